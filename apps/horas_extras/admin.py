@@ -283,10 +283,15 @@ class ResumenMensualAdmin(admin.ModelAdmin):
     actions = ['generar_resumen_seleccionados']
 
     def generar_resumen_seleccionados(self, request, queryset):
+        # Un cierre en bloque por período en lugar de un cálculo por fila
+        periodos = {}
+        for operador_id, ano, mes in queryset.values_list('operador_id', 'ano', 'mes'):
+            periodos.setdefault((ano, mes), []).append(operador_id)
+
         generados = 0
-        for resumen in queryset:
-            resumen.calcular_resumen()
-            generados += 1
+        for (ano, mes), operador_ids in periodos.items():
+            resultado = ResumenMensual.cerrar_mes(ano, mes, operador_ids)
+            generados += resultado['creados'] + resultado['actualizados']
 
         self.message_user(
             request,
@@ -0,0 +1,139 @@
+# apps/horas_extras/asignacion_masiva.py
+"""
+Asignación masiva de turnos (operador, fecha, tipo de turno) desde el
+calendario.
+
+asignar_turnos_masivo() atiende tanto ajax_asignar_turnos (un operador,
+varias fechas, usado por el calendario) como asignar_turnos_masivo_api
+(cualquier combinación): valida todas las asignaciones en memoria contra
+operadores, tipos de turno y turnos existentes leídos con una consulta cada
+uno, escribe con guardado_turnos.guardar_turnos_masivo
+(bulk_create/bulk_update) y recalcula los turnos N vecinos
+(recalculo_vecindad), todo en una transacción y con una sola
+reclasificación al final.
+"""
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .clasificacion_diaria import diferir_clasificacion
+from .guardado_turnos import CAMPOS_ACTUALIZABLES, guardar_turnos_masivo
+from .models import RegistroTurno, TipoTurno
+from .recalculo_vecindad import recalcular_vecindad
+
+# Límite por petición (un trimestre de 40 operadores cabe holgado)
+MAX_ASIGNACIONES = 5000
+
+# Al sobrescribir, el turno vuelve a 'programado' como en ajax_asignar_turnos
+CAMPOS_ASIGNACION = CAMPOS_ACTUALIZABLES + ['estado']
+
+
+def _entero(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def asignar_turnos_masivo(asignaciones, sobrescribir=True):
+    """
+    Asigna turnos en bloque.
+
+    Args:
+        asignaciones: Lista de dicts {'operador_id', 'fecha' ('YYYY-MM-DD'),
+            'tipo_turno_id'}
+        sobrescribir: Si es False, las fechas con turno se dejan como están
+
+    Returns:
+        dict: {
+            'resultados': [{'indice', 'operador_id', 'fecha', 'resultado', 'error'?}]
+                con resultado 'creado', 'actualizado', 'sin_cambios',
+                'existente' (sin sobrescribir), 'duplicado' (la misma
+                operador/fecha aparece después en la lista) o 'error',
+            'creados', 'actualizados', 'sin_cambios', 'existentes', 'errores': int,
+            'dias_afectados': [(operador_id, fecha)] turnos N vecinos recalculados,
+        }
+    """
+    resultados = []
+    validas = {}  # (operador_id, fecha) -> (indice, tipo_turno_id), gana la última
+    for indice, asignacion in enumerate(asignaciones):
+        operador_id = _entero(asignacion.get('operador_id'))
+        tipo_turno_id = _entero(asignacion.get('tipo_turno_id'))
+        fecha_str = asignacion.get('fecha')
+        resultado = {'indice': indice, 'operador_id': operador_id, 'fecha': fecha_str, 'resultado': None}
+        resultados.append(resultado)
+
+        try:
+            fecha = datetime.datetime.strptime(fecha_str or '', '%Y-%m-%d').date()
+        except ValueError:
+            resultado.update(resultado='error', error='Fecha inválida')
+            continue
+        if operador_id is None or tipo_turno_id is None:
+            resultado.update(resultado='error', error='Faltan operador_id o tipo_turno_id')
+            continue
+
+        clave = (operador_id, fecha)
+        if clave in validas:
+            resultados[validas[clave][0]]['resultado'] = 'duplicado'
+        validas[clave] = (indice, tipo_turno_id)
+
+    # Referencias y turnos existentes: una consulta cada uno
+    operadores = set(User.objects.filter(
+        id__in={operador_id for operador_id, _ in validas}, is_active=True
+    ).values_list('id', flat=True))
+    tipos = TipoTurno.objects.in_bulk({tipo_turno_id for _, tipo_turno_id in validas.values()})
+    existentes = set()
+    if validas:
+        fechas = [fecha for _, fecha in validas]
+        existentes = set(RegistroTurno.objects.filter(
+            operador_id__in=operadores, fecha__range=(min(fechas), max(fechas))
+        ).values_list('operador_id', 'fecha'))
+
+    turnos = []
+    indices = {}
+    for clave, (indice, tipo_turno_id) in validas.items():
+        operador_id, fecha = clave
+        resultado = resultados[indice]
+        tipo_turno = tipos.get(tipo_turno_id)
+        if operador_id not in operadores:
+            resultado.update(resultado='error', error='Operador no encontrado')
+        elif tipo_turno is None:
+            resultado.update(resultado='error', error='Tipo de turno no encontrado')
+        elif clave in existentes and not sobrescribir:
+            resultado['resultado'] = 'existente'
+        else:
+            # Horario del tipo de turno para el día de la semana (los N los
+            # ajusta recalcular_vecindad según sus vecinos)
+            hora_inicio, hora_fin, horas = tipo_turno.get_horario_por_dia(fecha)
+            turnos.append(RegistroTurno(
+                operador_id=operador_id, fecha=fecha, tipo_turno=tipo_turno,
+                hora_inicio_real=hora_inicio, hora_fin_real=hora_fin,
+                horas_programadas=horas, horas_trabajadas=Decimal('0.00'), estado='programado'
+            ))
+            indices[clave] = indice
+
+    afectados = []
+    if turnos:
+        with transaction.atomic(), diferir_clasificacion():
+            guardado = guardar_turnos_masivo(turnos, CAMPOS_ASIGNACION)
+            escritos = [clave for clave, accion in guardado['acciones'].items() if accion != 'sin_cambios']
+            afectados = recalcular_vecindad(escritos)
+        for clave, accion in guardado['acciones'].items():
+            resultados[indices[clave]]['resultado'] = accion
+
+    totales = {'creado': 0, 'actualizado': 0, 'sin_cambios': 0, 'existente': 0, 'error': 0}
+    for resultado in resultados:
+        if resultado['resultado'] in totales:
+            totales[resultado['resultado']] += 1
+
+    return {
+        'resultados': resultados,
+        'creados': totales['creado'],
+        'actualizados': totales['actualizado'],
+        'sin_cambios': totales['sin_cambios'],
+        'existentes': totales['existente'],
+        'errores': totales['error'],
+        'dias_afectados': afectados,
+    }
@@ -9,11 +9,32 @@ Clasifica en: HOD, RNO, RDF, RNF.
 
 import datetime
 from decimal import Decimal
-import holidays
 from django.utils import timezone
 
+from .festivos import es_festivo
 from .models_normativo import ParametroNormativo
 
+MINUTOS_DIA = 24 * 60
+CATEGORIAS = ('HOD', 'RNO', 'RDF', 'RNF')
+
+
+def _minutos_del_dia(valor):
+    """Minutos transcurridos desde medianoche para un time/datetime"""
+    return valor.hour * 60 + valor.minute
+
+
+def alinear_a_horas(dt_inicio, dt_fin):
+    """
+    Intervalo equivalente al recorrido hora por hora del cálculo original:
+    desde la hora en punto de inicio, tantas horas completas como pasos de
+    una hora caben en [dt_inicio, dt_fin) (la fracción final cuenta como hora).
+    """
+    inicio = dt_inicio.replace(minute=0, second=0, microsecond=0)
+    horas, resto = divmod(dt_fin - dt_inicio, datetime.timedelta(hours=1))
+    if resto:
+        horas += 1
+    return inicio, inicio + datetime.timedelta(hours=horas)
+
 
 class CalculadoraLegal:
     """
@@ -24,27 +45,29 @@ class CalculadoraLegal:
     """
 
     def __init__(self):
-        # Cache de festivos de Colombia
-        self.co_holidays = holidays.CO()
-        # Cache de parámetros por fecha
-        self._parametros_cache = {}
+        # Parámetros por defecto si no hay ParametroNormativo vigente
+        self._parametros_defecto = None
+        # Cache por fecha de festivo/domingo y de franjas nocturnas
+        self._dia_festivo_cache = {}
+        self._franjas_cache = {}
 
     def _obtener_parametros(self, fecha):
         """
         Obtiene parámetros normativos vigentes para una fecha.
-        Usa cache para evitar consultas repetidas.
+        ParametroNormativo.obtener_vigente resuelve con el índice de vigencias
+        del proceso (sin consulta por fecha).
         """
-        if fecha not in self._parametros_cache:
-            parametros = ParametroNormativo.obtener_vigente(fecha)
-            if not parametros:
-                # Fallback: crear instancia con defaults
-                parametros = ParametroNormativo()
-            self._parametros_cache[fecha] = parametros
-        return self._parametros_cache[fecha]
+        parametros = ParametroNormativo.obtener_vigente(fecha)
+        if not parametros:
+            # Fallback: crear instancia con defaults
+            if self._parametros_defecto is None:
+                self._parametros_defecto = ParametroNormativo()
+            parametros = self._parametros_defecto
+        return parametros
 
     def es_festivo(self, fecha):
-        """Verifica si una fecha es festivo en Colombia"""
-        return fecha in self.co_holidays
+        """Verifica si una fecha es festivo en Colombia (calendario de festivos.py)"""
+        return es_festivo(fecha)
 
     def obtener_inicio_nocturno(self, fecha):
         """
@@ -61,6 +84,90 @@ class CalculadoraLegal:
         parametros = self._obtener_parametros(fecha)
         return parametros.hora_fin_nocturno.hour
 
+    def es_dia_festivo(self, fecha):
+        """Festivo o domingo (recargo dominical/festivo), con cache por fecha"""
+        if fecha not in self._dia_festivo_cache:
+            self._dia_festivo_cache[fecha] = self.es_festivo(fecha) or fecha.weekday() == 6
+        return self._dia_festivo_cache[fecha]
+
+    def franjas_nocturnas(self, fecha, precision_minutos=False):
+        """
+        Franjas nocturnas del día como intervalos [inicio, fin) en minutos
+        desde medianoche, según los parámetros vigentes en la fecha.
+
+        Sin precision_minutos solo cuenta la hora de inicio/fin de la jornada
+        nocturna, igual que ParametroNormativo.es_hora_nocturna.
+        """
+        clave = (fecha, precision_minutos)
+        if clave not in self._franjas_cache:
+            parametros = self._obtener_parametros(fecha)
+            if precision_minutos:
+                inicio = _minutos_del_dia(parametros.hora_inicio_nocturno)
+                fin = _minutos_del_dia(parametros.hora_fin_nocturno)
+            else:
+                inicio = parametros.hora_inicio_nocturno.hour * 60
+                fin = parametros.hora_fin_nocturno.hour * 60
+
+            if inicio > fin:
+                # Jornada nocturna cruza medianoche (ej: 21:00 a 06:00)
+                franjas = ((0, fin), (inicio, MINUTOS_DIA))
+            elif inicio < fin:
+                franjas = ((inicio, fin),)
+            else:
+                franjas = ()
+            self._franjas_cache[clave] = franjas
+        return self._franjas_cache[clave]
+
+    def clasificar_intervalo(self, dt_inicio, dt_fin, precision_minutos=False):
+        """
+        Clasifica un intervalo de trabajo en minutos HOD/RNO/RDF/RNF por día
+        calendario.
+
+        El intervalo se corta en cada medianoche y cada tramo se intersecta
+        con las franjas nocturnas del día: el costo depende del número de
+        fronteras (días y franjas), no de la duración del turno.
+
+        Returns:
+            dict: { fecha: {'HOD': min, 'RNO': min, 'RDF': min, 'RNF': min} }
+        """
+        resultado = {}
+        fecha = dt_inicio.date()
+        desde = _minutos_del_dia(dt_inicio)
+        restante = int((dt_fin - dt_inicio).total_seconds() // 60)
+
+        while restante > 0:
+            hasta = min(desde + restante, MINUTOS_DIA)
+            nocturnos = 0
+            for franja_inicio, franja_fin in self.franjas_nocturnas(fecha, precision_minutos):
+                nocturnos += max(0, min(hasta, franja_fin) - max(desde, franja_inicio))
+            diurnos = (hasta - desde) - nocturnos
+
+            minutos = dict.fromkeys(CATEGORIAS, 0)
+            if self.es_dia_festivo(fecha):
+                minutos['RDF'], minutos['RNF'] = diurnos, nocturnos
+            else:
+                minutos['HOD'], minutos['RNO'] = diurnos, nocturnos
+            resultado[fecha] = minutos
+
+            restante -= hasta - desde
+            fecha += datetime.timedelta(days=1)
+            desde = 0
+
+        return resultado
+
+    def _clasificar_en_horas(self, dt_inicio, dt_fin, precision_minutos=False):
+        """clasificar_intervalo convertido a horas Decimal por fecha"""
+        # Sin precisión de minutos el intervalo está alineado a horas completas
+        # y se conserva el formato del cálculo original (Decimal('7.0'))
+        cuantizar = Decimal('0.01') if precision_minutos else Decimal('0.1')
+
+        resultado = {}
+        for fecha, minutos in self.clasificar_intervalo(dt_inicio, dt_fin, precision_minutos).items():
+            horas = {k: (Decimal(minutos[k]) / 60).quantize(cuantizar) for k in CATEGORIAS}
+            horas['TOTAL'] = (Decimal(sum(minutos.values())) / 60).quantize(cuantizar)
+            resultado[fecha] = horas
+        return resultado
+
     def es_hora_nocturna(self, fecha, hora):
         """
         Determina si una hora específica es nocturna según parámetros vigentes.
@@ -75,12 +182,16 @@ class CalculadoraLegal:
         parametros = self._obtener_parametros(fecha)
         return parametros.es_hora_nocturna(hora)
 
-    def calcular_horas_turno(self, turno):
+    def calcular_horas_turno(self, turno, precision_minutos=False):
         """
         Calcula el desglose de horas para un turno usando los intervalos REALES.
         Usa hora_inicio_real y hora_fin_real del objeto turno.
         Retorna: { fecha: {HOD, RNO, RDF, RNF, TOTAL} }
         
+        Con precision_minutos=True el intervalo real se clasifica al minuto
+        (ej: 06:30-14:00 = 7.50 HOD); por defecto se cuentan horas completas
+        como en el cálculo original.
+        
         Reglas:
         - Divide las horas en el día calendario donde realmente se trabajan
         - Clasifica cada hora según si es festivo/domingo (RNF) o no (RNO)
@@ -176,7 +287,6 @@ class CalculadoraLegal:
         hora_fin = getattr(turno, 'hora_fin_real', None)
         
         if hora_inicio and hora_fin:
-            # Si hay horarios reales, hacer cálculo hora por hora
             dt_inicio = datetime.datetime.combine(fecha_turno, hora_inicio)
             dt_fin = datetime.datetime.combine(fecha_turno, hora_fin)
             
@@ -184,39 +294,10 @@ class CalculadoraLegal:
             if hora_fin <= hora_inicio:
                 dt_fin += datetime.timedelta(days=1)
             
-            # Iterar hora por hora
-            dt_actual = dt_inicio
-            horas_contadas = Decimal('0.0')
+            if not precision_minutos:
+                dt_inicio, dt_fin = alinear_a_horas(dt_inicio, dt_fin)
             
-            while dt_actual < dt_fin: # Eliminado 'and horas_contadas < horas' para ser exactos con el rango
-                fecha_actual = dt_actual.date()
-                hora_actual = dt_actual.hour
-                
-                # Inicializar si no existe (por si cruza medianoche a otro día)
-                if fecha_actual not in resultado:
-                    resultado[fecha_actual] = {
-                        'HOD': Decimal('0.0'),
-                        'RNO': Decimal('0.0'),
-                        'RDF': Decimal('0.0'),
-                        'RNF': Decimal('0.0'),
-                        'TOTAL': Decimal('0.0')
-                    }
-                
-                # Determinar si es hora nocturna
-                es_hora_nocturna = self.es_hora_nocturna(fecha_actual, hora_actual)
-                es_dia_fest = self.es_festivo(fecha_actual) or (fecha_actual.weekday() == 6)
-                
-                # Clasificar la hora
-                if es_dia_fest:
-                    key = 'RNF' if es_hora_nocturna else 'RDF'
-                else:
-                    key = 'RNO' if es_hora_nocturna else 'HOD'
-                
-                resultado[fecha_actual][key] += Decimal('1.0')
-                resultado[fecha_actual]['TOTAL'] += Decimal('1.0')
-                horas_contadas += Decimal('1.0')
-                
-                dt_actual += datetime.timedelta(hours=1)
+            resultado.update(self._clasificar_en_horas(dt_inicio, dt_fin, precision_minutos))
         else:
             # Sin horarios reales, usar clasificación simple basada en tipo de turno
             resultado[fecha_turno]['TOTAL'] = horas
@@ -229,6 +310,41 @@ class CalculadoraLegal:
         
         return resultado
 
+    def clasificar_turnos(self, turnos, fecha_inicio=None, fecha_fin=None, precision_minutos=False):
+        """
+        Clasifica en un solo llamado los turnos de varios operadores (ej: todos
+        los RegistroTurno de un mes) y acumula las horas por operador y fecha.
+        
+        Los festivos y las franjas nocturnas se resuelven una vez por fecha y se
+        reutilizan entre todos los turnos del lote.
+        
+        Args:
+            turnos: Iterable de RegistroTurno (con select_related('tipo_turno'))
+            fecha_inicio, fecha_fin: Si se indican, solo se acumulan las fechas
+                dentro del rango (ej: descartar la parte del turno N del día
+                anterior al mes que cae en el mes anterior)
+            precision_minutos: Ver calcular_horas_turno
+        
+        Returns:
+            dict: { operador_id: { fecha: {HOD, RNO, RDF, RNF, TOTAL} } }
+        """
+        acumulado = {}
+        for turno in turnos:
+            if not turno.tipo_turno:
+                continue
+            
+            horas_operador = acumulado.setdefault(turno.operador_id, {})
+            for fecha, horas in self.calcular_horas_turno(turno, precision_minutos).items():
+                if (fecha_inicio and fecha < fecha_inicio) or (fecha_fin and fecha > fecha_fin):
+                    continue
+                if fecha in horas_operador:
+                    for k, valor in horas.items():
+                        horas_operador[fecha][k] += valor
+                else:
+                    horas_operador[fecha] = dict(horas)
+        
+        return acumulado
+
     def calcular_horas(self, fecha_turno, codigo_turno):
         """
         Método legacy para compatibilidad.
@@ -300,45 +416,8 @@ class CalculadoraLegal:
             else:
                 duracion = 7
         
-        # Iterar hora por hora
-        hora_actual = hora_inicio
-        fecha_actual = fecha_turno
-        horas_procesadas = 0
-        
-        while horas_procesadas < duracion:
-            # Inicializar acumulador para esta fecha
-            if fecha_actual not in resultado:
-                resultado[fecha_actual] = {
-                    'HOD': Decimal('0.0'),
-                    'RNO': Decimal('0.0'),
-                    'RDF': Decimal('0.0'),
-                    'RNF': Decimal('0.0'),
-                    'TOTAL': Decimal('0.0')
-                }
-            
-            # Determinar si es hora nocturna usando parámetros de BD
-            es_hora_nocturna = self.es_hora_nocturna(fecha_actual, hora_actual)
-            
-            # Determinar si es festivo o domingo
-            es_dia_festivo = self.es_festivo(fecha_actual) or (fecha_actual.weekday() == 6)
-            
-            # Clasificar la hora
-            if es_dia_festivo:
-                key = 'RNF' if es_hora_nocturna else 'RDF'
-            else:
-                key = 'RNO' if es_hora_nocturna else 'HOD'
-            
-            resultado[fecha_actual][key] += Decimal('1.0')
-            resultado[fecha_actual]['TOTAL'] += Decimal('1.0')
-            
-            # Avanzar hora
-            hora_actual += 1
-            horas_procesadas += 1
-            
-            # Cruce de medianoche
-            if hora_actual >= 24:
-                hora_actual = 0
-                fecha_actual = fecha_actual + datetime.timedelta(days=1)
+        dt_inicio = datetime.datetime.combine(fecha_turno, datetime.time(hora_inicio))
+        resultado.update(self._clasificar_en_horas(dt_inicio, dt_inicio + datetime.timedelta(hours=duracion)))
         
         return resultado
     
@@ -0,0 +1,233 @@
+# apps/horas_extras/calendario_cache.py
+"""
+Cache del payload mensual del calendario de turnos (ajax_calendario_data).
+
+El JSON de un mes se construye una vez por (año, mes, filtro de operador,
+formato) y se guarda serializado en el cache de Django junto con su ETag
+(hash del contenido) y la hora de construcción (Last-Modified).
+
+Invalidación por "generación" de mes, como el cache de procedimientos de
+reportes/utils.py: invalidar incrementa la generación del mes y deja
+huérfanas las entradas anteriores, que expiran por TTL (LocMemCache no
+borra por patrón). recalcular_clasificacion() invalida los meses del rango
+que reescribe; por ahí pasan todos los cambios de RegistroTurno (señales y
+guardado masivo), de parámetros normativos y de festivos.
+
+La generación solo invalida entre procesos si el cache es compartido
+(Redis, Memcached, base de datos). Con un backend local (LocMemCache) el
+incremento no llega a los demás procesos de IIS, que seguirían sirviendo el
+payload anterior con su ETag; en ese caso el payload no se cachea y se
+construye en cada petición desde la clasificación materializada (el ETag
+se calcula igual, así que una recarga sin cambios sigue respondiendo 304).
+"""
+import calendar
+import datetime
+import hashlib
+import json
+import logging
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .formato_compacto import FORMATO_COMPACTO, compactar_calendario
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'horas_extras:calendario'
+
+# Red de seguridad para cambios que no invalidan (p. ej. nombres de operadores)
+CALENDARIO_TTL = 600
+
+# Backends cuyo contenido no se comparte entre procesos
+BACKENDS_LOCALES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_compartido():
+    """Indica si el payload se puede cachear (la invalidación llega a todos los procesos)"""
+    return settings.CACHES['default']['BACKEND'] not in BACKENDS_LOCALES
+
+
+def _generacion_mes(ano, mes):
+    return cache.get(f'{CACHE_PREFIX}:gen:{ano}-{mes:02d}', 0)
+
+
+def _clave_payload(ano, mes, operador_id, formato):
+    generacion = _generacion_mes(ano, mes)
+    return f'{CACHE_PREFIX}:{ano}-{mes:02d}:{generacion}:{operador_id or "todos"}:{formato or "verboso"}'
+
+
+def _meses_rango(fecha_inicio, fecha_fin):
+    ano, mes = fecha_inicio.year, fecha_inicio.month
+    while (ano, mes) <= (fecha_fin.year, fecha_fin.month):
+        yield ano, mes
+        ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+
+
+def invalidar_calendario(fecha_inicio, fecha_fin):
+    """
+    Invalida los payloads de los meses de un rango, ahora y de nuevo al
+    confirmar la transacción en curso (otra petición podría reconstruirlos
+    con los datos previos al commit).
+    """
+    meses = list(_meses_rango(fecha_inicio, fecha_fin))
+
+    def _invalidar():
+        for ano, mes in meses:
+            clave_gen = f'{CACHE_PREFIX}:gen:{ano}-{mes:02d}'
+            # add() no sobrescribe; garantiza que incr() tenga una clave existente
+            cache.add(clave_gen, 0, None)
+            try:
+                cache.incr(clave_gen)
+            except ValueError:
+                cache.set(clave_gen, 1, None)
+
+    _invalidar()
+    transaction.on_commit(_invalidar)
+
+
+def construir_payload_calendario(ano, mes, operadores):
+    """
+    Datos del calendario de un mes: días (festivos) y, por operador, el turno
+    y las horas clasificadas de cada día.
+
+    Args:
+        operadores: QuerySet de User a incluir
+
+    Returns:
+        dict: {'calendario', 'operadores', 'mes', 'ano', 'nombre_mes'}
+    """
+    from .clasificacion_diaria import obtener_clasificacion
+    from .utils import CalculadoraHorasExtras
+
+    # Generar calendario
+    calendario_mes = CalculadoraHorasExtras.generar_calendario_mes(ano, mes)
+
+    # Rango de fechas
+    ultimo_dia = calendar.monthrange(ano, mes)[1]
+    fecha_inicio = datetime.date(ano, mes, 1)
+    fecha_fin = datetime.date(ano, mes, ultimo_dia)
+
+    operadores = list(operadores)
+
+    # Clasificación materializada del mes (incluye la continuidad del turno N
+    # del día anterior) con el turno de cada día: una sola consulta
+    clasificacion = obtener_clasificacion(fecha_inicio, fecha_fin, operadores)
+
+    horas_calculadas = {}  # {operador_id: {fecha_str: {HOD, RNO, RDF, RNF, TOTAL}}}
+    turnos_visual = {}  # {operador_id: {fecha_str: turno_info}}
+
+    for op_id, filas in clasificacion.items():
+        for fecha_calc, fila in filas.items():
+            fecha_str = fecha_calc.strftime('%Y-%m-%d')
+            horas_calculadas.setdefault(op_id, {})[fecha_str] = fila.horas()
+
+            # Turno visual (el que inicia ese día)
+            if fila.turno:
+                turnos_visual.setdefault(op_id, {})[fecha_str] = {
+                    'id': fila.turno.id,
+                    'tipo_turno': fila.turno.tipo_turno.codigo if fila.turno.tipo_turno else 'D',
+                    'estado': fila.turno.estado,
+                }
+
+    # Preparar respuesta con operadores
+    operadores_data = []
+    for operador in operadores:
+        turnos_operador = {}
+
+        for dia in calendario_mes:
+            fecha_str = dia['fecha'].strftime('%Y-%m-%d')
+            turno_info = turnos_visual.get(operador.id, {}).get(fecha_str)
+            horas_info = horas_calculadas.get(operador.id, {}).get(fecha_str, {
+                'HOD': Decimal(0), 'RNO': Decimal(0),
+                'RDF': Decimal(0), 'RNF': Decimal(0),
+                'TOTAL': Decimal(0)
+            })
+
+            if turno_info:
+                turnos_operador[fecha_str] = {
+                    'id': turno_info['id'],
+                    'tipo_turno': turno_info['tipo_turno'],
+                    'estado': turno_info['estado'],
+                    'HOD': str(horas_info['HOD']),
+                    'RNO': str(horas_info['RNO']),
+                    'RDF': str(horas_info['RDF']),
+                    'RNF': str(horas_info['RNF']),
+                    'TOTAL': str(horas_info['TOTAL']),
+                }
+            else:
+                turnos_operador[fecha_str] = None
+
+        operadores_data.append({
+            'id': operador.id,
+            'nombre': operador.get_full_name() or operador.username,
+            'username': operador.username,
+            'email': operador.email,
+            'turnos': turnos_operador
+        })
+
+    # Preparar datos del calendario
+    calendar_data = []
+    for dia in calendario_mes:
+        calendar_data.append({
+            'fecha': dia['fecha'].strftime('%Y-%m-%d'),
+            'dia': dia['dia'],
+            'dia_semana': dia['dia_semana'],
+            'nombre_dia': dia['nombre_dia'],
+            'es_festivo': dia['es_festivo'],
+            'es_domingo': dia['es_domingo'],
+            'es_sabado': dia['es_sabado'],
+            'festivo_info': dia['festivo_info']
+        })
+
+    return {
+        'calendario': calendar_data,
+        'operadores': operadores_data,
+        'mes': mes,
+        'ano': ano,
+        'nombre_mes': calendar.month_name[mes]
+    }
+
+
+def obtener_payload_calendario(ano, mes, operadores, operador_id=None, formato=None, use_cache=True):
+    """
+    Payload serializado del mes, desde el cache o construido y cacheado.
+
+    Args:
+        operadores: QuerySet de operadores (solo se evalúa si no hay cache)
+        operador_id: Filtro de operador de la petición (parte de la clave)
+        formato: None (verboso) o 'compacto' (formato_compacto.py)
+        use_cache: Si es False se reconstruye y reemplaza la entrada
+
+    Returns:
+        dict: {'contenido': bytes JSON, 'etag': str, 'generado': timestamp}
+    """
+    compartido = cache_compartido()
+    clave = _clave_payload(ano, mes, operador_id, formato)
+    if use_cache and compartido:
+        payload = cache.get(clave)
+        if payload is not None:
+            return payload
+
+    datos = construir_payload_calendario(ano, mes, operadores)
+    if formato == FORMATO_COMPACTO:
+        contenido = json.dumps(compactar_calendario(datos), separators=(',', ':'))
+    else:
+        contenido = json.dumps(datos, cls=DjangoJSONEncoder)
+    contenido = contenido.encode('utf-8')
+    payload = {
+        'contenido': contenido,
+        'etag': '"%s"' % hashlib.md5(contenido).hexdigest(),
+        'generado': int(time.time()),
+    }
+    if not compartido:
+        return payload
+    cache.set(clave, payload, CALENDARIO_TTL)
+    logger.info(f"Calendario {ano}-{mes:02d} ({operador_id or 'todos'}, {formato or 'verboso'}) cacheado: {len(contenido)} bytes")
+    return payload
@@ -0,0 +1,293 @@
+# apps/horas_extras/clasificacion_diaria.py
+"""
+Mantenimiento y lectura de ClasificacionDiaria (HOD, RNO, RDF, RNF por
+operador y día).
+
+Escritura: recalcular_clasificacion() reclasifica un rango de fechas con
+CalculadoraLegal y reemplaza las filas del rango. Las señales (signals.py)
+lo invocan con el rango mínimo afectado por cada cambio; dentro de
+diferir_clasificacion() los cambios se acumulan y se recalculan una sola
+vez al salir (generación masiva de turnos).
+
+Los cambios de vigencias normativas afectan desde la vigencia hasta el
+último turno: programar_reclasificacion() los recalcula mes a mes al
+confirmar la transacción, en un worker de Celery (o en línea con
+CLASIFICACION_EAGER = True).
+
+Cada recálculo invalida el payload cacheado del calendario de los meses del
+rango (calendario_cache.py).
+
+Lectura: obtener_clasificacion() devuelve un mes de todos los operadores con
+una sola consulta sobre el índice (fecha, operador). Antes comprueba que todo
+turno del rango tenga su fila; los operadores con turnos sin clasificar
+(datos previos a la tabla, cargas por SQL directo o QuerySet.update) se
+clasifican en ese momento y quedan materializados para las lecturas
+siguientes.
+"""
+import calendar
+import datetime
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, Max, OuterRef
+
+from .calculos_legales import CalculadoraLegal
+from .calendario_cache import invalidar_calendario
+from .models import ClasificacionDiaria, RegistroTurno
+from .vigencias import invalidar_vigencias
+
+logger = logging.getLogger(__name__)
+
+# Lotes de bulk_create por debajo del límite de 2100 parámetros de SQL Server
+TAMANO_LOTE = 200
+
+_estado = threading.local()
+
+
+def recalcular_clasificacion(fecha_inicio, fecha_fin, operador_ids=None, calculadora=None):
+    """
+    Recalcula la clasificación materializada de un rango de fechas.
+
+    Incluye los turnos del día anterior a fecha_inicio (su parte nocturna
+    puede caer en el rango).
+
+    Args:
+        fecha_inicio, fecha_fin: Rango a reemplazar (inclusive)
+        operador_ids: Operadores a recalcular (None = todos)
+        calculadora: CalculadoraLegal a reutilizar (opcional)
+
+    Returns:
+        int: Filas escritas
+    """
+    calculadora = calculadora or CalculadoraLegal()
+    if operador_ids is not None:
+        operador_ids = list(operador_ids)
+
+    turnos = RegistroTurno.objects.filter(
+        fecha__range=(fecha_inicio - datetime.timedelta(days=1), fecha_fin)
+    ).select_related('tipo_turno')
+    if operador_ids is not None:
+        turnos = turnos.filter(operador_id__in=operador_ids)
+    turnos = list(turnos)
+
+    # Una fila por turno del rango (aunque no sume horas) y por fecha con horas
+    filas = {}
+    for turno in turnos:
+        if fecha_inicio <= turno.fecha <= fecha_fin:
+            filas[(turno.operador_id, turno.fecha)] = ClasificacionDiaria(
+                operador_id=turno.operador_id, fecha=turno.fecha, turno=turno
+            )
+
+    horas_por_operador = calculadora.clasificar_turnos(turnos, fecha_inicio, fecha_fin)
+    for operador_id, dias in horas_por_operador.items():
+        for fecha, horas in dias.items():
+            fila = filas.get((operador_id, fecha))
+            if fila is None:
+                fila = filas[(operador_id, fecha)] = ClasificacionDiaria(operador_id=operador_id, fecha=fecha)
+            fila.asignar_horas(horas)
+
+    with transaction.atomic():
+        existentes = ClasificacionDiaria.objects.filter(fecha__range=(fecha_inicio, fecha_fin))
+        if operador_ids is not None:
+            existentes = existentes.filter(operador_id__in=operador_ids)
+        existentes.delete()
+        ClasificacionDiaria.objects.bulk_create(filas.values(), batch_size=TAMANO_LOTE)
+
+    # Payloads cacheados del calendario que muestran el rango
+    invalidar_calendario(fecha_inicio, fecha_fin)
+
+    return len(filas)
+
+
+def ultima_fecha_clasificable():
+    """
+    Límite de los recálculos hacia adelante: el día siguiente al último
+    RegistroTurno (su turno nocturno termina ese día). None si no hay turnos.
+    """
+    ultima = RegistroTurno.objects.aggregate(ultima=Max('fecha'))['ultima']
+    return ultima + datetime.timedelta(days=1) if ultima else None
+
+
+def tramos_mensuales(fecha_inicio, fecha_fin):
+    """Divide un rango en tramos (inicio, fin) que no cruzan de mes"""
+    actual = fecha_inicio
+    while actual <= fecha_fin:
+        fin_mes = datetime.date(actual.year, actual.month, calendar.monthrange(actual.year, actual.month)[1])
+        fin_tramo = min(fin_mes, fecha_fin)
+        yield actual, fin_tramo
+        actual = fin_tramo + datetime.timedelta(days=1)
+
+
+def reclasificar_desde(fecha_inicio):
+    """
+    Recalcula todos los operadores desde fecha_inicio hasta
+    ultima_fecha_clasificable(), un mes por transacción.
+
+    Un error se registra con el mes en que falló y se propaga (los meses
+    anteriores ya quedaron confirmados).
+
+    Returns:
+        int: Filas escritas
+    """
+    fecha_fin = ultima_fecha_clasificable()
+    if fecha_fin is None or fecha_fin < fecha_inicio:
+        return 0
+
+    # En un worker el índice de vigencias puede ser anterior al cambio
+    invalidar_vigencias()
+    calculadora = CalculadoraLegal()
+    total = 0
+    for inicio, fin in tramos_mensuales(fecha_inicio, fecha_fin):
+        try:
+            total += recalcular_clasificacion(inicio, fin, calculadora=calculadora)
+        except Exception as e:
+            logger.error(
+                f"Error al recalcular ClasificacionDiaria {inicio:%Y-%m}: {e}. "
+                f"Ejecute reconstruir_clasificacion_diaria --desde {inicio}"
+            )
+            raise
+    logger.info(f"ClasificacionDiaria recalculada {fecha_inicio} - {fecha_fin}: {total} filas")
+    return total
+
+
+def programar_reclasificacion(fecha_inicio):
+    """
+    Encola reclasificar_desde(fecha_inicio) al confirmar la transacción en
+    curso. Con CLASIFICACION_EAGER se ejecuta en el mismo proceso; los
+    errores (también al encolar) se propagan.
+    """
+    def _encolar():
+        if getattr(settings, 'CLASIFICACION_EAGER', False):
+            reclasificar_desde(fecha_inicio)
+            return
+
+        from .tasks import reclasificar_desde_task
+        try:
+            reclasificar_desde_task.delay(fecha_inicio.isoformat())
+        except Exception as e:
+            logger.error(
+                f"No se pudo encolar la reclasificación desde {fecha_inicio}: {e}. "
+                f"Ejecute reconstruir_clasificacion_diaria --desde {fecha_inicio}"
+            )
+            raise
+
+    transaction.on_commit(_encolar)
+
+
+def marcar_cambio(fecha_inicio, fecha_fin, operador_ids=None):
+    """
+    Registra que la clasificación de un rango quedó desactualizada.
+
+    Fuera de diferir_clasificacion() recalcula de inmediato; dentro, acumula
+    el rango y los operadores para un único recálculo al salir.
+    """
+    if fecha_inicio is None or fecha_fin is None or fecha_fin < fecha_inicio:
+        return
+
+    pendiente = getattr(_estado, 'pendiente', None)
+    if pendiente is None:
+        recalcular_clasificacion(fecha_inicio, fecha_fin, operador_ids)
+        return
+
+    if pendiente['desde'] is None:
+        pendiente['desde'], pendiente['hasta'] = fecha_inicio, fecha_fin
+    else:
+        pendiente['desde'] = min(pendiente['desde'], fecha_inicio)
+        pendiente['hasta'] = max(pendiente['hasta'], fecha_fin)
+    if operador_ids is None or pendiente['operadores'] is None:
+        pendiente['operadores'] = None
+    else:
+        pendiente['operadores'].update(operador_ids)
+
+
+@contextmanager
+def diferir_clasificacion():
+    """
+    Acumula los cambios de turnos del bloque y recalcula una sola vez al salir.
+
+    Uso:
+        with diferir_clasificacion():
+            for turno in turnos:
+                turno.save()
+    """
+    if getattr(_estado, 'pendiente', None) is not None:
+        # Bloque anidado: el externo recalcula
+        yield
+        return
+
+    _estado.pendiente = {'desde': None, 'hasta': None, 'operadores': set()}
+    try:
+        yield
+    finally:
+        pendiente = _estado.pendiente
+        _estado.pendiente = None
+
+    # Solo si el bloque terminó bien; un error del recálculo se propaga
+    if pendiente['desde'] is not None:
+        recalcular_clasificacion(pendiente['desde'], pendiente['hasta'], pendiente['operadores'])
+
+
+def _operadores_sin_clasificar(fecha_inicio, fecha_fin, operadores):
+    """Operadores con algún turno del rango que no tiene fila en ClasificacionDiaria"""
+    turnos = RegistroTurno.objects.filter(fecha__range=(fecha_inicio, fecha_fin)).exclude(
+        Exists(ClasificacionDiaria.objects.filter(operador_id=OuterRef('operador_id'), fecha=OuterRef('fecha')))
+    )
+    if operadores is not None:
+        turnos = turnos.filter(operador__in=operadores)
+    return set(turnos.values_list('operador_id', flat=True).distinct())
+
+
+def completar_clasificacion(fecha_inicio, fecha_fin, operadores=None):
+    """
+    Clasifica los operadores del rango que tienen turnos sin materializar.
+
+    Returns:
+        set: Ids de los operadores recalculados
+    """
+    faltantes = _operadores_sin_clasificar(fecha_inicio, fecha_fin, operadores)
+    if not faltantes:
+        return faltantes
+
+    logger.warning(
+        f"ClasificacionDiaria incompleta {fecha_inicio} - {fecha_fin} para {len(faltantes)} operadores; "
+        f"clasificando en la lectura"
+    )
+    try:
+        recalcular_clasificacion(fecha_inicio, fecha_fin, faltantes)
+    except IntegrityError:
+        # Otra petición materializó el mismo rango al mismo tiempo
+        logger.info(f"ClasificacionDiaria {fecha_inicio} - {fecha_fin} completada por otro proceso")
+    return faltantes
+
+
+def obtener_clasificacion(fecha_inicio, fecha_fin, operadores=None):
+    """
+    Lee la clasificación materializada de un rango (una consulta, más la
+    comprobación de turnos sin clasificar; ver completar_clasificacion).
+
+    Args:
+        fecha_inicio, fecha_fin: Rango de fechas (inclusive)
+        operadores: QuerySet/lista de User o de ids (None = todos)
+
+    Returns:
+        dict: { operador_id: { fecha: ClasificacionDiaria } } con turno y
+        turno.tipo_turno cargados
+    """
+    if operadores is not None and isinstance(operadores, (list, tuple, set)):
+        operadores = [getattr(o, 'pk', o) for o in operadores]
+
+    completar_clasificacion(fecha_inicio, fecha_fin, operadores)
+
+    filas = ClasificacionDiaria.objects.filter(
+        fecha__range=(fecha_inicio, fecha_fin)
+    ).select_related('turno__tipo_turno')
+    if operadores is not None:
+        filas = filas.filter(operador__in=operadores)
+
+    resultado = {}
+    for fila in filas:
+        resultado.setdefault(fila.operador_id, {})[fila.fecha] = fila
+    return resultado
@@ -0,0 +1,120 @@
+# apps/horas_extras/festivos.py
+"""
+Calendario de festivos del proceso.
+
+Une los festivos de Colombia de la librería holidays con los DiaFestivo
+activos y los guarda por año en un frozenset (búsqueda O(1)). Reemplaza los
+holidays.CO() creados en cada llamada y la consulta de DiaFestivo.es_festivo
+en cada RegistroTurno.save(). Lo usan models, utils, calculos_legales,
+motor_normativo y guardado_turnos.
+
+Invalidación (igual que vigencias.py):
+- Señales post_save/post_delete de DiaFestivo (signals.py), de inmediato y
+  otra vez al confirmar la transacción.
+- TTL_SEGUNDOS para cambios hechos desde otro proceso.
+"""
+import calendar
+import datetime
+import threading
+import time
+
+import holidays
+from django.db import transaction
+
+# Recarga periódica aunque no llegue una señal (cambios de otros procesos)
+TTL_SEGUNDOS = 300
+
+
+class CalendarioFestivos:
+    """Festivos por año (librería holidays + DiaFestivo activos)"""
+
+    def __init__(self, ttl=TTL_SEGUNDOS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # { año: (frozenset de fechas, cargado_en) }
+        self._anos = {}
+
+    def _festivos_locales(self, ano):
+        """DiaFestivo activos del año"""
+        from .models import DiaFestivo
+        return DiaFestivo.objects.filter(fecha__year=ano, activo=True).values_list('fecha', flat=True)
+
+    def festivos_ano(self, ano):
+        """frozenset con los festivos de un año"""
+        entrada = self._anos.get(ano)
+        if entrada is not None and time.monotonic() - entrada[1] < self.ttl:
+            return entrada[0]
+
+        with self._lock:
+            entrada = self._anos.get(ano)
+            if entrada is None or time.monotonic() - entrada[1] >= self.ttl:
+                fechas = set(holidays.CO(years=ano))
+                fechas.update(self._festivos_locales(ano))
+                entrada = (frozenset(fechas), time.monotonic())
+                self._anos[ano] = entrada
+        return entrada[0]
+
+    def es_festivo(self, fecha):
+        if isinstance(fecha, datetime.datetime):
+            fecha = fecha.date()
+        return fecha in self.festivos_ano(fecha.year)
+
+    def festivos_rango(self, fecha_inicio, fecha_fin):
+        """set de festivos entre dos fechas (inclusive)"""
+        festivos = set()
+        for ano in range(fecha_inicio.year, fecha_fin.year + 1):
+            festivos.update(f for f in self.festivos_ano(ano) if fecha_inicio <= f <= fecha_fin)
+        return festivos
+
+    def festivos_mes(self, ano, mes):
+        """Festivos de un mes, ordenados"""
+        ultimo = calendar.monthrange(ano, mes)[1]
+        return sorted(self.festivos_rango(datetime.date(ano, mes, 1), datetime.date(ano, mes, ultimo)))
+
+    def exportar(self, anos):
+        """{ año: frozenset } para precargar otro proceso (workers)"""
+        return {ano: self.festivos_ano(ano) for ano in anos}
+
+    def precargar(self, festivos_por_ano):
+        """Instala años ya calculados sin consultar la BD"""
+        ahora = time.monotonic()
+        for ano, fechas in festivos_por_ano.items():
+            self._anos[ano] = (frozenset(fechas), ahora)
+
+    def invalidar(self, *anos):
+        """Descarta los años indicados (todos si no se indica ninguno)"""
+        if not anos:
+            self._anos = {}
+            return
+        for ano in anos:
+            self._anos.pop(ano, None)
+
+
+calendario = CalendarioFestivos()
+
+
+def es_festivo(fecha):
+    """Si la fecha es festivo (no incluye domingos)"""
+    return calendario.es_festivo(fecha)
+
+
+def obtener_festivos_rango(fecha_inicio, fecha_fin):
+    """set de festivos entre dos fechas (inclusive)"""
+    return calendario.festivos_rango(fecha_inicio, fecha_fin)
+
+
+def obtener_festivos_mes(ano, mes):
+    """Lista ordenada de los festivos de un mes"""
+    return calendario.festivos_mes(ano, mes)
+
+
+def invalidar_festivos(*anos):
+    """
+    Descarta los años del calendario ahora y de nuevo al confirmar la
+    transacción en curso.
+    """
+    def _invalidar():
+        calendario.invalidar(*anos)
+
+    _invalidar()
+    transaction.on_commit(_invalidar)
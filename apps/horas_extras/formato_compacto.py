@@ -0,0 +1,161 @@
+# apps/horas_extras/formato_compacto.py
+"""
+Formato compacto (columnar) de las respuestas del calendario.
+
+El formato verboso repite por cada turno el nombre del operador, el color,
+el código y las horas como texto. El compacto, opcional con
+?formato=compacto, envía:
+
+- Diccionarios: operadores, tipos de turno y estados una sola vez; las
+  filas los referencian por índice.
+- Columnas: un arreglo por campo (día, operador, tipo, horas...) en lugar
+  de un objeto por turno.
+- Números: fechas como desplazamiento en días desde 'inicio' y horas como
+  enteros en centésimas (9.00 -> 900), que comprimen mejor con gzip que
+  los decimales en texto.
+
+Reconstrucción de la fila i en el cliente:
+    fecha  = inicio + turnos.dia[i] días
+    tipo   = tipos[turnos.tipo[i]]
+    horas  = turnos.horas.HOD[i] / escala_horas
+"""
+import datetime
+from decimal import Decimal
+
+FORMATO_COMPACTO = 'compacto'
+VERSION_COMPACTO = 1
+
+COLUMNAS_HORAS = ('HOD', 'RNO', 'RDF', 'RNF', 'TOTAL')
+ESCALA_HORAS = 100
+
+
+def es_formato_compacto(request):
+    """True si la petición pide el formato compacto (?formato=compacto)"""
+    return request.GET.get('formato') == FORMATO_COMPACTO
+
+
+def centesimas(valor):
+    """Horas (Decimal, float o texto) como entero en centésimas"""
+    return int((Decimal(str(valor or 0)) * ESCALA_HORAS).to_integral_value())
+
+
+class Diccionario:
+    """Codificación por diccionario: valor -> índice en orden de aparición"""
+
+    def __init__(self):
+        self.valores = []
+        self._indices = {}
+
+    def indice(self, valor, clave=None):
+        clave = valor if clave is None else clave
+        if clave not in self._indices:
+            self._indices[clave] = len(self.valores)
+            self.valores.append(valor)
+        return self._indices[clave]
+
+
+def _columnas_horas():
+    return {columna: [] for columna in COLUMNAS_HORAS}
+
+
+def compactar_calendario(payload):
+    """
+    Convierte el payload verboso de ajax_calendario_data al formato compacto.
+
+    Solo se incluyen los días con turno (en el verboso, los días sin turno
+    van como null).
+    """
+    inicio = datetime.date(payload['ano'], payload['mes'], 1)
+    estados = Diccionario()
+    tipos = Diccionario()
+
+    festivos, festivos_info = [], []
+    for dia in payload['calendario']:
+        if dia['es_festivo']:
+            festivos.append(dia['dia'] - 1)
+            festivos_info.append(dia['festivo_info'])
+
+    operadores = {'id': [], 'nombre': [], 'username': [], 'email': []}
+    turnos = {'id': [], 'operador': [], 'dia': [], 'tipo': [], 'estado': [], 'horas': _columnas_horas()}
+    for indice_operador, operador in enumerate(payload['operadores']):
+        for campo in operadores:
+            operadores[campo].append(operador[campo])
+
+        for fecha_str, turno in operador['turnos'].items():
+            if turno is None:
+                continue
+            turnos['id'].append(turno['id'])
+            turnos['operador'].append(indice_operador)
+            turnos['dia'].append((datetime.date.fromisoformat(fecha_str) - inicio).days)
+            turnos['tipo'].append(tipos.indice(turno['tipo_turno']))
+            turnos['estado'].append(estados.indice(turno['estado']))
+            for columna in COLUMNAS_HORAS:
+                turnos['horas'][columna].append(centesimas(turno[columna]))
+
+    return {
+        'formato': FORMATO_COMPACTO,
+        'version': VERSION_COMPACTO,
+        'ano': payload['ano'],
+        'mes': payload['mes'],
+        'nombre_mes': payload['nombre_mes'],
+        'inicio': inicio.isoformat(),
+        'dias': len(payload['calendario']),
+        'festivos': festivos,
+        'festivos_info': festivos_info,
+        'escala_horas': ESCALA_HORAS,
+        'operadores': operadores,
+        'tipos': tipos.valores,
+        'estados': estados.valores,
+        'turnos': turnos,
+    }
+
+
+def compactar_eventos(eventos, inicio):
+    """
+    Convierte la lista de eventos de FullCalendar (obtener_eventos_calendario)
+    al formato compacto.
+
+    El color y el código van en el diccionario de tipos de turno; el festivo,
+    en la lista de días festivos del rango.
+
+    Args:
+        eventos: Lista de eventos en formato verboso
+        inicio: Fecha base de los desplazamientos en días
+    """
+    operadores = Diccionario()
+    tipos = Diccionario()
+    patrones = Diccionario()
+    festivos = set()
+
+    columnas = {'id': [], 'operador': [], 'dia': [], 'tipo': [], 'patron': [], 'horas': _columnas_horas()}
+    for evento in eventos:
+        props = evento['extendedProps']
+        dia = (datetime.date.fromisoformat(evento['start']) - inicio).days
+
+        columnas['id'].append(evento['id'])
+        columnas['operador'].append(operadores.indice(
+            {'id': evento['resourceId'], 'nombre': props['operador_nombre']}, evento['resourceId']
+        ))
+        columnas['dia'].append(dia)
+        columnas['tipo'].append(tipos.indice(
+            {'id': props['tipo_turno_id'], 'codigo': props['codigo_turno'], 'color': evento['backgroundColor']},
+            props['tipo_turno_id']
+        ))
+        patron = props['codigo_patron']
+        columnas['patron'].append(None if patron is None else patrones.indice(patron))
+        for columna in COLUMNAS_HORAS:
+            columnas['horas'][columna].append(centesimas(props['horas'][columna]))
+        if props['es_festivo']:
+            festivos.add(dia)
+
+    return {
+        'formato': FORMATO_COMPACTO,
+        'version': VERSION_COMPACTO,
+        'inicio': inicio.isoformat(),
+        'festivos': sorted(festivos),
+        'escala_horas': ESCALA_HORAS,
+        'operadores': operadores.valores,
+        'tipos': tipos.valores,
+        'patrones': patrones.valores,
+        'eventos': columnas,
+    }
@@ -0,0 +1,130 @@
+# apps/horas_extras/guardado_turnos.py
+"""
+Guardado masivo de turnos generados (upsert por operador y fecha).
+
+guardar_turnos_masivo() reemplaza el SELECT + save() por día de los
+generadores: calcula en memoria los campos derivados que RegistroTurno.save()
+resolvería fila por fila (día de la semana, festivo, nocturno, horas
+programadas), compara contra los turnos existentes leídos en una consulta y
+escribe solo las diferencias con bulk_create/bulk_update por lotes, en una
+transacción.
+
+bulk_create/bulk_update no disparan señales: ClasificacionDiaria se
+recalcula aquí con marcar_cambio() para todo el rango escrito.
+"""
+import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .clasificacion_diaria import marcar_cambio
+from .festivos import obtener_festivos_rango
+from .models import RegistroTurno
+
+# Lotes por debajo del límite de 2100 parámetros de SQL Server
+# (~25 columnas por fila al insertar, ~2 parámetros por campo al actualizar)
+TAMANO_LOTE_INSERCION = 80
+TAMANO_LOTE_ACTUALIZACION = 50
+
+# Campos que el generador decide para un turno existente
+CAMPOS_ACTUALIZABLES = ['tipo_turno', 'hora_inicio_real', 'hora_fin_real', 'horas_trabajadas']
+
+# Campos que calcula RegistroTurno.calcular_campos_derivados()
+CAMPOS_DERIVADOS = [
+    'es_lunes', 'es_martes', 'es_miercoles', 'es_jueves', 'es_viernes', 'es_sabado', 'es_domingo',
+    'es_festivo', 'incluye_nocturno', 'horas_programadas',
+]
+
+CENTESIMA = Decimal('0.01')
+
+
+def _valores(turno, campos):
+    """Valores comparables de los campos que se escriben al actualizar"""
+    valores = []
+    for campo in campos + CAMPOS_DERIVADOS:
+        valor = getattr(turno, 'tipo_turno_id' if campo == 'tipo_turno' else campo)
+        if isinstance(valor, Decimal):
+            # La BD guarda 2 decimales: 7.333... y 7.33 son el mismo valor
+            valor = valor.quantize(CENTESIMA)
+        valores.append(valor)
+    return valores
+
+
+def guardar_turnos_masivo(turnos, campos=None):
+    """
+    Crea o actualiza turnos (clave: operador + fecha) en bloque.
+
+    A los turnos existentes solo se les actualizan los campos indicados (por
+    defecto CAMPOS_ACTUALIZABLES) y los campos derivados; estado y
+    observaciones se conservan salvo que se incluyan. Si la lista trae dos
+    turnos para el mismo operador y fecha, gana el último.
+
+    Args:
+        turnos: Iterable de RegistroTurno sin guardar (con tipo_turno asignado)
+        campos: Campos a copiar sobre los turnos existentes
+
+    Returns:
+        dict: {'creados', 'actualizados', 'sin_cambios': int,
+               'turnos': lista de RegistroTurno guardados,
+               'acciones': {(operador_id, fecha): 'creado' | 'actualizado' | 'sin_cambios'}}
+    """
+    campos = list(campos or CAMPOS_ACTUALIZABLES)
+    por_clave = {}
+    for turno in turnos:
+        por_clave[(turno.operador_id, turno.fecha)] = turno
+
+    resultado = {'creados': 0, 'actualizados': 0, 'sin_cambios': 0, 'turnos': [], 'acciones': {}}
+    if not por_clave:
+        return resultado
+
+    fechas = [fecha for _, fecha in por_clave]
+    desde, hasta = min(fechas), max(fechas)
+    operador_ids = {operador_id for operador_id, _ in por_clave}
+
+    festivos = obtener_festivos_rango(desde, hasta)
+    existentes = {
+        (registro.operador_id, registro.fecha): registro
+        for registro in RegistroTurno.objects.filter(operador_id__in=operador_ids, fecha__range=(desde, hasta))
+    }
+
+    nuevos, modificados = [], []
+    ahora = timezone.now()
+    for clave, turno in por_clave.items():
+        existente = existentes.get(clave)
+        if existente is None:
+            turno.calcular_campos_derivados(turno.fecha in festivos)
+            nuevos.append(turno)
+            resultado['turnos'].append(turno)
+            resultado['acciones'][clave] = 'creado'
+            continue
+
+        antes = _valores(existente, campos)
+        for campo in campos:
+            setattr(existente, campo, getattr(turno, campo))
+        existente.calcular_campos_derivados(existente.fecha in festivos)
+        if _valores(existente, campos) != antes:
+            existente.updated_at = ahora
+            modificados.append(existente)
+            resultado['acciones'][clave] = 'actualizado'
+        else:
+            resultado['sin_cambios'] += 1
+            resultado['acciones'][clave] = 'sin_cambios'
+        resultado['turnos'].append(existente)
+
+    with transaction.atomic():
+        RegistroTurno.objects.bulk_create(nuevos, batch_size=TAMANO_LOTE_INSERCION)
+        if modificados:
+            RegistroTurno.objects.bulk_update(
+                modificados, campos + CAMPOS_DERIVADOS + ['updated_at'],
+                batch_size=TAMANO_LOTE_ACTUALIZACION
+            )
+
+    resultado['creados'] = len(nuevos)
+    resultado['actualizados'] = len(modificados)
+
+    if nuevos or modificados:
+        # Sin señales: reclasificar el rango (y el día siguiente, turno nocturno)
+        marcar_cambio(desde, hasta + datetime.timedelta(days=1), operador_ids)
+
+    return resultado
@@ -0,0 +1,120 @@
+# apps/horas_extras/management/commands/benchmark_asignacion_masiva.py
+"""
+Benchmark de la asignación de turnos desde el calendario.
+
+Crea operadores sintéticos y asigna un mes completo (ciclo
+M/T/N/D) dos veces: fecha por fecha como ajax_asignar_turnos antes de la
+asignación masiva (filter().first() + create()/save() con sus señales) y con
+asignacion_masiva.asignar_turnos_masivo. Repite la asignación masiva sobre
+los turnos ya creados para medir la sobrescritura.
+
+Todo corre en una transacción que se revierte al final: la BD queda igual.
+
+Uso:
+    python manage.py benchmark_asignacion_masiva --operadores 40
+"""
+import datetime
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.horas_extras.asignacion_masiva import asignar_turnos_masivo
+from apps.horas_extras.models import RegistroTurno, TipoTurno
+
+CICLO = 'MTND'
+
+
+def asignar_por_fecha(asignaciones, tipos):
+    """Recorrido anterior de ajax_asignar_turnos: consultas y save() por fecha"""
+    for asignacion in asignaciones:
+        fecha = datetime.datetime.strptime(asignacion['fecha'], '%Y-%m-%d').date()
+        tipo_turno = tipos[asignacion['tipo_turno_id']]
+        existente = RegistroTurno.objects.filter(operador_id=asignacion['operador_id'], fecha=fecha).first()
+        hora_inicio, hora_fin, horas = tipo_turno.get_horario_por_dia(fecha)
+        if existente:
+            existente.tipo_turno = tipo_turno
+            existente.hora_inicio_real = hora_inicio
+            existente.hora_fin_real = hora_fin
+            existente.horas_programadas = horas
+            existente.estado = 'programado'
+            existente.save()
+        else:
+            RegistroTurno.objects.create(
+                operador_id=asignacion['operador_id'], tipo_turno=tipo_turno, fecha=fecha,
+                hora_inicio_real=hora_inicio, hora_fin_real=hora_fin, horas_programadas=horas,
+                horas_trabajadas=Decimal('0.00'), estado='programado'
+            )
+
+
+def generar_asignaciones(operadores, inicio, dias, tipo_por_codigo, desplazamiento=0):
+    """Ciclo M/T/N/D desfasado por operador"""
+    return [
+        {
+            'operador_id': operador.id,
+            'fecha': (inicio + datetime.timedelta(days=dia)).isoformat(),
+            'tipo_turno_id': tipo_por_codigo[CICLO[(dia + i + desplazamiento) % len(CICLO)]],
+        }
+        for i, operador in enumerate(operadores) for dia in range(dias)
+    ]
+
+
+class _Revertir(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Mide la asignación masiva de turnos contra la asignación fecha por fecha'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--operadores', type=int, default=20, help='Operadores por grupo (por defecto 20)')
+        parser.add_argument('--dias', type=int, default=30, help='Días a asignar (por defecto 30)')
+
+    def handle(self, *args, **options):
+        total, dias = options['operadores'], options['dias']
+        inicio_rango = datetime.date.today().replace(day=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'📊 Benchmark asignación: {total} operadores × {dias} días por grupo'
+        ))
+        try:
+            with transaction.atomic():
+                # Los tipos de turno del sistema; si faltan, se crean (y se revierten)
+                tipo_por_codigo = {
+                    codigo: TipoTurno.objects.get_or_create(codigo=codigo, defaults={
+                        'nombre': f'benchmark_{codigo}', 'descripcion': 'Benchmark', 'es_nocturno': codigo == 'N'
+                    })[0].id
+                    for codigo in CICLO
+                }
+                tipos = TipoTurno.objects.in_bulk(list(tipo_por_codigo.values()))
+                operadores = {
+                    grupo: [User.objects.create_user(f'benchmark_asignacion_{grupo}_{i}') for i in range(total)]
+                    for grupo in ('fecha', 'masivo')
+                }
+                por_fecha = generar_asignaciones(operadores['fecha'], inicio_rango, dias, tipo_por_codigo)
+                masivas = generar_asignaciones(operadores['masivo'], inicio_rango, dias, tipo_por_codigo)
+                # Sobrescritura: el ciclo corrido un día
+                rotadas = generar_asignaciones(operadores['masivo'], inicio_rango, dias, tipo_por_codigo, 1)
+
+                anterior = self._medir('Fecha por fecha', len(por_fecha), lambda: asignar_por_fecha(por_fecha, tipos))
+                masivo = self._medir('Masiva (creación)', len(masivas), lambda: asignar_turnos_masivo(masivas))
+                self._medir('Masiva (sobrescritura)', len(rotadas), lambda: asignar_turnos_masivo(rotadas))
+
+                self.stdout.write(self.style.SUCCESS(
+                    f'✅ Mejora: {anterior / masivo:.1f}x' if masivo else '✅ Sin tiempo medible'
+                ))
+                raise _Revertir
+        except _Revertir:
+            self.stdout.write('↩️ Datos del benchmark revertidos')
+
+    def _medir(self, nombre, cantidad, funcion):
+        inicio = time.perf_counter()
+        funcion()
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(
+            f'   • {nombre:<24} {cantidad:>6,} turnos en {duracion:6.2f} s '
+            f'({cantidad / duracion if duracion else 0:,.0f} turnos/s)'
+        )
+        return duracion
@@ -0,0 +1,129 @@
+# apps/horas_extras/management/commands/benchmark_reporte_mensual.py
+"""
+Benchmark de la clasificación mensual de horas.
+
+Genera operadores y turnos sintéticos en memoria (ciclo M/T/N/D) y compara,
+mes a mes durante un año, el recorrido anterior de las vistas (filtrar la
+lista completa de turnos una vez por operador) con la clasificación en una
+sola pasada (CalculadoraLegal.clasificar_turnos, la que usa
+recalcular_clasificacion). Solo consulta la BD para leer ParametroNormativo.
+"""
+import datetime
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from apps.horas_extras.calculos_legales import CalculadoraLegal
+from apps.horas_extras.reporte_mensual import CLAVES_HORAS, rango_mes
+
+HORARIOS = {
+    'M': (datetime.time(6, 0), datetime.time(14, 0)),
+    'T': (datetime.time(14, 0), datetime.time(22, 0)),
+    'N': (datetime.time(22, 0), datetime.time(6, 0)),
+}
+
+
+def _tipo_turno(codigo, horas):
+    return SimpleNamespace(codigo=codigo, get_horario_por_dia=lambda fecha: (None, None, horas))
+
+
+TIPOS = {
+    'M': _tipo_turno('M', Decimal('8.00')),
+    'T': _tipo_turno('T', Decimal('8.00')),
+    'N': _tipo_turno('N', Decimal('8.00')),
+    'D': _tipo_turno('D', Decimal('0.00')),
+}
+
+
+def generar_datos_sinteticos(total_operadores, ano, mes):
+    """Operadores y turnos con la forma de User/RegistroTurno"""
+    operadores = [
+        SimpleNamespace(id=i, username=f'operador{i}', get_full_name=lambda i=i: f'Operador {i}')
+        for i in range(1, total_operadores + 1)
+    ]
+    fecha_busqueda_inicio, _, fecha_fin = rango_mes(ano, mes)
+
+    turnos = []
+    for operador in operadores:
+        fecha = fecha_busqueda_inicio
+        while fecha <= fecha_fin:
+            codigo = 'MTND'[(fecha.toordinal() + operador.id) % 4]
+            inicio, fin = HORARIOS.get(codigo, (None, None))
+            turnos.append(SimpleNamespace(
+                operador_id=operador.id, fecha=fecha, tipo_turno=TIPOS[codigo],
+                hora_inicio_real=inicio, hora_fin_real=fin, horas_trabajadas=Decimal('0.00')
+            ))
+            fecha += datetime.timedelta(days=1)
+    return operadores, turnos
+
+
+def reporte_por_operador(operadores, turnos, ano, mes, calculadora):
+    """Recorrido anterior de las vistas: O(operadores × turnos)"""
+    _, fecha_inicio, fecha_fin = rango_mes(ano, mes)
+    datos = []
+    for operador in operadores:
+        acumulado = {}
+        turnos_op = [t for t in turnos if t.operador_id == operador.id]
+        for turno in turnos_op:
+            if turno.tipo_turno:
+                for fecha, horas in calculadora.calcular_horas_turno(turno).items():
+                    if fecha_inicio <= fecha <= fecha_fin:
+                        dia = acumulado.setdefault(fecha, {k: Decimal(0) for k in CLAVES_HORAS})
+                        for k in CLAVES_HORAS:
+                            dia[k] += horas.get(k, Decimal(0))
+        datos.append(acumulado)
+    return datos
+
+
+def clasificacion_en_lote(operadores, turnos, ano, mes, calculadora):
+    """Una sola pasada sobre todos los turnos del mes"""
+    _, fecha_inicio, fecha_fin = rango_mes(ano, mes)
+    return calculadora.clasificar_turnos(turnos, fecha_inicio, fecha_fin)
+
+
+class Command(BaseCommand):
+    help = 'Mide el reporte mensual de horas con operadores y turnos sintéticos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--operadores', type=int, default=200, help='Operadores del benchmark (por defecto 200)')
+        parser.add_argument('--ano', type=int, default=datetime.date.today().year, help='Año a recorrer (12 meses)')
+
+    def handle(self, *args, **options):
+        total = options['operadores']
+        ano = options['ano']
+
+        self.stdout.write(self.style.SUCCESS(f'📊 Benchmark reporte mensual: {total} operadores × 12 meses ({ano})'))
+
+        # Escalamiento: el recorrido anterior crece con operadores × turnos
+        self.stdout.write('\n📈 Escalamiento (un mes):')
+        for operadores_mes in (max(total // 4, 1), max(total // 2, 1), total):
+            operadores, turnos = generar_datos_sinteticos(operadores_mes, ano, 1)
+            anterior = self._medir(reporte_por_operador, operadores, turnos, ano, 1)
+            servicio = self._medir(clasificacion_en_lote, operadores, turnos, ano, 1)
+            self.stdout.write(
+                f'   • {operadores_mes:>5} operadores, {len(turnos):>6,} turnos: '
+                f'anterior {anterior:6.2f} s | servicio {servicio:6.2f} s'
+            )
+
+        # Año completo
+        self.stdout.write('\n⏱️ Año completo:')
+        total_anterior = total_servicio = 0.0
+        for mes in range(1, 13):
+            operadores, turnos = generar_datos_sinteticos(total, ano, mes)
+            total_anterior += self._medir(reporte_por_operador, operadores, turnos, ano, mes)
+            total_servicio += self._medir(clasificacion_en_lote, operadores, turnos, ano, mes)
+
+        self.stdout.write(f'   • Recorrido anterior: {total_anterior:6.2f} s')
+        self.stdout.write(f'   • Servicio:           {total_servicio:6.2f} s')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Mejora: {total_anterior / total_servicio:.1f}x' if total_servicio else '✅ Sin tiempo medible'
+        ))
+
+    def _medir(self, funcion, operadores, turnos, ano, mes):
+        # Calculadora nueva por medición: ambas pagan la carga de parámetros y festivos
+        calculadora = CalculadoraLegal()
+        inicio = time.perf_counter()
+        funcion(operadores, turnos, ano, mes, calculadora)
+        return time.perf_counter() - inicio
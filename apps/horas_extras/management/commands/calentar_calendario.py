@@ -0,0 +1,71 @@
+# apps/horas_extras/management/commands/calentar_calendario.py
+"""
+Precalienta el cache del payload del calendario (ajax_calendario_data) para
+el mes actual y el siguiente, en formato verboso y compacto: la vista
+general y, con --por-operador, el filtro de cada operador activo.
+
+Solo sirve si el cache es compartido (Redis, Memcached, base de datos):
+con un cache local el payload no se cachea (ver calendario_cache.py) y el
+comando no hace nada.
+
+Uso:
+    python manage.py calentar_calendario
+    python manage.py calentar_calendario --por-operador
+"""
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.horas_extras.calendario_cache import cache_compartido, obtener_payload_calendario
+from apps.horas_extras.formato_compacto import FORMATO_COMPACTO
+from apps.horas_extras.views import obtener_operadores_activos
+
+
+class Command(BaseCommand):
+    help = 'Precalienta el cache del calendario de turnos (mes actual y siguiente)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--por-operador',
+            action='store_true',
+            help='Calentar también la vista filtrada de cada operador activo'
+        )
+
+    def handle(self, *args, **options):
+        if not cache_compartido():
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ CACHES usa {settings.CACHES['default']['BACKEND']} (por proceso): "
+                f"el payload del calendario no se cachea, no hay nada que calentar"
+            ))
+            return
+
+        hoy = date.today()
+        meses = [(hoy.year, hoy.month), (hoy.year + 1, 1) if hoy.month == 12 else (hoy.year, hoy.month + 1)]
+
+        operador_ids = [None]
+        if options['por_operador']:
+            operador_ids += [str(op_id) for op_id in obtener_operadores_activos().values_list('id', flat=True)]
+
+        inicio = time.perf_counter()
+        formatos = [None, FORMATO_COMPACTO]
+        for ano, mes in meses:
+            for operador_id in operador_ids:
+                operadores = obtener_operadores_activos()
+                if operador_id:
+                    operadores = operadores.filter(id=operador_id)
+                for formato in formatos:
+                    # Reconstruye aunque exista: deja el payload con los datos actuales
+                    payload = obtener_payload_calendario(
+                        ano, mes, operadores, operador_id, formato, use_cache=False
+                    )
+                    if operador_id is None:
+                        self.stdout.write(
+                            f"   {mes:02d}/{ano} {formato or 'verboso'}: {len(payload['contenido']) / 1024:.1f} KB"
+                        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {len(meses) * len(operador_ids) * len(formatos)} payloads del calendario en cache '
+            f'en {time.perf_counter() - inicio:.1f} s'
+        ))
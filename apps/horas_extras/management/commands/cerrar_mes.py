@@ -0,0 +1,35 @@
+# apps/horas_extras/management/commands/cerrar_mes.py
+"""
+Cierre de mes: calcula y guarda ResumenMensual de todos los operadores de un
+mes (los que tienen turnos o un resumen ya creado) en bloque.
+
+Uso:
+    python manage.py cerrar_mes --ano 2026 --mes 1
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.horas_extras.models import ResumenMensual
+
+
+class Command(BaseCommand):
+    help = 'Calcula los resúmenes mensuales de todos los operadores de un mes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ano', type=int, required=True, help='Año')
+        parser.add_argument('--mes', type=int, required=True, help='Mes (1-12)')
+
+    def handle(self, *args, **options):
+        ano, mes = options['ano'], options['mes']
+        if not 1 <= mes <= 12:
+            raise CommandError('--mes debe estar entre 1 y 12')
+
+        self.stdout.write(f'🔄 Cerrando {mes:02d}/{ano}...')
+        inicio = time.perf_counter()
+        resultado = ResumenMensual.cerrar_mes(ano, mes)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {resultado['creados']} resúmenes creados, {resultado['actualizados']} actualizados "
+            f"en {time.perf_counter() - inicio:.1f} s"
+        ))
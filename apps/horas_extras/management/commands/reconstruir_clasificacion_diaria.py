@@ -0,0 +1,65 @@
+# apps/horas_extras/management/commands/reconstruir_clasificacion_diaria.py
+"""
+Reconstruye ClasificacionDiaria (HOD, RNO, RDF, RNF por operador y día) para
+un rango de fechas, mes a mes.
+
+Uso:
+    python manage.py reconstruir_clasificacion_diaria --desde 2025-01-01 --hasta 2025-12-31
+    python manage.py reconstruir_clasificacion_diaria --desde 2026-01-01 --operador 12
+
+Las lecturas clasifican por sí solas los turnos que no tienen fila
+(obtener_clasificacion), pero solo detectan turnos faltantes, no horas
+desactualizadas: usar el comando después de cargas que modifican turnos
+existentes sin pasar por las señales (SQL directo, QuerySet.update), o para
+materializar el histórico de una vez tras desplegar la tabla.
+"""
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.horas_extras.calculos_legales import CalculadoraLegal
+from apps.horas_extras.clasificacion_diaria import (
+    recalcular_clasificacion, tramos_mensuales, ultima_fecha_clasificable
+)
+from apps.horas_extras.models import RegistroTurno
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la clasificación diaria materializada de un rango de fechas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=str, default=None, help='Fecha inicio YYYY-MM-DD (por defecto el primer turno)')
+        parser.add_argument('--hasta', type=str, default=None, help='Fecha fin YYYY-MM-DD (por defecto el día siguiente al último turno)')
+        parser.add_argument('--operador', type=int, default=None, help='ID del operador (por defecto todos)')
+
+    def handle(self, *args, **options):
+        try:
+            desde = datetime.date.fromisoformat(options['desde']) if options['desde'] else None
+            hasta = datetime.date.fromisoformat(options['hasta']) if options['hasta'] else None
+        except ValueError as e:
+            raise CommandError(f'Fecha inválida: {e}')
+
+        desde = desde or RegistroTurno.objects.order_by('fecha').values_list('fecha', flat=True).first()
+        hasta = hasta or ultima_fecha_clasificable()
+        if not desde or not hasta:
+            self.stdout.write(self.style.WARNING('⚠️ No hay turnos registrados'))
+            return
+        if hasta < desde:
+            raise CommandError('--hasta debe ser posterior a --desde')
+
+        operador_ids = [options['operador']] if options['operador'] else None
+
+        self.stdout.write(f'🔄 Reconstruyendo clasificación diaria {desde} - {hasta}...')
+        inicio = time.perf_counter()
+        calculadora = CalculadoraLegal()
+        total = 0
+
+        for inicio_tramo, fin_tramo in tramos_mensuales(desde, hasta):
+            filas = recalcular_clasificacion(inicio_tramo, fin_tramo, operador_ids, calculadora)
+            total += filas
+            self.stdout.write(f'   • {inicio_tramo:%Y-%m}: {filas} filas')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {total} filas reconstruidas en {time.perf_counter() - inicio:.1f} s'
+        ))
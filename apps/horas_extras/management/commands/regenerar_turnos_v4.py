@@ -6,14 +6,24 @@ V4: Real hour ranges per turno + day of week, RNO from 19:00.
 Usage: 
     python manage.py regenerar_turnos_v4 --operador oscar
     python manage.py regenerar_turnos_v4 --todos
+    python manage.py regenerar_turnos_v4 --todos --workers 4
+    python manage.py regenerar_turnos_v4 --todos --dry-run
 """
 
+import time
 from datetime import date, timedelta
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
 from apps.horas_extras.models import RegistroTurno, TipoTurno, PatronOperador
+from apps.horas_extras.patrones import LineaSeeds
+from apps.horas_extras.regeneracion import (
+    calcular_turnos_operadores, diferencia_turnos, guardar_regeneracion, turnos_existentes
+)
 from apps.horas_extras.utils import GeneradorTurnosV4
 
+# Cambios listados por operador en --dry-run
+MAX_CAMBIOS_DRY_RUN = 10
+
 
 class Command(BaseCommand):
     help = 'Regenera turnos con lógica V4 (rangos horarios reales + recargos legales)'
@@ -42,12 +52,25 @@ class Command(BaseCommand):
             default='2026-02-28',
             help='Fecha fin (YYYY-MM-DD)'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Procesos para calcular los turnos en paralelo (por defecto 1)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostrar las diferencias por operador sin guardar'
+        )
 
     def handle(self, *args, **options):
         todos = options['todos']
         operador_query = options['operador']
         fecha_desde = date.fromisoformat(options['desde'])
         fecha_hasta = date.fromisoformat(options['hasta'])
+        workers = max(1, options['workers'])
+        dry_run = options['dry_run']
         
         self.stdout.write("=" * 70)
         self.stdout.write("REGENERACIÓN DE TURNOS V4")
@@ -108,46 +131,69 @@ class Command(BaseCommand):
         
         self.stdout.write("Rango: %s a %s" % (fecha_desde, fecha_hasta))
         
-        # Procesar cada operador
-        total_turnos = 0
-        operadores_procesados = 0
+        # Precarga: seeds, tipos de turno, festivos y turnos actuales (una consulta cada uno)
+        lineas = LineaSeeds.cargar(operadores)
+        nombres = {operador.pk: operador.get_full_name() for operador in operadores}
+        tipos_turno = {tipo.codigo: tipo for tipo in TipoTurno.objects.filter(codigo__in=['T', 'N', 'D', 'M', 'A'])}
+        festivos = GeneradorTurnosV4.obtener_festivos_rango(fecha_desde, fecha_hasta)
+        existentes = turnos_existentes(list(lineas), fecha_desde, fecha_hasta)
         
         for operador in operadores:
-            seeds = PatronOperador.objects.filter(operador=operador).order_by('fecha_inicio_patron')
+            seeds = lineas[operador.pk].seeds
             self.stdout.write("")
             self.stdout.write("Procesando: %s" % operador.get_full_name())
-            self.stdout.write("  Seeds configurados: %s" % seeds.count())
+            self.stdout.write("  Seeds configurados: %s" % len(seeds))
             for s in seeds:
                 motivo_str = " (%s)" % s.motivo if s.motivo else ""
                 self.stdout.write("    - %s desde %s%s" % (s.turno_inicial_patron, s.fecha_inicio_patron, motivo_str))
-
-            
-            # Eliminar turnos existentes
-            turnos_existentes = RegistroTurno.objects.filter(
-                operador=operador,
-                fecha__range=(fecha_desde, fecha_hasta)
-            )
-            count_antes = turnos_existentes.count()
-            turnos_existentes.delete()
-            
-            # Generar turnos con lógica V4
-            try:
-                turnos = GeneradorTurnosV4.generar_turnos_operador_v4(
-                    operador=operador,
-                    fecha_inicio=fecha_desde,
-                    fecha_fin=fecha_hasta
+            if not seeds:
+                self.stdout.write(self.style.ERROR("  [ERROR] No existe PatronOperador para %s" % operador.get_full_name()))
+                del lineas[operador.pk]
+        
+        # Cálculo (en paralelo con --workers) sin consultar la BD
+        dias = (fecha_hasta - fecha_desde).days + 1
+        self.stdout.write("")
+        self.stdout.write("Calculando %s operadores x %s días con %s worker(s)..." % (len(lineas), dias, workers))
+        
+        inicio = time.perf_counter()
+        turnos_por_operador = {}
+        for operador_id, turnos in calcular_turnos_operadores(
+            lineas, fecha_desde, fecha_hasta, festivos, set(tipos_turno), workers
+        ):
+            turnos_por_operador[operador_id] = turnos
+            diff = diferencia_turnos(existentes[operador_id], turnos)
+            self.stdout.write(
+                "  [%s/%s] %s: %s turnos (antes: %s; nuevos: %s, cambiados: %s, iguales: %s, eliminados: %s)" % (
+                    len(turnos_por_operador), len(lineas), nombres[operador_id], len(turnos),
+                    len(existentes[operador_id]), diff['nuevos'], diff['cambiados'], diff['iguales'], diff['eliminados']
                 )
-                
-                # Guardar
-                GeneradorTurnosV4.guardar_turnos(turnos)
-                total_turnos += len(turnos)
-                operadores_procesados += 1
-                
-                self.stdout.write(self.style.SUCCESS(
-                    "  [OK] %s turnos generados (antes: %s)" % (len(turnos), count_antes)
-                ))
-            except ValueError as e:
-                self.stdout.write(self.style.ERROR("  [ERROR] %s" % str(e)))
+            )
+            if dry_run:
+                for fecha, anterior, nuevo in diff['cambios'][:MAX_CAMBIOS_DRY_RUN]:
+                    self.stdout.write("      %s: %s -> %s" % (fecha, anterior or '-', nuevo or '-'))
+                if len(diff['cambios']) > MAX_CAMBIOS_DRY_RUN:
+                    self.stdout.write("      ... %s cambios más" % (len(diff['cambios']) - MAX_CAMBIOS_DRY_RUN))
+        
+        segundos = time.perf_counter() - inicio
+        operador_dias = len(turnos_por_operador) * dias
+        self.stdout.write("Cálculo: %s operador-días en %.2f s (%.0f operador-días/s)" % (
+            operador_dias, segundos, operador_dias / segundos if segundos else 0
+        ))
+        
+        total_turnos = sum(len(turnos) for turnos in turnos_por_operador.values())
+        operadores_procesados = len(turnos_por_operador)
+        
+        if dry_run:
+            self.stdout.write("")
+            self.stdout.write(self.style.WARNING("DRY-RUN: no se guardó ningún cambio"))
+            return
+        
+        # Escritor único: borrado + guardado masivo en una transacción
+        inicio = time.perf_counter()
+        guardado = guardar_regeneracion(turnos_por_operador, tipos_turno, fecha_desde, fecha_hasta)
+        self.stdout.write("Guardado: %s eliminados, %s creados en %.2f s" % (
+            guardado['eliminados'], guardado['creados'], time.perf_counter() - inicio
+        ))
         
         self.stdout.write("")
         self.stdout.write("=" * 70)
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:14
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('horas_extras', '0008_parametronormativo_configuracion_turnos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClasificacionDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('horas_hod', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=5)),
+                ('horas_rno', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=5)),
+                ('horas_rdf', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=5)),
+                ('horas_rnf', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=5)),
+                ('horas_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=5)),
+                ('fecha_calculo', models.DateTimeField(auto_now=True)),
+                ('operador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='clasificaciones_diarias', to=settings.AUTH_USER_MODEL)),
+                ('turno', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='horas_extras.registroturno')),
+            ],
+            options={
+                'verbose_name': 'Clasificación Diaria',
+                'verbose_name_plural': 'Clasificaciones Diarias',
+                'ordering': ['fecha', 'operador'],
+                'indexes': [models.Index(fields=['fecha', 'operador'], name='horas_extra_fecha_1c2122_idx')],
+                'unique_together': {('operador', 'fecha')},
+            },
+        ),
+    ]
@@ -8,6 +8,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
+import calendar
 import datetime
 from django.utils import timezone
 
@@ -116,8 +117,9 @@ class DiaFestivo(models.Model):
 
     @classmethod
     def es_festivo(cls, fecha):
-        """Verifica si una fecha es festivo"""
-        return cls.objects.filter(fecha=fecha, activo=True).exists()
+        """Verifica si una fecha es festivo (calendario del proceso: holidays + DiaFestivo activos)"""
+        from .festivos import es_festivo
+        return es_festivo(fecha)
 
     @classmethod
     def obtener_festivos_mes(cls, ano, mes):
@@ -189,6 +191,17 @@ class RegistroTurno(models.Model):
         return f"{self.operador.get_full_name() or self.operador.username} - {self.tipo_turno.codigo} - {self.fecha}"
 
     def save(self, *args, **kwargs):
+        self.calcular_campos_derivados(DiaFestivo.es_festivo(self.fecha))
+        super().save(*args, **kwargs)
+
+    def calcular_campos_derivados(self, es_festivo):
+        """
+        Calcula los campos de clasificación (día de la semana, festivo,
+        nocturno, horas programadas y trabajadas) sin consultar la BD.
+
+        Args:
+            es_festivo: Si la fecha es festivo (DiaFestivo activo)
+        """
         # Calcular automáticamente campos por día de la semana
         dia_semana = self.fecha.weekday()
         self.es_lunes = dia_semana == 0
@@ -199,7 +212,7 @@ class RegistroTurno(models.Model):
         self.es_sabado = dia_semana == 5
         self.es_domingo = dia_semana == 6
 
-        self.es_festivo = DiaFestivo.es_festivo(self.fecha)
+        self.es_festivo = es_festivo
         self.incluye_nocturno = self.tipo_turno.es_nocturno
 
         # Obtener horas programadas según el día
@@ -219,8 +232,6 @@ class RegistroTurno(models.Model):
             duracion = fin - inicio
             self.horas_trabajadas = Decimal(str(duracion.total_seconds() / 3600))
 
-        super().save(*args, **kwargs)
-
 
 class ResumenMensual(models.Model):
     """
@@ -265,39 +276,111 @@ class ResumenMensual(models.Model):
     def __str__(self):
         return f"{self.operador.get_full_name()} - {self.mes}/{self.ano}"
 
-    def calcular_resumen(self):
-        """Calcula el resumen de horas del mes"""
-        from django.db.models import Sum
+    # Campo -> filtro de turnos cuyas horas suma (None = todas)
+    FILTROS_HORAS = {
+        'total_horas_trabajadas': None,
+        # Por día de semana
+        'horas_lunes': models.Q(es_lunes=True),
+        'horas_martes': models.Q(es_martes=True),
+        'horas_miercoles': models.Q(es_miercoles=True),
+        'horas_jueves': models.Q(es_jueves=True),
+        'horas_viernes': models.Q(es_viernes=True),
+        'horas_sabados': models.Q(es_sabado=True),
+        'horas_domingos': models.Q(es_domingo=True),
+        # Por tipo especial
+        'horas_festivos': models.Q(es_festivo=True),
+        'horas_nocturnas': models.Q(incluye_nocturno=True),
+        'horas_nocturnas_festivas': models.Q(incluye_nocturno=True, es_festivo=True),
+        'horas_dominicales': models.Q(es_domingo=True),
+    }
 
-        turnos = RegistroTurno.objects.filter(
-            operador=self.operador,
-            fecha__year=self.ano,
-            fecha__month=self.mes,
+    CAMPOS_RESUMEN = ['total_turnos', 'total_horas_ordinarias'] + list(FILTROS_HORAS)
+
+    @classmethod
+    def turnos_del_mes(cls, ano, mes):
+        """Turnos trabajados del mes (base de los resúmenes)"""
+        ultimo = calendar.monthrange(ano, mes)[1]
+        return RegistroTurno.objects.filter(
+            fecha__range=(datetime.date(ano, mes, 1), datetime.date(ano, mes, ultimo)),
             estado='trabajado'
         )
 
-        self.total_turnos = turnos.count()
-        self.total_horas_trabajadas = turnos.aggregate(Sum('horas_trabajadas'))['horas_trabajadas__sum'] or Decimal('0.00')
+    @classmethod
+    def agregados(cls):
+        """Expresiones de agregación condicional de todos los totales (una consulta)"""
+        expresiones = {'total_turnos': models.Count('id')}
+        for campo, filtro in cls.FILTROS_HORAS.items():
+            expresiones[campo] = models.Sum('horas_trabajadas', filter=filtro)
+        return expresiones
+
+    def asignar_totales(self, valores):
+        """Copia los totales de un aggregate()/annotate() al resumen"""
+        self.total_turnos = valores.get('total_turnos') or 0
+        for campo in self.FILTROS_HORAS:
+            setattr(self, campo, valores.get(campo) or Decimal('0.00'))
         self.total_horas_ordinarias = self.total_horas_trabajadas  # No hay extras en este sistema
 
-        # Por día de semana
-        self.horas_lunes = turnos.filter(es_lunes=True).aggregate(Sum('horas_trabajadas'))['horas_trabajadas__sum'] or Decimal('0.00')
-        self.horas_martes = turnos.filter(es_martes=True).aggregate(Sum('horas_trabajadas'))['horas_trabajadas__sum'] or Decimal('0.00')
-        self.horas_miercoles = turnos.filter(es_miercoles=True).aggregate(Sum('horas_trabajadas'))['horas_trabajadas__sum'] or Decimal('0.00')
-        self.horas_jueves = turnos.filter(es_jueves=True).aggregate(Sum('horas_trabajadas'))['horas_trabajadas__sum'] or Decimal('0.00')
-        self.horas_viernes = turnos.filter(es_viernes=True).aggregate(Sum('horas_trabajadas'))['horas_trabajadas__sum'] or Decimal('0.00')
-        self.horas_sabados = turnos.filter(es_sabado=True).aggregate(Sum('horas_trabajadas'))['horas_trabajadas__sum'] or Decimal('0.00')
-        self.horas_domingos = turnos.filter(es_domingo=True).aggregate(Sum('horas_trabajadas'))['horas_trabajadas__sum'] or Decimal('0.00')
+    def calcular_resumen(self):
+        """Calcula el resumen de horas del mes"""
+        turnos = self.turnos_del_mes(self.ano, self.mes).filter(operador=self.operador)
 
-        # Por tipo especial
-        self.horas_festivos = turnos.filter(es_festivo=True).aggregate(Sum('horas_trabajadas'))['horas_trabajadas__sum'] or Decimal('0.00')
-        self.horas_nocturnas = turnos.filter(incluye_nocturno=True).aggregate(Sum('horas_trabajadas'))['horas_trabajadas__sum'] or Decimal('0.00')
-        self.horas_nocturnas_festivas = turnos.filter(incluye_nocturno=True, es_festivo=True).aggregate(Sum('horas_trabajadas'))['horas_trabajadas__sum'] or Decimal('0.00')
-        self.horas_dominicales = turnos.filter(es_domingo=True).aggregate(Sum('horas_trabajadas'))['horas_trabajadas__sum'] or Decimal('0.00')
+        self.asignar_totales(turnos.aggregate(**self.agregados()))
 
         self.save()
         return self
 
+    @classmethod
+    def cerrar_mes(cls, ano, mes, operadores=None):
+        """
+        Calcula y guarda (crea o actualiza) los resúmenes de un mes para
+        todos los operadores, con un número fijo de consultas.
+
+        Args:
+            operadores: QuerySet/lista de User o de ids (None = los que tienen
+                turnos en el mes o un resumen ya creado)
+
+        Returns:
+            dict: {'creados', 'actualizados'}
+        """
+        from django.db import transaction
+
+        ultimo = calendar.monthrange(ano, mes)[1]
+        existentes = {resumen.operador_id: resumen for resumen in cls.objects.filter(ano=ano, mes=mes)}
+
+        if operadores is None:
+            operador_ids = set(existentes)
+            operador_ids.update(RegistroTurno.objects.filter(
+                fecha__range=(datetime.date(ano, mes, 1), datetime.date(ano, mes, ultimo))
+            ).values_list('operador_id', flat=True).distinct())
+        else:
+            operador_ids = {getattr(operador, 'pk', operador) for operador in operadores}
+
+        totales = {
+            fila['operador_id']: fila
+            for fila in cls.turnos_del_mes(ano, mes).filter(
+                operador_id__in=operador_ids
+            ).values('operador_id').annotate(**cls.agregados()).order_by()
+        }
+
+        nuevos, actualizados = [], []
+        ahora = timezone.now()
+        for operador_id in operador_ids:
+            resumen = existentes.get(operador_id)
+            if resumen is None:
+                resumen = cls(operador_id=operador_id, ano=ano, mes=mes)
+                nuevos.append(resumen)
+            else:
+                resumen.fecha_calculo = ahora
+                actualizados.append(resumen)
+            resumen.asignar_totales(totales.get(operador_id, {}))
+
+        with transaction.atomic():
+            # Lotes por debajo del límite de 2100 parámetros de SQL Server
+            cls.objects.bulk_create(nuevos, batch_size=100)
+            cls.objects.bulk_update(actualizados, cls.CAMPOS_RESUMEN + ['fecha_calculo'], batch_size=50)
+
+        return {'creados': len(nuevos), 'actualizados': len(actualizados)}
+
 
 class PatronOperador(models.Model):
     """
@@ -320,6 +403,15 @@ class PatronOperador(models.Model):
         ('A', 'Apoyo'),
     ]
     
+    # Patrón global de turnos cíclicos (A es fijo)
+    CICLOS_CONFIG = [
+        ('T', 7),   # días 0-6
+        ('N', 8),   # días 7-14
+        ('D', 6),   # días 15-20
+        ('M', 7),   # días 21-27
+    ]
+    CICLO_TOTAL = 28
+    
     operador = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -389,6 +481,20 @@ class PatronOperador(models.Model):
             return None
         return seed.calcular_turno_fecha(fecha)
     
+    def posicion_ciclo(self, fecha):
+        """
+        Posición (0-27) de una fecha en el ciclo de 28 días de ESTE seed.
+        Un turno_inicial_patron fuera del ciclo arranca en la posición 0.
+        """
+        offset_inicial = 0
+        for codigo, duracion in self.CICLOS_CONFIG:
+            if codigo == self.turno_inicial_patron:
+                break
+            offset_inicial += duracion
+        
+        dias_desde_inicio = (fecha - self.fecha_inicio_patron).days
+        return (dias_desde_inicio + offset_inicial) % self.CICLO_TOTAL
+    
     def calcular_turno_fecha(self, fecha):
         """
         Calcula el turno que corresponde a una fecha específica
@@ -400,34 +506,15 @@ class PatronOperador(models.Model):
         TURNOS CÍCLICOS:
         - Usa el patrón global: T(7) + N(8) + D(6) + M(7) = 28 días
         """
-        from datetime import timedelta
-        
         # Turno A (Apoyo) es FIJO - no rota
         if self.turno_inicial_patron == 'A':
             return 'A'
         
-        ciclos_config = [
-            ('T', 7),   # días 0-6
-            ('N', 8),   # días 7-14
-            ('D', 6),   # días 15-20
-            ('M', 7),   # días 21-27
-        ]
-        ciclo_total = 28
-        
-        # Calcular offset inicial basado en turno_inicial_patron
-        offset_inicial = 0
-        for codigo, duracion in ciclos_config:
-            if codigo == self.turno_inicial_patron:
-                break
-            offset_inicial += duracion
-        
-        # Calcular posición en ciclo de 28 días
-        dias_desde_inicio = (fecha - self.fecha_inicio_patron).days
-        pos_en_ciclo = (dias_desde_inicio + offset_inicial) % ciclo_total
+        pos_en_ciclo = self.posicion_ciclo(fecha)
         
         # Determinar turno
         pos_acumulada = 0
-        for codigo, duracion in ciclos_config:
+        for codigo, duracion in self.CICLOS_CONFIG:
             if pos_en_ciclo < pos_acumulada + duracion:
                 return codigo
             pos_acumulada += duracion
@@ -435,3 +522,60 @@ class PatronOperador(models.Model):
         return 'D'  # fallback
 
 
+
+
+class ClasificacionDiaria(models.Model):
+    """
+    Clasificación legal materializada (HOD, RNO, RDF, RNF) por operador y día.
+
+    Guarda el resultado de CalculadoraLegal acumulado por fecha: incluye la
+    parte del turno nocturno del día anterior que cae en la fecha. La
+    mantienen las señales de RegistroTurno, ParametroNormativo,
+    PoliticaEmpresa y DiaFestivo (ver clasificacion_diaria.py); para
+    reconstruir un rango: manage.py reconstruir_clasificacion_diaria
+    """
+
+    CAMPOS_HORAS = {
+        'HOD': 'horas_hod',
+        'RNO': 'horas_rno',
+        'RDF': 'horas_rdf',
+        'RNF': 'horas_rnf',
+        'TOTAL': 'horas_total',
+    }
+
+    operador = models.ForeignKey(User, on_delete=models.CASCADE, related_name='clasificaciones_diarias')
+    fecha = models.DateField()
+    # Turno que inicia en la fecha (None si solo hay horas del turno del día anterior)
+    turno = models.ForeignKey(
+        RegistroTurno, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+
+    horas_hod = models.DecimalField(max_digits=5, decimal_places=2, default=Decimal('0.00'))
+    horas_rno = models.DecimalField(max_digits=5, decimal_places=2, default=Decimal('0.00'))
+    horas_rdf = models.DecimalField(max_digits=5, decimal_places=2, default=Decimal('0.00'))
+    horas_rnf = models.DecimalField(max_digits=5, decimal_places=2, default=Decimal('0.00'))
+    horas_total = models.DecimalField(max_digits=5, decimal_places=2, default=Decimal('0.00'))
+
+    fecha_calculo = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Clasificación Diaria'
+        verbose_name_plural = 'Clasificaciones Diarias'
+        ordering = ['fecha', 'operador']
+        unique_together = ['operador', 'fecha']
+        indexes = [
+            # Lectura de un mes para todos los operadores
+            models.Index(fields=['fecha', 'operador']),
+        ]
+
+    def __str__(self):
+        return f"{self.operador_id} - {self.fecha} - {self.horas_total}h"
+
+    def asignar_horas(self, horas):
+        """Copia un diccionario {HOD, RNO, RDF, RNF, TOTAL} a los campos"""
+        for clave, campo in self.CAMPOS_HORAS.items():
+            setattr(self, campo, horas.get(clave, Decimal('0.00')))
+
+    def horas(self):
+        """Horas en el formato de CalculadoraLegal: {HOD, RNO, RDF, RNF, TOTAL}"""
+        return {clave: getattr(self, campo) for clave, campo in self.CAMPOS_HORAS.items()}
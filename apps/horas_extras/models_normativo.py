@@ -141,17 +141,19 @@ class ParametroNormativo(models.Model):
         """
         Obtiene los parámetros vigentes para una fecha específica.
         
-        Busca el registro con vigencia_desde <= fecha más reciente.
+        Busca el registro con vigencia_desde <= fecha más reciente en el
+        índice de vigencias del proceso (ver vigencias.py): sin consulta a BD
+        salvo la carga inicial.
         
         Args:
             fecha: datetime.date para consultar
             
         Returns:
             ParametroNormativo o None si no hay parámetros definidos
+            (instancia compartida: no modificar)
         """
-        return cls.objects.filter(
-            vigencia_desde__lte=fecha
-        ).order_by('-vigencia_desde').first()
+        from .vigencias import vigente
+        return vigente(cls, fecha)
     
     def es_hora_nocturna(self, hora):
         """
@@ -232,7 +234,6 @@ class PoliticaEmpresa(models.Model):
     
     @classmethod
     def obtener_vigente(cls, fecha):
-        """Obtiene la política vigente para una fecha."""
-        return cls.objects.filter(
-            vigencia_desde__lte=fecha
-        ).order_by('-vigencia_desde').first()
+        """Obtiene la política vigente para una fecha (índice de vigencias, ver vigencias.py)."""
+        from .vigencias import vigente
+        return vigente(cls, fecha)
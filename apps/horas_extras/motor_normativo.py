@@ -16,19 +16,15 @@ Clasificaciones:
 from decimal import Decimal
 from datetime import date, time
 from typing import Dict, List, Optional
-import holidays
 
+from .festivos import calendario
 from .models_normativo import ParametroNormativo, PoliticaEmpresa
 from .motor_tiempo import segmentar_tiempo, obtener_segmentos_turno
 
 
-# Cache de festivos colombianos
-_co_holidays = holidays.CO()
-
-
 def es_festivo(fecha: date) -> bool:
-    """Verifica si una fecha es festivo en Colombia."""
-    return fecha in _co_holidays
+    """Verifica si una fecha es festivo en Colombia (calendario de festivos.py)."""
+    return calendario.es_festivo(fecha)
 
 
 def es_dominical(fecha: date) -> bool:
@@ -0,0 +1,161 @@
+# apps/horas_extras/patrones.py
+"""
+Línea de tiempo de seeds (PatronOperador) por operador.
+
+Carga los seeds de uno o varios operadores con una sola consulta y resuelve
+en memoria, con bisect, el seed vigente y la posición en el ciclo de 28 días
+de cualquier fecha o rango. Reemplaza las consultas por fecha de
+PatronOperador.obtener_seed_vigente / calcular_turno_para_fecha en los
+generadores (utils), el calendario de asignación y la vecindad de
+asignar_turno_api.
+
+Las líneas no se cachean entre peticiones: se construyen por operación
+(generación, petición) y se descartan.
+"""
+import bisect
+import datetime
+
+from .models import PatronOperador, RegistroTurno
+
+# Código de cada posición del ciclo: 'TTTTTTTNNNNNNNNDDDDDDMMMMMMM'
+CICLO_CODIGOS = ''.join(codigo * duracion for codigo, duracion in PatronOperador.CICLOS_CONFIG)
+
+UN_DIA = datetime.timedelta(days=1)
+
+
+class LineaSeeds:
+    """Seeds de un operador ordenados por fecha_inicio_patron"""
+
+    def __init__(self, seeds):
+        self.seeds = sorted(seeds, key=lambda seed: seed.fecha_inicio_patron)
+        self._fechas = [seed.fecha_inicio_patron for seed in self.seeds]
+
+    @classmethod
+    def de_operador(cls, operador):
+        """Línea de un operador (User o id), una consulta"""
+        return cls(PatronOperador.objects.filter(operador_id=getattr(operador, 'pk', operador)))
+
+    @classmethod
+    def cargar(cls, operadores):
+        """
+        Líneas de varios operadores con una sola consulta.
+
+        Args:
+            operadores: QuerySet/lista de User o de ids
+
+        Returns:
+            dict: { operador_id: LineaSeeds } (línea vacía si no tiene seeds)
+        """
+        ids = {getattr(operador, 'pk', operador) for operador in operadores}
+        por_operador = {operador_id: [] for operador_id in ids}
+        for seed in PatronOperador.objects.filter(operador_id__in=ids):
+            por_operador[seed.operador_id].append(seed)
+        return {operador_id: cls(seeds) for operador_id, seeds in por_operador.items()}
+
+    def __bool__(self):
+        return bool(self.seeds)
+
+    def seed_vigente(self, fecha):
+        """Seed con la mayor fecha_inicio_patron <= fecha (None si no hay)"""
+        posicion = bisect.bisect_right(self._fechas, fecha)
+        return self.seeds[posicion - 1] if posicion else None
+
+    def turno_fecha(self, fecha):
+        """Código de turno de una fecha según su seed vigente (None sin seed)"""
+        seed = self.seed_vigente(fecha)
+        return seed.calcular_turno_fecha(fecha) if seed else None
+
+    def tramos(self, fecha_inicio, fecha_fin):
+        """
+        Divide un rango en tramos con el mismo seed vigente.
+
+        Returns:
+            list: [(seed o None, desde, hasta)] contiguos y en orden
+        """
+        resultado = []
+        fecha = fecha_inicio
+        while fecha <= fecha_fin:
+            posicion = bisect.bisect_right(self._fechas, fecha)
+            seed = self.seeds[posicion - 1] if posicion else None
+            hasta = fecha_fin
+            if posicion < len(self._fechas):
+                hasta = min(fecha_fin, self._fechas[posicion] - UN_DIA)
+            resultado.append((seed, fecha, hasta))
+            fecha = hasta + UN_DIA
+        return resultado
+
+    def turnos_rango(self, fecha_inicio, fecha_fin):
+        """
+        Códigos de turno de todas las fechas de un rango (inclusive).
+
+        Cada tramo se resuelve con la posición de su primer día en el ciclo
+        y aritmética modular, sin recalcular el seed por fecha.
+
+        Returns:
+            dict: { fecha: 'T'/'N'/'D'/'M'/'A' o None si no hay seed }
+        """
+        resultado = {}
+        total_ciclo = len(CICLO_CODIGOS)
+        for seed, desde, hasta in self.tramos(fecha_inicio, fecha_fin):
+            dias = (hasta - desde).days + 1
+            if seed is None:
+                codigos = [None] * dias
+            elif seed.turno_inicial_patron == 'A':
+                codigos = ['A'] * dias
+            else:
+                posicion = seed.posicion_ciclo(desde)
+                codigos = [CICLO_CODIGOS[(posicion + i) % total_ciclo] for i in range(dias)]
+
+            for i, codigo in enumerate(codigos):
+                resultado[desde + datetime.timedelta(days=i)] = codigo
+        return resultado
+
+    def vecindad(self, fecha, mismo_seed=False):
+        """
+        Turnos del día anterior, del día y del siguiente.
+
+        Args:
+            mismo_seed: Resolver los vecinos con el seed vigente de la fecha
+                (continuidad del patrón, como en la generación masiva) en
+                lugar del seed vigente de cada vecino
+
+        Returns:
+            dict: {'prev', 'today', 'next'}
+        """
+        if mismo_seed:
+            seed = self.seed_vigente(fecha)
+            if seed is None:
+                return {'prev': None, 'today': None, 'next': None}
+            return {
+                'prev': seed.calcular_turno_fecha(fecha - UN_DIA),
+                'today': seed.calcular_turno_fecha(fecha),
+                'next': seed.calcular_turno_fecha(fecha + UN_DIA),
+            }
+
+        codigos = self.turnos_rango(fecha - UN_DIA, fecha + UN_DIA)
+        return {'prev': codigos[fecha - UN_DIA], 'today': codigos[fecha], 'next': codigos[fecha + UN_DIA]}
+
+
+def vecindad_turno(operador, fecha, codigo_hoy):
+    """
+    Vecindad de un turno asignado manualmente.
+
+    Los vecinos salen de los RegistroTurno del día anterior y siguiente (una
+    consulta); si falta alguno, del patrón del operador (una consulta más).
+
+    Returns:
+        dict: {'prev', 'today', 'next'}
+    """
+    anterior, siguiente = fecha - UN_DIA, fecha + UN_DIA
+    registrados = dict(
+        RegistroTurno.objects.filter(
+            operador=operador, fecha__in=[anterior, siguiente]
+        ).values_list('fecha', 'tipo_turno__codigo')
+    )
+
+    if anterior not in registrados or siguiente not in registrados:
+        patron = LineaSeeds.de_operador(operador).turnos_rango(anterior, siguiente)
+        for dia in (anterior, siguiente):
+            registrados.setdefault(dia, patron[dia])
+
+    return {'prev': registrados[anterior], 'today': codigo_hoy, 'next': registrados[siguiente]}
@@ -0,0 +1,131 @@
+# apps/horas_extras/recalculo_vecindad.py
+"""
+Recálculo incremental de los turnos N vecinos de un cambio de asignación.
+
+Las horas de un turno N dependen de sus vecinos (utils.GeneradorTurnosV4.
+_obtener_rangos_turno_n_vecindad): la madrugada 00-06 solo si el día
+anterior también es N y el bloque de la noche solo si el siguiente lo es.
+Al cambiar el turno de (operador, fecha), los N del día anterior y del
+siguiente pueden ganar o perder horas.
+
+recalcular_vecindad() recibe los (operador, fecha) modificados, relee en
+una consulta los turnos registrados alrededor y reescribe solo los N del
+conjunto cuyo horario cambió (los vecinos y el propio día si es N). La
+vecindad sale de los turnos registrados y, donde no hay, del patrón del
+operador, como en patrones.vecindad_turno(). El bulk_update no dispara
+señales: la clasificación materializada (y el cache del calendario) se
+recalcula con marcar_cambio() solo para los días reescritos.
+"""
+import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .clasificacion_diaria import marcar_cambio
+from .festivos import obtener_festivos_rango
+from .models import RegistroTurno
+from .patrones import LineaSeeds
+from .utils import GeneradorTurnosV4
+
+UN_DIA = datetime.timedelta(days=1)
+CENTESIMA = Decimal('0.01')
+
+CAMPOS_HORARIO = ['hora_inicio_real', 'hora_fin_real', 'horas_trabajadas']
+
+
+def _horario_n(fecha, vecindad, festivos):
+    """(hora_inicio, hora_fin, horas_trabajadas) de un turno N con su vecindad"""
+    recargos = GeneradorTurnosV4.calcular_recargos_fecha('N', fecha, festivos, vecindad)
+    segmentos = recargos['segmentos']
+    if not segmentos:
+        return None, None, Decimal('0.00')
+    return segmentos[0]['inicio'], segmentos[-1]['fin'], recargos['horas_trabajadas'].quantize(CENTESIMA)
+
+
+def recalcular_vecindad(cambios):
+    """
+    Recalcula los turnos N afectados por cambios de asignación.
+
+    Args:
+        cambios: Iterable de (operador_id, fecha) cuyo turno se creó,
+            modificó o eliminó
+
+    Returns:
+        list: (operador_id, fecha) de los turnos reescritos, ordenados
+    """
+    cambios = {(operador_id, fecha) for operador_id, fecha in cambios}
+    if not cambios:
+        return []
+
+    # Dependientes: el propio día y sus vecinos
+    candidatos = set()
+    for operador_id, fecha in cambios:
+        candidatos.update({(operador_id, fecha - UN_DIA), (operador_id, fecha), (operador_id, fecha + UN_DIA)})
+
+    operador_ids = {operador_id for operador_id, _ in candidatos}
+    fechas = [fecha for _, fecha in candidatos]
+    desde, hasta = min(fechas), max(fechas)
+
+    # Turnos de los candidatos y de sus vecinos: una consulta
+    registrados = {
+        (turno.operador_id, turno.fecha): turno
+        for turno in RegistroTurno.objects.filter(
+            operador_id__in=operador_ids, fecha__range=(desde - UN_DIA, hasta + UN_DIA)
+        ).select_related('tipo_turno')
+    }
+
+    nocturnos = [
+        registrados[clave] for clave in candidatos
+        if clave in registrados and registrados[clave].tipo_turno.codigo == 'N'
+    ]
+    if not nocturnos:
+        return []
+
+    lineas = None
+    festivos = obtener_festivos_rango(desde, hasta)
+
+    def codigo(operador_id, fecha):
+        nonlocal lineas
+        turno = registrados.get((operador_id, fecha))
+        if turno is not None:
+            return turno.tipo_turno.codigo
+        # Sin turno registrado: el del patrón (una consulta para todos los operadores)
+        if lineas is None:
+            lineas = LineaSeeds.cargar(operador_ids)
+        return lineas[operador_id].turno_fecha(fecha)
+
+    modificados = []
+    ahora = timezone.now()
+    for turno in nocturnos:
+        vecindad = {
+            'prev': codigo(turno.operador_id, turno.fecha - UN_DIA),
+            'today': 'N',
+            'next': codigo(turno.operador_id, turno.fecha + UN_DIA),
+        }
+        horario = _horario_n(turno.fecha, vecindad, festivos)
+        actual = (
+            turno.hora_inicio_real, turno.hora_fin_real,
+            (turno.horas_trabajadas or Decimal('0')).quantize(CENTESIMA)
+        )
+        if horario != actual:
+            turno.hora_inicio_real, turno.hora_fin_real, turno.horas_trabajadas = horario
+            turno.updated_at = ahora
+            modificados.append(turno)
+
+    if not modificados:
+        return []
+
+    with transaction.atomic():
+        RegistroTurno.objects.bulk_update(modificados, CAMPOS_HORARIO + ['updated_at'])
+
+    # Sin señales: reclasificar por operador los días reescritos (y el
+    # siguiente, donde cae la madrugada)
+    afectados = sorted((turno.operador_id, turno.fecha) for turno in modificados)
+    por_operador = {}
+    for operador_id, fecha in afectados:
+        por_operador.setdefault(operador_id, []).append(fecha)
+    for operador_id, dias in por_operador.items():
+        marcar_cambio(min(dias), max(dias) + UN_DIA, [operador_id])
+
+    return afectados
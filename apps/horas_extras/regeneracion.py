@@ -0,0 +1,200 @@
+# apps/horas_extras/regeneracion.py
+"""
+Regeneración de turnos V4 de muchos operadores (regenerar_turnos_v4).
+
+- calcular_turnos_operadores(): calcula los turnos de cada operador a partir
+  de datos precargados por el proceso principal (seeds, calendario de
+  festivos, tipos de turno y versiones de ParametroNormativo). Con workers > 1 reparte los
+  operadores en un pool de procesos; los workers no consultan la BD.
+- diferencia_turnos(): compara lo calculado contra los turnos existentes
+  (para --dry-run y el resumen por operador).
+- guardar_regeneracion(): único escritor; reemplaza los turnos del rango en
+  una transacción con el guardado masivo.
+
+Este módulo no importa modelos al cargarse: con el método de arranque
+'spawn' (Windows) los workers lo importan antes de django.setup().
+"""
+import datetime
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from decimal import Decimal
+
+CENTESIMA = Decimal('0.01')
+
+# Lotes por worker: más lotes que procesos para repartir mejor la carga
+LOTES_POR_WORKER = 4
+
+
+def _inicializar_worker(settings_module, parametros, festivos_por_ano):
+    """Prepara Django en el proceso worker sin abrir conexiones a la BD"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+    from django.db import connections
+    # Con 'fork' el worker hereda los sockets del padre: olvidarlos sin cerrarlos
+    for alias in connections:
+        connections[alias].connection = None
+
+    from .festivos import calendario
+    from .models_normativo import ParametroNormativo
+    from .vigencias import indice
+    indice(ParametroNormativo).precargar(parametros)
+    calendario.precargar(festivos_por_ano)
+
+
+def _calcular_lote(lote, fecha_inicio, fecha_fin, festivos, codigos_validos):
+    """[(operador_id, LineaSeeds)] -> [(operador_id, turnos calculados)]"""
+    from .utils import GeneradorTurnosV4
+
+    return [
+        (operador_id, GeneradorTurnosV4.calcular_turnos_linea(linea, fecha_inicio, fecha_fin, festivos, codigos_validos))
+        for operador_id, linea in lote
+    ]
+
+
+def calcular_turnos_operadores(lineas, fecha_inicio, fecha_fin, festivos, codigos_validos, workers=1):
+    """
+    Calcula los turnos V4 de varios operadores.
+
+    Args:
+        lineas: { operador_id: LineaSeeds }
+        festivos: set de fechas festivas del rango
+        codigos_validos: Códigos de TipoTurno existentes
+        workers: Procesos del pool (1 = en el proceso actual)
+
+    Yields:
+        (operador_id, turnos) a medida que se completan; turnos como en
+        GeneradorTurnosV4.calcular_turnos_linea
+    """
+    items = list(lineas.items())
+    if workers <= 1 or len(items) <= 1:
+        for operador_id, turnos in _calcular_lote(items, fecha_inicio, fecha_fin, festivos, codigos_validos):
+            yield operador_id, turnos
+        return
+
+    from django.conf import settings
+    from .festivos import calendario
+    from .models_normativo import ParametroNormativo
+    from .vigencias import indice
+
+    parametros = indice(ParametroNormativo).versiones()
+    festivos_por_ano = calendario.exportar(range(fecha_inicio.year, fecha_fin.year + 1))
+    total_lotes = min(len(items), workers * LOTES_POR_WORKER)
+    lotes = [items[i::total_lotes] for i in range(total_lotes)]
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_inicializar_worker,
+        initargs=(settings.SETTINGS_MODULE, parametros, festivos_por_ano),
+    ) as pool:
+        futuros = [
+            pool.submit(_calcular_lote, lote, fecha_inicio, fecha_fin, festivos, codigos_validos)
+            for lote in lotes
+        ]
+        for futuro in as_completed(futuros):
+            for operador_id, turnos in futuro.result():
+                yield operador_id, turnos
+
+
+def _clave(codigo, hora_inicio, hora_fin, horas_trabajadas):
+    return (codigo, hora_inicio, hora_fin, Decimal(horas_trabajadas or 0).quantize(CENTESIMA))
+
+
+def turnos_existentes(operador_ids, fecha_inicio, fecha_fin):
+    """
+    Turnos guardados del rango en una consulta.
+
+    Returns:
+        dict: { operador_id: { fecha: (codigo, hora_inicio, hora_fin, horas) } }
+    """
+    from .models import RegistroTurno
+
+    existentes = {operador_id: {} for operador_id in operador_ids}
+    filas = RegistroTurno.objects.filter(
+        operador_id__in=operador_ids, fecha__range=(fecha_inicio, fecha_fin)
+    ).values_list('operador_id', 'fecha', 'tipo_turno__codigo', 'hora_inicio_real', 'hora_fin_real', 'horas_trabajadas')
+    for operador_id, fecha, codigo, hora_inicio, hora_fin, horas in filas:
+        existentes[operador_id][fecha] = _clave(codigo, hora_inicio, hora_fin, horas)
+    return existentes
+
+
+def diferencia_turnos(existentes, turnos):
+    """
+    Compara los turnos calculados de un operador contra los guardados.
+
+    Args:
+        existentes: { fecha: clave } de turnos_existentes()
+        turnos: Turnos calculados (calcular_turnos_linea)
+
+    Returns:
+        dict: conteos 'nuevos', 'cambiados', 'iguales', 'eliminados' y
+        'cambios': [(fecha, codigo anterior o None, codigo nuevo o None)]
+    """
+    resultado = {'nuevos': 0, 'cambiados': 0, 'iguales': 0, 'eliminados': 0, 'cambios': []}
+    calculadas = set()
+
+    for turno in turnos:
+        calculadas.add(turno['fecha'])
+        anterior = existentes.get(turno['fecha'])
+        nuevo = _clave(turno['codigo'], turno['hora_inicio'], turno['hora_fin'], turno['horas_trabajadas'])
+        if anterior is None:
+            resultado['nuevos'] += 1
+            resultado['cambios'].append((turno['fecha'], None, turno['codigo']))
+        elif anterior != nuevo:
+            resultado['cambiados'] += 1
+            resultado['cambios'].append((turno['fecha'], anterior[0], turno['codigo']))
+        else:
+            resultado['iguales'] += 1
+
+    for fecha, anterior in existentes.items():
+        if fecha not in calculadas:
+            resultado['eliminados'] += 1
+            resultado['cambios'].append((fecha, anterior[0], None))
+
+    resultado['cambios'].sort()
+    return resultado
+
+
+def guardar_regeneracion(turnos_por_operador, tipos_turno, fecha_inicio, fecha_fin):
+    """
+    Reemplaza los turnos del rango de los operadores por los calculados
+    (borrado + guardado masivo en una transacción, una reclasificación).
+
+    Args:
+        turnos_por_operador: { operador_id: turnos calculados }
+        tipos_turno: { codigo: TipoTurno }
+
+    Returns:
+        dict: 'eliminados' y 'creados'
+    """
+    from django.db import transaction
+
+    from .clasificacion_diaria import diferir_clasificacion, marcar_cambio
+    from .guardado_turnos import guardar_turnos_masivo
+    from .models import RegistroTurno
+
+    registros = [
+        RegistroTurno(
+            operador_id=operador_id,
+            tipo_turno=tipos_turno[turno['codigo']],
+            fecha=turno['fecha'],
+            estado='programado',
+            hora_inicio_real=turno['hora_inicio'],
+            hora_fin_real=turno['hora_fin'],
+            horas_trabajadas=turno['horas_trabajadas'],
+        )
+        for operador_id, turnos in turnos_por_operador.items()
+        for turno in turnos
+    ]
+    operador_ids = list(turnos_por_operador)
+
+    with diferir_clasificacion(), transaction.atomic():
+        _, por_modelo = RegistroTurno.objects.filter(
+            operador_id__in=operador_ids, fecha__range=(fecha_inicio, fecha_fin)
+        ).delete()
+        guardado = guardar_turnos_masivo(registros)
+        # Los días borrados sin turno nuevo también cambian su clasificación
+        marcar_cambio(fecha_inicio, fecha_fin + datetime.timedelta(days=1), operador_ids)
+
+    return {'eliminados': por_modelo.get(RegistroTurno._meta.label, 0), 'creados': guardado['creados']}
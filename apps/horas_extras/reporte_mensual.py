@@ -0,0 +1,122 @@
+# apps/horas_extras/reporte_mensual.py
+"""
+Reporte mensual de horas por operador (HOD, RNO, RDF, RNF).
+
+Servicio único detrás de reportes_horas_extras, exportar_reporte_excel y
+reporte_preliminar. construir_reporte_mensual lee la clasificación
+materializada (ClasificacionDiaria); los turnos sin clasificar del mes se
+clasifican en la lectura (clasificacion_diaria.obtener_clasificacion).
+"""
+import calendar
+import datetime
+from decimal import Decimal
+
+from .calculos_legales import CalculadoraLegal
+from .clasificacion_diaria import obtener_clasificacion
+
+CLAVES_HORAS = ('HOD', 'RNO', 'RDF', 'RNF', 'TOTAL')
+
+
+def _horas_en_cero():
+    return {k: Decimal(0) for k in CLAVES_HORAS}
+
+
+def rango_mes(ano, mes):
+    """
+    Rango del reporte y fecha desde la que se deben buscar turnos.
+
+    La búsqueda incluye el último día del mes anterior: su turno nocturno
+    puede terminar dentro del mes.
+
+    Returns:
+        tuple: (fecha_busqueda_inicio, fecha_inicio, fecha_fin)
+    """
+    fecha_inicio = datetime.date(ano, mes, 1)
+    fecha_fin = datetime.date(ano, mes, calendar.monthrange(ano, mes)[1])
+    return fecha_inicio - datetime.timedelta(days=1), fecha_inicio, fecha_fin
+
+
+def _armar_reporte(operadores, turnos_map, horas_por_operador, ano, mes, calculadora):
+    """
+    Estructura común del reporte.
+
+    Args:
+        turnos_map: { operador_id: { fecha: RegistroTurno } }
+        horas_por_operador: { operador_id: { fecha: {HOD, RNO, RDF, RNF, TOTAL} } }
+
+    Returns:
+        dict: {
+            'datos': [{'nombre', 'id', 'dias': [{'fecha', 'dia_semana', 'turno',
+                       'es_festivo', 'horas'}], 'totales'}],
+            'totales_generales': {HOD, RNO, RDF, RNF, TOTAL}
+        }
+    """
+    _, _, fecha_fin = rango_mes(ano, mes)
+
+    # Datos del calendario comunes a todos los operadores
+    calendario = []
+    for dia in range(1, fecha_fin.day + 1):
+        fecha = datetime.date(ano, mes, dia)
+        calendario.append((fecha, fecha.strftime('%A'), calculadora.es_dia_festivo(fecha)))
+
+    datos_reporte = []
+    gran_totales = _horas_en_cero()
+
+    for operador in operadores:
+        turnos_operador = turnos_map.get(operador.id, {})
+        horas_operador = horas_por_operador.get(operador.id, {})
+        totales = _horas_en_cero()
+        dias = []
+
+        for fecha, dia_semana, es_festivo in calendario:
+            turno_visual = turnos_operador.get(fecha)
+            horas = _horas_en_cero()
+            for k, valor in horas_operador.get(fecha, {}).items():
+                horas[k] += valor
+                totales[k] += valor
+
+            dias.append({
+                'fecha': fecha,
+                'dia_semana': dia_semana,
+                'turno': turno_visual.tipo_turno.codigo if (turno_visual and turno_visual.tipo_turno) else 'Descanso',
+                'es_festivo': es_festivo,
+                'horas': horas
+            })
+
+        datos_reporte.append({
+            'nombre': operador.get_full_name() or operador.username,
+            'id': operador.id,
+            'dias': dias,
+            'totales': totales
+        })
+
+        for k in gran_totales:
+            gran_totales[k] += totales[k]
+
+    return {
+        'datos': datos_reporte,
+        'totales_generales': gran_totales
+    }
+
+
+def construir_reporte_mensual(operadores, ano, mes):
+    """
+    Construye el reporte desde ClasificacionDiaria (una consulta indexada).
+
+    Args:
+        operadores: QuerySet o lista de User a incluir
+        ano, mes: Periodo del reporte
+
+    Returns:
+        dict: Ver _armar_reporte
+    """
+    _, fecha_inicio, fecha_fin = rango_mes(ano, mes)
+    clasificacion = obtener_clasificacion(fecha_inicio, fecha_fin, operadores)
+
+    turnos_map = {}
+    horas_por_operador = {}
+    for operador_id, filas in clasificacion.items():
+        turnos_map[operador_id] = {fecha: fila.turno for fecha, fila in filas.items() if fila.turno}
+        horas_por_operador[operador_id] = {fecha: fila.horas() for fecha, fila in filas.items()}
+
+    return _armar_reporte(operadores, turnos_map, horas_por_operador, ano, mes, CalculadoraLegal())
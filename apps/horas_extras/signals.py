@@ -0,0 +1,118 @@
+# apps/horas_extras/signals.py
+"""
+Señales de horas_extras: mantienen al día ClasificacionDiaria y el índice
+de vigencias normativas.
+
+- RegistroTurno: recalcula la fecha del turno y el día siguiente (turno
+  nocturno) del operador; si el turno cambió de fecha u operador, también
+  el rango anterior.
+- ParametroNormativo / PoliticaEmpresa: invalida el índice de vigencias
+  (vigencias.py) y programa el recálculo de todos los operadores desde la
+  vigencia (la anterior si era menor) al confirmar la transacción, mes a
+  mes y en segundo plano (clasificacion_diaria.programar_reclasificacion).
+- DiaFestivo: invalida el calendario de festivos (festivos.py) y recalcula
+  la fecha del festivo para todos los operadores.
+
+Los valores previos de fecha/operador/vigencia se toman al cargar la
+instancia (post_init) y se renuevan tras cada guardado, sin consultar la BD
+antes de guardar. Los errores del recálculo se propagan.
+"""
+import datetime
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .clasificacion_diaria import marcar_cambio, programar_reclasificacion
+from .festivos import invalidar_festivos
+from .models import DiaFestivo, RegistroTurno
+from .models_normativo import ParametroNormativo, PoliticaEmpresa
+from .vigencias import invalidar_vigencias
+
+CAMPOS_TURNO = ('operador_id', 'fecha')
+CAMPOS_VIGENCIA = ('vigencia_desde',)
+CAMPOS_FESTIVO = ('fecha',)
+
+
+def _recordar(instance, campos):
+    """Guarda los valores actuales (sin cargar campos diferidos)"""
+    instance._clasificacion_anterior = {campo: instance.__dict__.get(campo) for campo in campos}
+
+
+def _anterior_si_cambio(instance, campos, created=False):
+    """
+    Valores previos de la instancia si alguno cambió desde que se cargó o
+    guardó por última vez; None si es nueva, no cambió o no se conocen.
+    """
+    anterior = getattr(instance, '_clasificacion_anterior', None)
+    if created or not anterior or any(anterior[campo] is None for campo in campos):
+        return None
+    if all(anterior[campo] == getattr(instance, campo) for campo in campos):
+        return None
+    return anterior
+
+
+@receiver(post_init, sender=RegistroTurno)
+def recordar_turno_anterior(sender, instance, **kwargs):
+    """Guarda operador/fecha previos para recalcular también el rango viejo"""
+    _recordar(instance, CAMPOS_TURNO)
+
+
+@receiver(post_save, sender=RegistroTurno)
+@receiver(post_delete, sender=RegistroTurno)
+def actualizar_clasificacion_turno(sender, instance, created=False, **kwargs):
+    """Recalcula la clasificación del día del turno y del día siguiente"""
+    anterior = _anterior_si_cambio(instance, CAMPOS_TURNO, created)
+    if anterior:
+        marcar_cambio(anterior['fecha'], anterior['fecha'] + datetime.timedelta(days=1), [anterior['operador_id']])
+
+    marcar_cambio(instance.fecha, instance.fecha + datetime.timedelta(days=1), [instance.operador_id])
+    _recordar(instance, CAMPOS_TURNO)
+
+
+@receiver(post_init, sender=ParametroNormativo)
+@receiver(post_init, sender=PoliticaEmpresa)
+def recordar_vigencia_anterior(sender, instance, **kwargs):
+    """Guarda la vigencia previa: si cambia, el recálculo parte de la menor"""
+    _recordar(instance, CAMPOS_VIGENCIA)
+
+
+@receiver(post_save, sender=ParametroNormativo)
+@receiver(post_delete, sender=ParametroNormativo)
+@receiver(post_save, sender=PoliticaEmpresa)
+@receiver(post_delete, sender=PoliticaEmpresa)
+def actualizar_clasificacion_vigencia(sender, instance, created=False, **kwargs):
+    """
+    Descarta el índice de vigencias del modelo y programa el recálculo de
+    todos los operadores desde la vigencia modificada (en ese orden: el
+    recálculo debe ver la versión nueva).
+    """
+    invalidar_vigencias(sender)
+
+    desde = instance.vigencia_desde
+    anterior = _anterior_si_cambio(instance, CAMPOS_VIGENCIA, created)
+    if anterior and anterior['vigencia_desde'] < desde:
+        desde = anterior['vigencia_desde']
+
+    programar_reclasificacion(desde)
+    _recordar(instance, CAMPOS_VIGENCIA)
+
+
+@receiver(post_init, sender=DiaFestivo)
+def recordar_festivo_anterior(sender, instance, **kwargs):
+    _recordar(instance, CAMPOS_FESTIVO)
+
+
+@receiver(post_save, sender=DiaFestivo)
+@receiver(post_delete, sender=DiaFestivo)
+def actualizar_clasificacion_festivo(sender, instance, created=False, **kwargs):
+    """
+    Descarta el calendario de festivos del año y recalcula la fecha del
+    festivo (y la anterior si se movió)
+    """
+    anterior = _anterior_si_cambio(instance, CAMPOS_FESTIVO, created)
+    invalidar_festivos(instance.fecha.year, *([anterior['fecha'].year] if anterior else []))
+    if anterior:
+        marcar_cambio(anterior['fecha'], anterior['fecha'])
+
+    marcar_cambio(instance.fecha, instance.fecha)
+    _recordar(instance, CAMPOS_FESTIVO)
@@ -0,0 +1,18 @@
+# apps/horas_extras/tasks.py
+"""
+Tareas de Celery del módulo de horas extras
+"""
+import datetime
+
+from celery import shared_task
+
+from .clasificacion_diaria import reclasificar_desde
+
+
+@shared_task(
+    name='horas_extras.reclasificar_desde', ignore_result=True,
+    autoretry_for=(Exception,), max_retries=3, default_retry_delay=60
+)
+def reclasificar_desde_task(fecha_inicio):
+    """Recalcula ClasificacionDiaria mes a mes desde una vigencia normativa modificada"""
+    return reclasificar_desde(datetime.date.fromisoformat(fecha_inicio))
@@ -0,0 +1,118 @@
+# apps/horas_extras/test_asignacion_masiva.py
+"""
+Tests para la asignación masiva de turnos (asignacion_masiva.py) y su API
+"""
+import json
+from datetime import date, time
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .asignacion_masiva import asignar_turnos_masivo
+from .models import ClasificacionDiaria, RegistroTurno, TipoTurno
+
+
+class AsignacionMasivaTest(TestCase):
+
+    def setUp(self):
+        self.manana = TipoTurno.objects.create(nombre='manana', descripcion='Mañana', codigo='M')
+        self.tarde = TipoTurno.objects.create(nombre='tarde', descripcion='Tarde', codigo='T')
+        self.operadores = [User.objects.create_user(f'operador_masivo_{i}') for i in range(3)]
+        self.existente = RegistroTurno.objects.create(
+            operador=self.operadores[0], fecha=date(2026, 3, 2), tipo_turno=self.manana,
+            hora_inicio_real=time(6, 0), hora_fin_real=time(14, 0), estado='trabajado'
+        )
+
+    def _asignaciones(self, tipo, dias=range(1, 11)):
+        return [
+            {'operador_id': operador.id, 'fecha': f'2026-03-{dia:02d}', 'tipo_turno_id': tipo.id}
+            for operador in self.operadores for dia in dias
+        ]
+
+    def test_consultas_constantes(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = asignar_turnos_masivo(self._asignaciones(self.tarde))
+
+        self.assertEqual((resultado['creados'], resultado['actualizados']), (29, 1))
+        self.assertEqual(RegistroTurno.objects.filter(tipo_turno=self.tarde).count(), 30)
+        self.existente.refresh_from_db()
+        self.assertEqual(self.existente.estado, 'programado')
+        self.assertTrue(ClasificacionDiaria.objects.filter(fecha=date(2026, 3, 10)).exists())
+
+        # El mismo volumen con 10 veces más días no agrega consultas
+        cantidad = len(consultas)
+        with CaptureQueriesContext(connection) as consultas:
+            asignar_turnos_masivo(self._asignaciones(self.manana, range(1, 31)))
+        self.assertLessEqual(len(consultas), cantidad + 4)
+
+    def test_resultados_por_asignacion(self):
+        asignaciones = [
+            {'operador_id': self.operadores[0].id, 'fecha': '2026-03-02', 'tipo_turno_id': self.tarde.id},
+            {'operador_id': self.operadores[1].id, 'fecha': '2026-03-02', 'tipo_turno_id': self.tarde.id},
+            {'operador_id': self.operadores[1].id, 'fecha': '2026-03-02', 'tipo_turno_id': self.manana.id},
+            {'operador_id': self.operadores[1].id, 'fecha': '2026-02-30', 'tipo_turno_id': self.manana.id},
+            {'operador_id': 9999, 'fecha': '2026-03-02', 'tipo_turno_id': self.manana.id},
+            {'operador_id': self.operadores[2].id, 'fecha': '2026-03-02', 'tipo_turno_id': 9999},
+        ]
+
+        resultado = asignar_turnos_masivo(asignaciones, sobrescribir=False)
+
+        self.assertEqual(
+            [item['resultado'] for item in resultado['resultados']],
+            ['existente', 'duplicado', 'creado', 'error', 'error', 'error']
+        )
+        self.assertEqual(
+            RegistroTurno.objects.get(operador=self.operadores[1], fecha=date(2026, 3, 2)).tipo_turno, self.manana
+        )
+        self.assertEqual(resultado['errores'], 3)
+
+    def test_sin_cambios(self):
+        asignar_turnos_masivo(self._asignaciones(self.tarde))
+        resultado = asignar_turnos_masivo(self._asignaciones(self.tarde))
+
+        self.assertEqual(resultado['sin_cambios'], 30)
+
+    def test_api(self):
+        self.client.force_login(User.objects.create_superuser('admin_masivo'))
+        url = reverse('horas_extras:api_asignar_turnos_masivo')
+
+        respuesta = self.client.post(
+            url, json.dumps({'asignaciones': self._asignaciones(self.tarde, [5])}), content_type='application/json'
+        )
+        datos = respuesta.json()
+        self.assertTrue(datos['success'])
+        self.assertEqual(datos['creados'], 3)
+        self.assertEqual(datos['resultados'][0]['fecha'], '2026-03-05')
+
+        vacia = self.client.post(url, json.dumps({'asignaciones': []}), content_type='application/json')
+        self.assertEqual(vacia.status_code, 400)
+
+    def test_calendario_usa_asignacion_masiva(self):
+        self.client.force_login(User.objects.create_superuser('admin_calendario'))
+        fechas = [f'2026-03-{dia:02d}' for dia in range(1, 11)] + ['2026-02-30']
+
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.post(
+                reverse('horas_extras:ajax_asignar_turnos'),
+                json.dumps({'operador_id': self.operadores[0].id, 'fechas': fechas, 'tipo_turno_id': self.tarde.id}),
+                content_type='application/json'
+            )
+
+        datos = respuesta.json()
+        self.assertEqual((datos['turnos_creados'], datos['turnos_existentes']), (9, 1))
+        self.assertEqual(datos['errores'], ['Error en fecha 2026-02-30: Fecha inválida'])
+        # Sin consulta por fecha: un solo INSERT para los 9 turnos
+        inserts = [c for c in consultas.captured_queries if c['sql'].startswith('INSERT INTO "horas_extras_registroturno"')]
+        self.assertEqual(len(inserts), 1)
+
+    def test_benchmark(self):
+        salida = StringIO()
+        call_command('benchmark_asignacion_masiva', '--operadores', '2', '--dias', '5', stdout=salida)
+
+        self.assertIn('Masiva (sobrescritura)', salida.getvalue())
+        self.assertFalse(User.objects.filter(username__startswith='benchmark_asignacion_').exists())
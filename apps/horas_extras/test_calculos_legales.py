@@ -0,0 +1,305 @@
+# apps/horas_extras/test_calculos_legales.py
+"""
+Tests para el motor de intervalos de CalculadoraLegal.
+
+El corpus aleatorio (semilla fija) compara el motor contra el recorrido hora
+por hora original, que se conserva aquí como implementación de referencia.
+"""
+import datetime
+import random
+from datetime import date, time
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from .calculos_legales import CalculadoraLegal
+from .festivos import CalendarioFestivos, calendario
+from .models_normativo import ParametroNormativo
+
+CODIGOS = ['M', 'T', 'A', 'N', 'N_W1', 'N_W2', 'D']
+CODIGOS_LEGACY = ['M', '1-M', 'MAÑANA', 'T', '2-T', 'N', '3-N', 'NOCHE', 'A', 'APOYO', 'N_W1', 'N_W2', 'D', 'X']
+
+
+def _horas_vacias():
+    return {k: Decimal('0.0') for k in ('HOD', 'RNO', 'RDF', 'RNF', 'TOTAL')}
+
+
+def _referencia_horas_turno(calc, turno):
+    """calcular_horas_turno original (recorrido hora por hora)"""
+    resultado = {}
+    fecha_turno = turno.fecha
+    codigo_turno = turno.tipo_turno.codigo if turno.tipo_turno else None
+    tipo_turno = turno.tipo_turno
+
+    if codigo_turno == 'D':
+        resultado[fecha_turno] = _horas_vacias()
+        return resultado
+
+    horas = Decimal('0.0')
+    if tipo_turno:
+        _, _, horas_dia = tipo_turno.get_horario_por_dia(fecha_turno)
+        horas = horas_dia or Decimal('0.0')
+    if horas == Decimal('0.0') and turno.horas_trabajadas:
+        horas = turno.horas_trabajadas
+
+    if codigo_turno in ['N', 'N_W1', 'N_W2']:
+        if horas > 0:
+            resultado[fecha_turno] = _horas_vacias()
+            resultado[fecha_turno]['TOTAL'] = horas
+            if calc.es_festivo(fecha_turno) or fecha_turno.weekday() == 6:
+                resultado[fecha_turno]['RNF'] = horas
+            else:
+                resultado[fecha_turno]['RNO'] = horas
+        return resultado
+
+    if horas <= 0:
+        resultado[fecha_turno] = _horas_vacias()
+        return resultado
+
+    es_day_festivo = calc.es_festivo(fecha_turno) or (fecha_turno.weekday() == 6)
+    resultado[fecha_turno] = _horas_vacias()
+
+    if turno.hora_inicio_real and turno.hora_fin_real:
+        dt_actual = datetime.datetime.combine(fecha_turno, turno.hora_inicio_real)
+        dt_fin = datetime.datetime.combine(fecha_turno, turno.hora_fin_real)
+        if turno.hora_fin_real <= turno.hora_inicio_real:
+            dt_fin += datetime.timedelta(days=1)
+
+        while dt_actual < dt_fin:
+            fecha_actual = dt_actual.date()
+            if fecha_actual not in resultado:
+                resultado[fecha_actual] = _horas_vacias()
+            nocturna = calc.es_hora_nocturna(fecha_actual, dt_actual.hour)
+            if calc.es_festivo(fecha_actual) or fecha_actual.weekday() == 6:
+                key = 'RNF' if nocturna else 'RDF'
+            else:
+                key = 'RNO' if nocturna else 'HOD'
+            resultado[fecha_actual][key] += Decimal('1.0')
+            resultado[fecha_actual]['TOTAL'] += Decimal('1.0')
+            dt_actual += datetime.timedelta(hours=1)
+    else:
+        resultado[fecha_turno]['TOTAL'] = horas
+        resultado[fecha_turno]['RDF' if es_day_festivo else 'HOD'] = horas
+
+    return resultado
+
+
+def _referencia_horas_legacy(calc, fecha_turno, codigo_turno):
+    """calcular_horas original (horarios teóricos, recorrido hora por hora)"""
+    resultado = {}
+    codigo = codigo_turno.upper().strip()
+
+    if codigo in ['D', 'DESCANSO']:
+        resultado[fecha_turno] = _horas_vacias()
+        return resultado
+
+    if codigo in ['N_W1', 'N_W2']:
+        horas = Decimal('1.0') if codigo == 'N_W1' else Decimal('6.0')
+        resultado[fecha_turno] = _horas_vacias()
+        resultado[fecha_turno]['TOTAL'] = horas
+        festivo = calc.es_festivo(fecha_turno) or (fecha_turno.weekday() == 6)
+        resultado[fecha_turno]['RNF' if festivo else 'RNO'] = horas
+        return resultado
+
+    cruza_dia = False
+    if codigo in ['1-M', 'MAÑANA', 'M', 'MANANA', 'TURNO 1-M']:
+        hora_inicio, hora_fin = 6, 14
+    elif codigo in ['2-T', 'TARDE', 'T', 'TURNO 2-T']:
+        hora_inicio, hora_fin = 14, 22
+    elif codigo in ['3-N', 'NOCHE', 'N', 'TURNO 3-N']:
+        hora_inicio, hora_fin, cruza_dia = 23, 6, True
+    elif codigo in ['APOYO', 'A', 'APOYO-A']:
+        hora_inicio, hora_fin = 13, 21
+    else:
+        return resultado
+
+    duracion = (24 - hora_inicio) + hora_fin if cruza_dia else hora_fin - hora_inicio
+    if fecha_turno.weekday() in [1, 2, 3, 4] and not cruza_dia:
+        duracion = 7
+
+    hora_actual, fecha_actual = hora_inicio, fecha_turno
+    for _ in range(duracion):
+        if fecha_actual not in resultado:
+            resultado[fecha_actual] = _horas_vacias()
+        nocturna = calc.es_hora_nocturna(fecha_actual, hora_actual)
+        if calc.es_festivo(fecha_actual) or (fecha_actual.weekday() == 6):
+            key = 'RNF' if nocturna else 'RDF'
+        else:
+            key = 'RNO' if nocturna else 'HOD'
+        resultado[fecha_actual][key] += Decimal('1.0')
+        resultado[fecha_actual]['TOTAL'] += Decimal('1.0')
+        hora_actual += 1
+        if hora_actual >= 24:
+            hora_actual = 0
+            fecha_actual += datetime.timedelta(days=1)
+    return resultado
+
+
+def _turno(fecha, codigo='M', inicio=None, fin=None, horas_dia=Decimal('8.00'),
+           horas_trabajadas=Decimal('0.00'), operador_id=1):
+    tipo = SimpleNamespace(codigo=codigo, get_horario_por_dia=lambda f: (None, None, horas_dia))
+    return SimpleNamespace(
+        fecha=fecha, tipo_turno=tipo, operador_id=operador_id,
+        hora_inicio_real=inicio, hora_fin_real=fin, horas_trabajadas=horas_trabajadas
+    )
+
+
+class MotorIntervalosBase(SimpleTestCase):
+    """
+    Parámetros normativos sin BD: 21:00-06:00 hasta 2025-12-24, 19:00-06:00 después.
+    Festivos: solo la librería holidays (sin DiaFestivo).
+    """
+
+    ventanas = [
+        (date(2000, 1, 1), time(21, 0), time(6, 0)),
+        (date(2025, 12, 25), time(19, 0), time(6, 0)),
+    ]
+
+    def setUp(self):
+        parche = mock.patch.object(ParametroNormativo, 'obtener_vigente', side_effect=self._vigente)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+        parche = mock.patch.object(CalendarioFestivos, '_festivos_locales', return_value=[])
+        parche.start()
+        self.addCleanup(parche.stop)
+        calendario.invalidar()
+        self.addCleanup(calendario.invalidar)
+
+    def _vigente(self, fecha):
+        vigentes = [v for v in self.ventanas if v[0] <= fecha]
+        _, inicio, fin = max(vigentes)
+        return ParametroNormativo(hora_inicio_nocturno=inicio, hora_fin_nocturno=fin)
+
+
+class CorpusEquivalenciaTest(MotorIntervalosBase):
+    """El motor de intervalos reproduce exactamente el cálculo hora por hora"""
+
+    CASOS = 3000
+
+    def _hora_aleatoria(self, rnd):
+        if rnd.random() < 0.1:
+            return None
+        minuto = rnd.choice([0, 0, 0, 15, 30, 45, rnd.randrange(60)])
+        return time(rnd.randrange(24), minuto)
+
+    def test_calcular_horas_turno(self):
+        rnd = random.Random(20260101)
+        for i in range(self.CASOS):
+            # Franja nocturna aleatoria (incluye minutos, franja diurna y vacía)
+            inicio_n = time(rnd.choice([17, 19, 21, 22, 6, 3]), rnd.choice([0, 30]))
+            fin_n = time(rnd.choice([4, 6, 21, 3]), rnd.choice([0, 15]))
+            self.ventanas = [(date(2000, 1, 1), inicio_n, fin_n), (date(2025, 12, 25), time(19, 0), time(6, 0))]
+
+            fecha = date(2025, 1, 1) + datetime.timedelta(days=rnd.randrange(730))
+            turno = _turno(
+                fecha,
+                codigo=rnd.choice(CODIGOS),
+                inicio=self._hora_aleatoria(rnd),
+                fin=self._hora_aleatoria(rnd),
+                horas_dia=rnd.choice([Decimal('0.00'), Decimal('7.00'), Decimal('8.00'), Decimal('6.00'), None]),
+                horas_trabajadas=rnd.choice([Decimal('0.00'), Decimal('7.50'), Decimal('1.00')]),
+            )
+
+            with self.subTest(caso=i, fecha=fecha, inicio=turno.hora_inicio_real, fin=turno.hora_fin_real):
+                esperado = _referencia_horas_turno(CalculadoraLegal(), turno)
+                obtenido = CalculadoraLegal().calcular_horas_turno(turno)
+                # repr compara también el orden de fechas y el formato Decimal('7.0')
+                self.assertEqual(repr(obtenido), repr(esperado))
+
+    def test_calcular_horas_legacy(self):
+        rnd = random.Random(7)
+        for i in range(self.CASOS // 3):
+            fecha = date(2025, 1, 1) + datetime.timedelta(days=rnd.randrange(730))
+            codigo = rnd.choice(CODIGOS_LEGACY)
+            with self.subTest(caso=i, fecha=fecha, codigo=codigo):
+                self.assertEqual(
+                    repr(CalculadoraLegal().calcular_horas(fecha, codigo)),
+                    repr(_referencia_horas_legacy(CalculadoraLegal(), fecha, codigo))
+                )
+
+
+class PrecisionMinutosTest(MotorIntervalosBase):
+    """Clasificación al minuto con precision_minutos=True"""
+
+    def test_fracciones_de_hora(self):
+        calc = CalculadoraLegal()
+        turno = _turno(date(2025, 3, 4), inicio=time(6, 30), fin=time(14, 0))
+
+        self.assertEqual(calc.calcular_horas_turno(turno)[turno.fecha]['HOD'], Decimal('8.0'))
+        resultado = calc.calcular_horas_turno(turno, precision_minutos=True)
+        self.assertEqual(resultado[turno.fecha]['HOD'], Decimal('7.50'))
+        self.assertEqual(resultado[turno.fecha]['TOTAL'], Decimal('7.50'))
+
+    def test_frontera_nocturna_y_medianoche(self):
+        """Martes 20:30 -> miércoles 01:15 con jornada nocturna desde las 21:00"""
+        calc = CalculadoraLegal()
+        turno = _turno(date(2025, 3, 4), inicio=time(20, 30), fin=time(1, 15))
+        resultado = calc.calcular_horas_turno(turno, precision_minutos=True)
+
+        self.assertEqual(resultado[date(2025, 3, 4)]['HOD'], Decimal('0.50'))
+        self.assertEqual(resultado[date(2025, 3, 4)]['RNO'], Decimal('3.00'))
+        self.assertEqual(resultado[date(2025, 3, 5)]['RNO'], Decimal('1.25'))
+
+    def test_festivo_al_dia_siguiente(self):
+        """Sábado 22:00 -> domingo 07:45: la parte del domingo es RNF/RDF"""
+        calc = CalculadoraLegal()
+        turno = _turno(date(2025, 3, 8), inicio=time(22, 0), fin=time(7, 45))
+        resultado = calc.calcular_horas_turno(turno, precision_minutos=True)
+
+        self.assertEqual(resultado[date(2025, 3, 8)]['RNO'], Decimal('2.00'))
+        self.assertEqual(resultado[date(2025, 3, 9)]['RNF'], Decimal('6.00'))
+        self.assertEqual(resultado[date(2025, 3, 9)]['RDF'], Decimal('1.75'))
+
+
+class ClasificarTurnosTest(MotorIntervalosBase):
+    """Tests para la API por lotes"""
+
+    def test_acumula_por_operador_y_fecha(self):
+        turnos = [
+            # Turno nocturno del día anterior al mes: solo cuenta su parte del 1 de marzo
+            _turno(date(2025, 2, 28), inicio=time(22, 0), fin=time(6, 0), operador_id=1),
+            _turno(date(2025, 3, 1), inicio=time(6, 0), fin=time(14, 0), operador_id=1),
+            _turno(date(2025, 3, 1), codigo='D', operador_id=2),
+            _turno(date(2025, 3, 2), codigo='N', horas_dia=Decimal('6.00'), operador_id=2),
+        ]
+        resultado = CalculadoraLegal().clasificar_turnos(turnos, date(2025, 3, 1), date(2025, 3, 31))
+
+        self.assertEqual(set(resultado), {1, 2})
+        self.assertNotIn(date(2025, 2, 28), resultado[1])
+        self.assertEqual(resultado[1][date(2025, 3, 1)]['RNO'], Decimal('6.0'))
+        self.assertEqual(resultado[1][date(2025, 3, 1)]['HOD'], Decimal('8.0'))
+        self.assertEqual(resultado[1][date(2025, 3, 1)]['TOTAL'], Decimal('14.0'))
+        self.assertEqual(resultado[2][date(2025, 3, 1)]['TOTAL'], Decimal('0.0'))
+        self.assertEqual(resultado[2][date(2025, 3, 2)]['RNF'], Decimal('6.00'))
+
+    def test_equivale_a_sumar_turno_por_turno(self):
+        rnd = random.Random(3)
+        turnos = [
+            _turno(
+                date(2025, 3, 1) + datetime.timedelta(days=rnd.randrange(-1, 31)),
+                codigo=rnd.choice(CODIGOS),
+                inicio=time(rnd.randrange(24)),
+                fin=time(rnd.randrange(24)),
+                operador_id=rnd.randrange(5)
+            )
+            for _ in range(300)
+        ]
+        calc = CalculadoraLegal()
+        esperado = {}
+        for turno in turnos:
+            for fecha, horas in calc.calcular_horas_turno(turno).items():
+                if date(2025, 3, 1) <= fecha <= date(2025, 3, 31):
+                    dia = esperado.setdefault(turno.operador_id, {}).setdefault(
+                        fecha, {k: Decimal(0) for k in horas}
+                    )
+                    for k, valor in horas.items():
+                        dia[k] += valor
+
+        obtenido = CalculadoraLegal().clasificar_turnos(turnos, date(2025, 3, 1), date(2025, 3, 31))
+        self.assertEqual(
+            {op: {f: {k: str(v) for k, v in h.items()} for f, h in dias.items()} for op, dias in obtenido.items()},
+            {op: {f: {k: str(v) for k, v in h.items()} for f, h in dias.items()} for op, dias in esperado.items() if dias}
+        )
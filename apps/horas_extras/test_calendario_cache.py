@@ -0,0 +1,141 @@
+# apps/horas_extras/test_calendario_cache.py
+"""
+Tests para el cache del payload del calendario (calendario_cache.py) y los
+ETag de ajax_calendario_data
+"""
+from datetime import date, time
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.user_management.models import Role, UserRole
+
+from . import clasificacion_diaria
+from .models import RegistroTurno, TipoTurno
+
+
+class CalendarioCacheBase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        rol = Role.objects.create(name='operador de centro de computo')
+        self.operador = User.objects.create_user('operador_calendario', first_name='Ana', last_name='Pérez')
+        UserRole.objects.create(user=self.operador, role=rol)
+        self.tipo = TipoTurno.objects.create(nombre='dia', descripcion='Día', codigo='M')
+        self.turno = RegistroTurno.objects.create(
+            operador=self.operador, fecha=date(2025, 3, 10), tipo_turno=self.tipo,
+            hora_inicio_real=time(6, 0), hora_fin_real=time(14, 0)
+        )
+
+        self.client.force_login(User.objects.create_user('coordinador'))
+        self.url = reverse('horas_extras:ajax_calendario_data')
+        self.parametros = {'mes': 3, 'ano': 2025}
+
+
+class CalendarioCacheTest(CalendarioCacheBase):
+    """Con un cache compartido entre procesos (Redis, Memcached...)"""
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        ajustes = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': directorio,
+        }})
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        super().setUp()
+
+    def test_respuesta_con_etag_y_304(self):
+        respuesta = self.client.get(self.url, self.parametros)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('ETag', respuesta)
+        self.assertIn('Last-Modified', respuesta)
+        datos = respuesta.json()
+        self.assertEqual(datos['operadores'][0]['turnos']['2025-03-10']['tipo_turno'], 'M')
+
+        with CaptureQueriesContext(connection) as consultas:
+            repetida = self.client.get(self.url, self.parametros, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(repetida.status_code, 304)
+        self.assertEqual(repetida.content, b'')
+        # Solo la sesión y el usuario autenticado: el payload sale del cache
+        self.assertLessEqual(len(consultas), 2)
+
+    def test_cambio_de_turno_invalida_el_mes(self):
+        etag = self.client.get(self.url, self.parametros)['ETag']
+
+        self.turno.hora_fin_real = time(15, 0)
+        self.turno.save()
+
+        respuesta = self.client.get(self.url, self.parametros, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+        self.assertEqual(respuesta.json()['operadores'][0]['turnos']['2025-03-10']['TOTAL'], '9.00')
+
+    def test_cambio_en_otro_mes_no_invalida(self):
+        etag = self.client.get(self.url, self.parametros)['ETag']
+
+        RegistroTurno.objects.create(
+            operador=self.operador, fecha=date(2025, 5, 10), tipo_turno=self.tipo,
+            hora_inicio_real=time(6, 0), hora_fin_real=time(14, 0)
+        )
+
+        respuesta = self.client.get(self.url, self.parametros, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+
+    def test_filtro_de_operador_en_la_clave(self):
+        general = self.client.get(self.url, self.parametros)
+        filtrado = self.client.get(self.url, {**self.parametros, 'operador_id': 999})
+
+        self.assertEqual(len(general.json()['operadores']), 1)
+        self.assertEqual(filtrado.json()['operadores'], [])
+        self.assertNotEqual(general['ETag'], filtrado['ETag'])
+
+    def test_comando_calentar(self):
+        salida = StringIO()
+        call_command('calentar_calendario', '--por-operador', stdout=salida)
+
+        # Mes actual y siguiente, vista general y por operador, dos formatos
+        self.assertIn('8 payloads del calendario en cache', salida.getvalue())
+        hoy = date.today()
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(self.url, {'mes': hoy.month, 'ano': hoy.year})
+        self.assertEqual(respuesta.status_code, 200)
+        # Sin lectura de la clasificación: el payload ya estaba en cache
+        self.assertFalse([q for q in consultas.captured_queries if 'clasificaciondiaria' in q['sql']])
+
+
+class CalendarioCacheLocalTest(CalendarioCacheBase):
+    """Con un cache local (LocMemCache) la invalidación no llega a otros procesos"""
+
+    def test_no_sirve_payload_de_otro_proceso(self):
+        etag = self.client.get(self.url, self.parametros)['ETag']
+
+        # Cambio hecho por otro proceso: este no ve el incremento de generación
+        with mock.patch.object(clasificacion_diaria, 'invalidar_calendario'):
+            self.turno.hora_fin_real = time(15, 0)
+            self.turno.save()
+
+        respuesta = self.client.get(self.url, self.parametros, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['operadores'][0]['turnos']['2025-03-10']['TOTAL'], '9.00')
+
+        # Sin cambios sigue respondiendo 304
+        repetida = self.client.get(self.url, self.parametros, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(repetida.status_code, 304)
+
+    def test_comando_calentar_no_hace_nada(self):
+        salida = StringIO()
+        call_command('calentar_calendario', stdout=salida)
+        self.assertIn('no hay nada que calentar', salida.getvalue())
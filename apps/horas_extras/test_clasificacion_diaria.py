@@ -0,0 +1,203 @@
+# apps/horas_extras/test_clasificacion_diaria.py
+"""
+Tests para la clasificación diaria materializada (ClasificacionDiaria)
+"""
+from datetime import date, time
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from .clasificacion_diaria import diferir_clasificacion, obtener_clasificacion
+from .festivos import invalidar_festivos
+from .models import ClasificacionDiaria, DiaFestivo, RegistroTurno, TipoTurno
+from .models_normativo import ParametroNormativo
+from .vigencias import invalidar_vigencias
+
+
+class ClasificacionDiariaBase(TestCase):
+
+    def setUp(self):
+        self.tipo = TipoTurno.objects.create(nombre='noche', descripcion='Noche', codigo='T')
+        self.operador = User.objects.create_user('operador_clasif')
+
+    def _turno(self, fecha, inicio=time(22, 0), fin=time(6, 0), operador=None):
+        return RegistroTurno.objects.create(
+            operador=operador or self.operador, tipo_turno=self.tipo, fecha=fecha,
+            hora_inicio_real=inicio, hora_fin_real=fin
+        )
+
+    def _horas(self, fecha, operador=None):
+        fila = ClasificacionDiaria.objects.filter(operador=operador or self.operador, fecha=fecha).first()
+        return fila.horas() if fila else None
+
+
+class SenalesTurnoTest(ClasificacionDiariaBase):
+    """Las señales de RegistroTurno mantienen la tabla al día"""
+
+    def test_turno_nocturno_llena_dos_dias(self):
+        turno = self._turno(date(2025, 3, 4))  # martes 22:00 -> miércoles 06:00
+
+        self.assertEqual(self._horas(date(2025, 3, 4))['RNO'], Decimal('2.00'))
+        self.assertEqual(self._horas(date(2025, 3, 5))['RNO'], Decimal('6.00'))
+        fila = ClasificacionDiaria.objects.get(fecha=date(2025, 3, 4))
+        self.assertEqual(fila.turno_id, turno.pk)
+        self.assertIsNone(ClasificacionDiaria.objects.get(fecha=date(2025, 3, 5)).turno_id)
+
+    def test_editar_y_mover_turno(self):
+        turno = self._turno(date(2025, 3, 4))
+        turno.hora_inicio_real, turno.hora_fin_real = time(6, 0), time(14, 0)
+        turno.save()
+        self.assertEqual(self._horas(date(2025, 3, 4))['HOD'], Decimal('8.00'))
+        self.assertIsNone(self._horas(date(2025, 3, 5)))
+
+        turno.fecha = date(2025, 3, 10)
+        turno.save()
+        self.assertIsNone(self._horas(date(2025, 3, 4)))
+        self.assertEqual(self._horas(date(2025, 3, 10))['TOTAL'], Decimal('8.00'))
+
+    def test_eliminar_turno(self):
+        self._turno(date(2025, 3, 4)).delete()
+        self.assertFalse(ClasificacionDiaria.objects.exists())
+
+    def test_festivo_reclasifica_la_fecha(self):
+        self._turno(date(2025, 3, 4), inicio=time(6, 0), fin=time(14, 0))
+
+        # CalculadoraLegal consulta el calendario de festivos de Colombia
+        self.addCleanup(invalidar_festivos)
+        with mock.patch('apps.horas_extras.calculos_legales.CalculadoraLegal.es_festivo', return_value=True):
+            DiaFestivo.objects.create(nombre='Festivo local', fecha=date(2025, 3, 4))
+
+        self.assertEqual(self._horas(date(2025, 3, 4))['RDF'], Decimal('8.00'))
+
+    def test_parametro_normativo_reclasifica_desde_su_vigencia(self):
+        self._turno(date(2025, 3, 4), inicio=time(18, 0), fin=time(22, 0))
+        self.assertEqual(self._horas(date(2025, 3, 4))['RNO'], Decimal('1.00'))
+
+        # El rollback del test no dispara señales: descartar el índice al terminar
+        self.addCleanup(invalidar_vigencias)
+        with override_settings(CLASIFICACION_EAGER=True), self.captureOnCommitCallbacks(execute=True):
+            ParametroNormativo.objects.create(
+                vigencia_desde=date(2025, 3, 1),
+                hora_inicio_nocturno=time(19, 0), hora_fin_nocturno=time(6, 0)
+            )
+            # Nada se recalcula dentro de la transacción del guardado
+            self.assertEqual(self._horas(date(2025, 3, 4))['RNO'], Decimal('1.00'))
+        self.assertEqual(self._horas(date(2025, 3, 4))['RNO'], Decimal('3.00'))
+
+    def test_vigencia_se_encola_al_confirmar(self):
+        self._turno(date(2025, 3, 4))
+        self.addCleanup(invalidar_vigencias)
+        parametro = ParametroNormativo.objects.create(
+            vigencia_desde=date(2025, 3, 1), hora_inicio_nocturno=time(19, 0), hora_fin_nocturno=time(6, 0)
+        )
+        parametro = ParametroNormativo.objects.get(pk=parametro.pk)
+
+        parametro.vigencia_desde = date(2025, 1, 15)
+        with mock.patch('apps.horas_extras.tasks.reclasificar_desde_task.delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            # Sin SELECT previo: la vigencia anterior se recuerda al cargar
+            with self.assertNumQueries(1):
+                parametro.save(update_fields=['vigencia_desde'])
+            delay.assert_not_called()
+        delay.assert_called_once_with('2025-01-15')
+
+        parametro.vigencia_desde = date(2025, 4, 1)
+        with mock.patch('apps.horas_extras.tasks.reclasificar_desde_task.delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            parametro.save()
+        delay.assert_called_once_with('2025-01-15')
+
+    def test_reclasificacion_mes_a_mes_y_errores(self):
+        from .clasificacion_diaria import reclasificar_desde
+
+        self._turno(date(2025, 1, 20))
+        self._turno(date(2025, 3, 4))
+        with mock.patch(
+            'apps.horas_extras.clasificacion_diaria.recalcular_clasificacion', return_value=1
+        ) as recalcular:
+            self.assertEqual(reclasificar_desde(date(2025, 1, 10)), 3)
+        self.assertEqual(
+            [llamada.args[:2] for llamada in recalcular.call_args_list],
+            [(date(2025, 1, 10), date(2025, 1, 31)), (date(2025, 2, 1), date(2025, 2, 28)),
+             (date(2025, 3, 1), date(2025, 3, 5))]
+        )
+
+        with mock.patch('apps.horas_extras.clasificacion_diaria.recalcular_clasificacion',
+                        side_effect=RuntimeError('bloqueo')), self.assertRaises(RuntimeError):
+            reclasificar_desde(date(2025, 1, 10))
+
+
+class DiferirClasificacionTest(ClasificacionDiariaBase):
+
+    def test_un_solo_recalculo_para_el_lote(self):
+        with mock.patch('apps.horas_extras.clasificacion_diaria.recalcular_clasificacion') as recalcular:
+            with diferir_clasificacion():
+                for dia in range(1, 11):
+                    self._turno(date(2025, 3, dia))
+
+        recalcular.assert_called_once_with(date(2025, 3, 1), date(2025, 3, 11), {self.operador.pk})
+
+    def test_error_del_recalculo_se_propaga(self):
+        with mock.patch('apps.horas_extras.clasificacion_diaria.recalcular_clasificacion',
+                        side_effect=RuntimeError('bloqueo')), self.assertRaises(RuntimeError):
+            with diferir_clasificacion():
+                self._turno(date(2025, 3, 1))
+
+    def test_lote_deja_la_tabla_completa(self):
+        with diferir_clasificacion():
+            for dia in range(1, 11):
+                self._turno(date(2025, 3, dia), inicio=time(6, 0), fin=time(14, 0))
+
+        self.assertEqual(ClasificacionDiaria.objects.count(), 10)
+
+
+class LecturaYReconstruccionTest(ClasificacionDiariaBase):
+
+    def test_mes_de_todos_los_operadores_en_una_consulta(self):
+        otro = User.objects.create_user('otro_clasif')
+        for dia in range(1, 29):
+            self._turno(date(2025, 2, dia), operador=self.operador if dia % 2 else otro)
+
+        # Comprobación de turnos sin clasificar + lectura
+        with self.assertNumQueries(2):
+            clasificacion = obtener_clasificacion(date(2025, 2, 1), date(2025, 2, 28))
+            codigos = {fila.turno.tipo_turno.codigo for filas in clasificacion.values() for fila in filas.values() if fila.turno}
+
+        self.assertEqual(set(clasificacion), {self.operador.pk, otro.pk})
+        self.assertEqual(codigos, {'T'})
+
+    def test_turnos_sin_clasificar_se_clasifican_al_leer(self):
+        """Datos previos a la tabla: la lectura los clasifica y materializa"""
+        otro = User.objects.create_user('otro_clasif')
+        self._turno(date(2025, 3, 4))
+        self._turno(date(2025, 3, 4), operador=otro)
+        esperado = self._horas(date(2025, 3, 5))
+        ClasificacionDiaria.objects.filter(operador=self.operador).delete()
+
+        clasificacion = obtener_clasificacion(date(2025, 3, 1), date(2025, 3, 31))
+
+        self.assertEqual(clasificacion[self.operador.pk][date(2025, 3, 5)].horas(), esperado)
+        self.assertEqual(ClasificacionDiaria.objects.filter(operador=self.operador).count(), 2)
+        with mock.patch('apps.horas_extras.clasificacion_diaria.recalcular_clasificacion') as recalcular:
+            obtener_clasificacion(date(2025, 3, 1), date(2025, 3, 31))
+        recalcular.assert_not_called()
+
+    def test_comando_reconstruye_el_rango(self):
+        for dia in range(25, 32):
+            self._turno(date(2025, 1, dia))
+        self._turno(date(2025, 2, 1))
+        esperado = list(ClasificacionDiaria.objects.order_by('fecha').values_list('fecha', 'horas_rno', 'turno_id'))
+        ClasificacionDiaria.objects.all().delete()
+
+        salida = StringIO()
+        call_command('reconstruir_clasificacion_diaria', '--desde', '2025-01-01', stdout=salida)
+
+        self.assertIn('2025-02', salida.getvalue())
+        self.assertEqual(
+            list(ClasificacionDiaria.objects.order_by('fecha').values_list('fecha', 'horas_rno', 'turno_id')),
+            esperado
+        )
@@ -0,0 +1,61 @@
+# apps/horas_extras/test_festivos.py
+"""
+Tests para el calendario de festivos del proceso (festivos.py)
+"""
+from datetime import date
+
+from django.test import TestCase
+
+from .festivos import calendario, es_festivo, invalidar_festivos, obtener_festivos_mes, obtener_festivos_rango
+from .models import DiaFestivo
+
+
+class CalendarioFestivosTest(TestCase):
+
+    def setUp(self):
+        invalidar_festivos()
+        self.addCleanup(invalidar_festivos)
+
+    def test_une_libreria_y_dia_festivo(self):
+        DiaFestivo.objects.create(nombre='Festivo local', fecha=date(2025, 3, 4))
+        DiaFestivo.objects.create(nombre='Inactivo', fecha=date(2025, 3, 5), activo=False)
+
+        self.assertTrue(es_festivo(date(2025, 1, 1)))    # Año nuevo (holidays)
+        self.assertTrue(es_festivo(date(2025, 3, 4)))    # DiaFestivo activo
+        self.assertFalse(es_festivo(date(2025, 3, 5)))   # DiaFestivo inactivo
+        self.assertFalse(es_festivo(date(2025, 3, 9)))   # Domingo: no es festivo
+
+    def test_una_consulta_por_ano(self):
+        with self.assertNumQueries(1):
+            for dia in range(1, 32):
+                es_festivo(date(2025, 12, dia))
+            DiaFestivo.es_festivo(date(2025, 7, 20))
+
+    def test_rangos_y_mes(self):
+        self.assertEqual(obtener_festivos_mes(2025, 12), [date(2025, 12, 8), date(2025, 12, 25)])
+        self.assertEqual(
+            obtener_festivos_rango(date(2024, 12, 20), date(2026, 1, 1)) & {date(2024, 12, 25), date(2026, 1, 1)},
+            {date(2024, 12, 25), date(2026, 1, 1)}
+        )
+
+    def test_senal_invalida_el_ano(self):
+        self.assertFalse(es_festivo(date(2025, 3, 4)))
+
+        festivo = DiaFestivo.objects.create(nombre='Festivo local', fecha=date(2025, 3, 4))
+        self.assertTrue(es_festivo(date(2025, 3, 4)))
+
+        festivo.fecha = date(2026, 3, 4)
+        festivo.save()
+        self.assertFalse(es_festivo(date(2025, 3, 4)))
+        self.assertTrue(es_festivo(date(2026, 3, 4)))
+
+        festivo.delete()
+        self.assertFalse(es_festivo(date(2026, 3, 4)))
+
+    def test_precargar_no_consulta(self):
+        exportado = calendario.exportar([2025])
+        invalidar_festivos()
+
+        calendario.precargar(exportado)
+        with self.assertNumQueries(0):
+            self.assertTrue(es_festivo(date(2025, 12, 25)))
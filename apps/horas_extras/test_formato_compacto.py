@@ -0,0 +1,108 @@
+# apps/horas_extras/test_formato_compacto.py
+"""
+Tests para el formato compacto (columnar) del calendario y de los eventos de
+FullCalendar (formato_compacto.py)
+"""
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.user_management.models import Role, UserRole
+
+from .festivos import invalidar_festivos
+from .formato_compacto import centesimas
+from .models import DiaFestivo, RegistroTurno, TipoTurno
+
+
+def _expandir_turnos(compacto):
+    """{(operador_id, fecha_str): turno verboso} a partir del formato compacto"""
+    inicio = date.fromisoformat(compacto['inicio'])
+    turnos = compacto['turnos']
+    resultado = {}
+    for i, dia in enumerate(turnos['dia']):
+        operador_id = compacto['operadores']['id'][turnos['operador'][i]]
+        fila = {
+            'id': turnos['id'][i],
+            'tipo_turno': compacto['tipos'][turnos['tipo'][i]],
+            'estado': compacto['estados'][turnos['estado'][i]],
+        }
+        for columna, valores in turnos['horas'].items():
+            fila[columna] = f"{valores[i] / compacto['escala_horas']:.2f}"
+        resultado[(operador_id, (inicio + timedelta(days=dia)).isoformat())] = fila
+    return resultado
+
+
+class FormatoCompactoTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.addCleanup(invalidar_festivos)
+        DiaFestivo.objects.create(nombre='Festivo local', fecha=date(2025, 3, 4))
+
+        rol = Role.objects.create(name='operador de centro de computo')
+        self.operadores = []
+        for i in range(3):
+            operador = User.objects.create_user(f'operador_compacto_{i}', first_name=f'Op{i}')
+            UserRole.objects.create(user=operador, role=rol)
+            self.operadores.append(operador)
+
+        dia = TipoTurno.objects.create(nombre='dia', descripcion='Día', codigo='M')
+        noche = TipoTurno.objects.create(nombre='noche', descripcion='Noche', codigo='T', es_nocturno=True)
+        for i, operador in enumerate(self.operadores):
+            for numero in range(1, 32, 2):
+                nocturno = (numero + i) % 3 == 0
+                RegistroTurno.objects.create(
+                    operador=operador, fecha=date(2025, 3, numero),
+                    tipo_turno=noche if nocturno else dia,
+                    hora_inicio_real=time(22, 0) if nocturno else time(6, 0),
+                    hora_fin_real=time(6, 0) if nocturno else time(13, 30),
+                )
+
+        self.client.force_login(User.objects.create_superuser('admin_compacto'))
+
+    def test_centesimas(self):
+        self.assertEqual(centesimas('9.00'), 900)
+        self.assertEqual(centesimas(7.5), 750)
+        self.assertEqual(centesimas(None), 0)
+
+    def test_calendario_equivalente_al_verboso(self):
+        url = reverse('horas_extras:ajax_calendario_data')
+        verboso = self.client.get(url, {'mes': 3, 'ano': 2025}).json()
+        respuesta = self.client.get(url, {'mes': 3, 'ano': 2025, 'formato': 'compacto'})
+        compacto = respuesta.json()
+
+        esperado = {
+            (operador['id'], fecha): turno
+            for operador in verboso['operadores'] for fecha, turno in operador['turnos'].items() if turno
+        }
+        self.assertEqual(_expandir_turnos(compacto), esperado)
+        self.assertEqual(compacto['festivos'], [dia['dia'] - 1 for dia in verboso['calendario'] if dia['es_festivo']])
+        self.assertEqual(compacto['festivos_info'][compacto['festivos'].index(3)]['nombre'], 'Festivo local')
+        self.assertEqual(sorted(compacto['tipos']), ['M', 'T'])
+        self.assertLess(len(respuesta.content), len(self.client.get(url, {'mes': 3, 'ano': 2025}).content) / 2)
+
+    def test_eventos_equivalentes_al_verboso(self):
+        url = reverse('horas_extras:api_eventos_calendario')
+        parametros = {'start': '2025-03-01T00:00:00', 'end': '2025-03-31T00:00:00'}
+        verboso = self.client.get(url, parametros).json()
+        compacto = self.client.get(url, {**parametros, 'formato': 'compacto'}).json()
+
+        inicio = date.fromisoformat(compacto['inicio'])
+        columnas = compacto['eventos']
+        self.assertEqual(len(columnas['id']), len(verboso))
+        for i, evento in enumerate(verboso):
+            self.assertEqual(columnas['id'][i], evento['id'])
+            operador = compacto['operadores'][columnas['operador'][i]]
+            tipo = compacto['tipos'][columnas['tipo'][i]]
+            props = evento['extendedProps']
+            self.assertEqual(operador, {'id': evento['resourceId'], 'nombre': props['operador_nombre']})
+            self.assertEqual((inicio + timedelta(days=columnas['dia'][i])).isoformat(), evento['start'])
+            self.assertEqual((tipo['codigo'], tipo['color']), (props['codigo_turno'], evento['backgroundColor']))
+            self.assertEqual(columnas['dia'][i] in compacto['festivos'], props['es_festivo'])
+            for columna, valor in props['horas'].items():
+                self.assertEqual(columnas['horas'][columna][i], centesimas(valor))
+        self.assertEqual(len(compacto['operadores']), 3)
@@ -0,0 +1,77 @@
+# apps/horas_extras/test_guardado_turnos.py
+"""
+Tests para el guardado masivo de turnos (guardado_turnos.guardar_turnos_masivo)
+"""
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .festivos import invalidar_festivos
+from .guardado_turnos import guardar_turnos_masivo
+from .models import ClasificacionDiaria, DiaFestivo, RegistroTurno, TipoTurno
+
+CAMPOS_COMPARADOS = [
+    'operador_id', 'fecha', 'tipo_turno_id', 'hora_inicio_real', 'hora_fin_real', 'horas_programadas',
+    'horas_trabajadas', 'es_lunes', 'es_martes', 'es_miercoles', 'es_jueves', 'es_viernes', 'es_sabado',
+    'es_domingo', 'es_festivo', 'incluye_nocturno',
+]
+
+
+class GuardarTurnosMasivoTest(TestCase):
+
+    def setUp(self):
+        self.manana = TipoTurno.objects.create(nombre='manana', descripcion='Mañana', codigo='M')
+        self.noche = TipoTurno.objects.create(nombre='noche', descripcion='Noche', codigo='N', es_nocturno=True)
+        self.operadores = [User.objects.create_user(f'operador_bulk_{i}') for i in range(3)]
+        # El rollback del test no dispara señales: descartar el calendario al terminar
+        self.addCleanup(invalidar_festivos)
+        DiaFestivo.objects.create(nombre='Festivo', fecha=date(2025, 3, 24))
+
+    def _turnos(self, tipo, inicio=time(6, 0), fin=time(14, 0)):
+        turnos = []
+        for operador in self.operadores:
+            for dia in range(1, 32):
+                turnos.append(RegistroTurno(
+                    operador=operador, tipo_turno=tipo, fecha=date(2025, 3, dia),
+                    hora_inicio_real=inicio, hora_fin_real=fin
+                ))
+        return turnos
+
+    def _filas(self):
+        return list(RegistroTurno.objects.order_by('operador_id', 'fecha').values_list(*CAMPOS_COMPARADOS))
+
+    def test_mismos_campos_que_save(self):
+        for turno in self._turnos(self.manana):
+            turno.save()
+        esperado = self._filas()
+        RegistroTurno.objects.all().delete()
+
+        resultado = guardar_turnos_masivo(self._turnos(self.manana))
+
+        self.assertEqual(resultado['creados'], 93)
+        self.assertEqual(self._filas(), esperado)
+        self.assertTrue(RegistroTurno.objects.get(operador=self.operadores[0], fecha=date(2025, 3, 24)).es_festivo)
+
+    def test_consultas_constantes_y_conteos(self):
+        guardar_turnos_masivo(self._turnos(self.manana))
+
+        turnos = self._turnos(self.noche, time(22, 0), time(6, 0))[:60] + self._turnos(self.manana)[60:]
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = guardar_turnos_masivo(turnos)
+
+        # Antes: SELECT + festivo + UPDATE por turno (~280 consultas)
+        self.assertLess(len(consultas), 20)
+
+        self.assertEqual((resultado['creados'], resultado['actualizados'], resultado['sin_cambios']), (0, 60, 33))
+        self.assertEqual(RegistroTurno.objects.filter(tipo_turno=self.noche, incluye_nocturno=True).count(), 60)
+
+    def test_reclasifica_el_rango_escrito(self):
+        guardar_turnos_masivo(self._turnos(self.manana, time(22, 0), time(6, 0)))
+
+        # Turno de 22:00 a 06:00 del 31: su madrugada cae el 1 de abril
+        fila = ClasificacionDiaria.objects.get(operador=self.operadores[0], fecha=date(2025, 3, 31) + timedelta(days=1))
+        self.assertEqual(fila.horas()['RNO'], Decimal('6.00'))
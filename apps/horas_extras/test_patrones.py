@@ -0,0 +1,125 @@
+# apps/horas_extras/test_patrones.py
+"""
+Tests para la línea de tiempo de seeds (patrones.LineaSeeds)
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .models import PatronOperador, RegistroTurno, TipoTurno
+from .patrones import LineaSeeds, vecindad_turno
+from .utils import GeneradorTurnos, GeneradorTurnosV4
+
+
+class LineaSeedsBase(TestCase):
+
+    def setUp(self):
+        self.operador = User.objects.create_user('operador_patron')
+        for fecha, turno in [
+            (date(2025, 1, 1), 'T'),
+            (date(2025, 2, 10), 'N'),
+            (date(2025, 3, 1), 'A'),
+            (date(2025, 3, 20), 'M'),
+        ]:
+            PatronOperador.objects.create(
+                operador=self.operador, fecha_inicio_patron=fecha, turno_inicial_patron=turno
+            )
+
+
+class LineaSeedsTest(LineaSeedsBase):
+
+    def test_rango_igual_al_calculo_por_fecha(self):
+        inicio, fin = date(2024, 12, 20), date(2025, 5, 31)
+        linea = LineaSeeds.de_operador(self.operador)
+
+        with self.assertNumQueries(0):
+            codigos = linea.turnos_rango(inicio, fin)
+
+        fecha = inicio
+        while fecha <= fin:
+            self.assertEqual(codigos[fecha], PatronOperador.calcular_turno_para_fecha(self.operador, fecha), fecha)
+            self.assertEqual(linea.seed_vigente(fecha), PatronOperador.obtener_seed_vigente(self.operador, fecha))
+            fecha += timedelta(days=1)
+
+    def test_tramos_cortan_en_cada_seed(self):
+        tramos = LineaSeeds.de_operador(self.operador).tramos(date(2024, 12, 30), date(2025, 3, 5))
+
+        self.assertEqual(
+            [(seed.turno_inicial_patron if seed else None, desde, hasta) for seed, desde, hasta in tramos],
+            [
+                (None, date(2024, 12, 30), date(2024, 12, 31)),
+                ('T', date(2025, 1, 1), date(2025, 2, 9)),
+                ('N', date(2025, 2, 10), date(2025, 2, 28)),
+                ('A', date(2025, 3, 1), date(2025, 3, 5)),
+            ]
+        )
+
+    def test_vecindad_en_cambio_de_seed(self):
+        linea = LineaSeeds.de_operador(self.operador)
+
+        # 2025-03-01 inicia el seed A: el día anterior sigue el patrón N
+        self.assertEqual(linea.vecindad(date(2025, 3, 1))['prev'], PatronOperador.calcular_turno_para_fecha(
+            self.operador, date(2025, 2, 28)
+        ))
+        self.assertEqual(linea.vecindad(date(2025, 3, 1), mismo_seed=True)['prev'], 'A')
+
+    def test_cargar_varios_operadores_en_una_consulta(self):
+        otro = User.objects.create_user('sin_patron')
+
+        with self.assertNumQueries(1):
+            lineas = LineaSeeds.cargar([self.operador, otro.pk])
+
+        self.assertEqual(len(lineas[self.operador.pk].seeds), 4)
+        self.assertFalse(lineas[otro.pk])
+        self.assertIsNone(lineas[otro.pk].turno_fecha(date(2025, 1, 1)))
+
+
+class VecindadTurnoTest(LineaSeedsBase):
+
+    def test_registro_tiene_prioridad_sobre_el_patron(self):
+        fecha = date(2025, 2, 12)  # patrón N desde el 10
+        descanso = TipoTurno.objects.create(nombre='descanso', descripcion='Descanso', codigo='D')
+        RegistroTurno.objects.create(operador=self.operador, tipo_turno=descanso, fecha=fecha - timedelta(days=1))
+
+        self.assertEqual(
+            vecindad_turno(self.operador, fecha, 'N'),
+            {'prev': 'D', 'today': 'N', 'next': 'N'}
+        )
+
+
+class GeneradoresTest(LineaSeedsBase):
+
+    def setUp(self):
+        super().setUp()
+        for codigo in ['T', 'N', 'D', 'M', 'A']:
+            TipoTurno.objects.create(nombre=f'turno {codigo}', descripcion=codigo, codigo=codigo)
+
+    def _consultas(self, funcion, *args):
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = funcion(*args)
+        return len(consultas), resultado
+
+    def test_consultas_no_dependen_del_rango(self):
+        for generar in (GeneradorTurnos.generar_turnos_operador_v3, GeneradorTurnosV4.generar_turnos_operador_v4):
+            # Llamada sin medir: llena los caches de proceso (tipos de turno,
+            # festivos, vigencias) para que ambas mediciones partan igual
+            generar(self.operador, date(2025, 1, 1), date(2025, 6, 30))
+            corto, _ = self._consultas(generar, self.operador, date(2025, 1, 1), date(2025, 1, 3))
+            largo, _ = self._consultas(generar, self.operador, date(2025, 1, 1), date(2025, 6, 30))
+            self.assertEqual(corto, largo, generar.__name__)
+
+    def test_v4_genera_el_turno_del_seed_vigente(self):
+        inicio, fin = date(2024, 12, 25), date(2025, 4, 10)
+        turnos = GeneradorTurnosV4.generar_turnos_operador_v4(self.operador, inicio, fin)
+
+        esperados = []
+        fecha = inicio
+        while fecha <= fin:
+            codigo = PatronOperador.calcular_turno_para_fecha(self.operador, fecha)
+            if codigo:
+                esperados.append((fecha, codigo))
+            fecha += timedelta(days=1)
+        self.assertEqual([(t.fecha, t.tipo_turno.codigo) for t in turnos], esperados)
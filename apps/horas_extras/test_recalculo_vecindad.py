@@ -0,0 +1,104 @@
+# apps/horas_extras/test_recalculo_vecindad.py
+"""
+Tests para el recálculo incremental de los turnos N vecinos
+(recalculo_vecindad.py)
+"""
+import json
+from datetime import date, time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import ClasificacionDiaria, RegistroTurno, TipoTurno
+from .recalculo_vecindad import recalcular_vecindad
+
+DIAS = ['lunes', 'martes', 'miercoles', 'jueves', 'viernes', 'sabado', 'domingo']
+
+
+class RecalculoVecindadTest(TestCase):
+
+    def setUp(self):
+        # Sin horas configuradas por día: la clasificación del N usa horas_trabajadas
+        self.noche = TipoTurno.objects.create(
+            nombre='noche', descripcion='Noche', codigo='N', es_nocturno=True,
+            **{f'horas_{dia}': Decimal('0.00') for dia in DIAS}
+        )
+        self.descanso = TipoTurno.objects.create(nombre='descanso', descripcion='Descanso', codigo='D')
+        self.manana = TipoTurno.objects.create(nombre='manana', descripcion='Mañana', codigo='M')
+        self.operador = User.objects.create_user('operador_vecindad')
+
+        # D N N N D del martes 10 al sábado 14 de marzo de 2026
+        self.turnos = {}
+        for dia, tipo in zip(range(10, 15), [self.descanso, self.noche, self.noche, self.noche, self.descanso]):
+            self.turnos[dia] = RegistroTurno.objects.create(
+                operador=self.operador, fecha=date(2026, 3, dia), tipo_turno=tipo
+            )
+        recalcular_vecindad([(self.operador.id, date(2026, 3, dia)) for dia in range(11, 14)])
+
+    def _horario(self, dia):
+        turno = RegistroTurno.objects.get(operador=self.operador, fecha=date(2026, 3, dia))
+        return turno.hora_inicio_real, turno.hora_fin_real, turno.horas_trabajadas
+
+    def _total_clasificado(self, dia):
+        return ClasificacionDiaria.objects.get(operador=self.operador, fecha=date(2026, 3, dia)).horas_total
+
+    def test_bloque_inicial(self):
+        self.assertEqual(self._horario(11), (time(23, 0), time(23, 59), Decimal('1.00')))
+        self.assertEqual(self._horario(12), (time(0, 0), time(23, 59), Decimal('7.00')))
+        self.assertEqual(self._horario(13), (time(0, 0), time(6, 0), Decimal('6.00')))
+
+    def test_cambio_en_medio_recalcula_vecinos(self):
+        turno = self.turnos[12]
+        turno.tipo_turno = self.descanso
+        turno.save()
+
+        afectados = recalcular_vecindad([(self.operador.id, date(2026, 3, 12))])
+
+        # El 11 pierde la noche y el 13 la madrugada
+        self.assertEqual(afectados, [(self.operador.id, date(2026, 3, 11)), (self.operador.id, date(2026, 3, 13))])
+        self.assertEqual(self._horario(11), (None, None, Decimal('0.00')))
+        self.assertEqual(self._horario(13), (None, None, Decimal('0.00')))
+        self.assertEqual(self._total_clasificado(11), Decimal('0.00'))
+
+    def test_cambio_sin_efecto(self):
+        turno = self.turnos[14]
+        turno.tipo_turno = self.manana
+        turno.save()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(recalcular_vecindad([(self.operador.id, date(2026, 3, 16))]), [])
+        self.assertEqual(recalcular_vecindad([(self.operador.id, date(2026, 3, 14))]), [])
+
+    def test_asignar_turno_api_devuelve_dias_afectados(self):
+        self.client.force_login(User.objects.create_superuser('admin_vecindad'))
+
+        respuesta = self.client.post(
+            reverse('horas_extras:api_asignar_turno'),
+            json.dumps({'operador_id': self.operador.id, 'fecha': '2026-03-14', 'tipo_turno_id': self.noche.id}),
+            content_type='application/json'
+        )
+
+        # El 13 gana la noche (el 14 ahora es N)
+        self.assertEqual(respuesta.json()['dias_afectados'], ['2026-03-13'])
+        self.assertEqual(self._horario(13), (time(0, 0), time(23, 59), Decimal('7.00')))
+        self.assertEqual(self._total_clasificado(13), Decimal('7.00'))
+
+    def test_ajax_asignar_turnos_devuelve_dias_afectados(self):
+        self.client.force_login(User.objects.create_superuser('admin_vecindad'))
+
+        respuesta = self.client.post(
+            reverse('horas_extras:ajax_asignar_turnos'),
+            json.dumps({
+                'operador_id': self.operador.id, 'fechas': ['2026-03-10'],
+                'tipo_turno_id': self.noche.id, 'sobrescribir': True
+            }),
+            content_type='application/json'
+        )
+
+        # El 10 pasa a N (con noche: el 11 es N) y el 11 gana la madrugada
+        datos = respuesta.json()
+        self.assertEqual(datos['turnos_actualizados'], 1)
+        self.assertEqual(datos['dias_afectados'], ['2026-03-10', '2026-03-11'])
+        self.assertEqual(self._horario(11), (time(0, 0), time(23, 59), Decimal('7.00')))
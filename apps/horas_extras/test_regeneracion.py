@@ -0,0 +1,100 @@
+# apps/horas_extras/test_regeneracion.py
+"""
+Tests para la regeneración de turnos V4 (regeneracion.py / regenerar_turnos_v4)
+"""
+from datetime import date, time
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from .models import PatronOperador, RegistroTurno, TipoTurno
+from .patrones import LineaSeeds
+from .regeneracion import calcular_turnos_operadores
+from .utils import GeneradorTurnosV4
+
+
+class RegeneracionBase(TestCase):
+
+    def setUp(self):
+        self.tipos = {
+            codigo: TipoTurno.objects.create(nombre=f'turno {codigo}', descripcion=codigo, codigo=codigo)
+            for codigo in ['T', 'N', 'D', 'M', 'A']
+        }
+        self.operadores = []
+        for i, turno in enumerate(['T', 'N', 'D', 'M', 'A']):
+            operador = User.objects.create_user(f'operador_regen_{i}', first_name=f'Regen{i}')
+            PatronOperador.objects.create(
+                operador=operador, fecha_inicio_patron=date(2025, 12, 1), turno_inicial_patron=turno
+            )
+            self.operadores.append(operador)
+
+    def _regenerar(self, *argumentos):
+        salida = StringIO()
+        call_command(
+            'regenerar_turnos_v4', '--todos', '--desde', '2025-12-01', '--hasta', '2026-01-31',
+            *argumentos, stdout=salida
+        )
+        return salida.getvalue()
+
+    def _turnos(self):
+        return list(RegistroTurno.objects.order_by('operador_id', 'fecha').values_list(
+            'operador_id', 'fecha', 'tipo_turno__codigo', 'hora_inicio_real', 'hora_fin_real', 'horas_trabajadas'
+        ))
+
+
+class CalculoParaleloTest(RegeneracionBase):
+
+    def test_workers_igual_que_en_proceso(self):
+        lineas = LineaSeeds.cargar(self.operadores)
+        festivos = GeneradorTurnosV4.obtener_festivos_rango(date(2025, 12, 1), date(2026, 1, 31))
+        argumentos = (lineas, date(2025, 12, 1), date(2026, 1, 31), festivos, set(self.tipos))
+
+        secuencial = dict(calcular_turnos_operadores(*argumentos))
+        paralelo = dict(calcular_turnos_operadores(*argumentos, workers=2))
+
+        self.assertEqual(paralelo, secuencial)
+
+    def test_mismo_resultado_que_el_generador_por_operador(self):
+        self._regenerar('--workers', '2')
+
+        esperado = []
+        for operador in self.operadores:
+            for turno in GeneradorTurnosV4.generar_turnos_operador_v4(operador, date(2025, 12, 1), date(2026, 1, 31)):
+                esperado.append((
+                    operador.pk, turno.fecha, turno.tipo_turno.codigo,
+                    turno.hora_inicio_real, turno.hora_fin_real, turno.horas_trabajadas
+                ))
+        self.assertEqual(self._turnos(), sorted(esperado))
+
+
+class DryRunTest(RegeneracionBase):
+
+    def test_dry_run_no_guarda_y_muestra_diferencias(self):
+        self._regenerar()
+        turno = RegistroTurno.objects.get(operador=self.operadores[0], fecha=date(2025, 12, 2))
+        turno.tipo_turno = self.tipos['D']
+        turno.hora_inicio_real = turno.hora_fin_real = None
+        turno.save()
+        antes = self._turnos()
+
+        salida = self._regenerar('--dry-run')
+
+        self.assertEqual(self._turnos(), antes)
+        self.assertIn('cambiados: 1', salida)
+        self.assertIn('2025-12-02: D -> T', salida)
+        self.assertIn('operador-días/s', salida)
+        self.assertIn('DRY-RUN', salida)
+
+    def test_regenerar_reemplaza_el_rango(self):
+        extra = RegistroTurno.objects.create(
+            operador=self.operadores[0], tipo_turno=self.tipos['M'], fecha=date(2026, 1, 15),
+            hora_inicio_real=time(6, 0), hora_fin_real=time(14, 0), estado='trabajado'
+        )
+
+        self._regenerar()
+
+        regenerado = RegistroTurno.objects.get(operador=self.operadores[0], fecha=extra.fecha)
+        self.assertEqual(regenerado.estado, 'programado')
+        self.assertEqual(RegistroTurno.objects.count(), 5 * 62)
@@ -0,0 +1,92 @@
+# apps/horas_extras/test_reporte_mensual.py
+"""
+Tests para el servicio de reporte mensual de horas
+"""
+from datetime import date, time
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from .calculos_legales import CalculadoraLegal
+from .management.commands.benchmark_reporte_mensual import (
+    clasificacion_en_lote, generar_datos_sinteticos, reporte_por_operador
+)
+from .models import RegistroTurno, TipoTurno
+from .models_normativo import ParametroNormativo
+from .reporte_mensual import CLAVES_HORAS, construir_reporte_mensual, rango_mes
+
+
+class ReporteMensualTest(TestCase):
+
+    def setUp(self):
+        parametros = ParametroNormativo(hora_inicio_nocturno=time(21, 0), hora_fin_nocturno=time(6, 0))
+        parche = mock.patch.object(ParametroNormativo, 'obtener_vigente', return_value=parametros)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+        self.manana = TipoTurno.objects.create(nombre='manana', descripcion='Mañana', codigo='M')
+        self.noche = TipoTurno.objects.create(nombre='noche', descripcion='Noche', codigo='N', es_nocturno=True)
+        self.ana = User.objects.create_user('ana', first_name='Ana', last_name='Ruiz')
+        self.beto = User.objects.create_user('beto')
+
+    def test_rango_mes_incluye_dia_anterior(self):
+        self.assertEqual(rango_mes(2025, 1), (date(2024, 12, 31), date(2025, 1, 1), date(2025, 1, 31)))
+        self.assertEqual(rango_mes(2024, 3), (date(2024, 2, 29), date(2024, 3, 1), date(2024, 3, 31)))
+
+    def test_estructura_y_totales(self):
+        # Turno del último día de febrero que cruza al 1 de marzo (sábado)
+        RegistroTurno.objects.create(
+            operador=self.ana, tipo_turno=self.manana, fecha=date(2025, 2, 28),
+            hora_inicio_real=time(22, 0), hora_fin_real=time(6, 0)
+        )
+        RegistroTurno.objects.create(
+            operador=self.ana, tipo_turno=self.manana, fecha=date(2025, 3, 3),
+            hora_inicio_real=time(6, 0), hora_fin_real=time(14, 0)
+        )
+        RegistroTurno.objects.create(operador=self.beto, tipo_turno=self.noche, fecha=date(2025, 3, 9))
+
+        reporte = construir_reporte_mensual(User.objects.order_by('username'), 2025, 3)
+        ana, beto = reporte['datos']
+
+        self.assertEqual(ana['nombre'], 'Ana Ruiz')
+        self.assertEqual(beto['nombre'], 'beto')
+        self.assertEqual(len(ana['dias']), 31)
+        self.assertEqual(ana['dias'][0]['turno'], 'Descanso')
+        self.assertEqual(ana['dias'][0]['horas']['RNO'], Decimal('6.0'))
+        self.assertEqual(ana['dias'][2]['turno'], 'M')
+        self.assertEqual(ana['dias'][2]['horas']['HOD'], Decimal('8.0'))
+        self.assertEqual(ana['totales']['TOTAL'], Decimal('14.0'))
+
+        # Turno N de domingo sin horario real: TOTAL/RNF con las horas del día
+        domingo = beto['dias'][8]
+        self.assertTrue(domingo['es_festivo'])
+        self.assertEqual(domingo['horas']['RNF'], Decimal('8.00'))
+        self.assertEqual(reporte['totales_generales']['TOTAL'], Decimal('22.0'))
+
+    def test_una_consulta_de_turnos(self):
+        for dia in range(1, 29):
+            RegistroTurno.objects.create(
+                operador=self.ana if dia % 2 else self.beto, tipo_turno=self.manana, fecha=date(2025, 2, dia),
+                hora_inicio_real=time(6, 0), hora_fin_real=time(14, 0)
+            )
+        operadores = list(User.objects.order_by('username'))
+
+        # Comprobación de turnos sin clasificar + lectura, sin importar el número de operadores
+        with self.assertNumQueries(2):
+            construir_reporte_mensual(operadores, 2025, 2)
+
+    def test_equivale_al_recorrido_por_operador(self):
+        operadores, turnos = generar_datos_sinteticos(12, 2025, 12)
+        lote = clasificacion_en_lote(operadores, turnos, 2025, 12, CalculadoraLegal())
+        anterior = reporte_por_operador(operadores, turnos, 2025, 12, CalculadoraLegal())
+
+        for operador, acumulado in zip(operadores, anterior):
+            dias = lote.get(operador.id, {})
+            for fecha in set(dias) | set(acumulado):
+                cero = {k: Decimal(0) for k in CLAVES_HORAS}
+                self.assertEqual(
+                    {k: str(dias.get(fecha, cero).get(k, Decimal(0))) for k in CLAVES_HORAS},
+                    {k: str(acumulado.get(fecha, cero)[k]) for k in CLAVES_HORAS}
+                )
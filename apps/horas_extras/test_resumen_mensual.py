@@ -0,0 +1,111 @@
+# apps/horas_extras/test_resumen_mensual.py
+"""
+Tests para ResumenMensual.calcular_resumen y el cierre de mes en bloque
+"""
+from datetime import date, time
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .festivos import invalidar_festivos
+from .models import DiaFestivo, RegistroTurno, ResumenMensual, TipoTurno
+
+
+class ResumenMensualBase(TestCase):
+
+    def setUp(self):
+        self.dia = TipoTurno.objects.create(nombre='dia', descripcion='Día', codigo='M')
+        self.noche = TipoTurno.objects.create(nombre='noche', descripcion='Noche', codigo='T', es_nocturno=True)
+        self.addCleanup(invalidar_festivos)
+        DiaFestivo.objects.create(nombre='Festivo local', fecha=date(2025, 3, 4))
+
+        self.operadores = [User.objects.create_user(f'operador_resumen_{i}') for i in range(4)]
+        for i, operador in enumerate(self.operadores[:3]):
+            for dia in range(1, 32):
+                nocturno = (dia + i) % 3 == 0
+                RegistroTurno.objects.create(
+                    operador=operador, fecha=date(2025, 3, dia),
+                    tipo_turno=self.noche if nocturno else self.dia,
+                    hora_inicio_real=time(22, 0) if nocturno else time(6, 0),
+                    hora_fin_real=time(6, 0) if nocturno else time(13, 0),
+                    estado='trabajado' if dia % 5 else 'programado'
+                )
+        # Fuera del mes: no cuenta
+        RegistroTurno.objects.create(
+            operador=self.operadores[0], fecha=date(2025, 4, 1), tipo_turno=self.dia,
+            hora_inicio_real=time(6, 0), hora_fin_real=time(14, 0), estado='trabajado'
+        )
+
+    def _esperado(self, operador):
+        """Totales calculados en Python sobre los turnos trabajados del mes"""
+        turnos = [t for t in RegistroTurno.objects.filter(operador=operador, estado='trabajado')
+                  if (t.fecha.year, t.fecha.month) == (2025, 3)]
+
+        def suma(condicion):
+            return sum((t.horas_trabajadas for t in turnos if condicion(t)), Decimal('0.00'))
+
+        return {
+            'total_turnos': len(turnos),
+            'total_horas_trabajadas': suma(lambda t: True),
+            'total_horas_ordinarias': suma(lambda t: True),
+            'horas_lunes': suma(lambda t: t.es_lunes),
+            'horas_martes': suma(lambda t: t.es_martes),
+            'horas_miercoles': suma(lambda t: t.es_miercoles),
+            'horas_jueves': suma(lambda t: t.es_jueves),
+            'horas_viernes': suma(lambda t: t.es_viernes),
+            'horas_sabados': suma(lambda t: t.es_sabado),
+            'horas_domingos': suma(lambda t: t.es_domingo),
+            'horas_festivos': suma(lambda t: t.es_festivo),
+            'horas_nocturnas': suma(lambda t: t.incluye_nocturno),
+            'horas_nocturnas_festivas': suma(lambda t: t.incluye_nocturno and t.es_festivo),
+            'horas_dominicales': suma(lambda t: t.es_domingo),
+        }
+
+    def _guardado(self, operador):
+        resumen = ResumenMensual.objects.get(operador=operador, ano=2025, mes=3)
+        return {campo: getattr(resumen, campo) for campo in ResumenMensual.CAMPOS_RESUMEN}
+
+
+class CalcularResumenTest(ResumenMensualBase):
+
+    def test_una_consulta_de_agregacion(self):
+        resumen = ResumenMensual.objects.create(operador=self.operadores[0], ano=2025, mes=3)
+
+        with CaptureQueriesContext(connection) as consultas:
+            resumen.calcular_resumen()
+
+        # Agregación + UPDATE del resumen
+        self.assertEqual(len(consultas), 2)
+        self.assertEqual(self._guardado(self.operadores[0]), self._esperado(self.operadores[0]))
+        self.assertGreater(resumen.horas_festivos, 0)
+
+
+class CerrarMesTest(ResumenMensualBase):
+
+    def test_cierre_igual_al_calculo_por_operador(self):
+        ResumenMensual.objects.create(operador=self.operadores[1], ano=2025, mes=3, total_turnos=99)
+
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = ResumenMensual.cerrar_mes(2025, 3)
+
+        self.assertLessEqual(len(consultas), 8)
+        self.assertEqual(resultado, {'creados': 2, 'actualizados': 1})
+        for operador in self.operadores[:3]:
+            self.assertEqual(self._guardado(operador), self._esperado(operador))
+        self.assertFalse(ResumenMensual.objects.filter(operador=self.operadores[3]).exists())
+
+    def test_operador_sin_turnos_queda_en_cero(self):
+        ResumenMensual.cerrar_mes(2025, 3, operadores=[self.operadores[3]])
+
+        self.assertEqual(self._guardado(self.operadores[3])['total_horas_trabajadas'], Decimal('0.00'))
+
+    def test_comando(self):
+        salida = StringIO()
+        call_command('cerrar_mes', '--ano', '2025', '--mes', '3', stdout=salida)
+
+        self.assertIn('3 resúmenes creados', salida.getvalue())
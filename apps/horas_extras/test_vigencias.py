@@ -0,0 +1,61 @@
+# apps/horas_extras/test_vigencias.py
+"""
+Tests para el índice de vigencias de ParametroNormativo / PoliticaEmpresa
+"""
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.test import TestCase
+
+from .models_normativo import ParametroNormativo, PoliticaEmpresa
+from .utils import GeneradorTurnosV4
+from .vigencias import indice, invalidar_vigencias
+
+
+class IndiceVigenciasTest(TestCase):
+
+    def setUp(self):
+        # El índice es del proceso y el rollback de cada test no dispara señales
+        invalidar_vigencias()
+        self.addCleanup(invalidar_vigencias)
+
+        self.ley_2101 = ParametroNormativo.objects.create(vigencia_desde=date(2023, 7, 15), hora_inicio_nocturno=time(21, 0))
+        self.reforma = ParametroNormativo.objects.create(vigencia_desde=date(2025, 12, 25), hora_inicio_nocturno=time(19, 0))
+
+    def test_resuelve_por_intervalo(self):
+        self.assertIsNone(ParametroNormativo.obtener_vigente(date(2023, 7, 14)))
+        self.assertEqual(ParametroNormativo.obtener_vigente(date(2023, 7, 15)), self.ley_2101)
+        self.assertEqual(ParametroNormativo.obtener_vigente(date(2025, 12, 24)), self.ley_2101)
+        self.assertEqual(ParametroNormativo.obtener_vigente(date(2025, 12, 25)), self.reforma)
+        self.assertEqual(ParametroNormativo.obtener_vigente(date(2030, 1, 1)), self.reforma)
+
+    def test_una_carga_para_cualquier_numero_de_fechas(self):
+        with self.assertNumQueries(2):
+            for dia in range(60):
+                fecha = date(2025, 12, 1) + timedelta(days=dia)
+                ParametroNormativo.obtener_vigente(fecha)
+                PoliticaEmpresa.obtener_vigente(fecha)
+
+    def test_senales_recargan_el_indice(self):
+        self.assertEqual(GeneradorTurnosV4.obtener_hora_inicio_nocturno(date(2026, 3, 1)), time(19, 0))
+
+        self.reforma.hora_inicio_nocturno = time(20, 0)
+        self.reforma.save()
+        self.assertEqual(GeneradorTurnosV4.obtener_hora_inicio_nocturno(date(2026, 3, 1)), time(20, 0))
+
+        self.reforma.delete()
+        self.assertEqual(GeneradorTurnosV4.obtener_hora_inicio_nocturno(date(2026, 3, 1)), time(21, 0))
+
+        politica = PoliticaEmpresa.objects.create(vigencia_desde=date(2026, 1, 1), pagar_dominical_100=True)
+        self.assertEqual(PoliticaEmpresa.obtener_vigente(date(2026, 3, 1)), politica)
+
+    def test_ttl_recarga_cambios_de_otro_proceso(self):
+        ParametroNormativo.obtener_vigente(date(2026, 1, 1))
+        # Cambio sin señales (como otro worker o SQL directo)
+        ParametroNormativo.objects.filter(pk=self.reforma.pk).update(hora_inicio_nocturno=time(18, 0))
+
+        self.assertEqual(ParametroNormativo.obtener_vigente(date(2026, 1, 1)).hora_inicio_nocturno, time(19, 0))
+
+        ahora = indice(ParametroNormativo)._snapshot[2]
+        with mock.patch('apps.horas_extras.vigencias.time.monotonic', return_value=ahora + 301):
+            self.assertEqual(ParametroNormativo.obtener_vigente(date(2026, 1, 1)).hora_inicio_nocturno, time(18, 0))
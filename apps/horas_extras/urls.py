@@ -12,6 +12,7 @@ urlpatterns = [
     path('asignacion/calendario/', views_asignacion.calendario_asignacion, name='calendario_asignacion'),
     path('api/eventos/', views_asignacion.obtener_eventos_calendario, name='api_eventos_calendario'),
     path('api/asignar/', views_asignacion.asignar_turno_api, name='api_asignar_turno'),
+    path('api/asignar-masivo/', views_asignacion.asignar_turnos_masivo_api, name='api_asignar_turnos_masivo'),
 
     # === EMPLEADOS ===
     path('empleados/', views.lista_operadores, name='lista_operadores'),
@@ -9,6 +9,9 @@ from django.utils import timezone
 import calendar
 
 from .models import DiaFestivo, TipoTurno, RegistroTurno, ResumenMensual
+from .festivos import es_festivo, obtener_festivos_rango
+from .guardado_turnos import guardar_turnos_masivo
+from .patrones import LineaSeeds
 from apps.user_management.models import Role, UserRole
 
 
@@ -20,10 +23,8 @@ class CalculadoraHorasExtras:
 
     @classmethod
     def es_dia_festivo(cls, fecha):
-        """Verifica si una fecha es día festivo en Colombia usando librería holidays"""
-        import holidays
-        co_holidays = holidays.CO()
-        return fecha in co_holidays
+        """Verifica si una fecha es día festivo en Colombia (calendario de festivos.py)"""
+        return es_festivo(fecha)
 
     @classmethod
     def obtener_horario_turno(cls, tipo_turno, fecha):
@@ -269,31 +270,11 @@ class GeneradorTurnos:
     @classmethod
     def guardar_turnos_mes(cls, turnos_list):
         """
-        Guarda una lista de turnos en la base de datos
+        Guarda una lista de turnos en la base de datos: actualiza el turno
+        existente del operador en la fecha o lo crea (en bloque, ver
+        guardado_turnos.guardar_turnos_masivo)
         """
-        turnos_guardados = []
-
-        for turno in turnos_list:
-            # Verificar si ya existe un turno para esta fecha y operador
-            existente = RegistroTurno.objects.filter(
-                operador=turno.operador,
-                fecha=turno.fecha
-            ).first()
-
-            if existente:
-                # Actualizar turno existente
-                existente.tipo_turno = turno.tipo_turno
-                existente.hora_inicio_real = turno.hora_inicio_real
-                existente.hora_fin_real = turno.hora_fin_real
-                existente.horas_trabajadas = turno.horas_trabajadas
-                existente.save()
-                turnos_guardados.append(existente)
-            else:
-                # Crear nuevo turno
-                turno.save()
-                turnos_guardados.append(turno)
-
-        return turnos_guardados
+        return guardar_turnos_masivo(turnos_list)['turnos']
 
     @classmethod
     def generar_turnos_operador_v3(cls, operador, fecha_inicio, fecha_fin):
@@ -317,7 +298,7 @@ class GeneradorTurnos:
         horas_trabajadas = madrugada + noche
         """
         from datetime import time, timedelta
-        from apps.horas_extras.models import TipoTurno, RegistroTurno, PatronOperador
+        from apps.horas_extras.models import TipoTurno, RegistroTurno
         
         # Obtener tipos de turno
         try:
@@ -332,16 +313,17 @@ class GeneradorTurnos:
             disponibles = list(TipoTurno.objects.values_list('codigo', flat=True))
             raise ValueError(f"Falta algún tipo de turno. Disponibles: {disponibles}")
         
-        # Verificar que existe al menos un seed
-        if not PatronOperador.objects.filter(operador=operador).exists():
+        # Seeds del operador (una consulta); verificar que existe al menos uno
+        linea = LineaSeeds.de_operador(operador)
+        if not linea:
             raise ValueError(
                 f"No existe PatronOperador para {operador.get_full_name()}. "
                 f"Use: set_patron_operador --operador {operador.username} --fecha YYYY-MM-DD --turno T/N/D/M"
             )
         
-        # Función helper: obtener turno de una fecha usando seed vigente
-        def turno_de_fecha(fecha):
-            return PatronOperador.calcular_turno_para_fecha(operador, fecha)
+        # Turno de cada fecha del rango (y sus vecinos) usando el seed vigente
+        turnos_patron = linea.turnos_rango(fecha_inicio - timedelta(days=1), fecha_fin + timedelta(days=1))
+        turno_de_fecha = turnos_patron.get
 
         
         turnos_generados = []
@@ -807,28 +789,22 @@ class GeneradorTurnosV4:
     5. Después de descanso requiere nuevo seed
     """
     
-    # Cache de parámetros por fecha
-    _parametros_cache = {}
-    
     @classmethod
     def obtener_hora_inicio_nocturno(cls, fecha):
         """
         Obtiene la hora de inicio de jornada nocturna desde BD.
         
         ANTES: Hardcodeado a 19:00
-        AHORA: Lee de ParametroNormativo.obtener_vigente(fecha)
+        AHORA: Lee de ParametroNormativo.obtener_vigente(fecha) (índice de
+        vigencias compartido, invalidado por señales)
         """
         from .models_normativo import ParametroNormativo
         
-        if fecha not in cls._parametros_cache:
-            parametros = ParametroNormativo.obtener_vigente(fecha)
-            if parametros:
-                cls._parametros_cache[fecha] = parametros.hora_inicio_nocturno
-            else:
-                # Fallback: usar 21:00 como default pre-reforma
-                cls._parametros_cache[fecha] = time(21, 0)
-        
-        return cls._parametros_cache[fecha]
+        parametros = ParametroNormativo.obtener_vigente(fecha)
+        if parametros:
+            return parametros.hora_inicio_nocturno
+        # Fallback: usar 21:00 como default pre-reforma
+        return time(21, 0)
     
     # Configuración de rangos por turno y tipo de día
     # Mar=1, Mié=2, Jue=3, Vie=4 son "semana"
@@ -873,22 +849,12 @@ class GeneradorTurnosV4:
     @classmethod
     def es_festivo(cls, fecha):
         """Verifica si la fecha es festivo en Colombia"""
-        import holidays
-        co_holidays = holidays.CO()
-        return fecha in co_holidays
+        return es_festivo(fecha)
     
     @classmethod
     def obtener_festivos_rango(cls, fecha_inicio, fecha_fin):
         """Obtiene lista de festivos en un rango de fechas"""
-        import holidays
-        co_holidays = holidays.CO(years=[fecha_inicio.year, fecha_fin.year])
-        festivos = set()
-        fecha_actual = fecha_inicio
-        while fecha_actual <= fecha_fin:
-            if fecha_actual in co_holidays:
-                festivos.add(fecha_actual)
-            fecha_actual += timedelta(days=1)
-        return festivos
+        return obtener_festivos_rango(fecha_inicio, fecha_fin)
     
     @classmethod
     def obtener_rangos_horarios(cls, turno, fecha, festivos=None, context_vecindad=None):
@@ -1225,7 +1191,7 @@ class GeneradorTurnosV4:
         Returns:
             Lista de RegistroTurno listos para guardar
         """
-        from apps.horas_extras.models import TipoTurno, RegistroTurno, PatronOperador
+        from apps.horas_extras.models import TipoTurno, RegistroTurno
         
         # Obtener tipos de turno
         tipos_turno = {}
@@ -1235,8 +1201,9 @@ class GeneradorTurnosV4:
             except TipoTurno.DoesNotExist:
                 pass
         
-        # Verificar que existe al menos un seed
-        if not PatronOperador.objects.filter(operador=operador).exists():
+        # Seeds del operador (una consulta); verificar que existe al menos uno
+        linea = LineaSeeds.de_operador(operador)
+        if not linea:
             raise ValueError(
                 f"No existe PatronOperador para {operador.get_full_name()}. "
                 f"Use: set_patron_operador --operador {operador.username} --fecha YYYY-MM-DD --turno T/N/D/M/A"
@@ -1246,40 +1213,56 @@ class GeneradorTurnosV4:
         festivos = cls.obtener_festivos_rango(fecha_inicio, fecha_fin)
         
         turnos_generados = []
+        for turno in cls.calcular_turnos_linea(linea, fecha_inicio, fecha_fin, festivos, tipos_turno):
+            turnos_generados.append(RegistroTurno(
+                operador=operador,
+                tipo_turno=tipos_turno[turno['codigo']],
+                fecha=turno['fecha'],
+                estado='programado',
+                hora_inicio_real=turno['hora_inicio'],
+                hora_fin_real=turno['hora_fin'],
+                horas_trabajadas=turno['horas_trabajadas']
+            ))
+        
+        return turnos_generados
+    
+    @classmethod
+    def calcular_turnos_linea(cls, linea, fecha_inicio, fecha_fin, festivos, codigos_validos):
+        """
+        Calcula los turnos V4 de un rango a partir de los seeds ya cargados,
+        sin consultar la BD (los parámetros normativos salen del índice de
+        vigencias). Lo usan generar_turnos_operador_v4 y los workers de
+        regenerar_turnos_v4.
+        
+        Args:
+            linea: LineaSeeds del operador
+            festivos: set de fechas festivas del rango
+            codigos_validos: Códigos de TipoTurno existentes (los demás se omiten)
+        
+        Returns:
+            Lista de dicts {'fecha', 'codigo', 'hora_inicio', 'hora_fin', 'horas_trabajadas'}
+        """
+        # Turno de cada fecha según su seed vigente (None = sin seed)
+        turnos_patron = linea.turnos_rango(fecha_inicio, fecha_fin)
+        
+        turnos = []
         fecha_actual = fecha_inicio
         
         while fecha_actual <= fecha_fin:
-            # Obtener seed vigente para esta fecha
-            seed = PatronOperador.obtener_seed_vigente(operador, fecha_actual)
+            # Calcular turno del día (sin seed para esta fecha: saltar)
+            turno_codigo = turnos_patron[fecha_actual]
             
-            if not seed:
-                # Sin seed para esta fecha, saltar
+            if turno_codigo not in codigos_validos:
                 fecha_actual += timedelta(days=1)
                 continue
             
-            # Calcular turno del día
-            turno_codigo = seed.calcular_turno_fecha(fecha_actual)
-            
-            if turno_codigo not in tipos_turno:
-                fecha_actual += timedelta(days=1)
-                continue
-            
-            tipo_turno = tipos_turno[turno_codigo]
-            
             # Determinar contexto de vecindad para turno N
             context_vecindad = None
             if turno_codigo == 'N':
                 # Obtener turno anterior y siguiente usando el MISMO seed (asumimos continuidad de patrón)
                 # En un caso ideal, deberíamos buscar si hay OTRO seed que aplique, pero para generación
                 # masiva basada en un patrón, usar el mismo seed para +/- 1 día es lo correcto.
-                turno_ayer = seed.calcular_turno_fecha(fecha_actual - timedelta(days=1))
-                turno_manana = seed.calcular_turno_fecha(fecha_actual + timedelta(days=1))
-                
-                context_vecindad = {
-                    'prev': turno_ayer,
-                    'today': 'N',
-                    'next': turno_manana
-                }
+                context_vecindad = linea.vecindad(fecha_actual, mismo_seed=True)
 
             # Calcular recargos con rangos reales
             recargos = cls.calcular_recargos_fecha(
@@ -1296,25 +1279,23 @@ class GeneradorTurnosV4:
                 hora_inicio = recargos['segmentos'][0]['inicio']
                 hora_fin = recargos['segmentos'][-1]['fin']
             
-            # Crear registro
-            registro = RegistroTurno(
-                operador=operador,
-                tipo_turno=tipo_turno,
-                fecha=fecha_actual,
-                estado='programado',
-                hora_inicio_real=hora_inicio,
-                hora_fin_real=hora_fin,
-                horas_trabajadas=recargos['horas_trabajadas']
-            )
-            
-            turnos_generados.append(registro)
+            turnos.append({
+                'fecha': fecha_actual,
+                'codigo': turno_codigo,
+                'hora_inicio': hora_inicio,
+                'hora_fin': hora_fin,
+                'horas_trabajadas': recargos['horas_trabajadas'],
+            })
             fecha_actual += timedelta(days=1)
         
-        return turnos_generados
+        return turnos
     
     @classmethod
     def guardar_turnos(cls, turnos):
-        """Guarda lista de turnos en la base de datos"""
-        for turno in turnos:
-            turno.save()
-        return len(turnos)
+        """
+        Guarda lista de turnos en la base de datos (upsert en bloque).
+
+        Returns:
+            dict: conteos 'creados', 'actualizados', 'sin_cambios' y 'turnos'
+        """
+        return guardar_turnos_masivo(turnos)
@@ -13,6 +13,8 @@ from django.views.decorators.csrf import csrf_exempt
 from django.core.paginator import Paginator
 from django.db.models import Q, Sum, Count
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from datetime import datetime, date, timedelta
 import json
 import calendar
@@ -25,7 +27,11 @@ from .utils import (
     CalculadoraHorasExtras, GeneradorTurnos, ReportesHorasExtras,
     ValidadorTurnos
 )
-from .calculos_legales import CalculadoraLegal
+from .reporte_mensual import construir_reporte_mensual
+from .clasificacion_diaria import diferir_clasificacion
+from .calendario_cache import obtener_payload_calendario
+from .formato_compacto import FORMATO_COMPACTO, es_formato_compacto
+from .asignacion_masiva import MAX_ASIGNACIONES, asignar_turnos_masivo
 from .forms import RegistroTurnoForm, FiltroReporteForm, GenerarTurnosForm
 
 
@@ -352,21 +358,22 @@ def generar_turnos_automaticos(request):
                         'Marque "Sobrescribir existentes" para reemplazarlos.'
                     )
                 else:
-                    # Eliminar turnos existentes si se va a sobrescribir
-                    if sobrescribir:
-                        RegistroTurno.objects.filter(
-                            operador=operador,
-                            fecha__year=ano,
-                            fecha__month=mes
-                        ).delete()
-
-                    # Generar nuevos turnos
-                    turnos_nuevos = GeneradorTurnos.generar_turnos_mes(
-                        operador, ano, mes, patron_inicial
-                    )
-
-                    # Guardar turnos
-                    turnos_guardados = GeneradorTurnos.guardar_turnos_mes(turnos_nuevos)
+                    with diferir_clasificacion():
+                        # Eliminar turnos existentes si se va a sobrescribir
+                        if sobrescribir:
+                            RegistroTurno.objects.filter(
+                                operador=operador,
+                                fecha__year=ano,
+                                fecha__month=mes
+                            ).delete()
+
+                        # Generar nuevos turnos
+                        turnos_nuevos = GeneradorTurnos.generar_turnos_mes(
+                            operador, ano, mes, patron_inicial
+                        )
+
+                        # Guardar turnos
+                        turnos_guardados = GeneradorTurnos.guardar_turnos_mes(turnos_nuevos)
 
                     messages.success(
                         request,
@@ -434,106 +441,10 @@ def reportes_horas_extras(request):
             else:
                 operadores = obtener_operadores_activos()
             
-            # Rangos de fecha
-            ultimo_dia = calendar.monthrange(ano, mes)[1]
-            fecha_inicio = date(ano, mes, 1)
-            fecha_fin = date(ano, mes, ultimo_dia)
-            
-            # Para turnos nocturnos que cruzan medianoche, necesitamos incluir
-            # el último día del mes anterior (su turno puede terminar en este mes)
-            if mes == 1:
-                fecha_busqueda_inicio = date(ano - 1, 12, 31)
-            else:
-                ultimo_dia_mes_anterior = calendar.monthrange(ano, mes - 1)[1]
-                fecha_busqueda_inicio = date(ano, mes - 1, ultimo_dia_mes_anterior)
-            
-            # Obtener turnos (incluyendo día anterior para continuidad de turno N)
-            turnos = RegistroTurno.objects.filter(
-                fecha__range=(fecha_busqueda_inicio, fecha_fin),
-                operador__in=operadores
-            ).select_related('tipo_turno', 'operador')
-
-            
-            # Mapeo optimizado
-            turnos_map = {}
-            for t in turnos:
-                if t.operador_id not in turnos_map:
-                    turnos_map[t.operador_id] = {}
-                turnos_map[t.operador_id][t.fecha] = t
-            
-            # Calcular
-            calculadora = CalculadoraLegal()
-            datos_reporte = []
-            
-            # Acumuladores globales
-            gran_totales = {
-                'HOD': Decimal(0), 'RNO': Decimal(0),
-                'RDF': Decimal(0), 'RNF': Decimal(0),
-                'TOTAL': Decimal(0)
-            }
-            
-            for operador in operadores:
-                # Inicializar acumulador diario para el operador
-                acumulado_diario = {}
-                for d in range(1, ultimo_dia + 1):
-                    f = date(ano, mes, d)
-                    acumulado_diario[f] = {
-                        'HOD': Decimal(0), 'RNO': Decimal(0), 
-                        'RDF': Decimal(0), 'RNF': Decimal(0), 
-                        'TOTAL': Decimal(0)
-                    }
-                
-                # Calcular horas reales de todos los turnos
-                turnos_op = [t for t in turnos if t.operador_id == operador.id]
-                for turno in turnos_op:
-                    if turno.tipo_turno:
-                        # Siempre usar calcular_horas_turno (usa horas del TipoTurno por día)
-                        resultado = calculadora.calcular_horas_turno(turno)
-                        
-                        # Agregar al acumulado diario
-                        for fecha_res, horas_res in resultado.items():
-                            if fecha_inicio <= fecha_res <= fecha_fin:
-                                for k in ['HOD', 'RNO', 'RDF', 'RNF', 'TOTAL']:
-                                    acumulado_diario[fecha_res][k] += horas_res.get(k, Decimal(0))
-                
-                # Construir estructura para el reporte
-                info_operador = {
-                    'nombre': operador.get_full_name() or operador.username,
-                    'id': operador.id,
-                    'dias': [],
-                    'totales': {
-                        'HOD': Decimal(0), 'RNO': Decimal(0), 
-                        'RDF': Decimal(0), 'RNF': Decimal(0), 
-                        'TOTAL': Decimal(0)
-                    }
-                }
-                
-                for dia in range(1, ultimo_dia + 1):
-                    fecha_iter = date(ano, mes, dia)
-                    turno_visual = turnos_map.get(operador.id, {}).get(fecha_iter)
-                    
-                    detalle_dia = {
-                        'fecha': fecha_iter,
-                        'dia_semana': fecha_iter.strftime('%A'),
-                        'turno': turno_visual.tipo_turno.codigo if (turno_visual and turno_visual.tipo_turno) else 'Descanso',
-                        'es_festivo': calculadora.es_festivo(fecha_iter) or fecha_iter.weekday() == 6,
-                        'horas': acumulado_diario.get(fecha_iter)
-                    }
-                    
-                    info_operador['dias'].append(detalle_dia)
-                    
-                    # Sumar a totales del operador
-                    for k in info_operador['totales']:
-                        info_operador['totales'][k] += detalle_dia['horas'][k]
-                
-                datos_reporte.append(info_operador)
-                
-                # Sumar a totales globales
-                for k in gran_totales:
-                    gran_totales[k] += info_operador['totales'][k]
+            reporte = construir_reporte_mensual(operadores, ano, mes)
             
-            context['datos'] = datos_reporte
-            context['totales_generales'] = gran_totales
+            context['datos'] = reporte['datos']
+            context['totales_generales'] = reporte['totales_generales']
             context['porcentajes'] = {
                 'RNO': '35%',
                 'RDF': '75%',
@@ -585,7 +496,13 @@ def ajax_horarios_turno(request):
 
 @login_required
 def ajax_calendario_data(request):
-    """Vista AJAX para obtener datos del calendario con horas calculadas"""
+    """
+    Vista AJAX para obtener datos del calendario con horas calculadas.
+
+    El payload del mes sale del cache (calendario_cache.py) con ETag y
+    Last-Modified: una recarga sin cambios responde 304 sin cuerpo.
+    Con ?formato=compacto responde en formato columnar (formato_compacto.py).
+    """
 
     mes = request.GET.get('mes')
     ano = request.GET.get('ano')
@@ -598,131 +515,25 @@ def ajax_calendario_data(request):
         mes = int(mes)
         ano = int(ano)
 
-        # Generar calendario
-        calendario = CalculadoraHorasExtras.generar_calendario_mes(ano, mes)
-        
-        # Rango de fechas
-        ultimo_dia = calendar.monthrange(ano, mes)[1]
-        fecha_inicio = date(ano, mes, 1)
-        fecha_fin = date(ano, mes, ultimo_dia)
-        
-        # Para continuidad de turno N, incluir día anterior
-        if mes == 1:
-            fecha_busqueda = date(ano - 1, 12, 31)
-        else:
-            ultimo_dia_ant = calendar.monthrange(ano, mes - 1)[1]
-            fecha_busqueda = date(ano, mes - 1, ultimo_dia_ant)
-
         # Obtener operadores activos
         if operador_id:
             operadores = obtener_operadores_activos().filter(id=operador_id)
         else:
             operadores = obtener_operadores_activos()
 
-        # Obtener todos los turnos (incluyendo día anterior para continuidad)
-        turnos_query = RegistroTurno.objects.filter(
-            fecha__range=(fecha_busqueda, fecha_fin)
-        ).select_related('operador', 'tipo_turno')
+        formato = FORMATO_COMPACTO if es_formato_compacto(request) else None
+        payload = obtener_payload_calendario(ano, mes, operadores, operador_id, formato)
 
-        # Calculadora
-        calculadora = CalculadoraLegal()
-        
-        # Pre-calcular horas para todos los turnos y agregar por día
-        horas_calculadas = {}  # {operador_id: {fecha_str: {HOD, RNO, RDF, RNF, TOTAL}}}
-        turnos_visual = {}  # {operador_id: {fecha_str: turno_info}}
-        
-        for turno in turnos_query:
-            op_id = turno.operador.id
-            fecha_str = turno.fecha.strftime('%Y-%m-%d')
-            
-            # Guardar turno visual (el que inicia ese día)
-            if op_id not in turnos_visual:
-                turnos_visual[op_id] = {}
-            if turno.fecha >= fecha_inicio:  # Solo mostrar turnos del mes actual
-                turnos_visual[op_id][fecha_str] = {
-                    'id': turno.id,
-                    'tipo_turno': turno.tipo_turno.codigo if turno.tipo_turno else 'D',
-                    'estado': turno.estado,
-                }
-            
-            # Calcular horas reales
-            if turno.tipo_turno:
-                resultado = calculadora.calcular_horas_turno(turno)
-                
-                # Agregar al acumulador por fecha
-                if op_id not in horas_calculadas:
-                    horas_calculadas[op_id] = {}
-                    
-                for fecha_calc, horas in resultado.items():
-                    if fecha_inicio <= fecha_calc <= fecha_fin:
-                        fecha_calc_str = fecha_calc.strftime('%Y-%m-%d')
-                        if fecha_calc_str not in horas_calculadas[op_id]:
-                            horas_calculadas[op_id][fecha_calc_str] = {
-                                'HOD': Decimal(0), 'RNO': Decimal(0),
-                                'RDF': Decimal(0), 'RNF': Decimal(0),
-                                'TOTAL': Decimal(0)
-                            }
-                        for k in ['HOD', 'RNO', 'RDF', 'RNF', 'TOTAL']:
-                            horas_calculadas[op_id][fecha_calc_str][k] += horas.get(k, Decimal(0))
-
-        # Preparar respuesta con operadores
-        operadores_data = []
-        for operador in operadores:
-            turnos_operador = {}
-            
-            for dia in calendario:
-                fecha_str = dia['fecha'].strftime('%Y-%m-%d')
-                turno_info = turnos_visual.get(operador.id, {}).get(fecha_str)
-                horas_info = horas_calculadas.get(operador.id, {}).get(fecha_str, {
-                    'HOD': Decimal(0), 'RNO': Decimal(0),
-                    'RDF': Decimal(0), 'RNF': Decimal(0),
-                    'TOTAL': Decimal(0)
-                })
-                
-                if turno_info:
-                    turnos_operador[fecha_str] = {
-                        'id': turno_info['id'],
-                        'tipo_turno': turno_info['tipo_turno'],
-                        'estado': turno_info['estado'],
-                        'HOD': str(horas_info['HOD']),
-                        'RNO': str(horas_info['RNO']),
-                        'RDF': str(horas_info['RDF']),
-                        'RNF': str(horas_info['RNF']),
-                        'TOTAL': str(horas_info['TOTAL']),
-                    }
-                else:
-                    turnos_operador[fecha_str] = None
-
-            operadores_data.append({
-                'id': operador.id,
-                'nombre': operador.get_full_name() or operador.username,
-                'username': operador.username,
-                'email': operador.email,
-                'turnos': turnos_operador
-            })
-
-        # Preparar datos del calendario
-        calendar_data = []
-        for dia in calendario:
-            fecha_str = dia['fecha'].strftime('%Y-%m-%d')
-            calendar_data.append({
-                'fecha': fecha_str,
-                'dia': dia['dia'],
-                'dia_semana': dia['dia_semana'],
-                'nombre_dia': dia['nombre_dia'],
-                'es_festivo': dia['es_festivo'],
-                'es_domingo': dia['es_domingo'],
-                'es_sabado': dia['es_sabado'],
-                'festivo_info': dia['festivo_info']
-            })
-
-        return JsonResponse({
-            'calendario': calendar_data,
-            'operadores': operadores_data,
-            'mes': mes,
-            'ano': ano,
-            'nombre_mes': calendar.month_name[mes]
-        })
+        respuesta = get_conditional_response(
+            request, etag=payload['etag'], last_modified=payload['generado']
+        )
+        if respuesta is None:
+            respuesta = HttpResponse(payload['contenido'], content_type='application/json')
+        respuesta['ETag'] = payload['etag']
+        respuesta['Last-Modified'] = http_date(payload['generado'])
+        # El navegador guarda la copia pero revalida siempre (los turnos cambian)
+        patch_cache_control(respuesta, private=True, no_cache=True)
+        return respuesta
 
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
@@ -742,70 +553,32 @@ def ajax_asignar_turnos(request):
 
         if not operador_id or not fechas or not tipo_turno_id:
             return JsonResponse({'error': 'Faltan parámetros requeridos'}, status=400)
+        if not isinstance(fechas, list) or len(fechas) > MAX_ASIGNACIONES:
+            return JsonResponse({'error': f'Máximo {MAX_ASIGNACIONES} fechas por petición'}, status=400)
 
-        operador = User.objects.get(id=operador_id)
-        tipo_turno = TipoTurno.objects.get(id=tipo_turno_id)
+        if not User.objects.filter(id=operador_id).exists():
+            return JsonResponse({'error': 'Operador no encontrado'}, status=404)
+        if not TipoTurno.objects.filter(id=tipo_turno_id).exists():
+            return JsonResponse({'error': 'Tipo de turno no encontrado'}, status=404)
 
-        turnos_creados = 0
-        turnos_actualizados = 0
-        turnos_existentes = 0
-        errores = []
-
-        for fecha_str in fechas:
-            try:
-                fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
-
-                # Verificar si ya existe un turno
-                turno_existente = RegistroTurno.objects.filter(
-                    operador=operador,
-                    fecha=fecha
-                ).first()
-
-                if turno_existente and not sobrescribir:
-                    turnos_existentes += 1
-                    continue
-
-                # Obtener horarios del turno según el día de la semana
-                hora_inicio, hora_fin, horas = tipo_turno.get_horario_por_dia(fecha)
-
-                if turno_existente and sobrescribir:
-                    # Actualizar turno existente
-                    turno_existente.tipo_turno = tipo_turno
-                    turno_existente.hora_inicio_real = hora_inicio
-                    turno_existente.hora_fin_real = hora_fin
-                    turno_existente.horas_programadas = horas
-                    turno_existente.estado = 'programado'
-                    turno_existente.save()
-                    turnos_actualizados += 1
-                else:
-                    # Crear nuevo turno
-                    RegistroTurno.objects.create(
-                        operador=operador,
-                        tipo_turno=tipo_turno,
-                        fecha=fecha,
-                        hora_inicio_real=hora_inicio,
-                        hora_fin_real=hora_fin,
-                        horas_programadas=horas,
-                        horas_trabajadas=Decimal('0.00'),
-                        estado='programado'
-                    )
-                    turnos_creados += 1
-
-            except Exception as e:
-                errores.append(f"Error en fecha {fecha_str}: {str(e)}")
+        # Una transacción, escritura en bloque y una sola reclasificación
+        resultado = asignar_turnos_masivo([
+            {'operador_id': operador_id, 'fecha': fecha_str, 'tipo_turno_id': tipo_turno_id}
+            for fecha_str in fechas
+        ], sobrescribir=bool(sobrescribir))
 
         return JsonResponse({
             'success': True,
-            'turnos_creados': turnos_creados,
-            'turnos_actualizados': turnos_actualizados,
-            'turnos_existentes': turnos_existentes,
-            'errores': errores
+            'turnos_creados': resultado['creados'],
+            'turnos_actualizados': resultado['actualizados'] + resultado['sin_cambios'],
+            'turnos_existentes': resultado['existentes'],
+            'errores': [
+                f"Error en fecha {item['fecha']}: {item['error']}"
+                for item in resultado['resultados'] if item['resultado'] == 'error'
+            ],
+            'dias_afectados': [dia.isoformat() for _, dia in resultado['dias_afectados']]
         })
 
-    except User.DoesNotExist:
-        return JsonResponse({'error': 'Operador no encontrado'}, status=404)
-    except TipoTurno.DoesNotExist:
-        return JsonResponse({'error': 'Tipo de turno no encontrado'}, status=404)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -832,99 +605,12 @@ def exportar_reporte_excel(request):
         else:
             operadores = obtener_operadores_activos()
 
-        # 2. Pre-cargar Turnos
-        ultimo_dia = calendar.monthrange(ano, mes)[1]
-        fecha_inicio = date(ano, mes, 1)
-        fecha_fin = date(ano, mes, ultimo_dia)
-        
-        # Para turnos nocturnos que cruzan medianoche (continuidad de mes)
-        if mes == 1:
-            fecha_busqueda_inicio = date(ano - 1, 12, 31)
-        else:
-            ultimo_dia_mes_anterior = calendar.monthrange(ano, mes - 1)[1]
-            fecha_busqueda_inicio = date(ano, mes - 1, ultimo_dia_mes_anterior)
-        
-        turnos = RegistroTurno.objects.filter(
-            operador__in=operadores,
-            fecha__range=[fecha_busqueda_inicio, fecha_fin]
-        ).select_related('tipo_turno')
-
-        
-        turnos_map = {}
-        for t in turnos:
-            if t.operador_id not in turnos_map:
-                turnos_map[t.operador_id] = {}
-            turnos_map[t.operador_id][t.fecha] = t
-
-        # 3. Calcular
-        calculadora = CalculadoraLegal()
-        datos_reporte = []
-        
-        gran_totales = {
-            'HOD': Decimal(0), 'RNO': Decimal(0),
-            'RDF': Decimal(0), 'RNF': Decimal(0),
-            'TOTAL': Decimal(0)
-        }
-        
-        for operador in operadores:
-            # Inicializar acumulador diario
-            acumulado_diario = {}
-            for d in range(1, ultimo_dia + 1):
-                f = date(ano, mes, d)
-                acumulado_diario[f] = {
-                    'HOD': Decimal(0), 'RNO': Decimal(0), 
-                    'RDF': Decimal(0), 'RNF': Decimal(0), 
-                    'TOTAL': Decimal(0)
-                }
-            
-            # Calcular horas reales
-            turnos_op = [t for t in turnos if t.operador_id == operador.id]
-            for turno in turnos_op:
-                if turno.tipo_turno:
-                    resultado = calculadora.calcular_horas_turno(turno)
-                    
-                    for fecha_res, horas_res in resultado.items():
-                        if fecha_inicio <= fecha_res <= fecha_fin:
-                            for k in ['HOD', 'RNO', 'RDF', 'RNF', 'TOTAL']:
-                                acumulado_diario[fecha_res][k] += horas_res.get(k, Decimal(0))
-            
-            # Estructurar reporte
-            info_operador = {
-                'nombre': operador.get_full_name() or operador.username,
-                'id': operador.id,
-                'dias': [],
-                'totales': {
-                    'HOD': Decimal(0), 'RNO': Decimal(0), 
-                    'RDF': Decimal(0), 'RNF': Decimal(0), 
-                    'TOTAL': Decimal(0)
-                }
-            }
-            
-            for dia in range(1, ultimo_dia + 1):
-                fecha_iter = date(ano, mes, dia)
-                turno_visual = turnos_map.get(operador.id, {}).get(fecha_iter)
-                
-                detalle_dia = {
-                    'fecha': fecha_iter,
-                    'dia_semana': fecha_iter.strftime('%A'),
-                    'turno': turno_visual.tipo_turno.codigo if (turno_visual and turno_visual.tipo_turno) else 'Descanso',
-                    'es_festivo': calculadora.es_festivo(fecha_iter) or fecha_iter.weekday() == 6,
-                    'horas': acumulado_diario.get(fecha_iter)
-                }
-                
-                info_operador['dias'].append(detalle_dia)
-                
-                for k in info_operador['totales']:
-                    info_operador['totales'][k] += detalle_dia['horas'][k]
-            
-            datos_reporte.append(info_operador)
-            
-            for k in gran_totales:
-                gran_totales[k] += info_operador['totales'][k]
+        # 2. Calcular (una consulta de turnos para todos los operadores)
+        reporte = construir_reporte_mensual(operadores, ano, mes)
         
-        # 4. Generar Excel
+        # 3. Generar Excel
         periodo_str = f"{calendar.month_name[mes]} {ano}"
-        return ExportadorReportes.generar_excel(datos_reporte, gran_totales, periodo_str)
+        return ExportadorReportes.generar_excel(reporte['datos'], reporte['totales_generales'], periodo_str)
 
 
     except Exception as e:
@@ -943,89 +629,10 @@ def reporte_preliminar(request):
     # Obtener operadores
     operadores = obtener_operadores_activos()
     
-    # Rango de fechas
-    ultimo_dia = calendar.monthrange(ano, mes)[1]
-    fecha_inicio = date(ano, mes, 1)
-    fecha_fin = date(ano, mes, ultimo_dia)
-    
-    # Para turnos nocturnos que cruzan medianoche (continuidad de mes)
-    if mes == 1:
-        fecha_busqueda_inicio = date(ano - 1, 12, 31)
-    else:
-        ultimo_dia_mes_anterior = calendar.monthrange(ano, mes - 1)[1]
-        fecha_busqueda_inicio = date(ano, mes - 1, ultimo_dia_mes_anterior)
+    reporte = construir_reporte_mensual(operadores, ano, mes)
     
-    # Obtener turnos
-    turnos = RegistroTurno.objects.filter(
-        fecha__range=(fecha_busqueda_inicio, fecha_fin),
-        operador__in=operadores
-    ).select_related('tipo_turno', 'operador')
-
-    
-    # Indexar turnos por operador y fecha
-    turnos_map = {}
-    for t in turnos:
-        if t.operador_id not in turnos_map:
-            turnos_map[t.operador_id] = {}
-        turnos_map[t.operador_id][t.fecha] = t
-        
-    calculadora = CalculadoraLegal()
-    datos_reporte = []
-    
-    for operador in operadores:
-        # Inicializar acumulador diario
-        acumulado_diario = {}
-        for d in range(1, ultimo_dia + 1):
-            f = date(ano, mes, d)
-            acumulado_diario[f] = {
-                'HOD': Decimal(0), 'RNO': Decimal(0), 
-                'RDF': Decimal(0), 'RNF': Decimal(0), 
-                'TOTAL': Decimal(0)
-            }
-        
-        # Calcular horas reales
-        turnos_op = [t for t in turnos if t.operador_id == operador.id]
-        for turno in turnos_op:
-            if turno.tipo_turno:
-                resultado = calculadora.calcular_horas_turno(turno)
-                
-                for fecha_res, horas_res in resultado.items():
-                    if fecha_inicio <= fecha_res <= fecha_fin:
-                        for k in ['HOD', 'RNO', 'RDF', 'RNF', 'TOTAL']:
-                            acumulado_diario[fecha_res][k] += horas_res.get(k, Decimal(0))
-        
-        info_operador = {
-            'nombre': operador.get_full_name() or operador.username,
-            'id': operador.id,
-            'dias': [],
-            'totales': {
-                'HOD': Decimal(0), 'RNO': Decimal(0), 
-                'RDF': Decimal(0), 'RNF': Decimal(0), 
-                'TOTAL': Decimal(0)
-            }
-        }
-        
-        for dia in range(1, ultimo_dia + 1):
-            fecha_iter = date(ano, mes, dia)
-            turno_visual = turnos_map.get(operador.id, {}).get(fecha_iter)
-            
-            detalle_dia = {
-                'fecha': fecha_iter,
-                'dia_semana': fecha_iter.strftime('%A'),
-                'turno': turno_visual.tipo_turno.codigo if (turno_visual and turno_visual.tipo_turno) else 'Descanso',
-                'horas': acumulado_diario.get(fecha_iter)
-            }
-            
-            for k in info_operador['totales']:
-                info_operador['totales'][k] += detalle_dia['horas'][k]
-            
-            info_operador['dias'].append(detalle_dia)
-            
-        datos_reporte.append(info_operador)
-
-        
     context = {
-        'datos': datos_reporte,
+        'datos': reporte['datos'],
         'mes': mes,
         'ano': ano,
         'meses': [
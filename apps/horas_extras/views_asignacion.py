@@ -6,9 +6,14 @@ from django.views.decorators.http import require_POST
 from django.utils.dateparse import parse_date
 from django.db import transaction
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from .models import RegistroTurno, TipoTurno, PatronOperador
+from .formato_compacto import compactar_eventos, es_formato_compacto
+from .patrones import LineaSeeds, vecindad_turno
+from .asignacion_masiva import MAX_ASIGNACIONES, asignar_turnos_masivo
+from .clasificacion_diaria import diferir_clasificacion
+from .recalculo_vecindad import recalcular_vecindad
 from apps.user_management.models import Role
 
 def es_administrador(user):
@@ -45,6 +50,7 @@ def obtener_eventos_calendario(request):
     """
     API para obtener los eventos (turnos) para el calendario.
     Recibe start y end (fechas) y opcionalmente update_id (operador).
+    Con ?formato=compacto responde en formato columnar (formato_compacto.py).
     """
     start_date = request.GET.get('start')
     end_date = request.GET.get('end')
@@ -57,18 +63,29 @@ def obtener_eventos_calendario(request):
     start = parse_date(start_date.split('T')[0])
     end = parse_date(end_date.split('T')[0])
     
-    query = RegistroTurno.objects.filter(fecha__range=[start, end])
+    query = RegistroTurno.objects.filter(fecha__range=[start, end]).select_related('tipo_turno', 'operador')
     
     if operador_id:
         query = query.filter(operador_id=operador_id)
+        operadores_clasificacion = [operador_id]
     else:
         # Si son muchos eventos, puede ser pesado.
         # Aquí filtramos solo operadores activos para no traer basura histórica si no es necesaria
         query = query.filter(operador__is_active=True)
+        operadores_clasificacion = User.objects.filter(is_active=True)
     
-    # Importar calculadora para obtener horas y festivos
+    # Horas desde la clasificación materializada (una consulta para todo el rango)
     from .calculos_legales import CalculadoraLegal
+    from .clasificacion_diaria import obtener_clasificacion
     calculadora = CalculadoraLegal()
+    clasificacion = obtener_clasificacion(start, end, operadores_clasificacion)
+    
+    # Turno esperado según el patrón, para marcar asignaciones fuera de patrón
+    turnos = list(query)
+    lineas = LineaSeeds.cargar({turno.operador_id for turno in turnos})
+    turnos_patron = {
+        operador_id: linea.turnos_rango(start, end) for operador_id, linea in lineas.items() if linea
+    }
         
     eventos = []
     colores_turno = {
@@ -79,7 +96,7 @@ def obtener_eventos_calendario(request):
         'apoyo': '#0d6efd',  # Azul (Primary) - Apoyo
     }
     
-    for turno in query:
+    for turno in turnos:
         # Determinar color basado en coincidencias parciales si no es exacto
         codigo_lower = turno.tipo_turno.codigo.lower()
         nombre_lower = turno.tipo_turno.nombre.lower()
@@ -105,14 +122,14 @@ def obtener_eventos_calendario(request):
         if 'descanso' in nombre_lower or 'd' in codigo_lower:
             color = colores_turno['descanso']
         
-        # Calcular horas para el tooltip
-        resultado_horas = calculadora.calcular_horas_turno(turno)
-        horas_del_dia = resultado_horas.get(turno.fecha, {
+        # Horas del día para el tooltip
+        fila = clasificacion.get(turno.operador_id, {}).get(turno.fecha)
+        horas_del_dia = fila.horas() if fila else {
             'HOD': 0, 'RNO': 0, 'RDF': 0, 'RNF': 0, 'TOTAL': 0
-        })
+        }
         
         # Verificar si es festivo
-        es_festivo = calculadora.es_festivo(turno.fecha) or turno.fecha.weekday() == 6
+        es_festivo = calculadora.es_dia_festivo(turno.fecha)
             
         eventos.append({
             'id': turno.id,
@@ -126,6 +143,7 @@ def obtener_eventos_calendario(request):
                 'tipo_turno_id': turno.tipo_turno_id,
                 'operador_nombre': turno.operador.get_full_name(),
                 'codigo_turno': turno.tipo_turno.codigo,
+                'codigo_patron': turnos_patron.get(turno.operador_id, {}).get(turno.fecha),
                 'es_festivo': es_festivo,
                 'horas': {
                     'HOD': float(horas_del_dia.get('HOD', 0)),
@@ -136,7 +154,9 @@ def obtener_eventos_calendario(request):
                 }
             }
         })
-        
+
+    if es_formato_compacto(request):
+        return JsonResponse(compactar_eventos(eventos, start), json_dumps_params={'separators': (',', ':')})
     return JsonResponse(eventos, safe=False)
 
 @login_required
@@ -173,18 +193,10 @@ def asignar_turno_api(request):
         # Determinar contexto para turno N (Vecindad)
         context_vecindad = None
         if tipo_turno.codigo == 'N':
-            cutoff = datetime.combine(fecha, datetime.min.time())
-            # Buscar turno ayer y mañana para validar vecindad
-            prev_reg = RegistroTurno.objects.filter(operador=operador, fecha=fecha - timedelta(days=1)).first()
-            next_reg = RegistroTurno.objects.filter(operador=operador, fecha=fecha + timedelta(days=1)).first()
-            
-            context_vecindad = {
-                'prev': prev_reg.tipo_turno.codigo if prev_reg else None,
-                'today': 'N',
-                'next': next_reg.tipo_turno.codigo if next_reg else None
-            }
+            # Turnos asignados ayer y mañana; sin asignar, el que indica el patrón
+            context_vecindad = vecindad_turno(operador, fecha, 'N')
             
-        ranges = GeneradorTurnosV4.obtener_rangos_horarios(tipo_turno.codigo, fecha, context_vecindad)
+        ranges = GeneradorTurnosV4.obtener_rangos_horarios(tipo_turno.codigo, fecha, context_vecindad=context_vecindad)
         
         hora_inicio_real = None
         hora_fin_real = None
@@ -194,8 +206,9 @@ def asignar_turno_api(request):
             hora_inicio_real = ranges[0]['inicio']
             hora_fin_real = ranges[-1]['fin']
             
-        # Operación atómica para evitar duplicados raciales
-        with transaction.atomic():
+        # Operación atómica para evitar duplicados raciales; la clasificación
+        # del día y de los vecinos recalculados se actualiza una vez al final
+        with diferir_clasificacion(), transaction.atomic():
             registro, created = RegistroTurno.objects.update_or_create(
                 operador=operador,
                 fecha=fecha,
@@ -210,15 +223,58 @@ def asignar_turno_api(request):
             )
             # Forzar el save para disparar la logica de horas_programadas en models.py
             registro.save()
+
+            # Turnos N de ayer y mañana cuya vecindad cambió
+            afectados = recalcular_vecindad([(operador.id, fecha)])
             
         return JsonResponse({
             'success': True, 
             'message': 'Turno asignado correctamente',
             'registro_id': registro.id,
-            'accion': 'creado' if created else 'actualizado'
+            'accion': 'creado' if created else 'actualizado',
+            'dias_afectados': [dia.isoformat() for _, dia in afectados]
         })
         
     except json.JSONDecodeError:
         return JsonResponse({'error': 'JSON inválido'}, status=400)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
+
+@login_required
+@user_passes_test(es_administrador)
+@require_POST
+def asignar_turnos_masivo_api(request):
+    """
+    API para asignar muchos turnos en una sola transacción.
+    Recibe JSON: {
+        "asignaciones": [
+            {"operador_id": 1, "fecha": "2026-01-27", "tipo_turno_id": 5},
+            ...
+        ],
+        "sobrescribir": true
+    }
+    Devuelve el resultado de cada asignación (ver asignacion_masiva.py).
+    """
+    try:
+        data = json.loads(request.body)
+        asignaciones = data.get('asignaciones')
+        sobrescribir = data.get('sobrescribir', True)
+
+        if not isinstance(asignaciones, list) or not asignaciones:
+            return JsonResponse({'error': 'Faltan asignaciones'}, status=400)
+        if len(asignaciones) > MAX_ASIGNACIONES:
+            return JsonResponse({'error': f'Máximo {MAX_ASIGNACIONES} asignaciones por petición'}, status=400)
+        if not all(isinstance(asignacion, dict) for asignacion in asignaciones):
+            return JsonResponse({'error': 'Cada asignación debe ser un objeto'}, status=400)
+
+        resultado = asignar_turnos_masivo(asignaciones, sobrescribir=bool(sobrescribir))
+        resultado['dias_afectados'] = [
+            {'operador_id': operador_id, 'fecha': fecha.isoformat()}
+            for operador_id, fecha in resultado['dias_afectados']
+        ]
+        return JsonResponse({'success': True, **resultado})
+
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'JSON inválido'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
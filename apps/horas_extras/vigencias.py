@@ -0,0 +1,100 @@
+# apps/horas_extras/vigencias.py
+"""
+Índice en memoria de las versiones de ParametroNormativo y PoliticaEmpresa.
+
+Carga todas las versiones de un modelo una vez por proceso (ordenadas por
+vigencia_desde) y resuelve la versión vigente de cualquier fecha con bisect,
+sin consultar la BD. Lo usan ParametroNormativo.obtener_vigente y
+PoliticaEmpresa.obtener_vigente, y a través de ellos motor_normativo,
+calculos_legales y utils.
+
+Invalidación:
+- Señales post_save/post_delete de ambos modelos (signals.py), de inmediato
+  y otra vez al confirmar la transacción.
+- TTL_SEGUNDOS como red de seguridad para cambios hechos desde otro proceso
+  (otro worker de IIS/gunicorn o Celery).
+
+Las instancias devueltas son compartidas: no se deben modificar.
+"""
+import bisect
+import threading
+import time
+
+from django.db import transaction
+
+# Recarga periódica aunque no llegue una señal (cambios de otros procesos)
+TTL_SEGUNDOS = 300
+
+
+class IndiceVigencias:
+    """Versiones de un modelo con vigencia_desde, resueltas por bisect"""
+
+    def __init__(self, modelo, ttl=TTL_SEGUNDOS):
+        self.modelo = modelo
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # (fechas, versiones, cargado_en): se reemplaza completo para lecturas sin lock
+        self._snapshot = None
+
+    def invalidar(self):
+        self._snapshot = None
+
+    def precargar(self, versiones):
+        """Instala versiones ya leídas (p. ej. en un proceso worker) sin consultar la BD"""
+        versiones = sorted(versiones, key=lambda v: v.vigencia_desde)
+        self._snapshot = ([v.vigencia_desde for v in versiones], versiones, time.monotonic())
+
+    def _cargar(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot[2] < self.ttl:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or time.monotonic() - snapshot[2] >= self.ttl:
+                versiones = list(self.modelo.objects.order_by('vigencia_desde'))
+                snapshot = ([v.vigencia_desde for v in versiones], versiones, time.monotonic())
+                self._snapshot = snapshot
+        return snapshot
+
+    def vigente(self, fecha):
+        """Versión con la mayor vigencia_desde <= fecha (None si no hay)"""
+        fechas, versiones, _ = self._cargar()
+        posicion = bisect.bisect_right(fechas, fecha)
+        return versiones[posicion - 1] if posicion else None
+
+    def versiones(self):
+        """Todas las versiones, de la más antigua a la más reciente"""
+        return list(self._cargar()[1])
+
+
+_indices = {}
+_indices_lock = threading.Lock()
+
+
+def indice(modelo):
+    """IndiceVigencias del proceso para el modelo"""
+    if modelo not in _indices:
+        with _indices_lock:
+            _indices.setdefault(modelo, IndiceVigencias(modelo))
+    return _indices[modelo]
+
+
+def vigente(modelo, fecha):
+    """Versión de modelo vigente en fecha"""
+    return indice(modelo).vigente(fecha)
+
+
+def invalidar_vigencias(modelo=None):
+    """
+    Descarta el índice de un modelo (o de todos) ahora y de nuevo al
+    confirmar la transacción en curso, para que otra petición no recargue
+    una versión anterior al commit.
+    """
+    def _invalidar():
+        for clave, indice_modelo in list(_indices.items()):
+            if modelo is None or clave is modelo:
+                indice_modelo.invalidar()
+
+    _invalidar()
+    transaction.on_commit(_invalidar)
@@ -0,0 +1,147 @@
+# apps/reportes/coalescencia.py
+"""
+Coalescencia ("single-flight") de ejecuciones idénticas concurrentes.
+
+Al cambio de turno varios operadores abren el mismo reporte con las mismas
+fechas por defecto en pocos segundos; sin coalescencia cada uno dispara el
+mismo procedimiento almacenado de varios segundos. ejecutar_una_vez()
+agrupa por huella (procedimiento o consulta + parámetros normalizados):
+
+- Entre hilos del proceso: el primer llamador (líder) ejecuta y los demás
+  esperan su resultado en un threading.Event.
+- Entre procesos, solo con un cache compartido (Redis, Memcached, BD): el
+  líder de cada proceso toma un candado con cache.add(); si otro proceso ya
+  lo tiene, espera leyendo el cache hasta que el resultado de esa ejecución
+  aparezca (clave con el token del candado, TTL corto). Con LocMemCache
+  este paso se omite: el cache no es visible entre procesos.
+
+No es un cache: el resultado solo se comparte con quienes llegaron mientras
+la ejecución estaba en curso. Si la espera supera 'espera_maxima' o la
+ejecución ajena termina sin resultado, el llamador ejecuta por su cuenta.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .config import COALESCENCIA_CONFIG
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'reportes:vuelo'
+
+# Backends cuyo contenido no se comparte entre procesos
+BACKENDS_LOCALES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+_lock = threading.Lock()
+_en_vuelo = {}
+
+
+class _Vuelo:
+    """Ejecución en curso dentro del proceso"""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+def construir_huella(tipo, texto, params=None):
+    """Huella de una ejecución: tipo ('sp', 'sql'), nombre o consulta y parámetros"""
+    firma = json.dumps([texto, params or []], default=str, sort_keys=True)
+    return f"{tipo}:{hashlib.md5(firma.encode('utf-8')).hexdigest()}"
+
+
+def _cache_compartido():
+    return settings.CACHES['default']['BACKEND'] not in BACKENDS_LOCALES
+
+
+def _ejecutar_entre_procesos(huella, funcion):
+    """Ejecuta funcion() o espera la ejecución de otro proceso con la misma huella"""
+    clave_candado = f'{CACHE_PREFIX}:candado:{huella}'
+    espera_maxima = COALESCENCIA_CONFIG['espera_maxima']
+    token = uuid.uuid4().hex
+
+    if cache.add(clave_candado, token, espera_maxima):
+        try:
+            resultado = funcion()
+            # Antes de soltar el candado: quien lo vea liberado encuentra el resultado
+            cache.set(f'{CACHE_PREFIX}:resultado:{huella}:{token}', resultado, COALESCENCIA_CONFIG['ttl_resultado'])
+            return resultado, False
+        finally:
+            if cache.get(clave_candado) == token:
+                cache.delete(clave_candado)
+
+    limite = time.monotonic() + espera_maxima
+    token_ajeno = cache.get(clave_candado)
+    while token_ajeno is not None and time.monotonic() < limite:
+        resultado = cache.get(f'{CACHE_PREFIX}:resultado:{huella}:{token_ajeno}')
+        if resultado is not None:
+            return resultado, True
+        actual = cache.get(clave_candado)
+        if actual is None:
+            # Liberado entre las dos lecturas: el resultado ya debe estar
+            resultado = cache.get(f'{CACHE_PREFIX}:resultado:{huella}:{token_ajeno}')
+            if resultado is not None:
+                return resultado, True
+        token_ajeno = actual
+        if token_ajeno is not None:
+            time.sleep(COALESCENCIA_CONFIG['intervalo_sondeo'])
+
+    logger.warning(f"Ejecución coalescida {huella} sin resultado compartido; se ejecuta localmente")
+    return funcion(), False
+
+
+def ejecutar_una_vez(huella, funcion):
+    """
+    Ejecuta funcion() una sola vez para todos los llamadores concurrentes con
+    la misma huella.
+
+    Args:
+        huella: Identificador de la ejecución (ver construir_huella)
+        funcion: Callable sin argumentos; su resultado debe ser serializable
+            si el cache es compartido
+
+    Returns:
+        tuple: (resultado, compartido) donde compartido indica si el
+            resultado vino de la ejecución de otro llamador. El mismo objeto
+            se entrega a todos: los llamadores deben copiarlo si lo modifican.
+    """
+    if not COALESCENCIA_CONFIG['habilitada']:
+        return funcion(), False
+
+    with _lock:
+        vuelo = _en_vuelo.get(huella)
+        lider = vuelo is None
+        if lider:
+            vuelo = _en_vuelo[huella] = _Vuelo()
+
+    if not lider:
+        if vuelo.evento.wait(COALESCENCIA_CONFIG['espera_maxima']):
+            if vuelo.error is not None:
+                raise vuelo.error
+            return vuelo.resultado, True
+        logger.warning(f"Tiempo de espera agotado para la ejecución coalescida {huella}")
+        return funcion(), False
+
+    try:
+        if _cache_compartido():
+            vuelo.resultado, compartido = _ejecutar_entre_procesos(huella, funcion)
+        else:
+            vuelo.resultado, compartido = funcion(), False
+        return vuelo.resultado, compartido
+    except Exception as e:
+        vuelo.error = e
+        raise
+    finally:
+        with _lock:
+            _en_vuelo.pop(huella, None)
+        vuelo.evento.set()
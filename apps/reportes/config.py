@@ -88,10 +88,9 @@ QUERIES = {
         SELECT 
             (SELECT COUNT(DISTINCT SERVIDOR) FROM BACKUPSGENERADOS WHERE SERVIDOR IS NOT NULL) as total_servidores,
             (SELECT COUNT(DISTINCT DatabaseName) FROM BACKUPSGENERADOS WHERE DatabaseName IS NOT NULL) as total_bases_datos,
-            (SELECT COUNT(*) FROM BACKUPSGENERADOS WHERE FECHA = CONVERT(varchar, GETDATE(), 103)) as backups_hoy,
+            (SELECT COUNT(*) FROM BACKUPSGENERADOS WHERE FECHA_HORA >= CONVERT(date, GETDATE())) as backups_hoy,
             (SELECT COUNT(*) FROM BACKUPSGENERADOS WHERE 
-                CONVERT(date, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2)) 
-                >= DATEADD(day, -7, GETDATE())
+                FECHA_HORA >= DATEADD(day, -7, CONVERT(date, GETDATE()))
             ) as backups_semana,
             (SELECT COUNT(*) FROM JOBSBACKUPGENERADOS WHERE 
                 FECHA_Y_HORA_INICIO >= DATEADD(day, -1, GETDATE()) AND 
@@ -119,15 +118,14 @@ QUERIES = {
                 ROW_NUMBER() OVER (
                     PARTITION BY SERVIDOR, DatabaseName, TYPE 
                     ORDER BY 
-                        CONVERT(date, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2)) DESC,
-                        CONVERT(time, HORA) DESC
+                        FECHA_HORA DESC
                 ) as rn,
                 DATEDIFF(hour, 
-                    CONVERT(datetime, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2) + ' ' + HORA), 
+                    FECHA_HORA, 
                     GETDATE()
                 ) as horas_desde_backup
             FROM BACKUPSGENERADOS
-            WHERE CONVERT(date, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2)) >= DATEADD(day, -30, GETDATE())
+            WHERE FECHA_HORA >= DATEADD(day, -30, CONVERT(date, GETDATE()))
                 AND SERVIDOR IS NOT NULL 
                 AND DatabaseName IS NOT NULL
         )
@@ -173,11 +171,10 @@ QUERIES = {
             END as tipo_descripcion,
             LEN(physical_device_name) as longitud_ruta
         FROM BACKUPSGENERADOS
-        WHERE CONVERT(date, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2)) >= DATEADD(day, -30, GETDATE())
+        WHERE FECHA_HORA >= DATEADD(day, -30, CONVERT(date, GETDATE()))
             AND physical_device_name IS NOT NULL
         ORDER BY 
-            CONVERT(date, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2)) DESC,
-            CONVERT(time, HORA) DESC
+            FECHA_HORA DESC
     """,
     
     'jobs_detallados': """
@@ -215,14 +212,14 @@ QUERIES = {
                 TYPE,
                 FECHA,
                 HORA,
+                FECHA_HORA,
                 ROW_NUMBER() OVER (
                     PARTITION BY SERVIDOR, DatabaseName
                     ORDER BY
-                        CONVERT(date, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2)) DESC,
-                        CONVERT(time, HORA) DESC
+                        FECHA_HORA DESC
                 ) as rn,
                 DATEDIFF(hour,
-                    CONVERT(datetime, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2) + ' ' + HORA),
+                    FECHA_HORA,
                     GETDATE()
                 ) as horas_transcurridas
             FROM BACKUPSGENERADOS
@@ -244,8 +241,7 @@ QUERIES = {
         FROM UltimosBackupsPorBD
         WHERE rn = 1
         ORDER BY
-            CONVERT(date, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2)) DESC,
-            CONVERT(time, HORA) DESC
+            FECHA_HORA DESC
     """,
 
     # === CONSULTAS ADICIONALES EXTRAÍDAS DE VIEWS.PY ===
@@ -259,8 +255,8 @@ QUERIES = {
             30 as TOTALPROGRAM,
             CAST((COUNT(*) * 100.0 / 30) AS DECIMAL(5,2)) as PORCENTAJE
         FROM BACKUPSGENERADOS bg
-        WHERE CONVERT(date, SUBSTRING(bg.FECHA,7,4) + '-' + SUBSTRING(bg.FECHA,4,2) + '-' + SUBSTRING(bg.FECHA,1,2))
-              BETWEEN CONVERT(date, %s) AND CONVERT(date, %s)
+        WHERE bg.FECHA_HORA >= CONVERT(date, %s)
+              AND bg.FECHA_HORA < DATEADD(day, 1, CONVERT(date, %s))
         GROUP BY bg.SERVIDOR, bg.DatabaseName, bg.IPSERVER
         ORDER BY bg.SERVIDOR, bg.DatabaseName
     """,
@@ -300,11 +296,10 @@ QUERIES = {
             END as tipo_descripcion,
             LEN(physical_device_name) as longitud_ruta
         FROM BACKUPSGENERADOS
-        WHERE CONVERT(date, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2)) >= DATEADD(day, -%s, GETDATE())
+        WHERE FECHA_HORA >= DATEADD(day, -%s, CONVERT(date, GETDATE()))
             AND physical_device_name IS NOT NULL
         ORDER BY
-            CONVERT(date, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2)) DESC,
-            CONVERT(time, HORA) DESC
+            FECHA_HORA DESC
     """,
 
     'estados_db_log': """
@@ -344,7 +339,7 @@ QUERIES = {
             bg.SERVIDOR as servidor,
             bg.IPSERVER as ip_servidor,
             COUNT(*) as total_backups,
-            MAX(CONVERT(date, SUBSTRING(bg.FECHA,7,4) + '-' + SUBSTRING(bg.FECHA,4,2) + '-' + SUBSTRING(bg.FECHA,1,2))) as ultimo_backup,
+            CONVERT(date, MAX(bg.FECHA_HORA)) as ultimo_backup,
             COUNT(DISTINCT bg.TYPE) as tipos_backup_count,
             STUFF((
                 SELECT DISTINCT ', ' + TYPE
@@ -394,19 +389,6 @@ QUERIES = {
         ORDER BY DatabaseName
     """,
 
-    'disk_growth_tendencia': """
-        SELECT
-            CONVERT(date, LogDate) as Fecha,
-            ServerIP,
-            DatabaseName,
-            MAX(FileSizeMB) as TamanoMB,
-            MIN(DiskFreeMB) as EspacioLibreMB
-        FROM DiskGrowthLog
-        WHERE LogDate >= DATEADD(day, -7, GETDATE())
-        GROUP BY CONVERT(date, LogDate), ServerIP, DatabaseName
-        ORDER BY Fecha DESC
-    """,
-
     'jobs_resultado_directo': """
         SELECT
             RESULTADO,
@@ -420,6 +402,85 @@ QUERIES = {
         FROM JOBSBACKUPGENERADOS
         WHERE CONVERT(date, FECHA_Y_HORA_INICIO) BETWEEN %s AND %s
         ORDER BY FECHA_Y_HORA_INICIO DESC
+    """,
+
+    # Consultas paginadas en SQL (sin ORDER BY: lo agrega ConsultaPaginada)
+    'jobs_resultado_paginado': """
+        SELECT
+            RESULTADO,
+            SERVIDOR,
+            IPSERVER,
+            CONVERT(varchar, FECHA_Y_HORA_INICIO, 103) as FECHA,
+            CONVERT(varchar, FECHA_Y_HORA_INICIO, 108) as HORA,
+            NOMBRE_DEL_JOB,
+            CAST(PASO as varchar) as PASO,
+            MENSAJE,
+            FECHA_Y_HORA_INICIO
+        FROM JOBSBACKUPGENERADOS
+        WHERE CONVERT(date, FECHA_Y_HORA_INICIO) BETWEEN %s AND %s
+    """,
+
+    'jobs_resultado_estadisticas': """
+        SELECT
+            COUNT(*) as total,
+            SUM(CASE WHEN RESULTADO LIKE %s THEN 1 ELSE 0 END) as exitosos,
+            SUM(CASE WHEN RESULTADO LIKE %s OR RESULTADO LIKE %s THEN 1 ELSE 0 END) as fallidos
+        FROM JOBSBACKUPGENERADOS
+        WHERE CONVERT(date, FECHA_Y_HORA_INICIO) BETWEEN %s AND %s
+    """,
+
+    'disk_growth_estadisticas': """
+        SELECT
+            COUNT(*) as total_registros,
+            SUM(FileSizeMB) as espacio_usado_mb,
+            SUM(DiskFreeMB) as espacio_libre_mb,
+            COUNT(DISTINCT ServerIP) as servidores,
+            COUNT(DISTINCT DatabaseName) as bases_datos,
+            SUM(CASE WHEN DiskFreeMB < 10240 THEN 1 ELSE 0 END) as discos_criticos,
+            SUM(CASE WHEN DiskFreeMB >= 10240 AND DiskFreeMB < 51200 THEN 1 ELSE 0 END) as discos_advertencia
+        FROM DiskGrowthLog
+        WHERE CONVERT(date, LogDate) BETWEEN %s AND %s
+    """,
+
+    # Canal de eventos del dashboard (eventos_dashboard.py)
+    # Clave (inicio, servidor, job, paso) del último job: marca inicial del canal de eventos
+    'jobs_ultima_clave': """
+        SELECT
+            FECHA_Y_HORA_INICIO,
+            COALESCE(SERVIDOR, '') as SERVIDOR,
+            COALESCE(NOMBRE_DEL_JOB, '') as NOMBRE_DEL_JOB,
+            COALESCE(PASO, 0) as PASO
+        FROM JOBSBACKUPGENERADOS
+        ORDER BY FECHA_Y_HORA_INICIO DESC, COALESCE(SERVIDOR, '') DESC,
+            COALESCE(NOMBRE_DEL_JOB, '') DESC, COALESCE(PASO, 0) DESC
+    """,
+
+    # Paginación por clave (inicio, servidor, job, paso): los pasos con la
+    # misma fecha que la marca se recorren por el resto de la clave. El
+    # límite por ciclo se agrega con utils.limitar_consulta
+    'jobs_fallidos_desde': """
+        SELECT
+            SERVIDOR,
+            IPSERVER,
+            NOMBRE_DEL_JOB,
+            PASO,
+            NOMBRE_DEL_PASO,
+            RESULTADO,
+            MENSAJE,
+            FECHA_Y_HORA_INICIO
+        FROM JOBSBACKUPGENERADOS
+        WHERE (
+                FECHA_Y_HORA_INICIO > %s
+                OR (FECHA_Y_HORA_INICIO = %s AND (
+                    COALESCE(SERVIDOR, '') > %s
+                    OR (COALESCE(SERVIDOR, '') = %s AND (
+                        COALESCE(NOMBRE_DEL_JOB, '') > %s
+                        OR (COALESCE(NOMBRE_DEL_JOB, '') = %s AND COALESCE(PASO, 0) > %s)
+                    ))
+                ))
+            )
+            AND (RESULTADO LIKE %s OR RESULTADO LIKE %s)
+        ORDER BY FECHA_Y_HORA_INICIO, COALESCE(SERVIDOR, ''), COALESCE(NOMBRE_DEL_JOB, ''), COALESCE(PASO, 0)
     """
 }
 
@@ -626,6 +687,13 @@ EXPORT_CONFIG = {
     'filename_pattern': 'SACSBD_{reporte}_{fecha}_{hora}'
 }
 
+# Exportaciones PDF/Excel en segundo plano (trabajos_exportacion.py)
+EXPORT_JOBS_CONFIG = {
+    'max_activos_por_usuario': 2,  # Trabajos pendientes/procesando simultáneos
+    'retencion_horas': 24,         # Tiempo que se conservan los archivos generados
+    'timeout_minutos': 30,         # Trabajos activos más antiguos se marcan como error
+}
+
 # Configuración de cacheo
 CACHE_CONFIG = {
     'dashboard_metrics': 300,      # 5 minutos
@@ -634,6 +702,75 @@ CACHE_CONFIG = {
     'backup_stats': 900           # 15 minutos
 }
 
+# Procedimientos cuyo resultado se cachea y la entrada de CACHE_CONFIG que
+# define su TTL. Los SP recolectores (sp_MonitorDatabaseStatus,
+# usp_MonitorDiskGrowth) escriben en tablas de log y NO deben cachearse.
+# sp_resultadoJobsBck tampoco: la página de jobs pagina en SQL
+# (QUERIES['jobs_resultado_paginado']) y su exportación lee por lotes la
+# misma consulta, así que ninguna de las dos pasaría por este cache.
+PROCEDURE_CACHE = {
+    'sp_Programaciondebcks': 'backup_stats',
+    'sp_ultimosbck': 'backup_stats',
+    'sp_genBak': 'backup_stats',
+}
+
+# Coalescencia de ejecuciones idénticas concurrentes (coalescencia.py)
+COALESCENCIA_CONFIG = {
+    'habilitada': True,
+    'espera_maxima': 120,       # Segundos que un llamador espera la ejecución en curso
+    'ttl_resultado': 30,        # Segundos que el resultado queda en el cache compartido para los que esperan
+    'intervalo_sondeo': 0.2,    # Segundos entre lecturas del cache compartido
+}
+
+# Snapshot de sp_DashboardMetrics refrescado en segundo plano (snapshot_dashboard.py)
+DASHBOARD_SNAPSHOT_CONFIG = {
+    'intervalo': 300,           # Segundos entre refrescos (tarea beat o refrescar_dashboard)
+    'max_antiguedad': 900,      # Más antiguo que esto: lo refresca la propia solicitud
+    'refresco_en_solicitud': True,  # Respaldo en proceso si no corre ningún refrescador
+}
+
+# Canal de eventos (SSE) del dashboard (eventos_dashboard.py)
+EVENTOS_DASHBOARD_CONFIG = {
+    'intervalo_sondeo': 15,     # Segundos entre consultas del sondeador compartido
+    'latido': 20,               # Segundos sin eventos antes de enviar un comentario keep-alive
+    'duracion_maxima': 600,     # Segundos por conexión; el navegador reconecta solo
+    'reintento_ms': 10000,      # Espera de reconexión sugerida al EventSource
+    'max_pendientes': 100,      # Eventos en cola por suscriptor (se descartan los más viejos)
+    'max_jobs_por_ciclo': 50,   # Jobs fallidos leídos por consulta
+}
+
+# Recolección incremental desde msdb (recoleccion_msdb.py). Los servidores
+# se definen en settings.SERVIDORES_MONITOREADOS
+RECOLECCION_MSDB_CONFIG = {
+    'tamano_lote': 1000,          # Filas de msdb por lote (una transacción por lote)
+    'max_lotes_por_corrida': 50,  # Tope por servidor y origen en cada corrida
+    'dias_iniciales': 30,         # Sin marca de agua, historia a traer en la primera corrida
+    'patron_jobs': '%Backup%',    # LIKE sobre sysjobs.name; None = todos los jobs
+}
+
+# Procedimientos recolectores que escriben en tablas de log (recolectores.py).
+# Solo se ejecutan si su última ejecución exitosa tiene más de 'max_antiguedad'
+# segundos; tras un error se espera RECOLECTORES_ESPERA_TRAS_ERROR antes de reintentar.
+RECOLECTORES_CONFIG = {
+    'sp_MonitorDatabaseStatus': {'max_antiguedad': 900},   # DatabaseStatusLog
+    'usp_MonitorDatabaseStatus': {'max_antiguedad': 900},  # DatabaseStatusLog (user_management)
+    'usp_MonitorDiskGrowth': {'max_antiguedad': 3600},     # DiskGrowthLog
+}
+RECOLECTORES_ESPERA_TRAS_ERROR = 60
+# Segundos tras los que una ejecución sin terminar se da por abandonada
+RECOLECTORES_TIEMPO_MAXIMO = 1800
+
+# Resúmenes diarios/semanales de DiskGrowthLog y series del gráfico de
+# crecimiento de discos (resumen_discos.py)
+RESUMEN_DISCOS_CONFIG = {
+    'tamano_lote': 5000,          # Filas de DiskGrowthLog por lote (una transacción por lote)
+    'max_lotes_por_corrida': 100,
+    'dias_maximos_crudo': 7,      # Rangos de hasta N días se grafican desde DiskGrowthLog
+    'dias_maximos_diario': 180,   # Hasta N días desde el resumen diario; más, el semanal
+    'puntos_grafico': 200,        # Puntos por serie tras el muestreo (LTTB)
+    'max_series': 10,             # Archivos graficados (los de mayor tamaño)
+}
+
 # Configuración de monitoreo y alertas
 MONITORING_CONFIG = {
     'check_interval_minutes': 15,
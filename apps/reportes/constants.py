@@ -163,6 +163,7 @@ class CSVConfig:
     DELIMITER = ';'                 # Delimitador para mejor compatibilidad con Excel
     ENCODING = 'utf-8'              # Encoding
     BOM = '\ufeff'                  # BOM para que Excel reconozca UTF-8
+    MARCA_ERROR = 'ERROR: exportación incompleta - {error}'  # Última fila si la lectura falla a mitad
 
 
 class DefaultDates:
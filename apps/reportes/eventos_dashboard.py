@@ -0,0 +1,192 @@
+# apps/reportes/eventos_dashboard.py
+"""
+Canal de eventos en tiempo real (Server-Sent Events) del dashboard.
+
+Las plantillas del dashboard consultaban api_dashboard_metrics cada 5
+minutos por pestaña y los jobs fallidos en JOBSBACKUPGENERADOS recién se
+veían en la siguiente consulta. Ahora cada pestaña abre un EventSource
+contra api_eventos_dashboard y recibe:
+
+- 'metricas': {'generado', 'cambios'} solo con las métricas que cambiaron
+  (la primera vez, todas).
+- 'job_fallido': cada job fallido nuevo.
+
+Un único sondeador por proceso (CanalEventos) consulta la BD cada
+'intervalo_sondeo' segundos en nombre de todos los suscriptores y reparte
+los eventos a sus colas asyncio: una conexión ociosa solo ocupa una cola,
+sin hilo ni consultas propias. El sondeador arranca con el primer
+suscriptor y se detiene al irse el último. Las métricas salen del snapshot
+de snapshot_dashboard (sin ejecutar el SP por ciclo) y los jobs de una
+consulta incremental paginada por su clave (inicio, servidor, job, paso):
+aunque más de 'max_jobs_por_ciclo' pasos fallen con la misma hora, cada
+ciclo avanza la marca.
+
+Requiere el punto de entrada ASGI (sacsbd_project/asgi.py): bajo WSGI cada
+conexión retendría un hilo del servidor, así que la vista responde 204 y
+las plantillas siguen consultando la API.
+"""
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+
+from .config import EVENTOS_DASHBOARD_CONFIG, QUERIES
+from .snapshot_dashboard import metricas_api, obtener_snapshot
+from .utils import ejecutar_consulta_personalizada, limitar_consulta
+
+logger = logging.getLogger(__name__)
+
+PATRONES_FALLIDO = ['%Fallido%', '%Error%']
+
+
+def formatear_evento(nombre, datos):
+    """Evento en formato text/event-stream"""
+    return f"event: {nombre}\ndata: {json.dumps(datos, cls=DjangoJSONEncoder)}\n\n"
+
+
+def _clave_job(fila):
+    # Mismo orden y COALESCE que ORDER BY de QUERIES['jobs_fallidos_desde']
+    return (fila['FECHA_Y_HORA_INICIO'], fila['SERVIDOR'] or '', fila['NOMBRE_DEL_JOB'] or '', fila['PASO'] or 0)
+
+
+class CanalEventos:
+    """Sondeador compartido y sus suscriptores dentro del proceso"""
+
+    def __init__(self):
+        self._suscriptores = set()
+        self._tarea = None
+        self._metricas = None
+        self._generado = None
+        self._marca = None      # Clave (inicio, servidor, job, paso) del último job visto
+
+    @property
+    def suscriptores(self):
+        return len(self._suscriptores)
+
+    def suscribir(self):
+        """Registra un suscriptor y arranca el sondeador si no está corriendo"""
+        cola = asyncio.Queue(maxsize=EVENTOS_DASHBOARD_CONFIG['max_pendientes'])
+        self._suscriptores.add(cola)
+        loop = asyncio.get_running_loop()
+        # Una tarea de otro loop (ya cerrado) nunca termina: se reemplaza
+        if self._tarea is None or self._tarea.done() or self._tarea.get_loop() is not loop:
+            self._tarea = loop.create_task(self._sondear())
+        return cola
+
+    def cancelar(self, cola):
+        self._suscriptores.discard(cola)
+
+    def estado_inicial(self):
+        """Métricas completas para un suscriptor nuevo (None antes del primer ciclo)"""
+        if self._metricas is None:
+            return None
+        return ('metricas', {'generado': self._generado, 'cambios': dict(self._metricas)})
+
+    def publicar(self, evento):
+        """Encola el evento para todos; a un suscriptor lento se le descarta el más viejo"""
+        for cola in list(self._suscriptores):
+            if cola.full():
+                cola.get_nowait()
+            cola.put_nowait(evento)
+
+    async def _sondear(self):
+        # Al quedarse sin suscriptores la tarea termina sin ceder el control,
+        # así suscribir() ve done() y arranca otra
+        while self._suscriptores:
+            try:
+                eventos = await sync_to_async(self.consultar, thread_sensitive=False)()
+            except Exception as e:
+                logger.error(f"Error en el sondeador de eventos del dashboard: {e}")
+                eventos = []
+            for evento in eventos:
+                self.publicar(evento)
+            await asyncio.sleep(EVENTOS_DASHBOARD_CONFIG['intervalo_sondeo'])
+
+    def consultar(self):
+        """Un ciclo del sondeador: devuelve los eventos nuevos [(nombre, datos)]"""
+        close_old_connections()
+        try:
+            return self._eventos_metricas() + self._eventos_jobs()
+        finally:
+            close_old_connections()
+
+    def _eventos_metricas(self):
+        snapshot = obtener_snapshot()
+        if snapshot is None:
+            return []
+        metricas = metricas_api(snapshot)
+        anteriores = self._metricas or {}
+        cambios = {clave: valor for clave, valor in metricas.items() if anteriores.get(clave) != valor}
+        self._metricas, self._generado = metricas, snapshot['generado']
+        if not cambios:
+            return []
+        return [('metricas', {'generado': self._generado, 'cambios': cambios})]
+
+    def _eventos_jobs(self):
+        if self._marca is None:
+            # Solo se publican los jobs posteriores al arranque
+            filas = ejecutar_consulta_personalizada(limitar_consulta(QUERIES['jobs_ultima_clave'], 1))
+            ultima = filas[0] if filas and filas[0]['FECHA_Y_HORA_INICIO'] else None
+            self._marca = _clave_job(ultima) if ultima else (datetime.now(), '', '', 0)
+            return []
+
+        fecha, servidor, job, paso = self._marca
+        consulta = limitar_consulta(QUERIES['jobs_fallidos_desde'], EVENTOS_DASHBOARD_CONFIG['max_jobs_por_ciclo'])
+        filas = ejecutar_consulta_personalizada(consulta, [
+            fecha, fecha, servidor, servidor, job, job, paso, *PATRONES_FALLIDO
+        ])
+        if filas:
+            self._marca = _clave_job(filas[-1])
+
+        return [('job_fallido', {
+            'servidor': fila['SERVIDOR'],
+            'ipserver': fila['IPSERVER'],
+            'job': fila['NOMBRE_DEL_JOB'],
+            'paso': fila['PASO'],
+            'nombre_paso': fila['NOMBRE_DEL_PASO'],
+            'resultado': fila['RESULTADO'],
+            'mensaje': fila['MENSAJE'],
+            'fecha': fila['FECHA_Y_HORA_INICIO'],
+        }) for fila in filas]
+
+
+canal = CanalEventos()
+
+
+async def flujo_eventos(canal_eventos=None):
+    """
+    Generador asíncrono del cuerpo text/event-stream de una conexión.
+
+    Termina tras 'duracion_maxima' segundos (el EventSource reconecta tras
+    'reintento_ms'): así se liberan las conexiones que el servidor no
+    detecta como cerradas.
+    """
+    canal_eventos = canal_eventos or canal
+    cola = canal_eventos.suscribir()
+    limite = time.monotonic() + EVENTOS_DASHBOARD_CONFIG['duracion_maxima']
+    try:
+        yield f"retry: {EVENTOS_DASHBOARD_CONFIG['reintento_ms']}\n\n"
+        inicial = canal_eventos.estado_inicial()
+        if inicial:
+            yield formatear_evento(*inicial)
+
+        while True:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                nombre, datos = await asyncio.wait_for(
+                    cola.get(), min(EVENTOS_DASHBOARD_CONFIG['latido'], restante)
+                )
+            except asyncio.TimeoutError:
+                # Comentario keep-alive para proxies (IIS, nginx)
+                yield ': latido\n\n'
+                continue
+            yield formatear_evento(nombre, datos)
+    finally:
+        canal_eventos.cancelar(cola)
@@ -0,0 +1,551 @@
+# apps/reportes/exportaciones.py
+"""
+Generadores de exportaciones PDF/Excel de reportes SACSBD.
+
+Cada generador recibe parámetros ya normalizados y escribe el archivo en un
+destino tipo archivo (HttpResponse, BytesIO o archivo en disco), de modo que
+la misma lógica sirve para la descarga directa y para los trabajos de
+exportación en segundo plano.
+"""
+import itertools
+import logging
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+# Para exportación Excel
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.formatting.rule import FormulaRule
+    from openpyxl.styles import Font, PatternFill, Border, Side, Alignment, NamedStyle
+    from openpyxl.utils import get_column_letter
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+from .recolectores import refrescar_si_vencido
+from .utils import consulta_jobs_backup, iterar_consulta, iterar_procedimiento_almacenado
+from .data_converters import add_cumplimiento_format
+from .constants import (
+    ExportHeaders,
+    ExportFileNames,
+    SheetNames,
+    ReportTitles,
+    ExcelStyles
+)
+
+logger = logging.getLogger(__name__)
+
+# Tipos de contenido por formato de exportación
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+# =============================================================================
+# ESCRITURA DE EXCEL CON FORMATO PROFESIONAL
+# =============================================================================
+
+# Filas usadas para estimar el ancho de columnas antes de empezar a escribir
+# (en modo write_only los anchos deben declararse antes de la primera fila)
+EXCEL_FILAS_MUESTRA_ANCHO = 200
+
+
+def _registrar_estilos_excel(wb):
+    """
+    Registra los estilos con nombre del reporte. Las celdas referencian el
+    estilo por nombre en lugar de crear objetos Font/Fill/Border propios.
+    """
+    header_side = Side(style='thin', color='000000')
+
+    estilos = [
+        NamedStyle(
+            name='sacsbd_titulo',
+            font=Font(bold=True, size=ExcelStyles.TITLE_FONT_SIZE, color=ExcelStyles.TITLE_COLOR),
+            alignment=Alignment(horizontal='left', vertical='center')
+        ),
+        NamedStyle(
+            name='sacsbd_fecha',
+            font=Font(italic=True, size=ExcelStyles.DATE_FONT_SIZE, color=ExcelStyles.DATE_COLOR)
+        ),
+        NamedStyle(
+            name='sacsbd_header',
+            font=Font(bold=True, color=ExcelStyles.HEADER_FONT_COLOR, size=ExcelStyles.HEADER_FONT_SIZE),
+            fill=PatternFill(start_color=ExcelStyles.HEADER_BG_COLOR, end_color=ExcelStyles.HEADER_BG_COLOR, fill_type='solid'),
+            alignment=Alignment(horizontal='center', vertical='center', wrap_text=True),
+            border=Border(left=header_side, right=header_side, top=header_side, bottom=header_side)
+        ),
+    ]
+    for estilo in estilos:
+        wb.add_named_style(estilo)
+
+
+def _reglas_filas_alternas(start_row):
+    """
+    Reglas de formato condicional para bordes y colores alternos de fila.
+    Una regla por paridad cubre todo el rango de datos.
+    """
+    thin_side = Side(style='thin', color='CCCCCC')
+    borde = Border(left=thin_side, right=thin_side, top=thin_side, bottom=thin_side)
+    reglas = []
+    for paridad, color in ((0, ExcelStyles.EVEN_ROW_COLOR), (1, ExcelStyles.ODD_ROW_COLOR)):
+        reglas.append(FormulaRule(
+            formula=[f'MOD(ROW()-{start_row},2)={paridad}'],
+            fill=PatternFill(start_color=color, end_color=color, fill_type='solid'),
+            border=borde
+        ))
+    return reglas
+
+
+def escribir_excel(destino, data, headers, title=None, sheet_name='Datos'):
+    """
+    Escribe un archivo Excel con formato profesional en `destino`.
+
+    Usa el modo write_only de openpyxl: las filas se escriben en streaming a
+    un archivo temporal como valores planos, con estilos con nombre para
+    título/encabezados y formato condicional para las filas alternas, por lo
+    que la memoria no crece con el número de filas. El ancho de columnas se
+    estima con los encabezados y las primeras EXCEL_FILAS_MUESTRA_ANCHO
+    filas, en la misma pasada de escritura.
+
+    Args:
+        destino: Objeto tipo archivo (HttpResponse, BytesIO, archivo abierto en 'wb')
+        data: Iterable de diccionarios con los datos
+        headers: Lista de tuplas (key, label)
+        title: Título del reporte (opcional)
+        sheet_name: Nombre de la hoja
+    """
+    wb = Workbook(write_only=True)
+    _registrar_estilos_excel(wb)
+    ws = wb.create_sheet(title=sheet_name)
+
+    header_keys = [h[0] for h in headers]
+    header_labels = [h[1] for h in headers]
+
+    # Muestra inicial para estimar anchos (el resto de filas se escribe sin retenerse)
+    filas = iter(data)
+    muestra = []
+    for row_data in filas:
+        muestra.append(row_data)
+        if len(muestra) >= EXCEL_FILAS_MUESTRA_ANCHO:
+            break
+
+    anchos = [len(str(label)) for label in header_labels]
+    for row_data in muestra:
+        if isinstance(row_data, dict):
+            for col_idx, key in enumerate(header_keys):
+                value = row_data.get(key)
+                if value:
+                    anchos[col_idx] = max(anchos[col_idx], len(str(value)))
+
+    for col_idx, ancho in enumerate(anchos, 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(ancho + 3, ExcelStyles.MAX_COLUMN_WIDTH)
+
+    start_row = 4 if title else 1
+
+    # Congelar encabezados (en write_only debe definirse antes de la primera fila)
+    ws.freeze_panes = f'A{start_row + 1}'
+
+    # Agregar título si existe
+    if title:
+        title_cell = WriteOnlyCell(ws, value=title)
+        title_cell.style = 'sacsbd_titulo'
+        date_cell = WriteOnlyCell(ws, value=f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+        date_cell.style = 'sacsbd_fecha'
+        ws.append([title_cell])
+        ws.append([date_cell])
+        ws.append([])
+
+    # Escribir encabezados
+    header_row = []
+    for label in header_labels:
+        cell = WriteOnlyCell(ws, value=label)
+        cell.style = 'sacsbd_header'
+        header_row.append(cell)
+    ws.append(header_row)
+
+    # Escribir datos como valores planos (sin objeto de estilo por celda)
+    total_filas = 0
+    for row_data in itertools.chain(muestra, filas):
+        if isinstance(row_data, dict):
+            ws.append([row_data.get(key, '') for key in header_keys])
+        else:
+            ws.append([''] * len(header_keys))
+        total_filas += 1
+
+    # Bordes y colores alternos de fila con formato condicional en lugar de
+    # un estilo por celda
+    if total_filas:
+        rango = f'A{start_row + 1}:{get_column_letter(len(header_keys))}{start_row + total_filas}'
+        for regla in _reglas_filas_alternas(start_row):
+            ws.conditional_formatting.add(rango, regla)
+
+    wb.save(destino)
+
+
+# =============================================================================
+# PARÁMETROS DE EXPORTACIÓN
+# =============================================================================
+
+def _fecha_param(valor, default):
+    """Valida una fecha YYYY-MM-DD recibida por GET/POST o usa el valor por defecto"""
+    if valor:
+        return datetime.strptime(valor, '%Y-%m-%d').strftime('%Y-%m-%d')
+    return default
+
+
+def _parametros_cumplimiento(datos):
+    return {
+        'fecha_inicio': _fecha_param(datos.get('fecha'), datetime.now().replace(day=1).strftime('%Y-%m-%d')),
+        'fecha_fin': _fecha_param(datos.get('fecha1'), (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')),
+    }
+
+
+def _parametros_jobs(datos):
+    return {
+        'fecha_inicio': _fecha_param(datos.get('fecha_inicio'), (timezone.now() - timedelta(days=30)).strftime('%Y-%m-%d')),
+        'fecha_fin': _fecha_param(datos.get('fecha_fin'), timezone.now().strftime('%Y-%m-%d')),
+        'servidor': datos.get('servidor', ''),
+        'resultado': datos.get('resultado', ''),
+    }
+
+
+def _parametros_estados(datos):
+    return {
+        'servidor': datos.get('servidor', ''),
+        'estado': datos.get('estado', ''),
+    }
+
+
+def _parametros_disk_growth(datos):
+    return {
+        'fecha_inicio': _fecha_param(datos.get('fecha_inicio'), (timezone.now() - timedelta(days=30)).strftime('%Y-%m-%d')),
+        'fecha_fin': _fecha_param(datos.get('fecha_fin'), timezone.now().strftime('%Y-%m-%d')),
+        'servidor': datos.get('servidor', ''),
+        'base_datos': datos.get('base_datos', ''),
+    }
+
+
+# =============================================================================
+# OBTENCIÓN DE DATOS
+# =============================================================================
+# Los PDF necesitan todas las filas (estadísticas y tabla de reportlab), por
+# lo que usan las funciones _datos_*. Los Excel recorren la misma consulta sin
+# materializar el resultado. Ambos leen con iterar_consulta /
+# iterar_procedimiento_almacenado, que propagan los errores: un fallo de
+# lectura marca el trabajo como fallido (procesar_exportacion) en lugar de
+# generar un archivo vacío o incompleto.
+
+def _filas_cumplimiento(parametros, use_cache=True):
+    return iterar_procedimiento_almacenado(
+        'sp_Programaciondebcks',
+        [parametros['fecha_inicio'], parametros['fecha_fin']],
+        use_cache=use_cache
+    )
+
+
+def _datos_cumplimiento(parametros, use_cache=True):
+    return list(_filas_cumplimiento(parametros, use_cache))
+
+
+def _consulta_jobs(parametros):
+    # Misma consulta y filtros (en SQL) que la página jobs_backup_view
+    return consulta_jobs_backup(
+        parametros['fecha_inicio'], parametros['fecha_fin'],
+        parametros.get('servidor', ''), parametros.get('resultado', '')
+    )
+
+
+def _datos_jobs(parametros):
+    return list(iterar_consulta(*_consulta_jobs(parametros)))
+
+
+def _consulta_estados(parametros):
+    # Actualizar DatabaseStatusLog solo si está vencido (recolectores.py)
+    refrescar_si_vencido('sp_MonitorDatabaseStatus')
+
+    query = """
+        SELECT
+            ServerName as SERVIDOR,
+            DatabaseName as DATABASE_NAME,
+            LastLogDate as FECHA_DE_CREACION,
+            StateDesc as ESTADO,
+            [State] as TIPO_ESTADO,
+            ServerIP as IPSERVER
+        FROM dbo.DatabaseStatusLog
+        WHERE 1=1
+    """
+    params = []
+
+    if parametros.get('servidor'):
+        query += " AND ServerName LIKE %s"
+        params.append(f"%{parametros['servidor']}%")
+    if parametros.get('estado'):
+        query += " AND StateDesc LIKE %s"
+        params.append(f"%{parametros['estado']}%")
+
+    query += " ORDER BY LastLogDate DESC, ServerName, DatabaseName"
+    return query, params
+
+
+def _datos_estados(parametros):
+    return list(iterar_consulta(*_consulta_estados(parametros)))
+
+
+def _consulta_disk_growth(parametros, columna_estado):
+    """
+    Consulta DiskGrowthLog. `columna_estado` es la expresión CASE del estado
+    del disco (clase CSS para PDF, texto para Excel).
+    """
+    query = f"""
+        SELECT
+            LogID,
+            ServerIP,
+            DatabaseName,
+            FileName,
+            FilePath,
+            FileSizeMB,
+            DiskFreeMB,
+            LogDate,
+            CAST((DiskFreeMB * 100.0 / (FileSizeMB + DiskFreeMB)) AS DECIMAL(5,2)) as PorcentajeLibre,
+            {columna_estado}
+        FROM DiskGrowthLog
+        WHERE CONVERT(date, LogDate) BETWEEN %s AND %s
+    """
+
+    params = [parametros['fecha_inicio'], parametros['fecha_fin']]
+
+    if parametros.get('servidor'):
+        query += " AND ServerIP LIKE %s"
+        params.append(f"%{parametros['servidor']}%")
+    if parametros.get('base_datos'):
+        query += " AND DatabaseName LIKE %s"
+        params.append(f"%{parametros['base_datos']}%")
+
+    query += " ORDER BY LogDate DESC, ServerIP, DatabaseName, FileName"
+    return query, params
+
+
+def _datos_disk_growth(parametros, columna_estado):
+    return list(iterar_consulta(*_consulta_disk_growth(parametros, columna_estado)))
+
+
+# =============================================================================
+# GENERADORES PDF
+# =============================================================================
+
+def _pdf_cumplimiento(parametros, destino, use_cache=True):
+    from .pdf_generator import generate_cumplimiento_pdf
+
+    fecha_inicio, fecha_fin = parametros['fecha_inicio'], parametros['fecha_fin']
+    resultados = _datos_cumplimiento(parametros, use_cache)
+
+    total_ejecutadas = sum(int(r.get('TOTAL', 0)) for r in resultados)
+    total_programadas = sum(int(r.get('TOTALPROGRAM', 0)) for r in resultados)
+    estadisticas = {
+        'total_registros': len(resultados),
+        'total_ejecutadas': total_ejecutadas,
+        'total_programadas': total_programadas,
+        'promedio_cumplimiento': (total_ejecutadas / total_programadas * 100) if total_programadas > 0 else 0
+    }
+
+    pdf_buffer = generate_cumplimiento_pdf(resultados, estadisticas, fecha_inicio, fecha_fin)
+    destino.write(pdf_buffer.getvalue())
+    return ExportFileNames.cumplimiento(fecha_inicio, fecha_fin, 'pdf')
+
+
+def _pdf_jobs(parametros, destino):
+    from .pdf_generator import generate_jobs_pdf
+
+    resultados = _datos_jobs(parametros)
+
+    total = len(resultados)
+    exitosos = len([r for r in resultados if 'exitoso' in r.get('RESULTADO', '').lower()])
+    fallidos = len([r for r in resultados if 'fallido' in r.get('RESULTADO', '').lower() or 'error' in r.get('RESULTADO', '').lower()])
+    stats = {
+        'total': total,
+        'exitosos': exitosos,
+        'fallidos': fallidos,
+        'porcentaje_exito': (exitosos / total * 100) if total > 0 else 0
+    }
+
+    pdf_buffer = generate_jobs_pdf(resultados, stats, parametros['fecha_inicio'], parametros['fecha_fin'])
+    destino.write(pdf_buffer.getvalue())
+    return ExportFileNames.jobs(parametros['fecha_inicio'], parametros['fecha_fin'], 'pdf')
+
+
+def _pdf_estados(parametros, destino):
+    from .pdf_generator import generate_estados_pdf
+
+    resultados = _datos_estados(parametros)
+
+    total = len(resultados)
+    online = len([r for r in resultados if r.get('ESTADO', '').upper() == 'ONLINE'])
+    stats = {
+        'total': total,
+        'online': online,
+        'otros': total - online,
+        'servidores': len(set(r.get('SERVIDOR', '') for r in resultados if r.get('SERVIDOR')))
+    }
+
+    pdf_buffer = generate_estados_pdf(resultados, stats)
+    destino.write(pdf_buffer.getvalue())
+    return f"estados_bd_{datetime.now().strftime('%Y-%m-%d')}.pdf"
+
+
+def _pdf_disk_growth(parametros, destino):
+    from .pdf_generator import generate_disk_growth_pdf
+
+    resultados = _datos_disk_growth(parametros, """CASE
+                    WHEN DiskFreeMB < 10240 THEN 'danger'
+                    WHEN DiskFreeMB < 51200 THEN 'warning'
+                    ELSE 'success'
+                END as status_class""")
+
+    if resultados:
+        espacio_total_usado = sum(float(r.get('FileSizeMB', 0)) for r in resultados)
+        espacio_total_libre = sum(float(r.get('DiskFreeMB', 0)) for r in resultados)
+        estadisticas = {
+            'total_registros': len(resultados),
+            'espacio_usado_gb': round(espacio_total_usado / 1024, 2),
+            'espacio_libre_gb': round(espacio_total_libre / 1024, 2),
+            'discos_criticos': len([r for r in resultados if r.get('status_class') == 'danger']),
+            'discos_advertencia': len([r for r in resultados if r.get('status_class') == 'warning'])
+        }
+    else:
+        estadisticas = {
+            'total_registros': 0,
+            'espacio_usado_gb': 0,
+            'espacio_libre_gb': 0,
+            'discos_criticos': 0,
+            'discos_advertencia': 0
+        }
+
+    pdf_buffer = generate_disk_growth_pdf(resultados, estadisticas, parametros['fecha_inicio'], parametros['fecha_fin'])
+    destino.write(pdf_buffer.getvalue())
+    return ExportFileNames.disk_growth(parametros['fecha_inicio'], parametros['fecha_fin'], 'pdf')
+
+
+# =============================================================================
+# GENERADORES EXCEL
+# =============================================================================
+
+def _excel_cumplimiento(parametros, destino, use_cache=True):
+    resultados = (add_cumplimiento_format(r) for r in _filas_cumplimiento(parametros, use_cache))
+    title = f"{ReportTitles.CUMPLIMIENTO} ({parametros['fecha_inicio']} - {parametros['fecha_fin']})"
+    escribir_excel(destino, resultados, ExportHeaders.CUMPLIMIENTO, title=title, sheet_name=SheetNames.CUMPLIMIENTO)
+    return ExportFileNames.timestamped('cumplimiento_backup', 'xlsx')
+
+
+def _excel_jobs(parametros, destino):
+    resultados = iterar_consulta(*_consulta_jobs(parametros))
+    title = f"{ReportTitles.JOBS} ({parametros['fecha_inicio']} - {parametros['fecha_fin']})"
+    escribir_excel(destino, resultados, ExportHeaders.JOBS, title=title, sheet_name=SheetNames.JOBS)
+    return ExportFileNames.timestamped('jobs_backup', 'xlsx')
+
+
+def _formato_excel_estado(r):
+    if r.get('FECHA_DE_CREACION') and hasattr(r['FECHA_DE_CREACION'], 'strftime'):
+        r['FECHA_DE_CREACION'] = r['FECHA_DE_CREACION'].strftime('%Y-%m-%d %H:%M:%S')
+    return r
+
+
+def _excel_estados(parametros, destino):
+    filas = iterar_consulta(*_consulta_estados(parametros))
+    resultados = (_formato_excel_estado(r) for r in filas)
+
+    escribir_excel(destino, resultados, ExportHeaders.ESTADOS_DB, title=ReportTitles.ESTADOS_DB, sheet_name=SheetNames.ESTADOS_DB)
+    return ExportFileNames.timestamped('estados_bd', 'xlsx')
+
+
+def _formato_excel_disco(r):
+    if r.get('LogDate') and hasattr(r['LogDate'], 'strftime'):
+        r['LogDate'] = r['LogDate'].strftime('%Y-%m-%d %H:%M:%S')
+    if r.get('FileSizeMB') is not None:
+        r['FileSizeMB'] = f"{float(r['FileSizeMB']):,.2f}"
+    if r.get('DiskFreeMB') is not None:
+        r['DiskFreeMB'] = f"{float(r['DiskFreeMB']):,.2f}"
+    if r.get('PorcentajeLibre') is not None:
+        r['PorcentajeLibre'] = f"{float(r['PorcentajeLibre']):.2f}%"
+    return r
+
+
+def _excel_disk_growth(parametros, destino):
+    filas = iterar_consulta(*_consulta_disk_growth(parametros, """CASE
+                    WHEN DiskFreeMB < 10240 THEN 'CRÍTICO'
+                    WHEN DiskFreeMB < 51200 THEN 'ADVERTENCIA'
+                    ELSE 'OK'
+                END as Estado"""))
+    resultados = (_formato_excel_disco(r) for r in filas)
+
+    title = f"{ReportTitles.DISK_GROWTH} ({parametros['fecha_inicio']} - {parametros['fecha_fin']})"
+    escribir_excel(destino, resultados, ExportHeaders.DISK_GROWTH, title=title, sheet_name=SheetNames.DISK_GROWTH)
+    return ExportFileNames.timestamped('crecimiento_discos', 'xlsx')
+
+
+# =============================================================================
+# REGISTRO DE REPORTES EXPORTABLES
+# =============================================================================
+
+# 'cache': los generadores aceptan use_cache (leen un procedimiento cacheado)
+REPORTES_EXPORTABLES = {
+    'cumplimiento': {
+        'cache': True,
+        'parametros': _parametros_cumplimiento,
+        'pdf': _pdf_cumplimiento,
+        'excel': _excel_cumplimiento,
+    },
+    'jobs': {
+        'parametros': _parametros_jobs,
+        'pdf': _pdf_jobs,
+        'excel': _excel_jobs,
+    },
+    'estados': {
+        'parametros': _parametros_estados,
+        'pdf': _pdf_estados,
+        'excel': _excel_estados,
+    },
+    'disk_growth': {
+        'parametros': _parametros_disk_growth,
+        'pdf': _pdf_disk_growth,
+        'excel': _excel_disk_growth,
+    },
+}
+
+
+def _reporte(tipo, formato=None):
+    if tipo not in REPORTES_EXPORTABLES:
+        raise ValueError(f"Reporte '{tipo}' no exportable")
+    if formato is not None and formato not in CONTENT_TYPES:
+        raise ValueError(f"Formato '{formato}' no soportado")
+    return REPORTES_EXPORTABLES[tipo]
+
+
+def parametros_exportacion(tipo, datos):
+    """
+    Normaliza los parámetros de un reporte (GET/POST o dict), resolviendo los
+    valores por defecto a fechas concretas.
+
+    Raises:
+        ValueError: Si el reporte no existe o una fecha es inválida
+    """
+    return _reporte(tipo)['parametros'](datos)
+
+
+def generar_exportacion(tipo, formato, parametros, destino, use_cache=True):
+    """
+    Genera la exportación `formato` ('pdf' o 'excel') del reporte `tipo` en `destino`.
+
+    use_cache solo aplica a los reportes que leen un procedimiento cacheado.
+
+    Returns:
+        str: Nombre sugerido del archivo descargado
+    """
+    reporte = _reporte(tipo, formato)
+    if formato == 'excel' and not OPENPYXL_AVAILABLE:
+        raise RuntimeError('openpyxl no está instalado')
+    if reporte.get('cache'):
+        return reporte[formato](parametros, destino, use_cache=use_cache)
+    return reporte[formato](parametros, destino)
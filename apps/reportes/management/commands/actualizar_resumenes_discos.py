@@ -0,0 +1,48 @@
+# apps/reportes/management/commands/actualizar_resumenes_discos.py
+"""
+Incorpora las filas nuevas de DiskGrowthLog a los resúmenes diarios y
+semanales (ResumenDiskGrowth) que usa el gráfico de crecimiento de discos.
+
+Alternativa a la tarea de Celery beat 'reportes.actualizar_resumenes_discos'
+(por ejemplo desde el Programador de tareas de Windows en servidores IIS).
+Con --reconstruir se borran y recalculan desde todo el log.
+
+Uso:
+    python manage.py actualizar_resumenes_discos
+    python manage.py actualizar_resumenes_discos --reconstruir
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.reportes.config import RESUMEN_DISCOS_CONFIG
+from apps.reportes.resumen_discos import actualizar_resumenes, reconstruir_resumenes
+
+
+class Command(BaseCommand):
+    help = 'Actualiza los resúmenes diarios/semanales de DiskGrowthLog'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=RESUMEN_DISCOS_CONFIG['tamano_lote'],
+            help='Filas por lote (por defecto RESUMEN_DISCOS_CONFIG["tamano_lote"])'
+        )
+        parser.add_argument('--reconstruir', action='store_true', help='Borra y recalcula todos los resúmenes')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        if options['reconstruir']:
+            self.stdout.write('🔁 Reconstruyendo los resúmenes desde todo DiskGrowthLog...')
+            resultado = reconstruir_resumenes(tamano_lote=options['lote'])
+        else:
+            resultado = actualizar_resumenes(tamano_lote=options['lote'])
+
+        if not resultado['muestras']:
+            self.stdout.write(self.style.SUCCESS('✅ Sin filas nuevas en DiskGrowthLog'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {resultado['muestras']} muestras incorporadas en {resultado['resumenes']} resúmenes "
+            f"(LogID {resultado['ultimo_log_id']}, {time.perf_counter() - inicio:.2f} s)"
+        ))
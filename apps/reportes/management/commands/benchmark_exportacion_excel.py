@@ -0,0 +1,86 @@
+# apps/reportes/management/commands/benchmark_exportacion_excel.py
+"""
+Benchmark de create_styled_excel (modo write_only).
+
+Genera filas sintéticas con la estructura del reporte de jobs y mide
+tiempo y pico de memoria para dos tamaños; con memoria acotada el pico
+debe ser prácticamente el mismo para N/10 y para N filas.
+No requiere conexión a SQL Server.
+
+La memoria queda acotada, pero el tiempo sigue siendo lineal: casi todo se
+va en la serialización por celda de openpyxl, así que el objetivo de
+--limite-segundos depende de la CPU y puede no cumplirse (se avisa).
+"""
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from apps.reportes.constants import ExportHeaders, ReportTitles, SheetNames
+from apps.reportes.views import create_styled_excel
+
+
+def generar_jobs_sinteticos(total):
+    """Filas con la forma de sp_resultadoJobsBck"""
+    for i in range(total):
+        yield {
+            'RESULTADO': 'Exitoso' if i % 7 else 'Fallido',
+            'SERVIDOR': f'SRV{i % 20:02d}',
+            'IPSERVER': f'10.0.0.{i % 20}',
+            'FECHA': f'{(i % 28) + 1:02d}/01/2024',
+            'HORA': f'{i % 24:02d}:{i % 60:02d}:00',
+            'NOMBRE_DEL_JOB': f'Backup_DB_{i % 150}',
+            'PASO': str(i % 3),
+            'MENSAJE': f'Ejecutado por programación {i}. Duración {i % 300} segundos.',
+        }
+
+
+def _exportar(total):
+    return create_styled_excel(
+        generar_jobs_sinteticos(total),
+        ExportHeaders.JOBS,
+        'benchmark.xlsx',
+        title=ReportTitles.JOBS,
+        sheet_name=SheetNames.JOBS
+    )
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo y memoria de la exportación Excel de jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=100000, help='Filas del benchmark (por defecto 100000)')
+        parser.add_argument('--limite-segundos', type=float, default=5.0, help='Tiempo objetivo para --filas')
+
+    def handle(self, *args, **options):
+        filas = options['filas']
+
+        self.stdout.write(self.style.SUCCESS('📊 Benchmark exportación Excel (write_only)'))
+
+        # Tiempo (sin tracemalloc, que distorsiona la medición)
+        self.stdout.write('\n⏱️ Tiempo:')
+        for total in (max(filas // 10, 1), filas):
+            inicio = time.perf_counter()
+            response = _exportar(total)
+            segundos = time.perf_counter() - inicio
+            self.stdout.write(
+                f'   • {total:>9,} filas: {segundos:6.2f} s, archivo {len(response.content) / (1024 * 1024):5.1f} MB'
+            )
+
+        if segundos <= options['limite_segundos']:
+            self.stdout.write(self.style.SUCCESS(f'   ✅ {filas:,} filas en {segundos:.2f} s'))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"   ⚠️ {filas:,} filas en {segundos:.2f} s (objetivo {options['limite_segundos']} s)"
+            ))
+
+        # Memoria de trabajo: con escritura acotada el pico no depende del número de filas
+        # (se descuenta el archivo final, que vive en la respuesta)
+        self.stdout.write('\n💾 Pico de memoria de trabajo:')
+        for total in (max(filas // 100, 1), max(filas // 10, 1)):
+            tracemalloc.start()
+            response = _exportar(total)
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            trabajo = (pico - len(response.content)) / (1024 * 1024)
+            self.stdout.write(f'   • {total:>9,} filas: {trabajo:6.2f} MB')
@@ -0,0 +1,132 @@
+# apps/reportes/management/commands/benchmark_fecha_backup.py
+"""
+Benchmark antes/después de la columna FECHA_HORA.
+
+Crea una tabla de trabajo con la estructura de BACKUPSGENERADOS, la
+siembra con N filas, mide las consultas de reportes con la conversión
+SUBSTRING(FECHA, ...) y luego con la columna calculada FECHA_HORA.
+No toca BACKUPSGENERADOS.
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from .crear_columna_fecha_backup import aplicar_columna_fecha_hora
+
+TABLA_BENCH = 'BACKUPSGENERADOS_BENCH'
+
+FECHA_SUBSTRING = "CONVERT(date, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2))"
+FECHA_HORA_SUBSTRING = "CONVERT(datetime, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2) + ' ' + HORA)"
+
+# (descripción, consulta antes, consulta después)
+CONSULTAS = [
+    (
+        'Archivos últimos 30 días (página 1)',
+        f"""SELECT BCK_ID, SERVIDOR, DatabaseName, FECHA, HORA FROM {TABLA_BENCH}
+            WHERE {FECHA_SUBSTRING} >= DATEADD(day, -30, GETDATE())
+            ORDER BY {FECHA_SUBSTRING} DESC, CONVERT(time, HORA) DESC
+            OFFSET 0 ROWS FETCH NEXT 25 ROWS ONLY""",
+        f"""SELECT BCK_ID, SERVIDOR, DatabaseName, FECHA, HORA FROM {TABLA_BENCH}
+            WHERE FECHA_HORA >= DATEADD(day, -30, CONVERT(date, GETDATE()))
+            ORDER BY FECHA_HORA DESC
+            OFFSET 0 ROWS FETCH NEXT 25 ROWS ONLY""",
+    ),
+    (
+        'Backups última semana (COUNT)',
+        f"SELECT COUNT(*) FROM {TABLA_BENCH} WHERE {FECHA_SUBSTRING} >= DATEADD(day, -7, GETDATE())",
+        f"SELECT COUNT(*) FROM {TABLA_BENCH} WHERE FECHA_HORA >= DATEADD(day, -7, CONVERT(date, GETDATE()))",
+    ),
+    (
+        'Último backup por BD (ROW_NUMBER)',
+        f"""SELECT SERVIDOR, DatabaseName, FECHA, HORA FROM (
+                SELECT SERVIDOR, DatabaseName, FECHA, HORA,
+                    ROW_NUMBER() OVER (PARTITION BY SERVIDOR, DatabaseName
+                                       ORDER BY {FECHA_SUBSTRING} DESC, CONVERT(time, HORA) DESC) as rn,
+                    DATEDIFF(hour, {FECHA_HORA_SUBSTRING}, GETDATE()) as horas
+                FROM {TABLA_BENCH}) t WHERE rn = 1""",
+        f"""SELECT SERVIDOR, DatabaseName, FECHA, HORA FROM (
+                SELECT SERVIDOR, DatabaseName, FECHA, HORA,
+                    ROW_NUMBER() OVER (PARTITION BY SERVIDOR, DatabaseName
+                                       ORDER BY FECHA_HORA DESC) as rn,
+                    DATEDIFF(hour, FECHA_HORA, GETDATE()) as horas
+                FROM {TABLA_BENCH}) t WHERE rn = 1""",
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark de consultas de BACKUPSGENERADOS antes/después de FECHA_HORA'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=200000, help='Filas a sembrar (por defecto 200000)')
+        parser.add_argument('--repeticiones', type=int, default=5, help='Ejecuciones por consulta')
+        parser.add_argument('--conservar', action='store_true', help='No eliminar la tabla de trabajo al terminar')
+
+    def handle(self, *args, **options):
+        filas = options['filas']
+        repeticiones = options['repeticiones']
+
+        with connection.cursor() as cursor:
+            self.stdout.write(f'🌱 Sembrando {filas:,} filas en {TABLA_BENCH}...')
+            self._sembrar(cursor, filas)
+
+            try:
+                antes = {desc: self._medir(cursor, sql, repeticiones) for desc, sql, _ in CONSULTAS}
+
+                self.stdout.write('🔧 Creando FECHA_HORA e índices...')
+                aplicar_columna_fecha_hora(cursor, TABLA_BENCH)
+
+                despues = {desc: self._medir(cursor, sql, repeticiones) for desc, _, sql in CONSULTAS}
+            finally:
+                if not options['conservar']:
+                    cursor.execute(f"DROP TABLE {TABLA_BENCH}")
+
+        self.stdout.write(f'\n📊 Mediana de {repeticiones} ejecuciones ({filas:,} filas):')
+        self.stdout.write(f"   {'Consulta':<40} {'Antes (ms)':>12} {'Después (ms)':>14} {'Mejora':>8}")
+        for desc, _, _ in CONSULTAS:
+            mejora = antes[desc] / despues[desc] if despues[desc] > 0 else 0
+            self.stdout.write(f'   {desc:<40} {antes[desc]:>12.1f} {despues[desc]:>14.1f} {mejora:>7.1f}x')
+
+    def _sembrar(self, cursor, filas):
+        """Crea la tabla de trabajo y la llena con datos sintéticos (un backup cada 7 minutos)"""
+        cursor.execute(f"IF OBJECT_ID('{TABLA_BENCH}') IS NOT NULL DROP TABLE {TABLA_BENCH}")
+        cursor.execute(f"""
+            CREATE TABLE {TABLA_BENCH} (
+                BCK_ID int IDENTITY(1,1) PRIMARY KEY,
+                SERVIDOR varchar(50) NULL,
+                DatabaseName varchar(100) NULL,
+                FECHA varchar(20) NULL,
+                HORA varchar(20) NULL,
+                TYPE varchar(20) NULL,
+                physical_device_name nvarchar(500) NULL,
+                IPSERVER varchar(50) NULL
+            )
+        """)
+        cursor.execute(f"""
+            WITH numeros AS (
+                SELECT TOP ({int(filas)}) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS n
+                FROM sys.all_objects a CROSS JOIN sys.all_objects b
+            )
+            INSERT INTO {TABLA_BENCH} (SERVIDOR, DatabaseName, FECHA, HORA, TYPE, physical_device_name, IPSERVER)
+            SELECT
+                'SRV' + RIGHT('0' + CAST(n % 20 AS varchar), 2),
+                'DB_' + CAST(n % 150 AS varchar),
+                CONVERT(varchar(10), DATEADD(minute, -7 * n, GETDATE()), 103),
+                CONVERT(varchar(8), DATEADD(minute, -7 * n, GETDATE()), 108),
+                CASE n % 3 WHEN 0 THEN 'FULL' WHEN 1 THEN 'DIFF' ELSE 'LOG' END,
+                'D:\\Backups\\DB_' + CAST(n % 150 AS varchar) + '_' + CAST(n AS varchar) + '.bak',
+                '10.0.0.' + CAST(n % 20 AS varchar)
+            FROM numeros
+        """)
+
+    def _medir(self, cursor, sql, repeticiones):
+        """Mediana en milisegundos de varias ejecuciones"""
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            cursor.execute(sql)
+            cursor.fetchall()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        return statistics.median(tiempos)
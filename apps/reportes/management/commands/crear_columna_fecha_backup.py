@@ -0,0 +1,147 @@
+# apps/reportes/management/commands/crear_columna_fecha_backup.py
+"""
+Crea en BACKUPSGENERADOS la columna calculada persistida FECHA_HORA
+(datetime a partir de FECHA 'DD/MM/YYYY' y HORA 'HH:MM:SS') y sus índices.
+
+Las consultas de reportes filtran y ordenan sobre FECHA_HORA; sin esta
+columna tenían que convertir SUBSTRING(FECHA, ...) fila por fila, lo que
+obliga a un recorrido completo de la tabla.
+"""
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+TABLA_POR_DEFECTO = 'BACKUPSGENERADOS'
+
+# TRY_CONVERT con estilo 120 es determinista (requisito de PERSISTED) y deja
+# NULL en filas con FECHA/HORA inválidas en lugar de romper los INSERT.
+EXPRESION_FECHA_HORA = (
+    "TRY_CONVERT(datetime2(0), "
+    "SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2) + ' ' + HORA, 120)"
+)
+
+
+def _validar_tabla(tabla):
+    if not re.match(r'^[A-Za-z_][A-Za-z0-9_]*$', tabla):
+        raise CommandError(f'Nombre de tabla inválido: {tabla}')
+    return tabla
+
+
+def indices_fecha_hora(tabla):
+    """Índices a crear: {nombre: definición de columnas}"""
+    return {
+        f'IX_{tabla}_FECHA_HORA': '(FECHA_HORA DESC) INCLUDE (SERVIDOR, DatabaseName, IPSERVER, TYPE)',
+        f'IX_{tabla}_SERVIDOR_BD_FECHA_HORA': '(SERVIDOR, DatabaseName, FECHA_HORA DESC)',
+    }
+
+
+def columna_existe(cursor, tabla):
+    cursor.execute("SELECT COL_LENGTH(%s, 'FECHA_HORA')", [tabla])
+    return cursor.fetchone()[0] is not None
+
+
+def indice_existe(cursor, tabla, nombre):
+    cursor.execute(
+        "SELECT COUNT(*) FROM sys.indexes WHERE name = %s AND object_id = OBJECT_ID(%s)",
+        [nombre, tabla]
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def aplicar_columna_fecha_hora(cursor, tabla=TABLA_POR_DEFECTO):
+    """
+    Crea la columna FECHA_HORA y sus índices si no existen (idempotente).
+
+    Returns:
+        list: Acciones ejecutadas
+    """
+    tabla = _validar_tabla(tabla)
+    acciones = []
+
+    if not columna_existe(cursor, tabla):
+        cursor.execute(f"ALTER TABLE {tabla} ADD FECHA_HORA AS {EXPRESION_FECHA_HORA} PERSISTED")
+        acciones.append(f'Columna {tabla}.FECHA_HORA creada')
+
+    for nombre, definicion in indices_fecha_hora(tabla).items():
+        if not indice_existe(cursor, tabla, nombre):
+            cursor.execute(f"CREATE NONCLUSTERED INDEX {nombre} ON {tabla} {definicion}")
+            acciones.append(f'Índice {nombre} creado')
+
+    return acciones
+
+
+def eliminar_columna_fecha_hora(cursor, tabla=TABLA_POR_DEFECTO):
+    """Elimina los índices y la columna FECHA_HORA (reversión)"""
+    tabla = _validar_tabla(tabla)
+    acciones = []
+
+    for nombre in indices_fecha_hora(tabla):
+        if indice_existe(cursor, tabla, nombre):
+            cursor.execute(f"DROP INDEX {nombre} ON {tabla}")
+            acciones.append(f'Índice {nombre} eliminado')
+
+    if columna_existe(cursor, tabla):
+        cursor.execute(f"ALTER TABLE {tabla} DROP COLUMN FECHA_HORA")
+        acciones.append(f'Columna {tabla}.FECHA_HORA eliminada')
+
+    return acciones
+
+
+class Command(BaseCommand):
+    help = 'Crea la columna calculada FECHA_HORA e índices en BACKUPSGENERADOS'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tabla',
+            type=str,
+            default=TABLA_POR_DEFECTO,
+            help='Tabla sobre la que se crea la columna (por defecto BACKUPSGENERADOS)'
+        )
+        parser.add_argument(
+            '--estado',
+            action='store_true',
+            help='Solo muestra si la columna y los índices existen'
+        )
+        parser.add_argument(
+            '--eliminar',
+            action='store_true',
+            help='Elimina la columna y los índices'
+        )
+
+    def handle(self, *args, **options):
+        tabla = _validar_tabla(options['tabla'])
+
+        with connection.cursor() as cursor:
+            if options['estado']:
+                self._mostrar_estado(cursor, tabla)
+                return
+
+            if options['eliminar']:
+                acciones = eliminar_columna_fecha_hora(cursor, tabla)
+            else:
+                self.stdout.write(f'🔧 Preparando FECHA_HORA en {tabla}...')
+                acciones = aplicar_columna_fecha_hora(cursor, tabla)
+
+            if not acciones:
+                self.stdout.write(self.style.SUCCESS('✅ No hay cambios pendientes'))
+            for accion in acciones:
+                self.stdout.write(self.style.SUCCESS(f'   ✅ {accion}'))
+
+            if not options['eliminar']:
+                self._mostrar_estado(cursor, tabla)
+
+    def _mostrar_estado(self, cursor, tabla):
+        existe = columna_existe(cursor, tabla)
+        self.stdout.write(f"\n📊 {tabla}.FECHA_HORA: {'✅ existe' if existe else '❌ no existe'}")
+        for nombre in indices_fecha_hora(tabla):
+            estado = '✅ existe' if indice_existe(cursor, tabla, nombre) else '❌ no existe'
+            self.stdout.write(f'   • {nombre}: {estado}')
+
+        if existe:
+            cursor.execute(f"SELECT COUNT(*) FROM {tabla} WHERE FECHA_HORA IS NULL")
+            invalidas = cursor.fetchone()[0]
+            if invalidas:
+                self.stdout.write(self.style.WARNING(
+                    f'   ⚠️ {invalidas:,} filas con FECHA/HORA no convertibles (FECHA_HORA = NULL)'
+                ))
@@ -0,0 +1,28 @@
+# apps/reportes/management/commands/limpiar_exportaciones.py
+"""
+Elimina las exportaciones en segundo plano vencidas y sus archivos.
+
+Alternativa a la tarea programada de Celery beat (por ejemplo desde el
+Programador de tareas de Windows en servidores IIS).
+"""
+from django.core.management.base import BaseCommand
+
+from apps.reportes.config import EXPORT_JOBS_CONFIG
+from apps.reportes.trabajos_exportacion import limpiar_exportaciones
+
+
+class Command(BaseCommand):
+    help = 'Elimina las exportaciones PDF/Excel vencidas y sus archivos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horas',
+            type=int,
+            default=EXPORT_JOBS_CONFIG['retencion_horas'],
+            help='Retención en horas (por defecto EXPORT_JOBS_CONFIG["retencion_horas"])'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"🧹 Eliminando exportaciones con más de {options['horas']} horas...")
+        eliminados = limpiar_exportaciones(options['horas'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Exportaciones eliminadas: {eliminados}'))
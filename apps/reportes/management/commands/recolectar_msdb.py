@@ -0,0 +1,66 @@
+# apps/reportes/management/commands/recolectar_msdb.py
+"""
+Recolecta el historial de msdb de los servidores monitoreados en
+BACKUPSGENERADOS y JOBSBACKUPGENERADOS (incremental por marca de agua).
+
+Alternativa a la tarea de Celery beat 'reportes.recolectar_msdb' (por
+ejemplo desde el Programador de tareas de Windows en servidores IIS).
+
+Uso:
+    python manage.py recolectar_msdb
+    python manage.py recolectar_msdb --servidor SRV01 --desde 2024-01-01
+"""
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reportes.config import RECOLECCION_MSDB_CONFIG
+from apps.reportes.recoleccion_msdb import obtener_servidores, recolectar
+
+
+class Command(BaseCommand):
+    help = 'Recolecta backups y jobs nuevos desde msdb de los servidores monitoreados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servidor', action='append', help='Solo este servidor (repetible)')
+        parser.add_argument('--desde', help='Backfill desde esta fecha (YYYY-MM-DD), ignora la marca de agua')
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=RECOLECCION_MSDB_CONFIG['tamano_lote'],
+            help='Filas por lote (por defecto RECOLECCION_MSDB_CONFIG["tamano_lote"])'
+        )
+
+    def handle(self, *args, **options):
+        desde = None
+        if options['desde']:
+            try:
+                desde = datetime.datetime.strptime(options['desde'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError(f"Fecha inválida: {options['desde']} (formato YYYY-MM-DD)")
+
+        servidores = obtener_servidores()
+        if options['servidor']:
+            servidores = [s for s in servidores if s['nombre'] in options['servidor']]
+        if not servidores:
+            self.stdout.write(self.style.WARNING('⚠️ No hay servidores en SERVIDORES_MONITOREADOS para recolectar'))
+            return
+
+        modo = f'backfill desde {desde}' if desde else 'incremental'
+        self.stdout.write(f'📥 Recolectando msdb de {len(servidores)} servidor(es) ({modo})...')
+        errores = 0
+        for resultado in recolectar(servidores, desde=desde, tamano_lote=options['lote']):
+            nombre = f"{resultado['servidor']}.{resultado['origen']}"
+            if 'error' in resultado:
+                errores += 1
+                self.stdout.write(self.style.ERROR(f"   ❌ {nombre}: {resultado['error']}"))
+            else:
+                self.stdout.write(
+                    f"   • {nombre}: {resultado['insertadas']} nuevas de {resultado['leidas']} leídas "
+                    f"en {resultado['lotes']} lote(s), marca {resultado['ultimo_id']}"
+                )
+
+        if errores:
+            self.stdout.write(self.style.WARNING(f'⚠️ Recolección terminada con {errores} error(es)'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✅ Recolección terminada'))
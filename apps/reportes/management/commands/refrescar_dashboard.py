@@ -0,0 +1,63 @@
+# apps/reportes/management/commands/refrescar_dashboard.py
+"""
+Refresca el snapshot de sp_DashboardMetrics que leen el dashboard y su API.
+
+Alternativa a la tarea de Celery beat 'reportes.refrescar_dashboard': corre
+en bucle (por ejemplo como servicio de Windows en servidores IIS) o una sola
+vez con --una-vez (Programador de tareas). Necesita un cache compartido con
+los procesos web; con LocMemCache el snapshot solo queda en este proceso.
+
+Uso:
+    python manage.py refrescar_dashboard
+    python manage.py refrescar_dashboard --una-vez
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.reportes.coalescencia import BACKENDS_LOCALES
+from apps.reportes.config import DASHBOARD_SNAPSHOT_CONFIG
+from apps.reportes.snapshot_dashboard import refrescar_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Refresca periódicamente el snapshot de sp_DashboardMetrics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intervalo',
+            type=int,
+            default=DASHBOARD_SNAPSHOT_CONFIG['intervalo'],
+            help='Segundos entre refrescos (por defecto DASHBOARD_SNAPSHOT_CONFIG["intervalo"])'
+        )
+        parser.add_argument('--una-vez', action='store_true', help='Refresca una vez y termina')
+
+    def handle(self, *args, **options):
+        if settings.CACHES['default']['BACKEND'] in BACKENDS_LOCALES:
+            self.stdout.write(self.style.WARNING(
+                '⚠️ El cache es local al proceso: los procesos web no verán este snapshot'
+            ))
+
+        if options['una_vez']:
+            self._refrescar()
+            return
+
+        self.stdout.write(f"🔄 Refrescando el dashboard cada {options['intervalo']} s (Ctrl+C para salir)")
+        try:
+            while True:
+                self._refrescar()
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            self.stdout.write('⏹️ Refresco detenido')
+
+    def _refrescar(self):
+        inicio = time.perf_counter()
+        snapshot = refrescar_snapshot()
+        duracion = time.perf_counter() - inicio
+        if snapshot is None:
+            self.stdout.write(self.style.ERROR(f'❌ sp_DashboardMetrics sin datos ({duracion:.2f} s)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Snapshot generado {snapshot['generado']:%Y-%m-%d %H:%M:%S} ({duracion:.2f} s)"
+            ))
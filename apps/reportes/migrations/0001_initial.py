@@ -0,0 +1,115 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackupGenerado',
+            fields=[
+                ('bck_id', models.AutoField(db_column='BCK_ID', primary_key=True, serialize=False)),
+                ('servidor', models.CharField(blank=True, db_column='SERVIDOR', max_length=50, null=True)),
+                ('database_name', models.CharField(blank=True, db_column='DatabaseName', max_length=100, null=True)),
+                ('fecha', models.CharField(blank=True, db_column='FECHA', max_length=20, null=True)),
+                ('hora', models.CharField(blank=True, db_column='HORA', max_length=20, null=True)),
+                ('type', models.CharField(blank=True, db_column='TYPE', max_length=20, null=True)),
+                ('physical_device_name', models.TextField(blank=True, db_column='physical_device_name', null=True)),
+                ('ipserver', models.CharField(blank=True, db_column='IPSERVER', max_length=50, null=True)),
+                ('fecha_hora', models.DateTimeField(blank=True, db_column='FECHA_HORA', editable=False, null=True)),
+            ],
+            options={
+                'db_table': 'BACKUPSGENERADOS',
+                'ordering': ['-bck_id'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='EstadoDB',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'db_table': 'ESTADODB',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='JobBackupGenerado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('servidor', models.CharField(blank=True, db_column='SERVIDOR', max_length=100, null=True)),
+                ('resultado', models.CharField(blank=True, db_column='RESULTADO', max_length=50, null=True)),
+                ('fecha_y_hora_inicio', models.DateTimeField(blank=True, db_column='FECHA_Y_HORA_INICIO', null=True)),
+                ('nombre_del_job', models.CharField(blank=True, db_column='NOMBRE_DEL_JOB', max_length=100, null=True)),
+                ('paso', models.IntegerField(blank=True, db_column='PASO', null=True)),
+                ('nombre_del_paso', models.CharField(blank=True, db_column='NOMBRE_DEL_PASO', max_length=100, null=True)),
+                ('mensaje', models.TextField(blank=True, db_column='MENSAJE', null=True)),
+                ('ipserver', models.CharField(blank=True, db_column='IPSERVER', max_length=50, null=True)),
+            ],
+            options={
+                'db_table': 'JOBSBACKUPGENERADOS',
+                'ordering': ['-fecha_y_hora_inicio'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ProgramacionDeBCKS',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('servidor', models.CharField(db_column='SERVIDOR', max_length=100)),
+                ('database_name', models.CharField(db_column='DatabaseName', max_length=100)),
+                ('ipserver', models.CharField(db_column='IPSERVER', max_length=50)),
+                ('total_programado', models.IntegerField(db_column='TOTALPROGRAM')),
+            ],
+            options={
+                'db_table': 'PROGRAMACIONDEBCKS',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='UltimoBCK',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'db_table': 'ULTIMOBCK',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TrabajoExportacion',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('tipo', models.CharField(max_length=30)),
+                ('formato', models.CharField(choices=[('pdf', 'PDF'), ('excel', 'Excel')], max_length=10)),
+                ('parametros', models.JSONField(default=dict)),
+                ('huella', models.CharField(db_index=True, max_length=64)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('completado', 'Completado'), ('error', 'Error')], default='pendiente', max_length=20)),
+                ('archivo', models.CharField(blank=True, max_length=255)),
+                ('nombre_archivo', models.CharField(blank=True, max_length=255)),
+                ('tamano_bytes', models.BigIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trabajos_exportacion', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Trabajo de Exportación',
+                'verbose_name_plural': 'Trabajos de Exportación',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['usuario', 'estado'], name='reportes_tr_usuario_ba5d95_idx'), models.Index(fields=['estado', 'fecha_fin'], name='reportes_tr_estado_5bed97_idx')],
+            },
+        ),
+    ]
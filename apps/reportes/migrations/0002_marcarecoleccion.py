@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarcaRecoleccion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('servidor', models.CharField(max_length=100)),
+                ('origen', models.CharField(choices=[('backups', 'msdb.backupset → BACKUPSGENERADOS'), ('jobs', 'msdb.sysjobhistory → JOBSBACKUPGENERADOS')], max_length=20)),
+                ('ultimo_id', models.BigIntegerField(default=0)),
+                ('filas_insertadas', models.BigIntegerField(default=0)),
+                ('ultima_ejecucion', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Marca de Recolección',
+                'verbose_name_plural': 'Marcas de Recolección',
+                'unique_together': {('servidor', 'origen')},
+            },
+        ),
+    ]
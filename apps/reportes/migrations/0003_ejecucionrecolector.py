@@ -0,0 +1,28 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0002_marcarecoleccion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EjecucionRecolector',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=100, unique=True)),
+                ('ultima_exitosa', models.DateTimeField(blank=True, null=True)),
+                ('ultimo_intento', models.DateTimeField(blank=True, null=True)),
+                ('duracion_segundos', models.FloatField(blank=True, null=True)),
+                ('ultimo_error', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'Ejecución de Recolector',
+                'verbose_name_plural': 'Ejecuciones de Recolectores',
+            },
+        ),
+    ]
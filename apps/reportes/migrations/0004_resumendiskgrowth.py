@@ -0,0 +1,39 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0003_ejecucionrecolector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiskGrowth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periodo', models.CharField(choices=[('dia', 'Diario'), ('semana', 'Semanal')], max_length=10)),
+                ('inicio', models.DateField()),
+                ('servidor', models.CharField(max_length=100)),
+                ('base_datos', models.CharField(max_length=128)),
+                ('archivo', models.CharField(max_length=260)),
+                ('tamano_min_mb', models.DecimalField(blank=True, decimal_places=2, max_digits=18, null=True)),
+                ('tamano_max_mb', models.DecimalField(blank=True, decimal_places=2, max_digits=18, null=True)),
+                ('tamano_ultimo_mb', models.DecimalField(blank=True, decimal_places=2, max_digits=18, null=True)),
+                ('libre_min_mb', models.DecimalField(blank=True, decimal_places=2, max_digits=18, null=True)),
+                ('libre_max_mb', models.DecimalField(blank=True, decimal_places=2, max_digits=18, null=True)),
+                ('libre_ultimo_mb', models.DecimalField(blank=True, decimal_places=2, max_digits=18, null=True)),
+                ('muestras', models.IntegerField(default=0)),
+                ('ultima_fecha', models.DateTimeField()),
+                ('ultimo_log_id', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Resumen de Crecimiento de Discos',
+                'verbose_name_plural': 'Resúmenes de Crecimiento de Discos',
+                'indexes': [models.Index(fields=['periodo', 'inicio'], name='reportes_re_periodo_74976c_idx')],
+                'unique_together': {('periodo', 'inicio', 'servidor', 'base_datos', 'archivo')},
+            },
+        ),
+    ]
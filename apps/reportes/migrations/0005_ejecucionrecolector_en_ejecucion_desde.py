@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-17 22:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0004_resumendiskgrowth'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ejecucionrecolector',
+            name='en_ejecucion_desde',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,7 +1,20 @@
 # apps/reportes/models.py
-from django.db import models
+import uuid
+
+from django.contrib.auth.models import User
+from django.db import connection, models
 from django.utils import timezone
-from datetime import datetime
+
+def _hora_local_servidor(valor):
+    """
+    FECHA_HORA guarda la hora local del servidor (FECHA + HORA). Con USE_TZ
+    el ORM la devuelve marcada en la zona de la conexión (UTC por defecto):
+    se toma la hora tal como está en la columna y se marca en la zona local.
+    """
+    if timezone.is_aware(valor):
+        valor = timezone.localtime(valor, connection.timezone).replace(tzinfo=None)
+    return timezone.make_aware(valor)
+
 
 class BackupGenerado(models.Model):
     """Modelo para la tabla BACKUPSGENERADOS"""
@@ -13,6 +26,9 @@ class BackupGenerado(models.Model):
     type = models.CharField(max_length=20, null=True, blank=True, db_column='TYPE')
     physical_device_name = models.TextField(null=True, blank=True, db_column='physical_device_name')
     ipserver = models.CharField(max_length=50, null=True, blank=True, db_column='IPSERVER')
+    # Columna calculada persistida (FECHA + HORA), creada con
+    # `manage.py crear_columna_fecha_backup`
+    fecha_hora = models.DateTimeField(null=True, blank=True, editable=False, db_column='FECHA_HORA')
     
     class Meta:
         db_table = 'BACKUPSGENERADOS'
@@ -24,15 +40,8 @@ class BackupGenerado(models.Model):
     
     @property
     def fecha_hora_completa(self):
-        """Combina fecha y hora en un datetime"""
-        try:
-            if self.fecha and self.hora:
-                # Formato esperado: DD/MM/YYYY HH:MM:SS
-                fecha_str = f"{self.fecha} {self.hora}"
-                return datetime.strptime(fecha_str, "%d/%m/%Y %H:%M:%S")
-        except (ValueError, TypeError):
-            pass
-        return None
+        """Fecha y hora del backup (columna calculada FECHA_HORA)"""
+        return self.fecha_hora
     
     @property
     def tipo_backup_display(self):
@@ -50,7 +59,7 @@ class BackupGenerado(models.Model):
         """Calcula horas transcurridas desde el backup"""
         fecha_backup = self.fecha_hora_completa
         if fecha_backup:
-            delta = timezone.now() - timezone.make_aware(fecha_backup)
+            delta = timezone.now() - _hora_local_servidor(fecha_backup)
             return int(delta.total_seconds() / 3600)
         return None
     
@@ -169,3 +178,158 @@ class ProgramacionDeBCKS(models.Model):
     class Meta:
         db_table = 'PROGRAMACIONDEBCKS'
         managed = False
+
+
+class TrabajoExportacion(models.Model):
+    """Exportación PDF/Excel generada en segundo plano (ver trabajos_exportacion.py)"""
+
+    ESTADO_PENDIENTE = 'pendiente'
+    ESTADO_PROCESANDO = 'procesando'
+    ESTADO_COMPLETADO = 'completado'
+    ESTADO_ERROR = 'error'
+
+    ESTADOS = [
+        (ESTADO_PENDIENTE, 'Pendiente'),
+        (ESTADO_PROCESANDO, 'Procesando'),
+        (ESTADO_COMPLETADO, 'Completado'),
+        (ESTADO_ERROR, 'Error'),
+    ]
+    ESTADOS_ACTIVOS = (ESTADO_PENDIENTE, ESTADO_PROCESANDO)
+
+    FORMATOS = [
+        ('pdf', 'PDF'),
+        ('excel', 'Excel'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='trabajos_exportacion')
+    tipo = models.CharField(max_length=30)
+    formato = models.CharField(max_length=10, choices=FORMATOS)
+    parametros = models.JSONField(default=dict)
+    # Hash de tipo + formato + parámetros para detectar solicitudes repetidas
+    huella = models.CharField(max_length=64, db_index=True)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=ESTADO_PENDIENTE)
+
+    # Archivo generado (ruta relativa a EXPORTACIONES_ROOT)
+    archivo = models.CharField(max_length=255, blank=True)
+    nombre_archivo = models.CharField(max_length=255, blank=True)
+    tamano_bytes = models.BigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Trabajo de Exportación"
+        verbose_name_plural = "Trabajos de Exportación"
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['usuario', 'estado']),
+            models.Index(fields=['estado', 'fecha_fin']),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo}.{self.formato} - {self.usuario} ({self.estado})"
+
+    @property
+    def esta_activo(self):
+        """Indica si el trabajo sigue en cola o en proceso"""
+        return self.estado in self.ESTADOS_ACTIVOS
+
+
+class MarcaRecoleccion(models.Model):
+    """
+    Marca de agua por servidor y origen de la recolección incremental desde
+    msdb (ver recoleccion_msdb.py)
+    """
+
+    ORIGEN_BACKUPS = 'backups'
+    ORIGEN_JOBS = 'jobs'
+
+    ORIGENES = [
+        (ORIGEN_BACKUPS, 'msdb.backupset → BACKUPSGENERADOS'),
+        (ORIGEN_JOBS, 'msdb.sysjobhistory → JOBSBACKUPGENERADOS'),
+    ]
+
+    servidor = models.CharField(max_length=100)
+    origen = models.CharField(max_length=20, choices=ORIGENES)
+    # backup_set_id / instance_id más alto ya procesado en msdb
+    ultimo_id = models.BigIntegerField(default=0)
+    filas_insertadas = models.BigIntegerField(default=0)
+    ultima_ejecucion = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Marca de Recolección"
+        verbose_name_plural = "Marcas de Recolección"
+        unique_together = ['servidor', 'origen']
+
+    def __str__(self):
+        return f"{self.servidor}.{self.origen} > {self.ultimo_id}"
+
+
+class EjecucionRecolector(models.Model):
+    """
+    Última ejecución de un procedimiento recolector (sp_MonitorDatabaseStatus,
+    usp_MonitorDiskGrowth...). Ver recolectores.py
+    """
+    nombre = models.CharField(max_length=100, unique=True)
+    ultima_exitosa = models.DateTimeField(null=True, blank=True)
+    ultimo_intento = models.DateTimeField(null=True, blank=True)
+    duracion_segundos = models.FloatField(null=True, blank=True)
+    ultimo_error = models.TextField(blank=True)
+    # Reserva del proceso que lo está ejecutando (None = libre)
+    en_ejecucion_desde = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Ejecución de Recolector"
+        verbose_name_plural = "Ejecuciones de Recolectores"
+
+    def __str__(self):
+        return f"{self.nombre} ({self.ultima_exitosa or 'nunca'})"
+
+
+class ResumenDiskGrowth(models.Model):
+    """
+    Resumen diario y semanal de DiskGrowthLog por servidor, base de datos y
+    archivo (ver resumen_discos.py)
+    """
+
+    PERIODO_DIA = 'dia'
+    PERIODO_SEMANA = 'semana'
+
+    PERIODOS = [
+        (PERIODO_DIA, 'Diario'),
+        (PERIODO_SEMANA, 'Semanal'),
+    ]
+
+    periodo = models.CharField(max_length=10, choices=PERIODOS)
+    # Día del resumen, o lunes de la semana
+    inicio = models.DateField()
+    servidor = models.CharField(max_length=100)
+    base_datos = models.CharField(max_length=128)
+    archivo = models.CharField(max_length=260)
+
+    tamano_min_mb = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+    tamano_max_mb = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+    tamano_ultimo_mb = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+    libre_min_mb = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+    libre_max_mb = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+    libre_ultimo_mb = models.DecimalField(max_digits=18, decimal_places=2, null=True, blank=True)
+
+    muestras = models.IntegerField(default=0)
+    # LogDate de la última muestra del período
+    ultima_fecha = models.DateTimeField()
+    # LogID más alto incorporado (marca de agua de la actualización incremental)
+    ultimo_log_id = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Resumen de Crecimiento de Discos"
+        verbose_name_plural = "Resúmenes de Crecimiento de Discos"
+        unique_together = ['periodo', 'inicio', 'servidor', 'base_datos', 'archivo']
+        indexes = [
+            models.Index(fields=['periodo', 'inicio']),
+        ]
+
+    def __str__(self):
+        return f"{self.periodo} {self.inicio} {self.servidor}.{self.base_datos}.{self.archivo}"
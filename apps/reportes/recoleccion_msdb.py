@@ -0,0 +1,288 @@
+# apps/reportes/recoleccion_msdb.py
+"""
+Recolección incremental del historial de msdb hacia BACKUPSGENERADOS y
+JOBSBACKUPGENERADOS.
+
+Reemplaza la carga por procedimientos almacenados (sp_BakGenerados) por un
+proceso programado (tarea beat 'reportes.recolectar_msdb' o el comando
+recolectar_msdb), fuera de las solicitudes web:
+
+- Marcas de agua por servidor y origen (MarcaRecoleccion): backup_set_id
+  de msdb.backupset e instance_id de msdb.sysjobhistory. Cada corrida lee
+  solo lo posterior a la marca, en lotes de 'tamano_lote' filas; cada lote
+  se escribe y avanza la marca en una misma transacción.
+- Inserción idempotente: cada lote se compara contra las filas ya cargadas
+  por su clave natural (servidor, base, fecha, hora, tipo y archivo para
+  backups; servidor, job, paso e inicio para jobs), así que repetir un
+  lote, una corrida interrumpida o un backfill no duplica filas.
+- Backfill: con desde=<fecha> se ignora la marca y se relee msdb desde esa
+  fecha; la marca solo avanza.
+
+Las consultas a msdb son SQL portable (el límite por lote se agrega según
+el motor) para que los tests usen tablas equivalentes en SQLite.
+"""
+import logging
+import re
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from .config import RECOLECCION_MSDB_CONFIG
+from .models import MarcaRecoleccion
+from .utils import limitar_consulta
+
+logger = logging.getLogger(__name__)
+
+# msdb.backupset.type
+TIPOS_BACKUP = {'D': 'FULL', 'I': 'DIFF', 'L': 'LOG'}
+
+# msdb.sysjobhistory.run_status
+RESULTADOS_JOB = {0: 'Fallido', 1: 'Exitoso', 2: 'Reintento', 3: 'Cancelado', 4: 'En curso'}
+
+CONSULTA_BACKUPS = """
+    SELECT b.backup_set_id, b.database_name, b.backup_finish_date, b.type, m.physical_device_name
+    FROM {msdb}backupset b
+    JOIN {msdb}backupmediafamily m ON m.media_set_id = b.media_set_id
+    WHERE b.backup_set_id > %s AND b.backup_finish_date >= %s
+    ORDER BY b.backup_set_id
+"""
+
+CONSULTA_JOBS = """
+    SELECT h.instance_id, j.name, h.step_id, h.step_name, h.run_status, h.run_date, h.run_time, h.message
+    FROM {msdb}sysjobhistory h
+    JOIN {msdb}sysjobs j ON j.job_id = h.job_id
+    WHERE h.instance_id > %s AND h.run_date >= %s{filtro}
+    ORDER BY h.instance_id
+"""
+
+INSERT_BACKUPS = """
+    INSERT INTO BACKUPSGENERADOS (SERVIDOR, DatabaseName, FECHA, HORA, TYPE, physical_device_name, IPSERVER)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+INSERT_JOBS = """
+    INSERT INTO JOBSBACKUPGENERADOS
+        (SERVIDOR, NOMBRE_DEL_JOB, PASO, FECHA_Y_HORA_INICIO, NOMBRE_DEL_PASO, RESULTADO, MENSAJE, IPSERVER)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+# Nombre de servidor vinculado: se interpola entre corchetes en la consulta
+_NOMBRE_VINCULADO = re.compile(r'^[A-Za-z0-9_.\-\\]+$')
+
+
+def obtener_servidores():
+    """Servidores configurados en settings.SERVIDORES_MONITOREADOS"""
+    return list(getattr(settings, 'SERVIDORES_MONITOREADOS', []))
+
+
+class OrigenMsdb:
+    """
+    Lectura por lotes del historial de msdb de un servidor.
+
+    Args:
+        conexion: Conexión de Django a la instancia (o la local para un
+            servidor vinculado)
+        prefijo: Prefijo de las tablas de msdb ('msdb.dbo.',
+            '[VINCULADO].msdb.dbo.' o '' para las tablas de prueba)
+    """
+
+    def __init__(self, conexion, prefijo='msdb.dbo.'):
+        self.conexion = conexion
+        self.prefijo = prefijo
+
+    @classmethod
+    def para_servidor(cls, servidor):
+        vinculado = servidor.get('vinculado')
+        if vinculado:
+            if not _NOMBRE_VINCULADO.match(vinculado):
+                raise ValueError(f'Nombre de servidor vinculado inválido: {vinculado}')
+            return cls(connection, f'[{vinculado}].msdb.dbo.')
+        return cls(connections[servidor.get('alias', 'default')])
+
+    def _leer(self, sql, params, limite):
+        # Un lote por consulta: el cursor no queda abierto mientras se escribe
+        # (la conexión puede ser la misma del destino)
+        with self.conexion.cursor() as cursor:
+            cursor.execute(limitar_consulta(sql, limite, self.conexion), params)
+            columnas = [col[0] for col in cursor.description]
+            return [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+
+    def backups(self, desde_id, desde_fecha, limite):
+        """
+        Archivos de backup con backup_set_id > desde_id.
+
+        Un backup en varios archivos (stripes) ocupa varias filas con el
+        mismo backup_set_id: si el lote se corta, el último set se descarta
+        para leerlo completo en el siguiente.
+        """
+        filas = self._leer(CONSULTA_BACKUPS.format(msdb=self.prefijo), [desde_id, desde_fecha], limite)
+        if len(filas) == limite:
+            ultimo = filas[-1]['backup_set_id']
+            completas = [fila for fila in filas if fila['backup_set_id'] != ultimo]
+            filas = completas or filas
+        return filas
+
+    def jobs(self, desde_id, desde_fecha, limite):
+        """Pasos de jobs (historial) con instance_id > desde_id"""
+        patron = RECOLECCION_MSDB_CONFIG['patron_jobs']
+        sql = CONSULTA_JOBS.format(msdb=self.prefijo, filtro=' AND j.name LIKE %s' if patron else '')
+        params = [desde_id, int(desde_fecha.strftime('%Y%m%d'))] + ([patron] if patron else [])
+        return self._leer(sql, params, limite)
+
+
+def _fecha_job(run_date, run_time):
+    return datetime.strptime(f'{int(run_date):08d}{int(run_time):06d}', '%Y%m%d%H%M%S')
+
+
+def _insertar_nuevos(cursor, consulta_existentes, params, registros, largo_clave, insert):
+    """Inserta los registros cuya clave (primeras largo_clave columnas) no existe"""
+    cursor.execute(consulta_existentes, params)
+    existentes = {tuple(fila) for fila in cursor.fetchall()}
+    nuevos = []
+    for registro in registros:
+        clave = registro[:largo_clave]
+        if clave not in existentes:
+            existentes.add(clave)
+            nuevos.append(registro)
+    if nuevos:
+        cursor.executemany(insert, nuevos)
+    return len(nuevos)
+
+
+def escribir_backups(servidor, filas):
+    """Inserta en BACKUPSGENERADOS los backups de filas que falten; devuelve la cantidad"""
+    registros = [(
+        servidor['nombre'],
+        fila['database_name'],
+        fila['backup_finish_date'].strftime('%d/%m/%Y'),
+        fila['backup_finish_date'].strftime('%H:%M:%S'),
+        TIPOS_BACKUP.get(fila['type'], fila['type']),
+        fila['physical_device_name'],
+        servidor.get('ip', ''),
+    ) for fila in filas]
+    fechas = sorted({registro[2] for registro in registros})
+    consulta = (
+        "SELECT SERVIDOR, DatabaseName, FECHA, HORA, TYPE, physical_device_name FROM BACKUPSGENERADOS "
+        f"WHERE SERVIDOR = %s AND FECHA IN ({', '.join(['%s'] * len(fechas))})"
+    )
+    with connection.cursor() as cursor:
+        return _insertar_nuevos(cursor, consulta, [servidor['nombre']] + fechas, registros, 6, INSERT_BACKUPS)
+
+
+def escribir_jobs(servidor, filas):
+    """Inserta en JOBSBACKUPGENERADOS los pasos de filas que falten; devuelve la cantidad"""
+    registros = [(
+        servidor['nombre'],
+        fila['name'],
+        fila['step_id'],
+        _fecha_job(fila['run_date'], fila['run_time']),
+        fila['step_name'],
+        RESULTADOS_JOB.get(fila['run_status'], str(fila['run_status'])),
+        fila['message'],
+        servidor.get('ip', ''),
+    ) for fila in filas]
+    inicios = [registro[3] for registro in registros]
+    consulta = (
+        "SELECT SERVIDOR, NOMBRE_DEL_JOB, PASO, FECHA_Y_HORA_INICIO FROM JOBSBACKUPGENERADOS "
+        "WHERE SERVIDOR = %s AND FECHA_Y_HORA_INICIO BETWEEN %s AND %s"
+    )
+    with connection.cursor() as cursor:
+        return _insertar_nuevos(
+            cursor, consulta, [servidor['nombre'], min(inicios), max(inicios)], registros, 4, INSERT_JOBS
+        )
+
+
+ORIGENES = {
+    MarcaRecoleccion.ORIGEN_BACKUPS: ('backups', 'backup_set_id', escribir_backups),
+    MarcaRecoleccion.ORIGEN_JOBS: ('jobs', 'instance_id', escribir_jobs),
+}
+
+
+def recolectar_origen(servidor, origen, lector, desde=None, tamano_lote=None):
+    """
+    Recolecta un origen ('backups' o 'jobs') de un servidor por lotes.
+
+    Args:
+        servidor: Entrada de SERVIDORES_MONITOREADOS
+        origen: MarcaRecoleccion.ORIGEN_BACKUPS u ORIGEN_JOBS
+        lector: OrigenMsdb del servidor
+        desde: date para backfill (ignora la marca de agua)
+        tamano_lote: Filas por lote (por defecto 'tamano_lote')
+
+    Returns:
+        dict: {'servidor', 'origen', 'lotes', 'leidas', 'insertadas', 'ultimo_id'}
+    """
+    metodo, columna_id, escribir = ORIGENES[origen]
+    tamano_lote = tamano_lote or RECOLECCION_MSDB_CONFIG['tamano_lote']
+    marca, _ = MarcaRecoleccion.objects.get_or_create(servidor=servidor['nombre'], origen=origen)
+
+    if desde is not None:
+        desde_id, desde_fecha = 0, datetime.combine(desde, datetime.min.time())
+    elif marca.ultimo_id:
+        desde_id, desde_fecha = marca.ultimo_id, datetime(1900, 1, 1)
+    else:
+        desde_id = 0
+        desde_fecha = datetime.combine(
+            timezone.localdate() - timedelta(days=RECOLECCION_MSDB_CONFIG['dias_iniciales']), datetime.min.time()
+        )
+
+    resumen = {'servidor': servidor['nombre'], 'origen': origen, 'lotes': 0, 'leidas': 0, 'insertadas': 0}
+    for _ in range(RECOLECCION_MSDB_CONFIG['max_lotes_por_corrida']):
+        filas = getattr(lector, metodo)(desde_id, desde_fecha, tamano_lote)
+        if not filas:
+            break
+        ultimo_id = filas[-1][columna_id]
+
+        with transaction.atomic():
+            # El bloqueo de la marca serializa corridas simultáneas del mismo origen
+            marca = MarcaRecoleccion.objects.select_for_update().get(pk=marca.pk)
+            insertadas = escribir(servidor, filas)
+            marca.ultimo_id = max(marca.ultimo_id, ultimo_id)
+            marca.filas_insertadas += insertadas
+            marca.ultima_ejecucion = timezone.now()
+            marca.save(update_fields=['ultimo_id', 'filas_insertadas', 'ultima_ejecucion'])
+
+        resumen['lotes'] += 1
+        resumen['leidas'] += len(filas)
+        resumen['insertadas'] += insertadas
+        # Se sigue hasta un lote vacío: backups() puede devolver menos filas
+        # que el límite aunque queden más
+        desde_id = ultimo_id
+
+    resumen['ultimo_id'] = marca.ultimo_id
+    return resumen
+
+
+def recolectar(servidores=None, desde=None, tamano_lote=None, crear_lector=None):
+    """
+    Recolecta backups y jobs de todos los servidores.
+
+    Un error en un servidor se registra y no detiene a los demás.
+
+    Args:
+        servidores: Lista de servidores (por defecto obtener_servidores())
+        desde: date para backfill
+        tamano_lote: Filas por lote
+        crear_lector: Fábrica servidor -> OrigenMsdb (por defecto
+            OrigenMsdb.para_servidor; los tests usan tablas locales)
+
+    Returns:
+        list: Resúmenes de recolectar_origen; los fallidos traen 'error'
+    """
+    crear_lector = crear_lector or OrigenMsdb.para_servidor
+    resultados = []
+    for servidor in obtener_servidores() if servidores is None else servidores:
+        for origen in ORIGENES:
+            try:
+                resultado = recolectar_origen(servidor, origen, crear_lector(servidor), desde, tamano_lote)
+                logger.info(
+                    f"Recolección {servidor['nombre']}.{origen}: {resultado['insertadas']} "
+                    f"filas nuevas de {resultado['leidas']} leídas"
+                )
+            except Exception as e:
+                logger.error(f"Error recolectando {origen} de {servidor.get('nombre')}: {e}")
+                resultado = {'servidor': servidor.get('nombre'), 'origen': origen, 'error': str(e)}
+            resultados.append(resultado)
+    return resultados
@@ -0,0 +1,117 @@
+# apps/reportes/recolectores.py
+"""
+Ejecución condicionada de los procedimientos recolectores.
+
+sp_MonitorDatabaseStatus, usp_MonitorDatabaseStatus y usp_MonitorDiskGrowth
+insertan una pasada de monitoreo en DatabaseStatusLog / DiskGrowthLog. Las
+vistas de estados y crecimiento de discos (y sus exportaciones) los
+ejecutaban en cada solicitud, así que cada página vista escribía en las
+tablas de log y las hacía crecer.
+
+refrescar_si_vencido() solo ejecuta el recolector si su última ejecución
+exitosa (EjecucionRecolector) es más antigua que 'max_antiguedad':
+
+- Lectura rápida: si está vigente no se toma ningún bloqueo.
+- Reserva entre procesos: en una transacción corta se bloquea la fila del
+  recolector con select_for_update(skip_locked=True), se vuelve a comprobar
+  la antigüedad (otro proceso pudo terminar mientras tanto) y se marca
+  'en_ejecucion_desde'. Mientras la marca esté vigente (menos de
+  RECOLECTORES_TIEMPO_MAXIMO segundos) ningún otro proceso lo ejecuta.
+- El EXEC corre en autocommit, fuera de toda transacción de Django: las
+  filas que inserta el procedimiento se confirman como en la ejecución
+  directa, las lecturas concurrentes de las tablas de log no quedan
+  bloqueadas por una transacción abierta y los INSERT…EXEC contra
+  servidores vinculados no se promueven a transacciones distribuidas.
+- Al terminar se registra la hora, duración y error, y se libera la marca.
+
+Nunca lanza excepciones: un fallo del recolector no impide la lectura.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .config import RECOLECTORES_CONFIG, RECOLECTORES_ESPERA_TRAS_ERROR, RECOLECTORES_TIEMPO_MAXIMO
+from .models import EjecucionRecolector
+
+logger = logging.getLogger(__name__)
+
+
+def _ejecutar(nombre):
+    # El nombre viene de RECOLECTORES_CONFIG (lista blanca)
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXEC {nombre}")
+
+
+def _vigente(registro, max_antiguedad):
+    ahora = timezone.now()
+    # Otro proceso lo está ejecutando (una marca vencida es de un proceso caído)
+    if registro.en_ejecucion_desde and registro.en_ejecucion_desde >= ahora - timedelta(seconds=RECOLECTORES_TIEMPO_MAXIMO):
+        return True
+    if registro.ultima_exitosa and registro.ultima_exitosa >= ahora - timedelta(seconds=max_antiguedad):
+        return True
+    # Tras un error no se reintenta en cada solicitud
+    return bool(
+        registro.ultimo_error and registro.ultimo_intento
+        and registro.ultimo_intento >= ahora - timedelta(seconds=RECOLECTORES_ESPERA_TRAS_ERROR)
+    )
+
+
+def refrescar_si_vencido(nombre, max_antiguedad=None):
+    """
+    Ejecuta el procedimiento recolector si sus datos están vencidos.
+
+    Args:
+        nombre: Procedimiento definido en RECOLECTORES_CONFIG
+        max_antiguedad: Segundos (por defecto el de RECOLECTORES_CONFIG)
+
+    Returns:
+        bool: True si se ejecutó con éxito en esta llamada
+    """
+    if nombre not in RECOLECTORES_CONFIG:
+        raise ValueError(f'Recolector no configurado: {nombre}')
+    if max_antiguedad is None:
+        max_antiguedad = RECOLECTORES_CONFIG[nombre]['max_antiguedad']
+
+    try:
+        registro, _ = EjecucionRecolector.objects.get_or_create(nombre=nombre)
+        if _vigente(registro, max_antiguedad):
+            return False
+
+        # Reserva en una transacción corta: el bloqueo no se mantiene durante el EXEC
+        with transaction.atomic():
+            registro = EjecucionRecolector.objects.select_for_update(skip_locked=True).filter(pk=registro.pk).first()
+            if registro is None:
+                logger.info(f"{nombre} ya se está ejecutando en otro proceso")
+                return False
+            if _vigente(registro, max_antiguedad):
+                return False
+            registro.ultimo_intento = registro.en_ejecucion_desde = timezone.now()
+            registro.save(update_fields=['ultimo_intento', 'en_ejecucion_desde'])
+    except Exception as e:
+        logger.error(f"Error verificando la vigencia de {nombre}: {e}")
+        return False
+
+    inicio = time.perf_counter()
+    try:
+        _ejecutar(nombre)
+        error = ''
+    except Exception as e:
+        error = str(e)
+        logger.warning(f"Error ejecutando el recolector {nombre}: {e}")
+    duracion = time.perf_counter() - inicio
+
+    try:
+        campos = {'en_ejecucion_desde': None, 'ultimo_error': error}
+        if not error:
+            campos.update(ultima_exitosa=timezone.now(), duracion_segundos=duracion)
+        EjecucionRecolector.objects.filter(pk=registro.pk).update(**campos)
+    except Exception as e:
+        logger.error(f"Error registrando la ejecución de {nombre}: {e}")
+    if error:
+        return False
+
+    logger.info(f"Recolector {nombre} ejecutado en {duracion:.2f} s")
+    return True
@@ -0,0 +1,342 @@
+# apps/reportes/resumen_discos.py
+"""
+Resúmenes de DiskGrowthLog y series del gráfico de crecimiento de discos.
+
+El gráfico del reporte de crecimiento de discos recalculaba en cada carga
+un GROUP BY CONVERT(date, LogDate) de los últimos 7 días sobre el log
+completo y luego lo recortaba a 50 puntos. Ahora:
+
+- ResumenDiskGrowth guarda por día y por semana (desde el lunes), para cada
+  servidor, base de datos y archivo, el mínimo, máximo y último valor de
+  FileSizeMB y DiskFreeMB. actualizar_resumenes() lo mantiene de forma
+  incremental: lee solo las filas con LogID mayor al último incorporado,
+  en lotes de 'tamano_lote', y cada lote se fusiona con los resúmenes
+  existentes en una transacción. Se ejecuta fuera de las solicitudes web:
+  con la tarea beat 'reportes.actualizar_resumenes_discos' o con el
+  comando actualizar_resumenes_discos. Las vistas solo leen los resúmenes.
+- series_crecimiento() elige la resolución según el rango pedido (muestras
+  de DiskGrowthLog para rangos cortos, resumen diario o semanal para los
+  largos) y reduce cada serie en el servidor con LTTB a 'puntos_grafico'
+  puntos, conservando la forma de la curva.
+"""
+import logging
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .config import RESUMEN_DISCOS_CONFIG
+from .models import ResumenDiskGrowth
+from .utils import ejecutar_consulta_personalizada, limitar_consulta
+
+logger = logging.getLogger(__name__)
+
+CONSULTA_LOG = """
+    SELECT LogID, ServerIP, DatabaseName, FileName, FileSizeMB, DiskFreeMB, LogDate
+    FROM DiskGrowthLog
+    WHERE LogID > %s
+    ORDER BY LogID
+"""
+
+CONSULTA_MUESTRAS = """
+    SELECT ServerIP, DatabaseName, FileName, FileSizeMB, LogDate
+    FROM DiskGrowthLog
+    WHERE LogDate >= %s AND LogDate < %s{filtros}
+    ORDER BY LogDate
+"""
+
+RESOLUCION_CRUDA = 'crudo'
+
+RESOLUCIONES = {
+    RESOLUCION_CRUDA: 'Muestras',
+    ResumenDiskGrowth.PERIODO_DIA: 'Diario',
+    ResumenDiskGrowth.PERIODO_SEMANA: 'Semanal',
+}
+
+CAMPOS_RESUMEN = [
+    'tamano_min_mb', 'tamano_max_mb', 'tamano_ultimo_mb',
+    'libre_min_mb', 'libre_max_mb', 'libre_ultimo_mb',
+    'muestras', 'ultima_fecha', 'ultimo_log_id',
+]
+
+
+def _inicio_periodo(periodo, dia):
+    if periodo == ResumenDiskGrowth.PERIODO_SEMANA:
+        return dia - timedelta(days=dia.weekday())
+    return dia
+
+
+def _decimal(valor):
+    return None if valor is None else Decimal(str(valor)).quantize(Decimal('0.01'))
+
+
+def _menor(actual, valor):
+    if valor is None:
+        return actual
+    return valor if actual is None else min(actual, valor)
+
+
+def _mayor(actual, valor):
+    if valor is None:
+        return actual
+    return valor if actual is None else max(actual, valor)
+
+
+def _clave(periodo, fila, fecha):
+    return (
+        periodo,
+        _inicio_periodo(periodo, timezone.localtime(fecha).date()),
+        fila['ServerIP'] or '',
+        fila['DatabaseName'] or '',
+        fila['FileName'] or '',
+    )
+
+
+def _fecha_log(valor):
+    # LogDate se guarda en hora local del servidor (GETDATE())
+    return timezone.make_aware(valor) if timezone.is_naive(valor) else valor
+
+
+def _aplicar(resumen, fila, fecha):
+    tamano, libre = _decimal(fila['FileSizeMB']), _decimal(fila['DiskFreeMB'])
+    resumen.tamano_min_mb = _menor(resumen.tamano_min_mb, tamano)
+    resumen.tamano_max_mb = _mayor(resumen.tamano_max_mb, tamano)
+    resumen.libre_min_mb = _menor(resumen.libre_min_mb, libre)
+    resumen.libre_max_mb = _mayor(resumen.libre_max_mb, libre)
+    if resumen.ultima_fecha is None or fecha >= resumen.ultima_fecha:
+        resumen.ultima_fecha = fecha
+        resumen.tamano_ultimo_mb = tamano
+        resumen.libre_ultimo_mb = libre
+    resumen.muestras += 1
+    resumen.ultimo_log_id = max(resumen.ultimo_log_id, fila['LogID'])
+
+
+def _incorporar(filas):
+    """Fusiona un lote de DiskGrowthLog con los resúmenes existentes"""
+    fechas = [_fecha_log(fila['LogDate']) for fila in filas]
+    claves = {
+        _clave(periodo, fila, fecha)
+        for fila, fecha in zip(filas, fechas)
+        for periodo, _ in ResumenDiskGrowth.PERIODOS
+    }
+
+    resumenes = {}
+    existentes = ResumenDiskGrowth.objects.filter(
+        inicio__in={clave[1] for clave in claves},
+        servidor__in={clave[2] for clave in claves},
+    )
+    for resumen in existentes:
+        clave = (resumen.periodo, resumen.inicio, resumen.servidor, resumen.base_datos, resumen.archivo)
+        if clave in claves:
+            resumenes[clave] = resumen
+
+    nuevos = []
+    for fila, fecha in zip(filas, fechas):
+        for periodo, _ in ResumenDiskGrowth.PERIODOS:
+            clave = _clave(periodo, fila, fecha)
+            resumen = resumenes.get(clave)
+            if resumen is None:
+                resumen = ResumenDiskGrowth(
+                    periodo=clave[0], inicio=clave[1], servidor=clave[2],
+                    base_datos=clave[3], archivo=clave[4],
+                )
+                resumenes[clave] = resumen
+                nuevos.append(resumen)
+            _aplicar(resumen, fila, fecha)
+
+    actualizados = [resumen for resumen in resumenes.values() if resumen.pk is not None]
+    ResumenDiskGrowth.objects.bulk_create(nuevos, batch_size=500)
+    ResumenDiskGrowth.objects.bulk_update(actualizados, CAMPOS_RESUMEN, batch_size=500)
+    return len(resumenes)
+
+
+def actualizar_resumenes(tamano_lote=None, max_lotes=None):
+    """
+    Incorpora a ResumenDiskGrowth las filas nuevas de DiskGrowthLog.
+
+    Args:
+        tamano_lote: Filas por lote (por defecto RESUMEN_DISCOS_CONFIG)
+        max_lotes: Tope de lotes en esta corrida (por defecto RESUMEN_DISCOS_CONFIG)
+
+    Returns:
+        dict: {'muestras': filas leídas, 'resumenes': resúmenes escritos, 'ultimo_log_id'}
+    """
+    tamano_lote = tamano_lote or RESUMEN_DISCOS_CONFIG['tamano_lote']
+    max_lotes = max_lotes or RESUMEN_DISCOS_CONFIG['max_lotes_por_corrida']
+    desde = ResumenDiskGrowth.objects.aggregate(marca=Max('ultimo_log_id'))['marca'] or 0
+    resultado = {'muestras': 0, 'resumenes': 0, 'ultimo_log_id': desde}
+
+    for _ in range(max_lotes):
+        # Consulta directa: un error debe detener la corrida, no leerse como "sin filas"
+        with connection.cursor() as cursor:
+            cursor.execute(limitar_consulta(CONSULTA_LOG, tamano_lote), [desde])
+            columnas = [col[0] for col in cursor.description]
+            filas = [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+        if not filas:
+            break
+
+        with transaction.atomic():
+            resultado['resumenes'] += _incorporar(filas)
+        desde = filas[-1]['LogID']
+        resultado['muestras'] += len(filas)
+        resultado['ultimo_log_id'] = desde
+
+    if resultado['muestras']:
+        logger.info(
+            f"Resúmenes de DiskGrowthLog: {resultado['muestras']} muestras hasta LogID {desde}"
+        )
+    return resultado
+
+
+def reconstruir_resumenes(tamano_lote=None):
+    """
+    Borra los resúmenes y los recalcula desde todo DiskGrowthLog (en una
+    transacción: el gráfico sigue leyendo los anteriores hasta terminar)
+    """
+    resultado = {'muestras': 0, 'resumenes': 0, 'ultimo_log_id': 0}
+    with transaction.atomic():
+        ResumenDiskGrowth.objects.all().delete()
+        while True:
+            parcial = actualizar_resumenes(tamano_lote)
+            if not parcial['muestras']:
+                return resultado
+            resultado['muestras'] += parcial['muestras']
+            resultado['resumenes'] += parcial['resumenes']
+            resultado['ultimo_log_id'] = parcial['ultimo_log_id']
+
+
+def lttb(puntos, umbral):
+    """
+    Largest-Triangle-Three-Buckets: reduce una serie a 'umbral' puntos.
+
+    Conserva el primero y el último; de cada balde intermedio elige el punto
+    que forma el triángulo de mayor área con el punto elegido antes y el
+    promedio del balde siguiente, así que se mantienen picos y cambios de
+    pendiente.
+
+    Args:
+        puntos: Secuencia de tuplas (x, y, ...) ordenada por x numérica
+        umbral: Número de puntos a conservar
+
+    Returns:
+        list: Las tuplas elegidas, en orden
+    """
+    total = len(puntos)
+    if umbral >= total or umbral < 3:
+        return list(puntos)
+
+    muestreados = [puntos[0]]
+    ancho = (total - 2) / (umbral - 2)
+    anterior = 0
+
+    for balde in range(umbral - 2):
+        siguiente = puntos[int((balde + 1) * ancho) + 1:min(int((balde + 2) * ancho) + 1, total)]
+        x_promedio = sum(punto[0] for punto in siguiente) / len(siguiente)
+        y_promedio = sum(punto[1] for punto in siguiente) / len(siguiente)
+
+        ax, ay = puntos[anterior][0], puntos[anterior][1]
+        elegido, area_maxima = None, -1
+        for indice in range(int(balde * ancho) + 1, int((balde + 1) * ancho) + 1):
+            x, y = puntos[indice][0], puntos[indice][1]
+            area = abs((ax - x_promedio) * (y - ay) - (ax - x) * (y_promedio - ay))
+            if area > area_maxima:
+                elegido, area_maxima = indice, area
+
+        muestreados.append(puntos[elegido])
+        anterior = elegido
+
+    muestreados.append(puntos[-1])
+    return muestreados
+
+
+def resolucion_para_rango(dias):
+    """Resolución del gráfico para un rango de 'dias' días"""
+    if dias <= RESUMEN_DISCOS_CONFIG['dias_maximos_crudo']:
+        return RESOLUCION_CRUDA
+    if dias <= RESUMEN_DISCOS_CONFIG['dias_maximos_diario']:
+        return ResumenDiskGrowth.PERIODO_DIA
+    return ResumenDiskGrowth.PERIODO_SEMANA
+
+
+def _muestras_crudas(inicio, fin, servidor, base_datos):
+    filtros, params = '', [
+        datetime.combine(inicio, datetime.min.time()),
+        datetime.combine(fin + timedelta(days=1), datetime.min.time()),
+    ]
+    if servidor:
+        filtros += ' AND ServerIP LIKE %s'
+        params.append(f'%{servidor}%')
+    if base_datos:
+        filtros += ' AND DatabaseName LIKE %s'
+        params.append(f'%{base_datos}%')
+
+    for fila in ejecutar_consulta_personalizada(CONSULTA_MUESTRAS.format(filtros=filtros), params):
+        fecha = fila['LogDate']
+        if timezone.is_aware(fecha):
+            fecha = timezone.localtime(fecha).replace(tzinfo=None)
+        clave = (fila['ServerIP'] or '', fila['DatabaseName'] or '', fila['FileName'] or '')
+        yield clave, fecha, fila['FileSizeMB']
+
+
+def _muestras_resumen(periodo, inicio, fin, servidor, base_datos):
+    resumenes = ResumenDiskGrowth.objects.filter(
+        periodo=periodo,
+        inicio__gte=_inicio_periodo(periodo, inicio),
+        inicio__lte=fin,
+    )
+    if servidor:
+        resumenes = resumenes.filter(servidor__icontains=servidor)
+    if base_datos:
+        resumenes = resumenes.filter(base_datos__icontains=base_datos)
+
+    for resumen in resumenes.order_by('inicio').iterator():
+        clave = (resumen.servidor, resumen.base_datos, resumen.archivo)
+        yield clave, datetime.combine(resumen.inicio, datetime.min.time()), resumen.tamano_ultimo_mb
+
+
+def series_crecimiento(fecha_inicio, fecha_fin, servidor='', base_datos='', puntos=None):
+    """
+    Series de tamaño (FileSizeMB) por servidor, base y archivo para el gráfico.
+
+    Args:
+        fecha_inicio, fecha_fin: Fechas 'YYYY-MM-DD' (inclusivas)
+        servidor, base_datos: Filtros parciales (como los del reporte)
+        puntos: Puntos por serie (por defecto RESUMEN_DISCOS_CONFIG['puntos_grafico'])
+
+    Returns:
+        dict: {'resolucion', 'resolucion_nombre', 'series': [{'nombre', 'puntos': [{'x', 'y'}]}]}
+    """
+    inicio = datetime.strptime(fecha_inicio, '%Y-%m-%d').date()
+    fin = datetime.strptime(fecha_fin, '%Y-%m-%d').date()
+    puntos = puntos or RESUMEN_DISCOS_CONFIG['puntos_grafico']
+    resolucion = resolucion_para_rango((fin - inicio).days + 1)
+
+    if resolucion == RESOLUCION_CRUDA:
+        muestras = _muestras_crudas(inicio, fin, servidor, base_datos)
+    else:
+        muestras = _muestras_resumen(resolucion, inicio, fin, servidor, base_datos)
+
+    series = {}
+    for clave, fecha, tamano in muestras:
+        if tamano is not None:
+            series.setdefault(clave, []).append((fecha.timestamp(), float(tamano), fecha))
+
+    # Los archivos más grandes primero (último valor de la serie)
+    claves = sorted(series, key=lambda clave: series[clave][-1][1], reverse=True)
+    formato = '%Y-%m-%dT%H:%M' if resolucion == RESOLUCION_CRUDA else '%Y-%m-%d'
+    return {
+        'resolucion': resolucion,
+        'resolucion_nombre': RESOLUCIONES[resolucion],
+        'series': [
+            {
+                'nombre': ' - '.join(parte for parte in clave if parte),
+                'puntos': [
+                    {'x': fecha.strftime(formato), 'y': round(y, 2)}
+                    for _, y, fecha in lttb(series[clave], puntos)
+                ],
+            }
+            for clave in claves[:RESUMEN_DISCOS_CONFIG['max_series']]
+        ],
+    }
@@ -0,0 +1,116 @@
+# apps/reportes/snapshot_dashboard.py
+"""
+Snapshot de sp_DashboardMetrics para el dashboard.
+
+dashboard_view y api_dashboard_metrics ejecutaban el SP (5 conjuntos de
+resultados) en cada solicitud, y la plantilla consulta la API cada 5
+minutos por pestaña abierta. Ahora un único refrescador guarda en el cache
+el último resultado ya estructurado y las vistas solo leen ese snapshot:
+
+- Refrescador: la tarea de Celery beat 'reportes.refrescar_dashboard' o el
+  comando refrescar_dashboard (bucle, para servidores sin Celery).
+- Respaldo en proceso: si el snapshot falta o supera 'max_antiguedad' (no
+  corre ningún refrescador, o el cache es LocMemCache y cada proceso tiene
+  el suyo), la solicitud lo refresca; las concurrentes comparten esa única
+  ejecución (coalescencia.ejecutar_una_vez).
+
+El snapshot guarda 'generado' (cuándo cambiaron los datos por última vez)
+y 'verificado' (último refresco): un refresco que trae los mismos datos no
+mueve 'generado', así la API puede responder "sin cambios desde <ts>".
+"""
+import hashlib
+import json
+import logging
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .coalescencia import ejecutar_una_vez
+from .config import DASHBOARD_SNAPSHOT_CONFIG
+from .utils import ejecutar_sp_dashboard_metrics
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'reportes:dashboard:snapshot'
+HUELLA_REFRESCO = 'dashboard:snapshot'
+
+# Métricas que publican la API y el canal de eventos del dashboard
+METRICAS_API = (
+    'total_servidores',
+    'total_bases_datos',
+    'backups_hoy',
+    'backups_semana',
+    'total_backups_historico',
+    'total_jobs_historico',
+)
+
+
+def _version(datos):
+    firma = json.dumps(datos, default=str, sort_keys=True)
+    return hashlib.md5(firma.encode('utf-8')).hexdigest()
+
+
+def refrescar_snapshot():
+    """
+    Ejecuta sp_DashboardMetrics y guarda el snapshot.
+
+    Si el SP falla (ejecutar_sp_dashboard_metrics devuelve la estructura
+    vacía) se conserva el snapshot anterior.
+
+    Returns:
+        dict | None: {'datos', 'version', 'generado', 'verificado'} o None si
+            el SP falló y no había snapshot
+    """
+    anterior = cache.get(CACHE_KEY)
+    datos = ejecutar_sp_dashboard_metrics()
+    if not datos.get('metricas'):
+        logger.warning("sp_DashboardMetrics sin métricas; se conserva el snapshot anterior")
+        return anterior
+
+    ahora = timezone.now()
+    version = _version(datos)
+    snapshot = {
+        'datos': datos,
+        'version': version,
+        'generado': anterior['generado'] if anterior and anterior['version'] == version else ahora,
+        'verificado': ahora,
+    }
+    # Sin expiración: la antigüedad se controla con 'verificado'
+    cache.set(CACHE_KEY, snapshot, None)
+    logger.info(f"Snapshot del dashboard refrescado (generado {snapshot['generado'].isoformat()})")
+    return snapshot
+
+
+def _vigente(snapshot):
+    if snapshot is None:
+        return False
+    antiguedad = (timezone.now() - snapshot['verificado']).total_seconds()
+    return antiguedad <= DASHBOARD_SNAPSHOT_CONFIG['max_antiguedad']
+
+
+def obtener_snapshot():
+    """
+    Devuelve el snapshot vigente del dashboard sin ejecutar el SP salvo que
+    falte o esté vencido (respaldo en proceso, coalescido).
+
+    Returns:
+        dict | None: Ver refrescar_snapshot(). El mismo objeto puede
+            entregarse a varios llamadores: no modificarlo.
+    """
+    snapshot = cache.get(CACHE_KEY)
+    if _vigente(snapshot) or not DASHBOARD_SNAPSHOT_CONFIG['refresco_en_solicitud']:
+        return snapshot
+
+    nuevo, _ = ejecutar_una_vez(HUELLA_REFRESCO, refrescar_snapshot)
+    return nuevo or snapshot
+
+
+def sin_cambios_desde(snapshot, desde):
+    """True si los datos del snapshot no cambiaron después de desde (datetime)"""
+    return snapshot is not None and desde is not None and snapshot['generado'] <= desde
+
+
+def metricas_api(snapshot):
+    """Valores de METRICAS_API del snapshot (0 si faltan)"""
+    metricas = snapshot['datos'].get('metricas', {}) if snapshot else {}
+    return {clave: metricas.get(clave, 0) for clave in METRICAS_API}
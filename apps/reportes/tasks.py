@@ -0,0 +1,40 @@
+# apps/reportes/tasks.py
+"""
+Tareas de Celery del módulo de reportes
+"""
+from celery import shared_task
+
+from .recoleccion_msdb import recolectar
+from .resumen_discos import actualizar_resumenes
+from .snapshot_dashboard import refrescar_snapshot
+from .trabajos_exportacion import limpiar_exportaciones, procesar_exportacion
+
+
+@shared_task(name='reportes.generar_exportacion', ignore_result=True)
+def generar_exportacion_task(trabajo_id):
+    """Genera el archivo de un TrabajoExportacion"""
+    procesar_exportacion(trabajo_id)
+
+
+@shared_task(name='reportes.limpiar_exportaciones', ignore_result=True)
+def limpiar_exportaciones_task():
+    """Elimina las exportaciones vencidas (programada con Celery beat)"""
+    return limpiar_exportaciones()
+
+
+@shared_task(name='reportes.refrescar_dashboard', ignore_result=True)
+def refrescar_dashboard_task():
+    """Refresca el snapshot de sp_DashboardMetrics (programada con Celery beat)"""
+    refrescar_snapshot()
+
+
+@shared_task(name='reportes.recolectar_msdb', ignore_result=True)
+def recolectar_msdb_task():
+    """Recolecta el historial nuevo de msdb (programada con Celery beat)"""
+    recolectar()
+
+
+@shared_task(name='reportes.actualizar_resumenes_discos', ignore_result=True)
+def actualizar_resumenes_discos_task():
+    """Incorpora DiskGrowthLog nuevo a los resúmenes diarios/semanales (programada con Celery beat)"""
+    actualizar_resumenes()
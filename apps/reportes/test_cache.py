@@ -0,0 +1,158 @@
+# apps/reportes/test_cache.py
+"""
+Tests para el cache de resultados de procedimientos almacenados
+"""
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from .utils import (
+    construir_clave_cache,
+    debe_omitir_cache,
+    ejecutar_procedimiento_almacenado,
+    invalidar_cache_procedimiento,
+    obtener_estadisticas_cache,
+    reiniciar_estadisticas_cache,
+)
+
+
+def _cursor_falso(filas, columnas=('SERVIDOR', 'TOTAL')):
+    """Crea un cursor simulado que devuelve las filas indicadas"""
+    cursor = mock.MagicMock()
+    cursor.description = [(c,) for c in columnas]
+    cursor.fetchall.return_value = filas
+    conexion = mock.MagicMock()
+    conexion.cursor.return_value.__enter__.return_value = cursor
+    return conexion, cursor
+
+
+class CacheProcedimientosTest(TestCase):
+    """Tests para el cache de ejecutar_procedimiento_almacenado"""
+
+    def setUp(self):
+        cache.clear()
+        reiniciar_estadisticas_cache()
+
+    def test_segunda_llamada_usa_cache(self):
+        """La misma consulta solo debe llegar una vez a SQL Server"""
+        conexion, cursor = _cursor_falso([('SRV01', 10)])
+        with mock.patch('apps.reportes.utils.connection', conexion):
+            primero = ejecutar_procedimiento_almacenado('sp_Programaciondebcks', ['2024-01-01', '2024-01-31'])
+            segundo = ejecutar_procedimiento_almacenado('sp_Programaciondebcks', ['2024-01-01', '2024-01-31'])
+
+        self.assertEqual(cursor.execute.call_count, 1)
+        self.assertEqual(primero, segundo)
+        stats = obtener_estadisticas_cache()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_clave_usa_parametros_normalizados(self):
+        """Fechas con / y con - deben compartir la entrada de cache"""
+        self.assertEqual(
+            construir_clave_cache('sp_resultadoJobsBck', ['2024/01/01', '2024/01/31']),
+            construir_clave_cache('sp_resultadoJobsBck', ['2024-01-01', '2024-01-31'])
+        )
+        self.assertNotEqual(
+            construir_clave_cache('sp_resultadoJobsBck', ['2024-01-01', '2024-01-31']),
+            construir_clave_cache('sp_resultadoJobsBck', ['2024-01-01', '2024-02-29'])
+        )
+
+    def test_resultado_cacheado_no_se_modifica(self):
+        """Modificar el resultado devuelto no debe alterar el cache"""
+        conexion, _ = _cursor_falso([('SRV01', 10)])
+        with mock.patch('apps.reportes.utils.connection', conexion):
+            resultado = ejecutar_procedimiento_almacenado('sp_ultimosbck', ['2024-01-01', '2024-01-31'])
+            resultado[0]['css_class'] = 'success'
+            cacheado = ejecutar_procedimiento_almacenado('sp_ultimosbck', ['2024-01-01', '2024-01-31'])
+
+        self.assertNotIn('css_class', cacheado[0])
+
+    def test_bypass_consulta_y_refresca(self):
+        """use_cache=False debe consultar SQL Server y actualizar el cache"""
+        conexion, cursor = _cursor_falso([('SRV01', 10)])
+        with mock.patch('apps.reportes.utils.connection', conexion):
+            ejecutar_procedimiento_almacenado('sp_Programaciondebcks', ['2024-01-01', '2024-01-31'])
+            cursor.fetchall.return_value = [('SRV01', 20)]
+            fresco = ejecutar_procedimiento_almacenado(
+                'sp_Programaciondebcks', ['2024-01-01', '2024-01-31'], use_cache=False
+            )
+            cacheado = ejecutar_procedimiento_almacenado('sp_Programaciondebcks', ['2024-01-01', '2024-01-31'])
+
+        self.assertEqual(cursor.execute.call_count, 2)
+        self.assertEqual(fresco[0]['TOTAL'], 20)
+        self.assertEqual(cacheado[0]['TOTAL'], 20)
+        self.assertEqual(obtener_estadisticas_cache()['bypass'], 1)
+
+    def test_invalidacion(self):
+        """Tras invalidar, la siguiente llamada debe volver a SQL Server"""
+        conexion, cursor = _cursor_falso([('SRV01', 10)])
+        with mock.patch('apps.reportes.utils.connection', conexion):
+            ejecutar_procedimiento_almacenado('sp_Programaciondebcks', ['2024-01-01', '2024-01-31'])
+            ejecutar_procedimiento_almacenado('sp_ultimosbck', ['2024-01-01', '2024-01-31'])
+            invalidar_cache_procedimiento('sp_Programaciondebcks')
+            ejecutar_procedimiento_almacenado('sp_Programaciondebcks', ['2024-01-01', '2024-01-31'])
+            ejecutar_procedimiento_almacenado('sp_ultimosbck', ['2024-01-01', '2024-01-31'])
+            self.assertEqual(cursor.execute.call_count, 3)
+
+            invalidar_cache_procedimiento()
+            ejecutar_procedimiento_almacenado('sp_ultimosbck', ['2024-01-01', '2024-01-31'])
+            self.assertEqual(cursor.execute.call_count, 4)
+
+    def test_errores_no_se_cachean(self):
+        """Un fallo de SQL Server no debe dejar una lista vacía en cache"""
+        conexion, cursor = _cursor_falso([('SRV01', 10)])
+        cursor.execute.side_effect = [Exception('timeout'), None]
+        with mock.patch('apps.reportes.utils.connection', conexion):
+            self.assertEqual(ejecutar_procedimiento_almacenado('sp_Programaciondebcks', ['2024-01-01', '2024-01-31']), [])
+            resultado = ejecutar_procedimiento_almacenado('sp_Programaciondebcks', ['2024-01-01', '2024-01-31'])
+
+        self.assertEqual(len(resultado), 1)
+
+    def test_recolectores_no_se_cachean(self):
+        """Los SP que escriben en tablas de log siempre deben ejecutarse"""
+        conexion, cursor = _cursor_falso([])
+        with mock.patch('apps.reportes.utils.connection', conexion):
+            ejecutar_procedimiento_almacenado('sp_MonitorDatabaseStatus')
+            ejecutar_procedimiento_almacenado('sp_MonitorDatabaseStatus')
+
+        self.assertEqual(cursor.execute.call_count, 2)
+
+    def test_jobs_no_se_cachean(self):
+        """La página y la exportación de jobs usan la consulta paginada, no el SP"""
+        conexion, cursor = _cursor_falso([('SRV01', 10)])
+        with mock.patch('apps.reportes.utils.connection', conexion):
+            ejecutar_procedimiento_almacenado('sp_resultadoJobsBck', ['2024-01-01', '2024-01-31'])
+            ejecutar_procedimiento_almacenado('sp_resultadoJobsBck', ['2024-01-01', '2024-01-31'])
+
+        self.assertEqual(cursor.execute.call_count, 2)
+
+
+class BypassCacheTest(TestCase):
+    """Tests para el flag de bypass de administradores"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.admin = User.objects.create_user('admin_cache', password='x', is_staff=True)
+        self.operador = User.objects.create_user('operador_cache', password='x')
+
+    def test_admin_con_refresh(self):
+        request = self.factory.get('/reportes/cumplimiento/?refresh=1')
+        request.user = self.admin
+        self.assertTrue(debe_omitir_cache(request))
+
+    def test_usuario_normal_no_puede_omitir(self):
+        request = self.factory.get('/reportes/cumplimiento/?refresh=1')
+        request.user = self.operador
+        self.assertFalse(debe_omitir_cache(request))
+
+    def test_sin_parametro_refresh(self):
+        request = self.factory.get('/reportes/cumplimiento/')
+        request.user = self.admin
+        self.assertFalse(debe_omitir_cache(request))
+
+    def test_usuario_anonimo(self):
+        request = self.factory.get('/reportes/cumplimiento/?refresh=1')
+        request.user = AnonymousUser()
+        self.assertFalse(debe_omitir_cache(request))
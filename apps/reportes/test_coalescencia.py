@@ -0,0 +1,219 @@
+# apps/reportes/test_coalescencia.py
+"""
+Tests para la coalescencia de ejecuciones idénticas concurrentes
+(coalescencia.py) y su uso en ejecutar_procedimiento_almacenado
+"""
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from . import coalescencia
+from .coalescencia import CACHE_PREFIX, construir_huella, ejecutar_una_vez
+from .utils import (
+    ejecutar_consulta_personalizada,
+    ejecutar_procedimiento_almacenado,
+    es_consulta_lectura,
+    obtener_estadisticas_cache,
+    reiniciar_estadisticas_cache,
+)
+
+
+def _en_hilos(total, funcion):
+    """Ejecuta funcion() en total hilos y devuelve sus resultados"""
+    resultados = [None] * total
+
+    def correr(i):
+        resultados[i] = funcion()
+
+    hilos = [threading.Thread(target=correr, args=(i,)) for i in range(total)]
+    for hilo in hilos:
+        hilo.start()
+    return hilos, resultados
+
+
+class EjecutarUnaVezTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def _lenta(self, liberar, llamadas, resultado=None, error=None):
+        def funcion():
+            llamadas.append(1)
+            liberar.wait(5)
+            if error:
+                raise error
+            return resultado
+        return funcion
+
+    def test_hilos_comparten_una_ejecucion(self):
+        liberar, llamadas = threading.Event(), []
+        funcion = self._lenta(liberar, llamadas, resultado=[{'SERVIDOR': 'SRV01'}])
+
+        hilos, resultados = _en_hilos(5, lambda: ejecutar_una_vez('sp:prueba', funcion))
+        # Los hilos llegan mientras la primera ejecución sigue en curso
+        threading.Event().wait(0.2)
+        liberar.set()
+        for hilo in hilos:
+            hilo.join(5)
+
+        self.assertEqual(len(llamadas), 1)
+        self.assertEqual({id(resultado) for resultado, _ in resultados}, {id(resultados[0][0])})
+        self.assertEqual(sorted(compartido for _, compartido in resultados), [False, True, True, True, True])
+        self.assertNotIn('sp:prueba', coalescencia._en_vuelo)
+
+    def test_huellas_distintas_no_se_agrupan(self):
+        self.assertNotEqual(construir_huella('sp', 'sp_genBak', ['2024-01-01']),
+                            construir_huella('sp', 'sp_genBak', ['2024-01-02']))
+        llamadas = []
+        for huella in ('a', 'b'):
+            ejecutar_una_vez(huella, lambda: llamadas.append(huella))
+        self.assertEqual(llamadas, ['a', 'b'])
+
+    def test_error_se_propaga_a_los_que_esperan(self):
+        liberar, llamadas = threading.Event(), []
+        funcion = self._lenta(liberar, llamadas, error=RuntimeError('fallo'))
+
+        def llamar():
+            try:
+                return ejecutar_una_vez('sp:error', funcion)
+            except RuntimeError as e:
+                return str(e)
+
+        hilos, resultados = _en_hilos(3, llamar)
+        threading.Event().wait(0.2)
+        liberar.set()
+        for hilo in hilos:
+            hilo.join(5)
+
+        self.assertEqual(len(llamadas), 1)
+        self.assertEqual(resultados, ['fallo'] * 3)
+
+    @mock.patch.dict(coalescencia.COALESCENCIA_CONFIG, {'intervalo_sondeo': 0.01})
+    @mock.patch.object(coalescencia, '_cache_compartido', return_value=True)
+    def test_espera_la_ejecucion_de_otro_proceso(self, _):
+        huella = 'sp:otro_proceso'
+        cache.set(f'{CACHE_PREFIX}:candado:{huella}', 'token-ajeno')
+
+        def terminar_ajeno():
+            cache.set(f'{CACHE_PREFIX}:resultado:{huella}:token-ajeno', [{'TOTAL': 3}])
+            cache.delete(f'{CACHE_PREFIX}:candado:{huella}')
+
+        threading.Timer(0.05, terminar_ajeno).start()
+        funcion = mock.Mock(return_value=[])
+
+        self.assertEqual(ejecutar_una_vez(huella, funcion), ([{'TOTAL': 3}], True))
+        funcion.assert_not_called()
+
+    @mock.patch.dict(coalescencia.COALESCENCIA_CONFIG, {'intervalo_sondeo': 0.01})
+    @mock.patch.object(coalescencia, '_cache_compartido', return_value=True)
+    def test_otro_proceso_sin_resultado_ejecuta_localmente(self, _):
+        huella = 'sp:sin_resultado'
+        cache.set(f'{CACHE_PREFIX}:candado:{huella}', 'token-ajeno')
+        threading.Timer(0.05, cache.delete, args=[f'{CACHE_PREFIX}:candado:{huella}']).start()
+
+        self.assertEqual(ejecutar_una_vez(huella, lambda: [{'TOTAL': 1}]), ([{'TOTAL': 1}], False))
+
+    @mock.patch.object(coalescencia, '_cache_compartido', return_value=True)
+    def test_lider_publica_y_libera_el_candado(self, _):
+        resultado, compartido = ejecutar_una_vez('sp:lider', lambda: [{'TOTAL': 2}])
+
+        self.assertEqual((resultado, compartido), ([{'TOTAL': 2}], False))
+        self.assertIsNone(cache.get(f'{CACHE_PREFIX}:candado:sp:lider'))
+
+
+class CoalescenciaProcedimientosTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        reiniciar_estadisticas_cache()
+
+    def _conexion_lenta(self, liberar):
+        cursor = mock.MagicMock()
+        cursor.description = [('SERVIDOR',), ('TOTAL',)]
+        cursor.execute.side_effect = lambda *args: liberar.wait(5)
+        cursor.fetchall.return_value = [('SRV01', 10)]
+        conexion = mock.MagicMock(in_atomic_block=False)
+        conexion.cursor.return_value.__enter__.return_value = cursor
+        return conexion, cursor
+
+    def _concurrentes(self, conexion, liberar, funcion, total=3):
+        with mock.patch('apps.reportes.utils.connection', conexion):
+            hilos, resultados = _en_hilos(total, funcion)
+            threading.Event().wait(0.2)
+            liberar.set()
+            for hilo in hilos:
+                hilo.join(5)
+        return resultados
+
+    def test_procedimiento_concurrente_una_ejecucion(self):
+        liberar = threading.Event()
+        conexion, cursor = self._conexion_lenta(liberar)
+
+        with mock.patch('apps.reportes.utils.connection', conexion):
+            hilos, resultados = _en_hilos(
+                3, lambda: ejecutar_procedimiento_almacenado('sp_estadosdb', ['2024/01/01'])
+            )
+            threading.Event().wait(0.2)
+            liberar.set()
+            for hilo in hilos:
+                hilo.join(5)
+
+        self.assertEqual(cursor.execute.call_count, 1)
+        self.assertEqual(resultados, [[{'SERVIDOR': 'SRV01', 'TOTAL': 10}]] * 3)
+        # Cada llamador recibe sus propios diccionarios
+        self.assertEqual(len({id(filas[0]) for filas in resultados}), 3)
+        self.assertEqual(obtener_estadisticas_cache()['coalescidas'], 2)
+
+    def test_consultas_secuenciales_no_se_agrupan(self):
+        liberar = threading.Event()
+        conexion, cursor = self._conexion_lenta(liberar)
+        cursor.execute.side_effect = None
+
+        with mock.patch('apps.reportes.utils.connection', conexion):
+            ejecutar_consulta_personalizada('SELECT 1', [])
+            ejecutar_consulta_personalizada('SELECT 1', [])
+
+        self.assertEqual(cursor.execute.call_count, 2)
+
+    def test_consulta_concurrente_copias_para_todos(self):
+        liberar = threading.Event()
+        conexion, cursor = self._conexion_lenta(liberar)
+
+        resultados = self._concurrentes(conexion, liberar, lambda: ejecutar_consulta_personalizada('SELECT 1', []))
+
+        self.assertEqual(cursor.execute.call_count, 1)
+        # También el líder recibe una copia: modificarla no afecta a los demás
+        resultados[0][0]['css_class'] = 'success'
+        self.assertEqual([filas[0].get('css_class') for filas in resultados[1:]], [None, None])
+
+    def test_escrituras_no_se_agrupan(self):
+        liberar = threading.Event()
+        conexion, cursor = self._conexion_lenta(liberar)
+
+        self._concurrentes(conexion, liberar, lambda: ejecutar_consulta_personalizada('UPDATE tabla SET x = 1', []))
+
+        self.assertEqual(cursor.execute.call_count, 3)
+
+    def test_recolectores_no_se_agrupan(self):
+        liberar = threading.Event()
+        conexion, cursor = self._conexion_lenta(liberar)
+
+        self._concurrentes(conexion, liberar, lambda: ejecutar_procedimiento_almacenado('usp_MonitorDiskGrowth'))
+
+        self.assertEqual(cursor.execute.call_count, 3)
+
+    def test_dentro_de_transaccion_no_se_agrupan(self):
+        liberar = threading.Event()
+        conexion, cursor = self._conexion_lenta(liberar)
+        conexion.in_atomic_block = True
+
+        self._concurrentes(conexion, liberar, lambda: ejecutar_consulta_personalizada('SELECT 1', []))
+
+        self.assertEqual(cursor.execute.call_count, 3)
+
+    def test_consultas_de_lectura(self):
+        self.assertTrue(es_consulta_lectura('  with t as (select 1 as x) SELECT x FROM t'))
+        self.assertFalse(es_consulta_lectura('SELECT * INTO copia FROM tabla'))
+        self.assertFalse(es_consulta_lectura('DELETE FROM tabla'))
@@ -0,0 +1,207 @@
+# apps/reportes/test_eventos_dashboard.py
+"""
+Tests para el canal de eventos (SSE) del dashboard (eventos_dashboard.py)
+"""
+import asyncio
+from datetime import datetime, timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import eventos_dashboard
+from .eventos_dashboard import CanalEventos, flujo_eventos, formatear_evento
+from .models import JobBackupGenerado
+
+GENERADO = timezone.now()
+
+
+def _snapshot(backups_hoy=5):
+    return {
+        'datos': {'metricas': {'total_servidores': 3, 'backups_hoy': backups_hoy}},
+        'generado': GENERADO,
+    }
+
+
+def _job(minuto, nombre='BackupFull'):
+    return {
+        'SERVIDOR': 'SRV01', 'IPSERVER': '10.0.0.1', 'NOMBRE_DEL_JOB': nombre, 'PASO': 1,
+        'NOMBRE_DEL_PASO': 'Backup', 'RESULTADO': 'Fallido', 'MENSAJE': 'Error de disco',
+        'FECHA_Y_HORA_INICIO': datetime(2026, 3, 2, 8, minuto),
+    }
+
+
+class ConsultaCanalTest(SimpleTestCase):
+
+    def setUp(self):
+        self.canal = CanalEventos()
+        for nombre, valor in (('obtener_snapshot', _snapshot()), ('close_old_connections', None)):
+            patcher = mock.patch.object(eventos_dashboard, nombre, return_value=valor)
+            setattr(self, nombre, patcher.start())
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(eventos_dashboard, 'ejecutar_consulta_personalizada')
+        self.consulta = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.consulta.return_value = [
+            {'FECHA_Y_HORA_INICIO': datetime(2026, 3, 2, 8, 0), 'SERVIDOR': 'SRV09', 'NOMBRE_DEL_JOB': 'X', 'PASO': 2}
+        ]
+
+    def test_deltas_de_metricas(self):
+        eventos = self.canal.consultar()
+        self.assertEqual(eventos, [('metricas', {
+            'generado': GENERADO,
+            'cambios': {'total_servidores': 3, 'total_bases_datos': 0, 'backups_hoy': 5,
+                        'backups_semana': 0, 'total_backups_historico': 0, 'total_jobs_historico': 0},
+        })])
+
+        self.consulta.return_value = []
+        self.assertEqual(self.canal.consultar(), [])
+
+        self.obtener_snapshot.return_value = _snapshot(backups_hoy=6)
+        self.assertEqual(self.canal.consultar(), [('metricas', {'generado': GENERADO, 'cambios': {'backups_hoy': 6}})])
+        self.assertEqual(self.canal.estado_inicial()[1]['cambios']['backups_hoy'], 6)
+
+    def test_jobs_fallidos_paginados_por_clave(self):
+        # Primer ciclo: solo fija la marca (no publica el histórico)
+        self.canal.consultar()
+
+        self.consulta.return_value = [_job(5), _job(9)]
+        eventos = [datos for nombre, datos in self.canal.consultar() if nombre == 'job_fallido']
+        self.assertEqual([evento['fecha'].minute for evento in eventos], [5, 9])
+        marca = datetime(2026, 3, 2, 8, 0)
+        self.assertEqual(self.consulta.call_args[0][1][:7], [marca, marca, 'SRV09', 'SRV09', 'X', 'X', 2])
+
+        self.consulta.return_value = []
+        self.canal.consultar()
+        marca = datetime(2026, 3, 2, 8, 9)
+        self.assertEqual(self.consulta.call_args[0][1][:7], [marca, marca, 'SRV01', 'SRV01', 'BackupFull', 'BackupFull', 1])
+
+    def test_muchos_fallidos_con_la_misma_hora_avanzan(self):
+        self.canal.consultar()
+        maximo = eventos_dashboard.EVENTOS_DASHBOARD_CONFIG['max_jobs_por_ciclo']
+
+        # Una página completa de pasos con la misma hora: la marca avanza dentro de ella
+        self.consulta.return_value = [dict(_job(0), SERVIDOR=f'SRV{numero:03d}') for numero in range(maximo)]
+        self.assertEqual(len(self.canal.consultar()), maximo)
+
+        self.consulta.return_value = []
+        self.canal.consultar()
+        parametros = self.consulta.call_args[0][1]
+        self.assertEqual(parametros[2], f'SRV{maximo - 1:03d}')
+
+    def test_formato_evento(self):
+        self.assertEqual(formatear_evento('metricas', {'backups_hoy': 5}), 'event: metricas\ndata: {"backups_hoy": 5}\n\n')
+
+
+class ConsultaJobsFallidosTest(TestCase):
+    """La paginación por clave contra una tabla real"""
+
+    @classmethod
+    def setUpClass(cls):
+        with connection.schema_editor() as editor:
+            editor.create_model(JobBackupGenerado)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            editor.delete_model(JobBackupGenerado)
+
+    def test_mas_fallidos_que_el_maximo_con_la_misma_hora(self):
+        inicio = timezone.make_aware(datetime(2026, 3, 2, 2, 0))
+        JobBackupGenerado.objects.create(servidor='SRV99', resultado='Fallido', fecha_y_hora_inicio=inicio,
+                                         nombre_del_job='Backup', paso=1)
+
+        canal = CanalEventos()
+        with mock.patch.object(eventos_dashboard, 'obtener_snapshot', return_value=None), \
+                mock.patch.dict(eventos_dashboard.EVENTOS_DASHBOARD_CONFIG, {'max_jobs_por_ciclo': 50}):
+            canal.consultar()  # solo fija la marca en el job existente
+
+            # 60 pasos fallan a la misma hora (02:00 programado en todos los servidores)
+            JobBackupGenerado.objects.bulk_create([
+                JobBackupGenerado(servidor=f'SRV{numero:02d}', resultado='Fallido', nombre_del_job='Backup',
+                                  paso=1, fecha_y_hora_inicio=inicio + timedelta(days=1))
+                for numero in range(60)
+            ])
+            ciclos = [[datos['servidor'] for _, datos in canal.consultar()] for _ in range(3)]
+
+        self.assertEqual([len(ciclo) for ciclo in ciclos], [50, 10, 0])
+        self.assertEqual(sorted(ciclos[0] + ciclos[1]), [f'SRV{numero:02d}' for numero in range(60)])
+
+
+class SondeadorCompartidoTest(SimpleTestCase):
+
+    @mock.patch.dict(eventos_dashboard.EVENTOS_DASHBOARD_CONFIG, {'intervalo_sondeo': 0.01, 'latido': 0.05})
+    def test_un_sondeo_para_todos_los_suscriptores(self):
+        canal = CanalEventos()
+        ciclos = []
+
+        def consultar():
+            ciclos.append(1)
+            return [('metricas', {'cambios': {'backups_hoy': len(ciclos)}})] if len(ciclos) == 1 else []
+
+        async def leer(flujo, cantidad):
+            return [await flujo.__anext__() for _ in range(cantidad)]
+
+        async def escenario():
+            flujos = [flujo_eventos(canal) for _ in range(50)]
+            # retry + evento del primer ciclo
+            lecturas = await asyncio.gather(*(leer(flujo, 2) for flujo in flujos))
+            suscriptores = canal.suscriptores
+            for flujo in flujos:
+                await flujo.aclose()
+            await asyncio.sleep(0.05)
+            return lecturas, suscriptores
+
+        with mock.patch.object(canal, 'consultar', side_effect=consultar):
+            lecturas, suscriptores = asyncio.run(escenario())
+
+        self.assertEqual(suscriptores, 50)
+        self.assertTrue(all(lectura[1].startswith('event: metricas') for lectura in lecturas))
+        # Un ciclo por intervalo, no uno por suscriptor
+        self.assertLess(len(ciclos), 10)
+        self.assertEqual(canal.suscriptores, 0)
+        self.assertTrue(canal._tarea.done())
+
+    def test_suscriptor_lento_descarta_los_mas_viejos(self):
+        canal = CanalEventos()
+
+        async def escenario():
+            with mock.patch.dict(eventos_dashboard.EVENTOS_DASHBOARD_CONFIG, {'max_pendientes': 2}):
+                with mock.patch.object(canal, '_sondear', mock.AsyncMock()):
+                    cola = canal.suscribir()
+            for numero in range(3):
+                canal.publicar(('job_fallido', numero))
+            return [cola.get_nowait()[1] for _ in range(cola.qsize())]
+
+        self.assertEqual(asyncio.run(escenario()), [1, 2])
+
+
+class VistaEventosTest(TestCase):
+
+    def test_wsgi_responde_204(self):
+        self.client.force_login(User.objects.create_user('operador_eventos'))
+        self.assertEqual(self.client.get(reverse('reportes:api_eventos_dashboard')).status_code, 204)
+
+    async def test_asgi_abre_el_flujo(self):
+        usuario = await sync_to_async(User.objects.create_user)('operador_eventos_asgi')
+        await sync_to_async(self.async_client.force_login)(usuario)
+
+        canal = CanalEventos()
+        with mock.patch.object(eventos_dashboard, 'canal', canal), \
+                mock.patch.object(canal, 'consultar', return_value=[]):
+            respuesta = await self.async_client.get(reverse('reportes:api_eventos_dashboard'))
+            self.assertEqual(respuesta['Content-Type'], 'text/event-stream')
+            primero = await respuesta.streaming_content.__anext__()
+            await respuesta.streaming_content.aclose()
+
+        self.assertTrue(primero.startswith(b'retry:'))
+
+    async def test_asgi_sin_sesion(self):
+        respuesta = await self.async_client.get(reverse('reportes:api_eventos_dashboard'))
+        self.assertEqual(respuesta.status_code, 403)
@@ -0,0 +1,211 @@
+# apps/reportes/test_exportaciones.py
+"""
+Tests para las exportaciones CSV/Excel
+"""
+import io
+import types
+from datetime import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+
+from .constants import CSVConfig
+from .utils import iterar_consulta, iterar_procedimiento_almacenado
+from .views import create_csv_response, create_styled_excel
+
+
+class CSVStreamingTest(TestCase):
+    """Tests para create_csv_response en modo streaming"""
+
+    headers = [('SERVIDOR', 'Servidor'), ('FECHA', 'Fecha')]
+
+    def _contenido(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_respuesta_streaming(self):
+        filas = ({'SERVIDOR': f'SRV{i}', 'FECHA': '01/01/2024'} for i in range(3))
+        response = create_csv_response(filas, self.headers, 'prueba.csv')
+
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="prueba.csv"')
+        contenido = self._contenido(response)
+        self.assertTrue(contenido.startswith(CSVConfig.BOM + 'Servidor;Fecha'))
+        self.assertEqual(len(contenido.strip().splitlines()), 4)
+
+    def test_no_consume_el_iterable_por_adelantado(self):
+        """Las filas se leen a medida que se envía la respuesta"""
+        consumidas = []
+
+        def filas():
+            for i in range(5):
+                consumidas.append(i)
+                yield {'SERVIDOR': f'SRV{i}', 'FECHA': ''}
+
+        response = create_csv_response(filas(), self.headers, 'prueba.csv')
+        self.assertEqual(consumidas, [])
+        self._contenido(response)
+        self.assertEqual(consumidas, [0, 1, 2, 3, 4])
+
+    def test_formato_fechas(self):
+        filas = [{'SERVIDOR': 'SRV01', 'FECHA': datetime(2024, 5, 1, 8, 30)}]
+        contenido = self._contenido(create_csv_response(filas, self.headers, 'prueba.csv'))
+        self.assertIn('SRV01;2024-05-01 08:30:00', contenido)
+
+    def test_error_a_mitad_marca_el_archivo(self):
+        """Un fallo durante la lectura no entrega un CSV parcial como completo"""
+        def filas():
+            yield {'SERVIDOR': 'SRV01', 'FECHA': ''}
+            raise RuntimeError('conexión perdida')
+
+        partes = []
+        with self.assertRaises(RuntimeError):
+            for parte in create_csv_response(filas(), self.headers, 'prueba.csv').streaming_content:
+                partes.append(parte.decode('utf-8'))
+
+        lineas = ''.join(partes).strip().splitlines()
+        self.assertEqual(lineas[1], 'SRV01;')
+        self.assertEqual(lineas[-1], 'ERROR: exportación incompleta - conexión perdida')
+
+
+class IteracionPorLotesTest(TestCase):
+    """Tests para iterar_consulta / iterar_procedimiento_almacenado"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_iterar_consulta_devuelve_todas_las_filas(self):
+        for i in range(5):
+            User.objects.create_user(f'usuario_lote_{i}')
+
+        filas = iterar_consulta(
+            "SELECT username FROM auth_user WHERE username LIKE %s ORDER BY username",
+            ['usuario_lote_%'],
+            chunk_size=2
+        )
+        self.assertIsInstance(filas, types.GeneratorType)
+        self.assertEqual([f['username'] for f in filas], [f'usuario_lote_{i}' for i in range(5)])
+
+    def test_lee_con_fetchmany(self):
+        """El cursor se lee por lotes, nunca con fetchall"""
+        cursor = mock.MagicMock()
+        cursor.description = [('RESULTADO',)]
+        cursor.fetchmany.side_effect = [[('Exitoso',)] * 2, [('Fallido',)], []]
+        conexion = mock.MagicMock()
+        conexion.cursor.return_value.__enter__.return_value = cursor
+
+        with mock.patch('apps.reportes.utils.connection', conexion):
+            filas = list(iterar_procedimiento_almacenado('sp_resultadoJobsBck', ['2024-01-01', '2024-01-31'], chunk_size=2))
+
+        self.assertEqual(len(filas), 3)
+        cursor.fetchmany.assert_called_with(2)
+        cursor.fetchall.assert_not_called()
+
+    def test_errores_de_lectura_se_propagan(self):
+        cursor = mock.MagicMock()
+        cursor.description = [('RESULTADO',)]
+        cursor.fetchmany.side_effect = [[('Exitoso',)] * 2, Exception('timeout')]
+        conexion = mock.MagicMock()
+        conexion.cursor.return_value.__enter__.return_value = cursor
+
+        filas = []
+        with mock.patch('apps.reportes.utils.connection', conexion), self.assertRaises(Exception):
+            for fila in iterar_procedimiento_almacenado('sp_resultadoJobsBck', ['2024-01-01', '2024-01-31'], chunk_size=2):
+                filas.append(fila)
+        self.assertEqual(len(filas), 2)
+
+        with self.assertRaises(Exception):
+            list(iterar_consulta('SELECT * FROM tabla_inexistente'))
+
+    def test_procedimiento_no_permitido(self):
+        with self.assertRaises(ValueError):
+            iterar_procedimiento_almacenado('xp_cmdshell')
+
+    def test_usa_cache_si_existe(self):
+        """Si la página ya cacheó el SP, la exportación no vuelve a SQL Server"""
+        from .utils import construir_clave_cache
+        cache.set(construir_clave_cache('sp_Programaciondebcks', ['2024-01-01', '2024-01-31']), [{'RESULTADO': 'Exitoso'}], 60)
+        conexion = mock.MagicMock()
+
+        with mock.patch('apps.reportes.utils.connection', conexion):
+            filas = list(iterar_procedimiento_almacenado('sp_Programaciondebcks', ['2024-01-01', '2024-01-31']))
+
+        self.assertEqual(filas, [{'RESULTADO': 'Exitoso'}])
+        conexion.cursor.assert_not_called()
+
+
+class ExcelWriteOnlyTest(TestCase):
+    """Tests para create_styled_excel en modo write_only"""
+
+    headers = [('SERVIDOR', 'Servidor'), ('MENSAJE', 'Mensaje')]
+
+    def _libro(self, response):
+        from openpyxl import load_workbook
+        return load_workbook(io.BytesIO(response.content)).active
+
+    def test_formato_con_titulo(self):
+        filas = ({'SERVIDOR': f'SRV{i}', 'MENSAJE': 'x' * 30} for i in range(5))
+        ws = self._libro(create_styled_excel(filas, self.headers, 'a.xlsx', title='Reporte', sheet_name='Jobs'))
+
+        self.assertEqual(ws.title, 'Jobs')
+        self.assertEqual(ws['A1'].value, 'Reporte')
+        self.assertEqual(ws['A1'].style, 'sacsbd_titulo')
+        self.assertEqual(ws['A4'].value, 'Servidor')
+        self.assertEqual(ws['A4'].style, 'sacsbd_header')
+        self.assertEqual(ws['A5'].value, 'SRV0')
+        self.assertEqual(ws.max_row, 9)
+        self.assertEqual(ws.freeze_panes, 'A5')
+
+    def test_filas_alternas_y_anchos(self):
+        filas = [{'SERVIDOR': 'SRV01', 'MENSAJE': 'm' * 80}, {'SERVIDOR': 'SRV02', 'MENSAJE': ''}]
+        ws = self._libro(create_styled_excel(filas, self.headers, 'a.xlsx'))
+
+        self.assertEqual(ws.freeze_panes, 'A2')
+        rangos = [str(cf.sqref) for cf in ws.conditional_formatting]
+        self.assertEqual(rangos, ['A2:B3'])
+        self.assertEqual(ws.column_dimensions['A'].width, len('Servidor') + 3)
+        self.assertEqual(ws.column_dimensions['B'].width, 50)
+
+    def test_sin_datos(self):
+        ws = self._libro(create_styled_excel([], self.headers, 'a.xlsx'))
+        self.assertEqual(ws.max_row, 1)
+
+    def test_reportes_excel_se_escriben_por_lotes(self):
+        """Los Excel de reportes recorren la consulta sin materializarla"""
+        from . import exportaciones
+
+        leidas = []
+
+        def filas(*args, **kwargs):
+            for i in range(3):
+                leidas.append(i)
+                yield {'LogID': i, 'FileSizeMB': 1024, 'DiskFreeMB': 512, 'PorcentajeLibre': 33.3}
+
+        def escribir(destino, data, *args, **kwargs):
+            self.assertNotIsInstance(data, list)
+            self.assertEqual(leidas, [])
+            self.assertEqual(next(data)['FileSizeMB'], '1,024.00')
+
+        parametros = {'fecha_inicio': '2024-01-01', 'fecha_fin': '2024-01-31'}
+        with mock.patch.object(exportaciones, 'iterar_consulta', side_effect=filas), \
+                mock.patch.object(exportaciones, 'escribir_excel', side_effect=escribir) as escribir_excel:
+            exportaciones.generar_exportacion('disk_growth', 'excel', parametros, io.BytesIO())
+
+        escribir_excel.assert_called_once()
+
+    def test_error_de_lectura_no_genera_excel(self):
+        from . import exportaciones
+
+        def filas(*args, **kwargs):
+            yield {'SERVIDOR': 'SRV01'}
+            raise RuntimeError('conexión perdida')
+
+        destino = io.BytesIO()
+        with mock.patch.object(exportaciones, 'iterar_consulta', side_effect=filas), \
+                self.assertRaises(RuntimeError):
+            exportaciones.generar_exportacion(
+                'jobs', 'excel', {'fecha_inicio': '2024-01-01', 'fecha_fin': '2024-01-31'}, destino
+            )
+        self.assertEqual(destino.getvalue(), b'')
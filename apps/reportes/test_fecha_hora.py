@@ -0,0 +1,100 @@
+# apps/reportes/test_fecha_hora.py
+"""
+Tests para la columna calculada FECHA_HORA de BACKUPSGENERADOS
+"""
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from .config import QUERIES
+from .management.commands.crear_columna_fecha_backup import aplicar_columna_fecha_hora
+from .models import BackupGenerado
+
+
+class FechaHoraModeloTest(SimpleTestCase):
+
+    def test_fecha_hora_completa_lee_columna(self):
+        """fecha_hora_completa debe leer FECHA_HORA sin parsear FECHA/HORA"""
+        momento = datetime(2024, 3, 15, 22, 30, 5)
+        backup = BackupGenerado(fecha='no es fecha', hora='??', fecha_hora=momento)
+        self.assertEqual(backup.fecha_hora_completa, momento)
+
+
+class HorasDesdeBackupTest(TestCase):
+    """horas_desde_backup con valores leídos del ORM (aware con USE_TZ)"""
+
+    @classmethod
+    def setUpClass(cls):
+        with connection.schema_editor() as editor:
+            editor.create_model(BackupGenerado)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            editor.delete_model(BackupGenerado)
+
+    def test_columna_en_hora_local(self):
+        # La columna guarda la hora local del servidor, sin zona
+        hace_30_horas = timezone.localtime() - timedelta(hours=30, minutes=10)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO BACKUPSGENERADOS (SERVIDOR, FECHA_HORA) VALUES (%s, %s)',
+                ['SRV01', hace_30_horas.replace(tzinfo=None)]
+            )
+
+        backup = BackupGenerado.objects.get()
+        self.assertTrue(timezone.is_aware(backup.fecha_hora))
+        self.assertEqual(backup.horas_desde_backup, 30)
+        self.assertEqual(backup.estado_cumplimiento, 'warning')
+
+    def test_valor_sin_zona(self):
+        backup = BackupGenerado(fecha_hora=timezone.localtime().replace(tzinfo=None) - timedelta(hours=2))
+        self.assertEqual(backup.horas_desde_backup, 2)
+
+
+class FechaHoraConsultasTest(SimpleTestCase):
+
+    def test_consultas_no_usan_substring(self):
+        """Ninguna consulta de BACKUPSGENERADOS debe convertir FECHA fila por fila"""
+        for nombre, sql in QUERIES.items():
+            with self.subTest(consulta=nombre):
+                self.assertNotIn('SUBSTRING(FECHA', sql)
+                self.assertNotIn('SUBSTRING(bg.FECHA', sql)
+
+
+class CrearColumnaFechaHoraTest(SimpleTestCase):
+
+    def _cursor(self, columna_existe, indices_existen):
+        cursor = mock.MagicMock()
+        respuestas = iter([(1 if columna_existe else None,)] + [(int(indices_existen),)] * 2)
+        cursor.fetchone.side_effect = lambda: next(respuestas)
+        return cursor
+
+    def _ddl(self, cursor):
+        return [c.args[0] for c in cursor.execute.call_args_list
+                if c.args[0].startswith(('ALTER', 'CREATE'))]
+
+    def test_crea_columna_e_indices(self):
+        cursor = self._cursor(columna_existe=False, indices_existen=False)
+        acciones = aplicar_columna_fecha_hora(cursor)
+
+        self.assertEqual(len(acciones), 3)
+        ddl = self._ddl(cursor)
+        self.assertIn('PERSISTED', ddl[0])
+        self.assertTrue(all('BACKUPSGENERADOS' in sql for sql in ddl))
+
+    def test_idempotente(self):
+        """Si ya existe todo no se ejecuta DDL"""
+        cursor = self._cursor(columna_existe=True, indices_existen=True)
+        self.assertEqual(aplicar_columna_fecha_hora(cursor), [])
+        self.assertEqual(self._ddl(cursor), [])
+
+    def test_tabla_invalida(self):
+        with self.assertRaises(CommandError):
+            aplicar_columna_fecha_hora(mock.MagicMock(), 'BACKUPS; DROP TABLE X')
@@ -0,0 +1,98 @@
+# apps/reportes/test_paginacion.py
+"""
+Tests para la paginación en SQL (ConsultaPaginada) y la fuente del reporte de jobs
+"""
+import io
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.test import TestCase
+from django.urls import reverse
+
+from .exportaciones import _datos_jobs, _excel_jobs
+from .utils import ConsultaPaginada
+
+
+class ConsultaPaginadaTest(TestCase):
+    """Tests para ConsultaPaginada como fuente de Paginator"""
+
+    def _consulta(self, total=60):
+        """Simula SQL Server: COUNT(*) y OFFSET/FETCH sobre 'total' filas"""
+        llamadas = []
+
+        def ejecutar(sql, params):
+            llamadas.append((sql, list(params)))
+            if sql.startswith('SELECT COUNT(*)'):
+                return [{'total': total}]
+            offset, limit = params[-2:]
+            return [{'BCK_ID': i} for i in range(offset, min(offset + limit, total))]
+
+        return ejecutar, llamadas
+
+    def test_solo_trae_la_pagina_visible(self):
+        """Paginator debe pedir COUNT + una sola página"""
+        ejecutar, llamadas = self._consulta()
+        with mock.patch('apps.reportes.utils.ejecutar_consulta_personalizada', side_effect=ejecutar):
+            consulta = ConsultaPaginada('SELECT BCK_ID FROM BACKUPSGENERADOS WHERE TYPE = %s', ['FULL'], order_by='BCK_ID DESC')
+            page = Paginator(consulta, 25).get_page(2)
+            filas = list(page)
+
+        self.assertEqual(page.paginator.num_pages, 3)
+        self.assertEqual([f['BCK_ID'] for f in filas], list(range(25, 50)))
+        self.assertEqual(len(llamadas), 2)
+        sql_pagina, params_pagina = llamadas[1]
+        self.assertIn('ORDER BY BCK_ID DESC OFFSET %s ROWS FETCH NEXT %s ROWS ONLY', sql_pagina)
+        self.assertEqual(params_pagina, ['FULL', 25, 25])
+
+    def test_ultima_pagina_parcial(self):
+        """La última página solo trae las filas restantes"""
+        ejecutar, llamadas = self._consulta(total=60)
+        with mock.patch('apps.reportes.utils.ejecutar_consulta_personalizada', side_effect=ejecutar):
+            page = Paginator(ConsultaPaginada('SELECT 1', order_by='1'), 25).get_page(3)
+            self.assertEqual(len(page), 10)
+
+        self.assertEqual(llamadas[1][1], [50, 10])
+
+    def test_count_se_calcula_una_vez(self):
+        ejecutar, llamadas = self._consulta()
+        with mock.patch('apps.reportes.utils.ejecutar_consulta_personalizada', side_effect=ejecutar):
+            consulta = ConsultaPaginada('SELECT 1')
+            self.assertEqual(consulta.count(), 60)
+            self.assertEqual(len(consulta), 60)
+
+        self.assertEqual(len(llamadas), 1)
+
+    def test_sin_resultados(self):
+        """Un COUNT vacío (error de conexión) produce una página vacía"""
+        with mock.patch('apps.reportes.utils.ejecutar_consulta_personalizada', return_value=[]):
+            page = Paginator(ConsultaPaginada('SELECT 1'), 25).get_page(1)
+            self.assertEqual(list(page), [])
+
+
+class JobsMismaFuenteTest(TestCase):
+    """La página de jobs y sus exportaciones leen la misma consulta"""
+
+    filtros = {'fecha_inicio': '2024-01-01', 'fecha_fin': '2024-01-31', 'servidor': 'srv', 'resultado': 'fall'}
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('operador_jobs'))
+
+    def test_pagina_y_exportaciones_usan_la_misma_consulta(self):
+        with mock.patch('apps.reportes.utils.ejecutar_consulta_personalizada', return_value=[]) as pagina:
+            self.client.get(reverse('reportes:jobs_backup'), self.filtros)
+        sql_pagina, params_pagina = next(
+            c.args for c in pagina.call_args_list if 'OFFSET' not in c.args[0] and 'COUNT(*) AS total' in c.args[0]
+        )
+
+        with mock.patch('apps.reportes.views.iterar_consulta', return_value=iter([])) as csv:
+            b''.join(self.client.get(reverse('reportes:export_jobs_csv'), self.filtros).streaming_content)
+        with mock.patch('apps.reportes.exportaciones.iterar_consulta', side_effect=lambda *args: iter([])) as exportacion:
+            _excel_jobs(self.filtros, io.BytesIO())
+            _datos_jobs(self.filtros)
+
+        excel, pdf = exportacion.call_args_list
+        for sql, params in (csv.call_args.args, excel.args, pdf.args):
+            self.assertIn(sql.split(' ORDER BY ')[0], sql_pagina)
+            self.assertEqual(params, params_pagina)
+            self.assertTrue(sql.endswith('ORDER BY FECHA_Y_HORA_INICIO DESC'))
@@ -0,0 +1,179 @@
+# apps/reportes/test_recoleccion_msdb.py
+"""
+Tests para la recolección incremental desde msdb (recoleccion_msdb.py).
+
+Las tablas de msdb (backupset, backupmediafamily, sysjobs, sysjobhistory)
+se crean sin prefijo en la BD de pruebas junto con las tablas no
+administradas de destino, así que se ejecutan las mismas consultas.
+"""
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import recoleccion_msdb
+from .models import BackupGenerado, JobBackupGenerado, MarcaRecoleccion
+from .recoleccion_msdb import OrigenMsdb, recolectar
+
+TABLAS_MSDB = {
+    'backupset': 'backup_set_id INTEGER PRIMARY KEY, media_set_id INTEGER, database_name VARCHAR(128), '
+                 'backup_finish_date DATETIME, type CHAR(1)',
+    'backupmediafamily': 'media_set_id INTEGER, physical_device_name VARCHAR(260)',
+    'sysjobs': 'job_id VARCHAR(36), name VARCHAR(128)',
+    'sysjobhistory': 'instance_id INTEGER PRIMARY KEY, job_id VARCHAR(36), step_id INTEGER, '
+                     'step_name VARCHAR(128), run_status INTEGER, run_date INTEGER, run_time INTEGER, '
+                     'message VARCHAR(1000)',
+}
+
+SERVIDOR = {'nombre': 'SRV01', 'ip': '10.0.0.11'}
+
+
+def _lector_local(servidor):
+    return OrigenMsdb(connection, prefijo='')
+
+
+def _ejecutar(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+class RecoleccionMsdbTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with connection.schema_editor() as editor:
+            editor.create_model(BackupGenerado)
+            editor.create_model(JobBackupGenerado)
+            for tabla, columnas in TABLAS_MSDB.items():
+                editor.execute(f'CREATE TABLE {tabla} ({columnas})')
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            editor.delete_model(BackupGenerado)
+            editor.delete_model(JobBackupGenerado)
+            for tabla in TABLAS_MSDB:
+                editor.execute(f'DROP TABLE {tabla}')
+
+    def setUp(self):
+        self.ayer = datetime.combine(timezone.localdate() - timedelta(days=1), datetime.min.time())
+        _ejecutar("INSERT INTO sysjobs VALUES ('J1', 'Backup Diario'), ('J2', 'Limpieza Logs')")
+
+    def _backup(self, backup_set_id, archivos=1, tipo='D', fecha=None, base='Ventas'):
+        _ejecutar(
+            'INSERT INTO backupset VALUES (%s, %s, %s, %s, %s)',
+            [backup_set_id, backup_set_id, base, fecha or self.ayer + timedelta(hours=backup_set_id), tipo]
+        )
+        for archivo in range(archivos):
+            _ejecutar('INSERT INTO backupmediafamily VALUES (%s, %s)',
+                      [backup_set_id, f'D:\\bak\\{base}_{backup_set_id}_{archivo}.bak'])
+
+    def _job(self, instance_id, job_id='J1', run_status=1, paso=1):
+        _ejecutar(
+            'INSERT INTO sysjobhistory VALUES (%s, %s, %s, %s, %s, %s, %s, %s)',
+            [instance_id, job_id, paso, 'Backup', run_status, int(self.ayer.strftime('%Y%m%d')),
+             80000 + instance_id, 'Mensaje']
+        )
+
+    def test_incremental_por_lotes(self):
+        self._backup(1)
+        self._backup(2, archivos=2)
+        self._backup(3, tipo='L')
+        self._job(10)
+        self._job(11, run_status=0)
+
+        resultados = recolectar([SERVIDOR], tamano_lote=2, crear_lector=_lector_local)
+
+        self.assertEqual([r['insertadas'] for r in resultados], [4, 2])
+        self.assertEqual(BackupGenerado.objects.count(), 4)
+        self.assertEqual(
+            sorted(BackupGenerado.objects.values_list('type', flat=True)), ['FULL', 'FULL', 'FULL', 'LOG']
+        )
+        backup = BackupGenerado.objects.filter(type='LOG').get()
+        self.assertEqual((backup.servidor, backup.ipserver), ('SRV01', '10.0.0.11'))
+        self.assertEqual(backup.fecha, self.ayer.strftime('%d/%m/%Y'))
+        self.assertEqual(backup.hora, '03:00:00')
+        self.assertEqual(MarcaRecoleccion.objects.get(servidor='SRV01', origen='backups').ultimo_id, 3)
+
+        fallido = JobBackupGenerado.objects.get(resultado='Fallido')
+        self.assertEqual(fallido.fecha_y_hora_inicio.replace(tzinfo=None), self.ayer.replace(hour=8, second=11))
+
+        # Segunda corrida: nada nuevo que leer
+        resultados = recolectar([SERVIDOR], crear_lector=_lector_local)
+        self.assertEqual([r['leidas'] for r in resultados], [0, 0])
+
+        self._backup(4)
+        self._job(12)
+        resultados = recolectar([SERVIDOR], crear_lector=_lector_local)
+        self.assertEqual([(r['leidas'], r['insertadas']) for r in resultados], [(1, 1), (1, 1)])
+
+    def test_set_con_varios_archivos_no_se_parte(self):
+        self._backup(1, archivos=3)
+        self._backup(2, archivos=3)
+
+        lector = _lector_local(SERVIDOR)
+        filas = lector.backups(0, datetime(1900, 1, 1), 4)
+        self.assertEqual([fila['backup_set_id'] for fila in filas], [1, 1, 1])
+
+        recolectar([SERVIDOR], tamano_lote=4, crear_lector=_lector_local)
+        self.assertEqual(BackupGenerado.objects.count(), 6)
+
+    def test_filtra_jobs_y_dias_iniciales(self):
+        self._job(10)
+        self._job(11, job_id='J2')
+        self._backup(1, fecha=self.ayer - timedelta(days=90))
+        self._backup(2)
+
+        recolectar([SERVIDOR], crear_lector=_lector_local)
+
+        self.assertEqual(list(JobBackupGenerado.objects.values_list('nombre_del_job', flat=True)), ['Backup Diario'])
+        self.assertEqual(BackupGenerado.objects.count(), 1)
+
+    def test_backfill_idempotente(self):
+        self._backup(1, fecha=self.ayer - timedelta(days=90))
+        self._backup(2)
+        recolectar([SERVIDOR], crear_lector=_lector_local)
+        self.assertEqual(BackupGenerado.objects.count(), 1)
+
+        desde = (self.ayer - timedelta(days=120)).date()
+        for _ in range(2):
+            resultados = recolectar([SERVIDOR], desde=desde, crear_lector=_lector_local)
+
+        self.assertEqual(BackupGenerado.objects.count(), 2)
+        self.assertEqual(resultados[0]['insertadas'], 0)
+        self.assertEqual(MarcaRecoleccion.objects.get(servidor='SRV01', origen='backups').ultimo_id, 2)
+
+    def test_error_en_un_servidor_no_detiene_los_demas(self):
+        self._backup(1)
+
+        def crear_lector(servidor):
+            if servidor['nombre'] == 'SRV02':
+                raise ConnectionError('sin conexión')
+            return _lector_local(servidor)
+
+        resultados = recolectar([{'nombre': 'SRV02'}, SERVIDOR], crear_lector=crear_lector)
+
+        self.assertEqual([r['servidor'] for r in resultados if 'error' in r], ['SRV02', 'SRV02'])
+        self.assertEqual(BackupGenerado.objects.filter(servidor='SRV01').count(), 1)
+
+    def test_servidor_vinculado_invalido(self):
+        with self.assertRaises(ValueError):
+            OrigenMsdb.para_servidor({'nombre': 'X', 'vinculado': 'SRV]; DROP TABLE x--'})
+        self.assertEqual(OrigenMsdb.para_servidor({'nombre': 'X', 'vinculado': 'SRV02'}).prefijo,
+                         '[SRV02].msdb.dbo.')
+
+    @override_settings(SERVIDORES_MONITOREADOS=[SERVIDOR])
+    def test_comando(self):
+        self._backup(1)
+        salida = StringIO()
+        with mock.patch.object(recoleccion_msdb.OrigenMsdb, 'para_servidor', side_effect=_lector_local):
+            call_command('recolectar_msdb', '--desde', self.ayer.strftime('%Y-%m-%d'), stdout=salida)
+
+        self.assertIn('SRV01.backups: 1 nuevas', salida.getvalue())
+        self.assertIn('backfill', salida.getvalue())
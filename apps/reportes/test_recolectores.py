@@ -0,0 +1,115 @@
+# apps/reportes/test_recolectores.py
+"""
+Tests para la ejecución condicionada de los procedimientos recolectores
+(recolectores.py) y las vistas que leen sus tablas de log
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import recolectores
+from .models import EjecucionRecolector
+from .recolectores import refrescar_si_vencido
+
+
+class RefrescarSiVencidoTest(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(recolectores, '_ejecutar')
+        self.ejecutar = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _envejecer(self, nombre, segundos):
+        EjecucionRecolector.objects.filter(nombre=nombre).update(
+            ultima_exitosa=timezone.now() - timedelta(seconds=segundos),
+            ultimo_intento=timezone.now() - timedelta(seconds=segundos),
+        )
+
+    def test_solo_ejecuta_si_esta_vencido(self):
+        self.assertTrue(refrescar_si_vencido('usp_MonitorDiskGrowth'))
+        self.assertFalse(refrescar_si_vencido('usp_MonitorDiskGrowth'))
+        self.assertEqual(self.ejecutar.call_count, 1)
+
+        registro = EjecucionRecolector.objects.get(nombre='usp_MonitorDiskGrowth')
+        self.assertIsNotNone(registro.duracion_segundos)
+
+        self._envejecer('usp_MonitorDiskGrowth', 3601)
+        self.assertTrue(refrescar_si_vencido('usp_MonitorDiskGrowth'))
+        self.assertFalse(refrescar_si_vencido('usp_MonitorDiskGrowth', max_antiguedad=10))
+        self.assertEqual(self.ejecutar.call_count, 2)
+
+    def test_error_registra_y_espera_antes_de_reintentar(self):
+        self.ejecutar.side_effect = RuntimeError('servidor caído')
+
+        self.assertFalse(refrescar_si_vencido('sp_MonitorDatabaseStatus'))
+        self.assertFalse(refrescar_si_vencido('sp_MonitorDatabaseStatus'))
+        self.assertEqual(self.ejecutar.call_count, 1)
+
+        registro = EjecucionRecolector.objects.get(nombre='sp_MonitorDatabaseStatus')
+        self.assertEqual(registro.ultimo_error, 'servidor caído')
+        self.assertIsNone(registro.ultima_exitosa)
+
+        self.ejecutar.side_effect = None
+        EjecucionRecolector.objects.filter(pk=registro.pk).update(ultimo_intento=timezone.now() - timedelta(minutes=5))
+        self.assertTrue(refrescar_si_vencido('sp_MonitorDatabaseStatus'))
+        self.assertEqual(EjecucionRecolector.objects.get(pk=registro.pk).ultimo_error, '')
+
+    def test_bloqueado_por_otro_proceso(self):
+        EjecucionRecolector.objects.create(nombre='usp_MonitorDiskGrowth')
+        bloqueado = mock.MagicMock()
+        bloqueado.filter.return_value.first.return_value = None
+
+        with mock.patch.object(EjecucionRecolector.objects, 'select_for_update', return_value=bloqueado):
+            self.assertFalse(refrescar_si_vencido('usp_MonitorDiskGrowth'))
+
+        bloqueado.filter.assert_called_once()
+        self.ejecutar.assert_not_called()
+
+    def test_exec_fuera_de_la_transaccion_de_reserva(self):
+        profundidad = len(connection.atomic_blocks)
+        durante = {}
+
+        def ejecutar(nombre):
+            durante['bloques'] = len(connection.atomic_blocks)
+            durante['reservado'] = EjecucionRecolector.objects.get(nombre=nombre).en_ejecucion_desde
+            # Otro proceso que llega mientras corre no lo vuelve a ejecutar
+            durante['concurrente'] = refrescar_si_vencido(nombre)
+
+        self.ejecutar.side_effect = ejecutar
+        self.assertTrue(refrescar_si_vencido('usp_MonitorDiskGrowth'))
+
+        self.assertEqual(durante['bloques'], profundidad)
+        self.assertIsNotNone(durante['reservado'])
+        self.assertFalse(durante['concurrente'])
+        self.assertEqual(self.ejecutar.call_count, 1)
+        self.assertIsNone(EjecucionRecolector.objects.get(nombre='usp_MonitorDiskGrowth').en_ejecucion_desde)
+
+    def test_reserva_abandonada_se_reclama(self):
+        EjecucionRecolector.objects.create(
+            nombre='usp_MonitorDiskGrowth', en_ejecucion_desde=timezone.now() - timedelta(minutes=5)
+        )
+        self.assertFalse(refrescar_si_vencido('usp_MonitorDiskGrowth'))
+
+        EjecucionRecolector.objects.update(en_ejecucion_desde=timezone.now() - timedelta(hours=1))
+        self.assertTrue(refrescar_si_vencido('usp_MonitorDiskGrowth'))
+
+    def test_recolector_desconocido(self):
+        with self.assertRaises(ValueError):
+            refrescar_si_vencido('sp_DROP')
+
+    def test_vistas_no_ejecutan_en_cada_solicitud(self):
+        self.client.force_login(User.objects.create_superuser('admin_recolectores'))
+
+        for _ in range(3):
+            self.client.get(reverse('reportes:estados_db'))
+            self.client.get(reverse('reportes:disk_growth'))
+
+        self.assertEqual(
+            sorted(llamada.args[0] for llamada in self.ejecutar.call_args_list),
+            ['sp_MonitorDatabaseStatus', 'usp_MonitorDiskGrowth']
+        )
@@ -0,0 +1,162 @@
+# apps/reportes/test_resumen_discos.py
+"""
+Tests para los resúmenes de DiskGrowthLog y las series del gráfico de
+crecimiento de discos (resumen_discos.py).
+
+DiskGrowthLog no es un modelo de Django: se crea con SQL en la BD de
+pruebas para ejecutar las mismas consultas.
+"""
+import math
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from . import recolectores, tasks
+from .models import ResumenDiskGrowth
+from .recolectores import refrescar_si_vencido
+from .resumen_discos import actualizar_resumenes, lttb, resolucion_para_rango, series_crecimiento
+
+COLUMNAS_LOG = (
+    'LogID INTEGER PRIMARY KEY, ServerIP VARCHAR(100), DatabaseName VARCHAR(128), FileName VARCHAR(260), '
+    'FilePath VARCHAR(260), FileSizeMB DECIMAL(18, 2), DiskFreeMB DECIMAL(18, 2), LogDate DATETIME'
+)
+
+# Lunes
+LUNES = datetime(2026, 3, 2)
+
+
+def _log(log_id, fecha, tamano, libre, servidor='10.0.0.1', base='Ventas', archivo='Ventas.mdf'):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO DiskGrowthLog VALUES (%s, %s, %s, %s, %s, %s, %s, %s)',
+            [log_id, servidor, base, archivo, f'D:\\data\\{archivo}', tamano, libre, fecha]
+        )
+
+
+class LttbTest(SimpleTestCase):
+
+    def test_conserva_extremos_y_picos(self):
+        puntos = [(x, math.sin(x / 10)) for x in range(1000)]
+        puntos[500] = (500, 50.0)
+
+        muestreados = lttb(puntos, 100)
+
+        self.assertEqual(len(muestreados), 100)
+        self.assertEqual((muestreados[0], muestreados[-1]), (puntos[0], puntos[-1]))
+        self.assertIn(puntos[500], muestreados)
+        self.assertEqual(muestreados, sorted(muestreados))
+
+    def test_series_cortas_sin_cambios(self):
+        puntos = [(x, x) for x in range(10)]
+        self.assertEqual(lttb(puntos, 200), puntos)
+        self.assertEqual(lttb(puntos, 2), puntos)
+
+
+class ResumenDiskGrowthTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with connection.schema_editor() as editor:
+            editor.execute(f'CREATE TABLE DiskGrowthLog ({COLUMNAS_LOG})')
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            editor.execute('DROP TABLE DiskGrowthLog')
+
+    def _resumen(self, periodo, inicio, archivo='Ventas.mdf'):
+        return ResumenDiskGrowth.objects.get(periodo=periodo, inicio=inicio, archivo=archivo)
+
+    def test_incremental_min_max_ultimo(self):
+        _log(1, LUNES.replace(hour=8), 100, 900)
+        _log(2, LUNES.replace(hour=20), 120, 880)
+        _log(3, LUNES.replace(hour=12), 90, 910)   # insertada tarde: no es la última del día
+        _log(4, LUNES + timedelta(days=2, hours=9), 130, 870)
+
+        resultado = actualizar_resumenes(tamano_lote=3)
+
+        self.assertEqual((resultado['muestras'], resultado['ultimo_log_id']), (4, 4))
+        dia = self._resumen('dia', LUNES.date())
+        self.assertEqual(
+            (dia.tamano_min_mb, dia.tamano_max_mb, dia.tamano_ultimo_mb, dia.libre_ultimo_mb, dia.muestras),
+            (Decimal('90'), Decimal('120'), Decimal('120'), Decimal('880'), 3)
+        )
+        semana = self._resumen('semana', LUNES.date())
+        self.assertEqual((semana.tamano_ultimo_mb, semana.libre_min_mb, semana.muestras), (Decimal('130'), 870, 4))
+        self.assertEqual(ResumenDiskGrowth.objects.count(), 3)
+
+        # Segunda corrida: nada nuevo
+        self.assertEqual(actualizar_resumenes()['muestras'], 0)
+
+        _log(5, LUNES + timedelta(days=2, hours=18), 150, 850)
+        _log(6, LUNES + timedelta(days=7), 160, 840)
+        self.assertEqual(actualizar_resumenes()['muestras'], 2)
+
+        semana.refresh_from_db()
+        self.assertEqual((semana.tamano_max_mb, semana.muestras, semana.ultimo_log_id), (Decimal('150'), 5, 5))
+        self.assertEqual(self._resumen('semana', (LUNES + timedelta(days=7)).date()).muestras, 1)
+
+    def test_resolucion_segun_rango(self):
+        self.assertEqual(
+            [resolucion_para_rango(dias) for dias in (1, 7, 8, 180, 181)],
+            ['crudo', 'crudo', 'dia', 'dia', 'semana']
+        )
+
+    def test_series_desde_resumen_y_crudas(self):
+        for dia in range(60):
+            fecha = LUNES + timedelta(days=dia)
+            _log(dia * 2 + 1, fecha.replace(hour=6), 1000 + dia, 500)
+            _log(dia * 2 + 2, fecha.replace(hour=6), 10 + dia, 500, base='Logs', archivo='Logs.ldf')
+        actualizar_resumenes()
+
+        grafico = series_crecimiento('2026-03-02', '2026-04-30', puntos=20)
+        self.assertEqual(grafico['resolucion'], 'dia')
+        self.assertEqual([serie['nombre'] for serie in grafico['series']],
+                         ['10.0.0.1 - Ventas - Ventas.mdf', '10.0.0.1 - Logs - Logs.ldf'])
+        puntos = grafico['series'][0]['puntos']
+        self.assertEqual(len(puntos), 20)
+        self.assertEqual((puntos[0], puntos[-1]['x']), ({'x': '2026-03-02', 'y': 1000.0}, '2026-04-30'))
+
+        grafico = series_crecimiento('2025-01-01', '2026-04-30', base_datos='logs')
+        self.assertEqual(grafico['resolucion'], 'semana')
+        self.assertEqual(len(grafico['series']), 1)
+        self.assertEqual(len(grafico['series'][0]['puntos']), 9)
+
+        grafico = series_crecimiento('2026-03-02', '2026-03-03', servidor='10.0.0')
+        self.assertEqual(grafico['resolucion'], 'crudo')
+        self.assertEqual(grafico['series'][0]['puntos'], [
+            {'x': '2026-03-02T06:00', 'y': 1000.0}, {'x': '2026-03-03T06:00', 'y': 1001.0}
+        ])
+
+    def test_solicitudes_no_actualizan_resumenes(self):
+        _log(1, LUNES, 100, 900)
+        with mock.patch.object(recolectores, '_ejecutar'):
+            self.assertTrue(refrescar_si_vencido('usp_MonitorDiskGrowth'))
+        self.assertFalse(ResumenDiskGrowth.objects.exists())
+
+        tasks.actualizar_resumenes_discos_task()
+        self.assertEqual(ResumenDiskGrowth.objects.count(), 2)
+
+    def test_vista_y_comando(self):
+        _log(1, LUNES, 100, 900)
+        salida = StringIO()
+        call_command('actualizar_resumenes_discos', '--reconstruir', stdout=salida)
+        self.assertIn('1 muestras', salida.getvalue())
+
+        self.client.force_login(User.objects.create_superuser('admin_discos'))
+        with mock.patch.object(recolectores, '_ejecutar'):
+            respuesta = self.client.get(
+                reverse('reportes:disk_growth'), {'fecha_inicio': '2026-01-01', 'fecha_fin': '2026-03-31'}
+            )
+        self.assertEqual(respuesta.context['series_grafico']['resolucion'], 'dia')
+        self.assertContains(respuesta, 'id="series-disk-growth"')
+        self.assertEqual(date(2026, 3, 2), ResumenDiskGrowth.objects.get(periodo='dia').inicio)
@@ -0,0 +1,101 @@
+# apps/reportes/test_snapshot_dashboard.py
+"""
+Tests para el snapshot de sp_DashboardMetrics (snapshot_dashboard.py) y las
+vistas del dashboard que lo leen
+"""
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import snapshot_dashboard
+from .snapshot_dashboard import CACHE_KEY, obtener_snapshot, refrescar_snapshot
+
+
+def _datos(backups_hoy=5):
+    return {
+        'metricas': {'total_servidores': 3, 'total_bases_datos': 40, 'backups_hoy': backups_hoy},
+        'stats_jobs': [{'resultado_agrupado': 'Exitoso', 'cantidad': 10}],
+        'tipos_backup': [],
+        'tendencia_semanal': [],
+        'top_servidores': [],
+    }
+
+
+class SnapshotDashboardTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        patcher = mock.patch.object(snapshot_dashboard, 'ejecutar_sp_dashboard_metrics', return_value=_datos())
+        self.sp = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lectura_sin_ejecutar_el_sp(self):
+        refrescar_snapshot()
+        for _ in range(3):
+            snapshot = obtener_snapshot()
+
+        self.assertEqual(self.sp.call_count, 1)
+        self.assertEqual(snapshot['datos']['metricas']['backups_hoy'], 5)
+
+    def test_respaldo_en_proceso_si_falta_o_vence(self):
+        self.assertEqual(obtener_snapshot()['datos']['metricas']['total_servidores'], 3)
+        self.assertEqual(self.sp.call_count, 1)
+
+        vencido = cache.get(CACHE_KEY)
+        vencido['verificado'] -= timedelta(hours=1)
+        cache.set(CACHE_KEY, vencido, None)
+        obtener_snapshot()
+        self.assertEqual(self.sp.call_count, 2)
+
+    def test_mismos_datos_conservan_generado(self):
+        primero = refrescar_snapshot()
+        segundo = refrescar_snapshot()
+        self.assertEqual(segundo['generado'], primero['generado'])
+        self.assertGreaterEqual(segundo['verificado'], primero['verificado'])
+
+        self.sp.return_value = _datos(backups_hoy=6)
+        self.assertGreater(refrescar_snapshot()['generado'], primero['generado'])
+
+    def test_fallo_del_sp_conserva_el_snapshot(self):
+        anterior = refrescar_snapshot()
+        self.sp.return_value = {'metricas': {}, 'stats_jobs': []}
+
+        self.assertEqual(refrescar_snapshot(), anterior)
+        self.assertEqual(cache.get(CACHE_KEY)['version'], anterior['version'])
+
+    def test_api_sin_cambios(self):
+        self.client.force_login(User.objects.create_user('operador_dashboard'))
+        url = reverse('reportes:api_dashboard_metrics')
+
+        datos = self.client.get(url).json()
+        self.assertEqual(datos['data']['backups_hoy'], 5)
+
+        sin_cambios = self.client.get(url, {'desde': datos['generado']}).json()
+        self.assertEqual(sin_cambios, {'success': True, 'sin_cambios': True, 'generado': datos['generado']})
+
+        self.sp.return_value = _datos(backups_hoy=7)
+        refrescar_snapshot()
+        nuevos = self.client.get(url, {'desde': datos['generado']}).json()
+        self.assertEqual(nuevos['data']['backups_hoy'], 7)
+        self.assertEqual(self.sp.call_count, 2)
+
+    def test_api_desde_invalido(self):
+        self.client.force_login(User.objects.create_user('operador_dashboard'))
+        datos = self.client.get(reverse('reportes:api_dashboard_metrics'), {'desde': 'ayer'}).json()
+
+        self.assertNotIn('sin_cambios', datos)
+
+    def test_comando_una_vez(self):
+        salida = StringIO()
+        call_command('refrescar_dashboard', '--una-vez', stdout=salida)
+
+        self.assertIn('Snapshot generado', salida.getvalue())
+        self.assertLessEqual(timezone.now() - cache.get(CACHE_KEY)['verificado'], timedelta(minutes=1))
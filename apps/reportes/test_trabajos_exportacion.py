@@ -0,0 +1,248 @@
+# apps/reportes/test_trabajos_exportacion.py
+"""
+Tests para las exportaciones PDF/Excel en segundo plano
+"""
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import TrabajoExportacion
+from .trabajos_exportacion import (
+    LimiteExportacionesError,
+    limpiar_exportaciones,
+    procesar_exportacion,
+    ruta_archivo_exportacion,
+    solicitar_exportacion,
+)
+
+FILAS_JOBS = [
+    {'SERVIDOR': 'SRV01', 'RESULTADO': 'Exitoso', 'NOMBRE_DEL_JOB': 'FULL'},
+    {'SERVIDOR': 'SRV02', 'RESULTADO': 'Fallido', 'NOMBRE_DEL_JOB': 'LOG'},
+]
+
+PARAMETROS_JOBS = {'fecha_inicio': '2024-01-01', 'fecha_fin': '2024-01-31', 'servidor': '', 'resultado': ''}
+
+
+class TrabajosExportacionBase(TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+        ajustes = override_settings(EXPORTACIONES_ROOT=self.directorio, EXPORTACIONES_EAGER=True)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        datos = mock.patch(
+            'apps.reportes.exportaciones.iterar_consulta',
+            side_effect=lambda *args, **kwargs: iter([dict(f) for f in FILAS_JOBS])
+        )
+        self.iterar_consulta = datos.start()
+        self.addCleanup(datos.stop)
+
+        self.usuario = User.objects.create_user('operador_export', password='x')
+
+
+class SolicitudExportacionTest(TrabajosExportacionBase):
+    """Tests para solicitar_exportacion / procesar_exportacion"""
+
+    def test_modo_eager_genera_el_archivo(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            trabajo, creado = solicitar_exportacion(self.usuario, 'jobs', 'excel', PARAMETROS_JOBS)
+
+        trabajo.refresh_from_db()
+        self.assertTrue(creado)
+        self.assertEqual(trabajo.estado, TrabajoExportacion.ESTADO_COMPLETADO)
+        self.assertTrue(trabajo.nombre_archivo.endswith('.xlsx'))
+        self.assertEqual(os.path.getsize(ruta_archivo_exportacion(trabajo)), trabajo.tamano_bytes)
+
+    @override_settings(EXPORTACIONES_EAGER=False)
+    def test_encola_en_celery(self):
+        with mock.patch('apps.reportes.tasks.generar_exportacion_task.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                trabajo, _ = solicitar_exportacion(self.usuario, 'jobs', 'pdf', PARAMETROS_JOBS)
+
+        delay.assert_called_once_with(str(trabajo.pk))
+        self.assertEqual(trabajo.estado, TrabajoExportacion.ESTADO_PENDIENTE)
+
+    def test_solicitud_identica_en_curso_se_reutiliza(self):
+        primero, creado1 = solicitar_exportacion(self.usuario, 'jobs', 'excel', PARAMETROS_JOBS)
+        segundo, creado2 = solicitar_exportacion(self.usuario, 'jobs', 'excel', dict(PARAMETROS_JOBS))
+
+        self.assertTrue(creado1)
+        self.assertFalse(creado2)
+        self.assertEqual(primero.pk, segundo.pk)
+        self.assertEqual(TrabajoExportacion.objects.count(), 1)
+
+    def test_limite_por_usuario(self):
+        solicitar_exportacion(self.usuario, 'jobs', 'excel', PARAMETROS_JOBS)
+        solicitar_exportacion(self.usuario, 'jobs', 'pdf', PARAMETROS_JOBS)
+
+        with self.assertRaises(LimiteExportacionesError):
+            solicitar_exportacion(self.usuario, 'estados', 'excel', {'servidor': '', 'estado': ''})
+
+        # Otro usuario no comparte el cupo
+        otro = User.objects.create_user('otro_export', password='x')
+        _, creado = solicitar_exportacion(otro, 'jobs', 'excel', PARAMETROS_JOBS)
+        self.assertTrue(creado)
+
+    def test_trabajos_colgados_liberan_el_cupo(self):
+        solicitar_exportacion(self.usuario, 'jobs', 'excel', PARAMETROS_JOBS)
+        solicitar_exportacion(self.usuario, 'jobs', 'pdf', PARAMETROS_JOBS)
+        TrabajoExportacion.objects.update(fecha_creacion=timezone.now() - timedelta(hours=2))
+
+        _, creado = solicitar_exportacion(self.usuario, 'estados', 'excel', {'servidor': '', 'estado': ''})
+        self.assertTrue(creado)
+        self.assertEqual(TrabajoExportacion.objects.filter(estado=TrabajoExportacion.ESTADO_ERROR).count(), 2)
+
+    def test_timeout_en_proceso_cuenta_desde_el_inicio(self):
+        trabajo, _ = solicitar_exportacion(self.usuario, 'jobs', 'excel', PARAMETROS_JOBS)
+        TrabajoExportacion.objects.filter(pk=trabajo.pk).update(
+            estado=TrabajoExportacion.ESTADO_PROCESANDO,
+            fecha_creacion=timezone.now() - timedelta(hours=2),
+            fecha_inicio=timezone.now()
+        )
+
+        solicitar_exportacion(self.usuario, 'jobs', 'pdf', PARAMETROS_JOBS)
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, TrabajoExportacion.ESTADO_PROCESANDO)
+
+    def test_trabajo_expirado_no_se_reabre_al_terminar(self):
+        trabajo, _ = solicitar_exportacion(self.usuario, 'jobs', 'excel', PARAMETROS_JOBS)
+
+        def generar_y_expirar(*args, **kwargs):
+            TrabajoExportacion.objects.filter(pk=trabajo.pk).update(estado=TrabajoExportacion.ESTADO_ERROR)
+            return 'jobs.xlsx'
+
+        with mock.patch('apps.reportes.trabajos_exportacion.generar_exportacion', side_effect=generar_y_expirar):
+            self.assertFalse(procesar_exportacion(trabajo.pk))
+
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, TrabajoExportacion.ESTADO_ERROR)
+        self.assertEqual(os.listdir(self.directorio), [])
+
+    def test_formato_invalido(self):
+        with self.assertRaises(ValueError):
+            solicitar_exportacion(self.usuario, 'jobs', 'docx', PARAMETROS_JOBS)
+
+    def test_procesar_solo_una_vez(self):
+        trabajo, _ = solicitar_exportacion(self.usuario, 'jobs', 'excel', PARAMETROS_JOBS)
+
+        self.assertTrue(procesar_exportacion(trabajo.pk))
+        self.assertFalse(procesar_exportacion(trabajo.pk))
+        self.assertEqual(self.iterar_consulta.call_count, 1)
+
+    def test_error_de_generacion(self):
+        trabajo, _ = solicitar_exportacion(self.usuario, 'jobs', 'excel', PARAMETROS_JOBS)
+
+        with mock.patch('apps.reportes.trabajos_exportacion.generar_exportacion', side_effect=RuntimeError('sin memoria')):
+            self.assertFalse(procesar_exportacion(trabajo.pk))
+
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, TrabajoExportacion.ESTADO_ERROR)
+        self.assertEqual(trabajo.error, 'sin memoria')
+        self.assertEqual(os.listdir(self.directorio), [])
+
+
+    def test_error_de_lectura_marca_el_trabajo_pdf(self):
+        """Un fallo de la consulta no entrega un PDF vacío como completado"""
+        trabajo, _ = solicitar_exportacion(self.usuario, 'jobs', 'pdf', PARAMETROS_JOBS)
+        self.iterar_consulta.side_effect = RuntimeError('timeout de SQL Server')
+
+        self.assertFalse(procesar_exportacion(trabajo.pk))
+
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, TrabajoExportacion.ESTADO_ERROR)
+        self.assertEqual(trabajo.error, 'timeout de SQL Server')
+        self.assertEqual(os.listdir(self.directorio), [])
+
+class LimpiezaExportacionesTest(TrabajosExportacionBase):
+    """Tests para la retención de exportaciones"""
+
+    def test_elimina_trabajos_vencidos_y_archivos(self):
+        vencido, _ = solicitar_exportacion(self.usuario, 'jobs', 'excel', PARAMETROS_JOBS)
+        reciente, _ = solicitar_exportacion(self.usuario, 'jobs', 'pdf', PARAMETROS_JOBS)
+        procesar_exportacion(vencido.pk)
+        procesar_exportacion(reciente.pk)
+        vencido.refresh_from_db()
+        TrabajoExportacion.objects.filter(pk=vencido.pk).update(fecha_fin=timezone.now() - timedelta(days=2))
+
+        self.assertEqual(limpiar_exportaciones(), 1)
+        self.assertFalse(os.path.exists(ruta_archivo_exportacion(vencido)))
+        self.assertEqual(list(TrabajoExportacion.objects.values_list('pk', flat=True)), [reciente.pk])
+
+
+class ExportacionesAPITest(TrabajosExportacionBase):
+    """Tests para las vistas de solicitud, estado y descarga"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.usuario)
+
+    def _solicitar(self, **datos):
+        datos = {'tipo': 'jobs', 'formato': 'excel', 'fecha_inicio': '2024-01-01', 'fecha_fin': '2024-01-31', **datos}
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('reportes:api_exportaciones'), datos)
+
+    def test_solicitar_consultar_y_descargar(self):
+        response = self._solicitar()
+        self.assertEqual(response.status_code, 202)
+        data = response.json()['data']
+
+        estado = self.client.get(data['url_estado']).json()['data']
+        self.assertEqual(estado['estado'], TrabajoExportacion.ESTADO_COMPLETADO)
+
+        descarga = self.client.get(estado['url_descarga'])
+        self.assertEqual(descarga.status_code, 200)
+        self.assertIn('attachment', descarga['Content-Disposition'])
+
+        from openpyxl import load_workbook
+        ws = load_workbook(io.BytesIO(b''.join(descarga.streaming_content))).active
+        self.assertIn('SRV01', [c.value for c in ws[5]])
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self._solicitar(tipo='xp_cmdshell').status_code, 400)
+        self.assertEqual(self._solicitar(fecha_inicio='2024-13-45').status_code, 400)
+
+    def test_limite_devuelve_429(self):
+        with override_settings(EXPORTACIONES_EAGER=False), \
+                mock.patch('apps.reportes.tasks.generar_exportacion_task.delay'):
+            self._solicitar(formato='excel')
+            self._solicitar(formato='pdf')
+            self.assertEqual(self._solicitar(tipo='estados').status_code, 429)
+
+    def test_no_descarga_trabajos_de_otro_usuario(self):
+        trabajo_id = self._solicitar().json()['data']['id']
+        otro = User.objects.create_user('otro_api', password='x')
+        self.client.force_login(otro)
+
+        self.assertEqual(self.client.get(reverse('reportes:api_estado_exportacion', args=[trabajo_id])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('reportes:descargar_exportacion', args=[trabajo_id])).status_code, 404)
+
+    def test_descarga_de_trabajo_pendiente(self):
+        trabajo, _ = solicitar_exportacion(self.usuario, 'jobs', 'excel', PARAMETROS_JOBS)
+        response = self.client.get(reverse('reportes:descargar_exportacion', args=[trabajo.pk]))
+        self.assertEqual(response.status_code, 409)
+
+    def test_botones_pdf_excel_usan_la_api(self):
+        with mock.patch('apps.reportes.recolectores._ejecutar'):
+            response = self.client.get(reverse('reportes:disk_growth'))
+
+        self.assertContains(response, reverse('reportes:api_exportaciones'))
+        self.assertContains(response, "solicitarExportacion('disk_growth', 'excel')")
+        self.assertContains(response, "solicitarExportacion('disk_growth', 'pdf')")
+        self.assertNotContains(response, reverse('reportes:export_disk_growth_excel'))
+
+    def test_exportacion_directa_sigue_disponible(self):
+        """Las vistas export_*_excel generan el archivo en la misma petición"""
+        response = self.client.get(reverse('reportes:export_jobs_excel'), {'fecha_inicio': '2024-01-01'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Disposition'].endswith('.xlsx"'))
+        self.assertEqual(TrabajoExportacion.objects.count(), 0)
@@ -0,0 +1,244 @@
+# apps/reportes/trabajos_exportacion.py
+"""
+Trabajos de exportación PDF/Excel en segundo plano.
+
+El usuario solicita una exportación y recibe el id de un TrabajoExportacion;
+un worker de Celery genera el archivo en EXPORTACIONES_ROOT y el usuario lo
+descarga cuando el trabajo queda completado. Con EXPORTACIONES_EAGER = True
+el trabajo se procesa en el mismo proceso al confirmar la transacción
+(desarrollo y tests, sin broker).
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .config import EXPORT_JOBS_CONFIG
+from .exportaciones import CONTENT_TYPES, generar_exportacion
+from .models import TrabajoExportacion
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONES = {
+    'pdf': 'pdf',
+    'excel': 'xlsx',
+}
+
+
+class LimiteExportacionesError(Exception):
+    """El usuario alcanzó el máximo de exportaciones simultáneas"""
+
+
+def huella_exportacion(tipo, formato, parametros):
+    """Hash estable de una solicitud para detectar duplicados en curso"""
+    contenido = json.dumps([tipo, formato, parametros], sort_keys=True, default=str)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def _directorio_exportaciones():
+    return str(settings.EXPORTACIONES_ROOT)
+
+
+def ruta_archivo_exportacion(trabajo):
+    """Ruta absoluta del archivo generado por un trabajo"""
+    return os.path.join(_directorio_exportaciones(), trabajo.archivo)
+
+
+def _expirar_trabajos_colgados():
+    """
+    Marca como error los trabajos activos que superaron el timeout (worker
+    caído o tarea perdida) para que no ocupen el cupo del usuario.
+
+    Los trabajos en proceso se miden desde fecha_inicio: el tiempo de espera
+    en la cola no cuenta para el timeout de generación.
+    """
+    limite = timezone.now() - timedelta(minutes=EXPORT_JOBS_CONFIG['timeout_minutos'])
+    return TrabajoExportacion.objects.filter(
+        Q(estado=TrabajoExportacion.ESTADO_PENDIENTE, fecha_creacion__lt=limite)
+        | Q(estado=TrabajoExportacion.ESTADO_PROCESANDO, fecha_inicio__lt=limite)
+    ).update(
+        estado=TrabajoExportacion.ESTADO_ERROR,
+        error='Tiempo de espera agotado',
+        fecha_fin=timezone.now()
+    )
+
+
+def solicitar_exportacion(usuario, tipo, formato, parametros):
+    """
+    Crea (o reutiliza) un trabajo de exportación y lo encola.
+
+    Una solicitud idéntica del mismo usuario que siga pendiente o en proceso
+    devuelve el trabajo existente en lugar de crear otro.
+
+    Args:
+        usuario: Usuario que solicita la exportación
+        tipo: Reporte (ver exportaciones.REPORTES_EXPORTABLES)
+        formato: 'pdf' o 'excel'
+        parametros: Parámetros normalizados con parametros_exportacion()
+
+    Returns:
+        tuple: (TrabajoExportacion, creado)
+
+    Raises:
+        ValueError: Si el formato no es válido
+        LimiteExportacionesError: Si el usuario ya tiene el máximo de trabajos activos
+    """
+    if formato not in CONTENT_TYPES:
+        raise ValueError(f"Formato '{formato}' no soportado")
+
+    huella = huella_exportacion(tipo, formato, parametros)
+    _expirar_trabajos_colgados()
+
+    with transaction.atomic():
+        # Serializar las solicitudes concurrentes del mismo usuario
+        User.objects.select_for_update().filter(pk=usuario.pk).first()
+
+        activos = TrabajoExportacion.objects.filter(
+            usuario=usuario,
+            estado__in=TrabajoExportacion.ESTADOS_ACTIVOS
+        )
+        existente = activos.filter(huella=huella).first()
+        if existente:
+            logger.info(f"Exportación {existente.pk} reutilizada para {usuario.username}")
+            return existente, False
+
+        maximo = EXPORT_JOBS_CONFIG['max_activos_por_usuario']
+        if activos.count() >= maximo:
+            raise LimiteExportacionesError(
+                f'Ya tiene {maximo} exportaciones en curso. Espere a que terminen.'
+            )
+
+        trabajo = TrabajoExportacion.objects.create(
+            usuario=usuario,
+            tipo=tipo,
+            formato=formato,
+            parametros=parametros,
+            huella=huella
+        )
+        transaction.on_commit(lambda: _encolar(trabajo.pk))
+
+    logger.info(f"Exportación {trabajo.pk} ({tipo}.{formato}) solicitada por {usuario.username}")
+    trabajo.refresh_from_db()
+    return trabajo, True
+
+
+def _encolar(trabajo_id):
+    """Envía el trabajo al worker de Celery (o lo procesa en línea en modo eager)"""
+    if getattr(settings, 'EXPORTACIONES_EAGER', False):
+        procesar_exportacion(trabajo_id)
+        return
+
+    try:
+        from .tasks import generar_exportacion_task
+        generar_exportacion_task.delay(str(trabajo_id))
+    except Exception as e:
+        logger.error(f"Error encolando exportación {trabajo_id}: {e}")
+        TrabajoExportacion.objects.filter(pk=trabajo_id).update(
+            estado=TrabajoExportacion.ESTADO_ERROR,
+            error='No se pudo encolar la exportación',
+            fecha_fin=timezone.now()
+        )
+
+
+def procesar_exportacion(trabajo_id):
+    """
+    Genera el archivo de un trabajo pendiente.
+
+    El paso pendiente -> procesando es un UPDATE condicional, por lo que una
+    tarea entregada dos veces solo genera el archivo una vez.
+
+    Returns:
+        bool: True si el archivo se generó
+    """
+    tomado = TrabajoExportacion.objects.filter(
+        pk=trabajo_id,
+        estado=TrabajoExportacion.ESTADO_PENDIENTE
+    ).update(estado=TrabajoExportacion.ESTADO_PROCESANDO, fecha_inicio=timezone.now())
+    if not tomado:
+        logger.warning(f"Exportación {trabajo_id} no está pendiente, se omite")
+        return False
+
+    trabajo = TrabajoExportacion.objects.get(pk=trabajo_id)
+    archivo = f"{trabajo.pk}.{EXTENSIONES[trabajo.formato]}"
+    ruta = os.path.join(_directorio_exportaciones(), archivo)
+    ruta_temporal = f"{ruta}.tmp"
+
+    try:
+        os.makedirs(_directorio_exportaciones(), exist_ok=True)
+        with open(ruta_temporal, 'wb') as destino:
+            nombre_archivo = generar_exportacion(trabajo.tipo, trabajo.formato, trabajo.parametros, destino)
+        os.replace(ruta_temporal, ruta)
+
+    except Exception as e:
+        logger.error(f"Error generando exportación {trabajo_id}: {e}")
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        TrabajoExportacion.objects.filter(pk=trabajo_id, estado=TrabajoExportacion.ESTADO_PROCESANDO).update(
+            estado=TrabajoExportacion.ESTADO_ERROR,
+            error=str(e)[:1000],
+            fecha_fin=timezone.now()
+        )
+        return False
+
+    # Condicional: si el trabajo expiró mientras se generaba, no se reabre
+    completado = TrabajoExportacion.objects.filter(
+        pk=trabajo_id,
+        estado=TrabajoExportacion.ESTADO_PROCESANDO
+    ).update(
+        estado=TrabajoExportacion.ESTADO_COMPLETADO,
+        archivo=archivo,
+        nombre_archivo=nombre_archivo,
+        tamano_bytes=os.path.getsize(ruta),
+        fecha_fin=timezone.now()
+    )
+    if not completado:
+        logger.warning(f"Exportación {trabajo_id} expiró durante la generación, se descarta el archivo")
+        os.remove(ruta)
+        return False
+
+    logger.info(f"Exportación {trabajo_id} generada: {nombre_archivo}")
+    return True
+
+
+def limpiar_exportaciones(retencion_horas=None):
+    """
+    Elimina los trabajos terminados (y sus archivos) más antiguos que la
+    retención configurada.
+
+    Returns:
+        int: Número de trabajos eliminados
+    """
+    if retencion_horas is None:
+        retencion_horas = EXPORT_JOBS_CONFIG['retencion_horas']
+
+    _expirar_trabajos_colgados()
+
+    limite = timezone.now() - timedelta(hours=retencion_horas)
+    vencidos = TrabajoExportacion.objects.filter(
+        estado__in=[TrabajoExportacion.ESTADO_COMPLETADO, TrabajoExportacion.ESTADO_ERROR],
+        fecha_fin__lt=limite
+    )
+
+    eliminados = 0
+    for trabajo in vencidos.iterator():
+        if trabajo.archivo:
+            try:
+                os.remove(ruta_archivo_exportacion(trabajo))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"No se pudo eliminar el archivo de la exportación {trabajo.pk}: {e}")
+                continue
+        trabajo.delete()
+        eliminados += 1
+
+    if eliminados:
+        logger.info(f"Exportaciones eliminadas por retención: {eliminados}")
+    return eliminados
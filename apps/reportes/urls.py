@@ -18,6 +18,8 @@ urlpatterns = [
     
     # APIs
     path('api/dashboard-metrics/', views.api_dashboard_metrics, name='api_dashboard_metrics'),
+    path('api/dashboard-eventos/', views.api_eventos_dashboard, name='api_eventos_dashboard'),
+    path('api/cache/', views.api_cache_procedimientos, name='api_cache_procedimientos'),
     
     # Funciones adicionales de cumplimiento
     path('buscar-reporte/', views.buscar_reporte_cumplimiento, name='buscar_reporte'),
@@ -39,6 +41,13 @@ urlpatterns = [
     path('estados-db/excel/', views.export_estados_excel, name='export_estados_excel'),
     path('disk-growth/excel/', views.export_disk_growth_excel, name='export_disk_growth_excel'),
     
+    # ==========================================================================
+    # EXPORTACIONES EN SEGUNDO PLANO (PDF/EXCEL)
+    # ==========================================================================
+    path('api/exportaciones/', views.api_exportaciones, name='api_exportaciones'),
+    path('api/exportaciones/<uuid:trabajo_id>/', views.api_estado_exportacion, name='api_estado_exportacion'),
+    path('exportaciones/<uuid:trabajo_id>/descargar/', views.descargar_exportacion, name='descargar_exportacion'),
+    
     # ==========================================================================
     # EXPORTACIÓN A CSV
     # ==========================================================================
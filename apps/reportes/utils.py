@@ -1,8 +1,17 @@
 # apps/reportes/utils.py
 from django.db import connection
+from django.core.cache import cache
+import hashlib
+import json
 import logging
+import re
+import threading
 from datetime import datetime
 
+from .coalescencia import construir_huella, ejecutar_una_vez
+from .config import CACHE_CONFIG, EXPORT_CONFIG, PROCEDURE_CACHE, QUERIES, RECOLECTORES_CONFIG
+from .utils_secure import sanitizar_input_like
+
 logger = logging.getLogger(__name__)
 
 # Whitelist de procedimientos almacenados permitidos (Seguridad)
@@ -104,16 +113,203 @@ def ejecutar_sp_dashboard_metrics():
         return resultado
 
 
-def ejecutar_procedimiento_almacenado(proc_name, params=None):
+def _normalizar_parametros(params):
+    """
+    Convierte fechas string a formato ISO (YYYY-MM-DD) para SQL Server.
+
+    Los parámetros que no son fechas se mantienen sin cambios.
+    """
+    converted_params = []
+    for param in params or []:
+        if isinstance(param, str):
+            # Intentar detectar y normalizar formatos de fecha comunes
+            try:
+                # Formato YYYY/MM/DD -> convertir a YYYY-MM-DD (ISO)
+                if '/' in param and len(param) == 10:
+                    dt = datetime.strptime(param, '%Y/%m/%d')
+                    # Convertir a formato ISO que SQL Server siempre acepta
+                    converted_params.append(dt.strftime('%Y-%m-%d'))
+                # Formato YYYY-MM-DD -> ya está en ISO, mantener
+                elif '-' in param and len(param) == 10:
+                    # Validar que es fecha válida
+                    datetime.strptime(param, '%Y-%m-%d')
+                    converted_params.append(param)  # Ya está en formato correcto
+                else:
+                    # No es fecha, mantener como string
+                    converted_params.append(param)
+            except ValueError:
+                # No se pudo parsear como fecha, mantener original
+                converted_params.append(param)
+        else:
+            # No es string, mantener original
+            converted_params.append(param)
+    return converted_params
+
+
+# =============================================================================
+# CACHE DE RESULTADOS DE PROCEDIMIENTOS ALMACENADOS
+# =============================================================================
+# La clave se compone de (procedimiento, parámetros normalizados) y de una
+# "generación" por procedimiento: invalidar incrementa la generación y deja
+# huérfanas las entradas anteriores, que expiran solas por TTL. Así no se
+# necesita borrar por patrón (LocMemCache no lo soporta).
+
+CACHE_PREFIX = 'reportes:sp'
+
+_cache_lock = threading.Lock()
+_cache_stats = {'hits': 0, 'misses': 0, 'bypass': 0, 'invalidaciones': 0, 'coalescidas': 0}
+
+
+def _ttl_procedimiento(proc_name):
+    """Retorna el TTL en segundos para el SP o None si no se cachea"""
+    clave_config = PROCEDURE_CACHE.get(proc_name)
+    if not clave_config:
+        return None
+    return CACHE_CONFIG.get(clave_config)
+
+
+def _generacion_procedimiento(proc_name):
+    """Retorna la generación vigente del cache para el procedimiento"""
+    return cache.get(f'{CACHE_PREFIX}:gen:{proc_name}', 0)
+
+
+def construir_clave_cache(proc_name, params=None):
+    """
+    Construye la clave de cache para un procedimiento y sus parámetros.
+
+    Los parámetros se normalizan antes de calcular la clave, de modo que
+    '2024/01/31' y '2024-01-31' comparten la misma entrada.
+    """
+    params_normalizados = _normalizar_parametros(params)
+    firma = json.dumps(params_normalizados, default=str, sort_keys=True)
+    digest = hashlib.md5(firma.encode('utf-8')).hexdigest()
+    generacion = _generacion_procedimiento(proc_name)
+    return f'{CACHE_PREFIX}:{proc_name}:{generacion}:{digest}'
+
+
+def _registrar_estadistica(tipo):
+    with _cache_lock:
+        _cache_stats[tipo] += 1
+
+
+def invalidar_cache_procedimiento(proc_name=None):
+    """
+    Invalida los resultados cacheados de un procedimiento.
+
+    Args:
+        proc_name (str): Procedimiento a invalidar. Si es None se invalidan
+            todos los procedimientos cacheables.
+    """
+    procedimientos = [proc_name] if proc_name else list(PROCEDURE_CACHE)
+    for nombre in procedimientos:
+        clave_gen = f'{CACHE_PREFIX}:gen:{nombre}'
+        # add() no sobrescribe; garantiza que incr() tenga una clave existente
+        cache.add(clave_gen, 0, None)
+        try:
+            cache.incr(clave_gen)
+        except ValueError:
+            cache.set(clave_gen, 1, None)
+    _registrar_estadistica('invalidaciones')
+    logger.info(f"Cache invalidado para: {', '.join(procedimientos)}")
+
+
+def obtener_estadisticas_cache():
+    """
+    Retorna los contadores de hits/misses del cache de procedimientos
+    (contadores del proceso actual).
+    """
+    with _cache_lock:
+        stats = dict(_cache_stats)
+    consultas = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round((stats['hits'] / consultas) * 100, 2) if consultas > 0 else 0
+    return stats
+
+
+def reiniciar_estadisticas_cache():
+    """Reinicia los contadores de hits/misses"""
+    with _cache_lock:
+        for clave in _cache_stats:
+            _cache_stats[clave] = 0
+
+
+def debe_omitir_cache(request):
+    """
+    Indica si la petición solicita saltarse el cache.
+
+    Solo los administradores (staff) pueden forzar la consulta directa
+    a SQL Server agregando ?refresh=1 a la URL.
+    """
+    user = getattr(request, 'user', None)
+    if not user or not user.is_authenticated or not user.is_staff:
+        return False
+    return request.GET.get('refresh') == '1'
+
+
+def _ejecutar_exec(cursor, proc_name, params=None):
+    """Ejecuta EXEC proc_name con placeholders (%s) y parámetros separados"""
+    if params:
+        converted_params = _normalizar_parametros(params)
+
+        # SEGURIDAD: Crear placeholders para cada parámetro
+        placeholders = ', '.join(['%s'] * len(converted_params))
+        sql = f"EXEC {proc_name} {placeholders}"  # Solo estructura, sin valores
+
+        logger.info(f"Ejecutando: {sql} con {len(converted_params)} parámetros")
+        cursor.execute(sql, converted_params)  # ✅ SEGURO - parámetros separados
+    else:
+        sql = f"EXEC {proc_name}"
+        logger.info(f"Ejecutando: {sql}")
+        cursor.execute(sql)
+
+
+# Consultas de solo lectura: empiezan con SELECT/WITH y no escriben
+_CONSULTA_LECTURA = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+_CONSULTA_ESCRITURA = re.compile(r'\b(INSERT|UPDATE|DELETE|MERGE|INTO|EXEC|EXECUTE)\b', re.IGNORECASE)
+
+
+def es_consulta_lectura(query):
+    """Indica si la consulta solo lee (se puede compartir entre llamadores)"""
+    return bool(_CONSULTA_LECTURA.match(query)) and not _CONSULTA_ESCRITURA.search(query)
+
+
+def _ejecutar_coalescido(huella, ejecutar, descripcion):
+    """
+    Comparte ejecutar() con las llamadas concurrentes de la misma huella.
+
+    Dentro de una transacción (atomic) se ejecuta aparte: el llamador debe
+    ver sus propios cambios sin confirmar y no recibir los de otro. Todos,
+    incluido el líder, reciben copias de las filas: los que esperan comparten
+    el mismo objeto y las vistas modifican los diccionarios.
+    """
+    if connection.in_atomic_block:
+        return ejecutar()
+
+    results, compartido = ejecutar_una_vez(huella, ejecutar)
+    if compartido:
+        _registrar_estadistica('coalescidas')
+        logger.info(f"Resultado de {descripcion} compartido con una ejecución en curso.")
+    return [dict(fila) for fila in results]
+
+
+def ejecutar_procedimiento_almacenado(proc_name, params=None, use_cache=True):
     """
     Ejecuta un procedimiento almacenado de forma SEGURA usando EXEC con placeholders.
 
     FIX DE SEGURIDAD: Esta función ahora usa placeholders (%s) con parámetros separados
     en lugar de concatenación de strings para prevenir SQL injection.
 
+    Los procedimientos declarados en config.PROCEDURE_CACHE se cachean con el
+    TTL de config.CACHE_CONFIG. Con use_cache=False se consulta SQL Server y el
+    resultado fresco reemplaza la entrada cacheada.
+
+    Las llamadas concurrentes con el mismo procedimiento y parámetros
+    comparten una sola ejecución (coalescencia.py), salvo dentro de una
+    transacción y en los procedimientos recolectores.
+
     Args:
         proc_name (str): Nombre del procedimiento almacenado
         params (list): Lista de parámetros para el procedimiento
+        use_cache (bool): Si es False se omite la lectura del cache
 
     Returns:
         list: Lista de diccionarios con los resultados
@@ -127,68 +323,63 @@ def ejecutar_procedimiento_almacenado(proc_name, params=None):
         logger.error(error_msg)
         raise ValueError(error_msg)
 
-    try:
-        with connection.cursor() as cursor:
-            if params:
-                # Convertir fechas string a formato ISO (YYYY-MM-DD) para SQL Server
-                converted_params = []
-                for param in params:
-                    if isinstance(param, str):
-                        # Intentar detectar y normalizar formatos de fecha comunes
-                        try:
-                            # Formato YYYY/MM/DD -> convertir a YYYY-MM-DD (ISO)
-                            if '/' in param and len(param) == 10:
-                                dt = datetime.strptime(param, '%Y/%m/%d')
-                                # Convertir a formato ISO que SQL Server siempre acepta
-                                converted_params.append(dt.strftime('%Y-%m-%d'))
-                            # Formato YYYY-MM-DD -> ya está en ISO, mantener
-                            elif '-' in param and len(param) == 10:
-                                # Validar que es fecha válida
-                                dt = datetime.strptime(param, '%Y-%m-%d')
-                                converted_params.append(param)  # Ya está en formato correcto
-                            else:
-                                # No es fecha, mantener como string
-                                converted_params.append(param)
-                        except ValueError:
-                            # No se pudo parsear como fecha, mantener original
-                            converted_params.append(param)
-                    else:
-                        # No es string, mantener original
-                        converted_params.append(param)
-
-                # SEGURIDAD: Crear placeholders para cada parámetro
-                placeholders = ', '.join(['%s'] * len(converted_params))
-                sql = f"EXEC {proc_name} {placeholders}"  # Solo estructura, sin valores
-
-                logger.info(f"Ejecutando: {sql} con {len(converted_params)} parámetros")
-                cursor.execute(sql, converted_params)  # ✅ SEGURO - parámetros separados
-            else:
-                sql = f"EXEC {proc_name}"
-                logger.info(f"Ejecutando: {sql}")
-                cursor.execute(sql)
-
-            # Obtener nombres de columnas
-            columns = [col[0] for col in cursor.description] if cursor.description else []
-
-            # Obtener resultados
-            results = []
-            for row in cursor.fetchall():
-                results.append(dict(zip(columns, row)))
-
-            logger.info(f"Procedimiento {proc_name} ejecutado exitosamente. {len(results)} registros obtenidos.")
-            return results
+    ttl = _ttl_procedimiento(proc_name)
+    clave = construir_clave_cache(proc_name, params) if ttl else None
 
-    except ValueError:
-        # Re-lanzar ValueError para que se propague
-        raise
-    except Exception as e:
-        logger.error(f"Error ejecutando procedimiento {proc_name}: {e}")
-        return []
+    if clave:
+        if use_cache:
+            cacheado = cache.get(clave)
+            if cacheado is not None:
+                _registrar_estadistica('hits')
+                logger.info(f"Cache hit para {proc_name}. {len(cacheado)} registros.")
+                # Copias: las vistas modifican los diccionarios (formatear_resultado_backup)
+                return [dict(fila) for fila in cacheado]
+            _registrar_estadistica('misses')
+        else:
+            _registrar_estadistica('bypass')
+
+    def ejecutar():
+        try:
+            with connection.cursor() as cursor:
+                _ejecutar_exec(cursor, proc_name, params)
+
+                # Obtener nombres de columnas
+                columns = [col[0] for col in cursor.description] if cursor.description else []
+
+                # Obtener resultados
+                results = []
+                for row in cursor.fetchall():
+                    results.append(dict(zip(columns, row)))
+
+                logger.info(f"Procedimiento {proc_name} ejecutado exitosamente. {len(results)} registros obtenidos.")
+
+                # Solo se cachean ejecuciones exitosas; los errores devuelven [] sin cachear
+                if clave:
+                    cache.set(clave, [dict(fila) for fila in results], ttl)
+                return results
+
+        except ValueError:
+            # Re-lanzar ValueError para que se propague
+            raise
+        except Exception as e:
+            logger.error(f"Error ejecutando procedimiento {proc_name}: {e}")
+            return []
+
+    # Los recolectores escriben en tablas de log: cada llamada debe ejecutarse
+    if proc_name in RECOLECTORES_CONFIG:
+        return ejecutar()
+    return _ejecutar_coalescido(
+        construir_huella('sp', proc_name, _normalizar_parametros(params)), ejecutar, proc_name
+    )
 
 def ejecutar_consulta_personalizada(query, params=None):
     """
     Ejecuta una consulta SQL personalizada
-    
+
+    Las consultas de solo lectura (es_consulta_lectura) idénticas y
+    concurrentes comparten una sola ejecución (coalescencia.py), salvo
+    dentro de una transacción.
+
     Args:
         query (str): Consulta SQL
         params (list): Parámetros para la consulta
@@ -196,20 +387,210 @@ def ejecutar_consulta_personalizada(query, params=None):
     Returns:
         list: Lista de diccionarios con los resultados
     """
+    def ejecutar():
+        try:
+            with connection.cursor() as cursor:
+                logger.info(f"Ejecutando consulta personalizada")
+                cursor.execute(query, params or [])
+                columns = [col[0] for col in cursor.description] if cursor.description else []
+                results = []
+                for row in cursor.fetchall():
+                    results.append(dict(zip(columns, row)))
+
+                logger.info(f"Consulta ejecutada exitosamente. {len(results)} registros obtenidos.")
+                return results
+        except Exception as e:
+            logger.error(f"Error ejecutando consulta: {e}")
+            return []
+
+    # Solo las lecturas de reportes se agrupan (coalescencia.py)
+    if not es_consulta_lectura(query):
+        return ejecutar()
+    return _ejecutar_coalescido(construir_huella('sql', query, params), ejecutar, 'consulta personalizada')
+
+def limitar_consulta(sql, limite, conexion=None):
+    """
+    Agrega a una consulta el límite de filas del motor: TOP (n) en SQL
+    Server, LIMIT n en los demás (tests con SQLite).
+
+    Args:
+        sql (str): Consulta que empieza con SELECT (ORDER BY incluido)
+        limite (int): Número máximo de filas
+        conexion: Conexión de Django (por defecto 'default')
+    """
+    if (conexion or connection).vendor == 'microsoft':
+        return sql.replace('SELECT', f'SELECT TOP ({int(limite)})', 1)
+    return f'{sql} LIMIT {int(limite)}'
+
+
+def _iterar_cursor(cursor, chunk_size):
+    """Recorre el cursor con fetchmany para no materializar todo el resultado"""
+    columns = [col[0] for col in cursor.description] if cursor.description else []
+    total = 0
+    while True:
+        filas = cursor.fetchmany(chunk_size)
+        if not filas:
+            break
+        total += len(filas)
+        for row in filas:
+            yield dict(zip(columns, row))
+    logger.info(f"Lectura por lotes finalizada. {total} registros obtenidos.")
+
+
+def iterar_consulta(query, params=None, chunk_size=None):
+    """
+    Ejecuta una consulta y devuelve los resultados por lotes (fetchmany).
+
+    A diferencia de ejecutar_consulta_personalizada, nunca mantiene en
+    memoria más de chunk_size filas; pensado para exportaciones grandes.
+
+    Args:
+        query (str): Consulta SQL
+        params (list): Parámetros para la consulta
+        chunk_size (int): Filas por lote (por defecto EXPORT_CONFIG['chunk_size'])
+
+    Yields:
+        dict: Una fila por iteración
+
+    Raises:
+        Exception: Los errores de la consulta se registran y se propagan; al
+            leer por partes pueden ocurrir después de entregar filas, y no
+            deben confundirse con el fin del resultado
+    """
+    chunk_size = chunk_size or EXPORT_CONFIG['chunk_size']
     try:
         with connection.cursor() as cursor:
-            logger.info(f"Ejecutando consulta personalizada")
+            logger.info("Ejecutando consulta por lotes")
             cursor.execute(query, params or [])
-            columns = [col[0] for col in cursor.description] if cursor.description else []
-            results = []
-            for row in cursor.fetchall():
-                results.append(dict(zip(columns, row)))
-            
-            logger.info(f"Consulta ejecutada exitosamente. {len(results)} registros obtenidos.")
-            return results
+            yield from _iterar_cursor(cursor, chunk_size)
     except Exception as e:
-        logger.error(f"Error ejecutando consulta: {e}")
-        return []
+        logger.error(f"Error ejecutando consulta por lotes: {e}")
+        raise
+
+
+def iterar_procedimiento_almacenado(proc_name, params=None, chunk_size=None, use_cache=True):
+    """
+    Variante por lotes de ejecutar_procedimiento_almacenado.
+
+    Si el resultado ya está en cache se recorre desde ahí; si no, se lee del
+    cursor con fetchmany sin cachearlo (para mantener la memoria constante).
+
+    Returns:
+        iterator: Filas como diccionarios
+
+    Raises:
+        ValueError: Si el procedimiento no está en la whitelist
+        Exception: Los errores de ejecución o lectura se propagan al iterar,
+            igual que en iterar_consulta
+    """
+    if proc_name not in ALLOWED_STORED_PROCEDURES:
+        error_msg = f"Procedimiento no permitido: {proc_name}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+
+    if use_cache and _ttl_procedimiento(proc_name):
+        cacheado = cache.get(construir_clave_cache(proc_name, params))
+        if cacheado is not None:
+            _registrar_estadistica('hits')
+            logger.info(f"Cache hit para {proc_name}. {len(cacheado)} registros.")
+            return (dict(fila) for fila in cacheado)
+        _registrar_estadistica('misses')
+
+    return _iterar_procedimiento(proc_name, params, chunk_size or EXPORT_CONFIG['chunk_size'])
+
+
+def _iterar_procedimiento(proc_name, params, chunk_size):
+    try:
+        with connection.cursor() as cursor:
+            _ejecutar_exec(cursor, proc_name, params)
+            yield from _iterar_cursor(cursor, chunk_size)
+    except Exception as e:
+        logger.error(f"Error ejecutando procedimiento {proc_name}: {e}")
+        raise
+
+
+class ConsultaPaginada:
+    """
+    Fuente de datos perezosa para django.core.paginator.Paginator.
+
+    En lugar de materializar todo el resultado, Paginator obtiene el total
+    con un COUNT(*) y cada página con OFFSET/FETCH, de modo que solo se
+    traen de SQL Server las filas visibles.
+
+    Args:
+        query (str): Consulta base SIN cláusula ORDER BY
+        params (list): Parámetros de la consulta base
+        order_by (str): Expresión ORDER BY (obligatoria para OFFSET/FETCH)
+    """
+
+    def __init__(self, query, params=None, order_by='(SELECT NULL)'):
+        self.query = query
+        self.params = list(params or [])
+        self.order_by = order_by
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            resultado = ejecutar_consulta_personalizada(
+                f"SELECT COUNT(*) AS total FROM ({self.query}) AS consulta_paginada",
+                self.params
+            )
+            self._count = resultado[0]['total'] if resultado else 0
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            inicio = key.start or 0
+            fin = key.stop if key.stop is not None else self.count()
+            if fin <= inicio:
+                return []
+            sql = (
+                f"{self.query} ORDER BY {self.order_by} "
+                f"OFFSET %s ROWS FETCH NEXT %s ROWS ONLY"
+            )
+            return ejecutar_consulta_personalizada(sql, self.params + [inicio, fin - inicio])
+        filas = self[key:key + 1]
+        if not filas:
+            raise IndexError('Índice fuera de rango')
+        return filas[0]
+
+
+def filtros_jobs_backup(servidor='', resultado=''):
+    """
+    Filtros SQL del reporte de jobs sobre JOBSBACKUPGENERADOS.
+
+    La página, sus estadísticas y las exportaciones usan los mismos filtros
+    para que el archivo exportado coincida con lo que se ve en pantalla.
+
+    Returns:
+        tuple: (fragmento SQL con los AND, lista de parámetros)
+    """
+    filtros_sql = ''
+    filtros_params = []
+    if servidor:
+        filtros_sql += " AND SERVIDOR LIKE %s"
+        filtros_params.append(f'%{sanitizar_input_like(servidor)}%')
+    if resultado:
+        filtros_sql += " AND RESULTADO LIKE %s"
+        filtros_params.append(f'%{sanitizar_input_like(resultado)}%')
+    return filtros_sql, filtros_params
+
+
+def consulta_jobs_backup(fecha_inicio, fecha_fin, servidor='', resultado=''):
+    """
+    Consulta completa del reporte de jobs para exportar, con el mismo origen,
+    filtros y orden que la página paginada.
+
+    Returns:
+        tuple: (query, params)
+    """
+    filtros_sql, filtros_params = filtros_jobs_backup(servidor, resultado)
+    query = f"{QUERIES['jobs_resultado_paginado']}{filtros_sql} ORDER BY FECHA_Y_HORA_INICIO DESC"
+    return query, [fecha_inicio, fecha_fin] + filtros_params
+
 
 def obtener_servidores_disponibles():
     """Obtiene la lista de servidores disponibles desde BACKUPSGENERADOS"""
@@ -268,8 +649,13 @@ def formatear_resultado_backup(resultado):
             resultado['css_class'] = 'warning'
             resultado['icono'] = 'ki-information'
     
-    # Formatear fechas si es necesario
-    if 'FECHA' in resultado and 'HORA' in resultado:
+    # Formatear fechas si es necesario (preferir la columna calculada FECHA_HORA)
+    if isinstance(resultado.get('FECHA_HORA'), datetime):
+        fecha_hora = resultado['FECHA_HORA']
+        resultado['fecha_formateada'] = fecha_hora.strftime("%d/%m/%Y")
+        resultado['hora_formateada'] = fecha_hora.strftime("%H:%M:%S")
+        resultado['fecha_hora_completa'] = fecha_hora
+    elif 'FECHA' in resultado and 'HORA' in resultado:
         try:
             fecha_hora_str = f"{resultado['FECHA']} {resultado['HORA']}"
             # Intentar parsear la fecha en formato DD/MM/YYYY HH:MM:SS
@@ -444,7 +830,7 @@ def obtener_estadisticas_generales():
                 (SELECT COUNT(DISTINCT DatabaseName) FROM BACKUPSGENERADOS) as total_bases_datos,
                 (SELECT COUNT(*) FROM BACKUPSGENERADOS) as total_backups,
                 (SELECT COUNT(*) FROM JOBSBACKUPGENERADOS) as total_jobs,
-                (SELECT COUNT(*) FROM BACKUPSGENERADOS WHERE FECHA = CONVERT(varchar, GETDATE(), 103)) as backups_hoy,
+                (SELECT COUNT(*) FROM BACKUPSGENERADOS WHERE FECHA_HORA >= CONVERT(date, GETDATE())) as backups_hoy,
                 (SELECT COUNT(*) FROM JOBSBACKUPGENERADOS WHERE CONVERT(date, FECHA_Y_HORA_INICIO) = CONVERT(date, GETDATE())) as jobs_hoy
         """
         
@@ -1,25 +1,20 @@
 # apps/reportes/views.py
 import csv
-from django.shortcuts import render, redirect
-from django.http import HttpResponse, JsonResponse
+from django.shortcuts import render, redirect, get_object_or_404
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse, FileResponse, Http404
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from django.core.paginator import Paginator
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.urls import reverse
 from django.contrib import messages
 from datetime import datetime, timedelta
 import json
 import logging
-
-# Para exportación Excel
-try:
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
-    from openpyxl.utils import get_column_letter
-    OPENPYXL_AVAILABLE = True
-except ImportError:
-    OPENPYXL_AVAILABLE = False
+import os
 
 
 # =============================================================================
@@ -28,10 +23,10 @@ except ImportError:
 
 def create_styled_excel(data, headers, filename, title=None, sheet_name='Datos'):
     """
-    Crea un archivo Excel con formato profesional.
+    Crea un archivo Excel con formato profesional (ver escribir_excel).
     
     Args:
-        data: Lista de diccionarios con los datos
+        data: Iterable de diccionarios con los datos
         headers: Lista de tuplas (key, label)
         filename: Nombre del archivo
         title: Título del reporte (opcional)
@@ -44,146 +39,118 @@ def create_styled_excel(data, headers, filename, title=None, sheet_name='Datos')
         # Fallback a CSV si openpyxl no está disponible
         return create_csv_response(data, headers, filename)
     
-    wb = Workbook()
-    ws = wb.active
-    ws.title = sheet_name
-    
-    # Estilos
-    header_font = Font(bold=True, color='FFFFFF', size=11)
-    header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-    header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    
-    even_fill = PatternFill(start_color='D9E2F3', end_color='D9E2F3', fill_type='solid')
-    odd_fill = PatternFill(start_color='FFFFFF', end_color='FFFFFF', fill_type='solid')
-    
-    thin_border = Border(
-        left=Side(style='thin', color='CCCCCC'),
-        right=Side(style='thin', color='CCCCCC'),
-        top=Side(style='thin', color='CCCCCC'),
-        bottom=Side(style='thin', color='CCCCCC')
-    )
-    
-    header_border = Border(
-        left=Side(style='thin', color='000000'),
-        right=Side(style='thin', color='000000'),
-        top=Side(style='thin', color='000000'),
-        bottom=Side(style='thin', color='000000')
-    )
-    
-    start_row = 1
-    
-    # Agregar título si existe
-    if title:
-        title_cell = ws.cell(row=1, column=1, value=title)
-        title_cell.font = Font(bold=True, size=14, color='1F4E79')
-        title_cell.alignment = Alignment(horizontal='left', vertical='center')
-        
-        date_cell = ws.cell(row=2, column=1, value=f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-        date_cell.font = Font(italic=True, size=10, color='666666')
-        
-        start_row = 4
-    
-    # Escribir encabezados
-    header_keys = [h[0] for h in headers]
-    header_labels = [h[1] for h in headers]
-    
-    for col_idx, label in enumerate(header_labels, 1):
-        cell = ws.cell(row=start_row, column=col_idx, value=label)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = header_border
-    
-    # Escribir datos
-    for row_idx, row_data in enumerate(data, start_row + 1):
-        for col_idx, key in enumerate(header_keys, 1):
-            value = row_data.get(key, '') if isinstance(row_data, dict) else ''
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            
-            # Alternar colores de fila
-            if (row_idx - start_row) % 2 == 0:
-                cell.fill = even_fill
-            else:
-                cell.fill = odd_fill
-            
-            cell.border = thin_border
-            cell.alignment = Alignment(horizontal='left', vertical='center')
-    
-    # Ajustar ancho de columnas
-    for col_idx, label in enumerate(header_labels, 1):
-        column_letter = get_column_letter(col_idx)
-        max_length = len(str(label))
-        
-        for row in ws.iter_rows(min_row=start_row + 1, min_col=col_idx, max_col=col_idx):
-            for cell in row:
-                if cell.value:
-                    cell_length = len(str(cell.value))
-                    if cell_length > max_length:
-                        max_length = cell_length
-        
-        ws.column_dimensions[column_letter].width = min(max_length + 3, 50)
-    
-    # Congelar encabezados
-    ws.freeze_panes = f'A{start_row + 1}'
-    
-    # Crear respuesta HTTP
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
+    response = HttpResponse(content_type=CONTENT_TYPES['excel'])
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
     
-    wb.save(response)
+    escribir_excel(response, data, headers, title=title, sheet_name=sheet_name)
     return response
 
 
-def create_csv_response(data, headers, filename):
-    """Crea una respuesta HTTP con un archivo CSV formateado correctamente."""
-    response = HttpResponse(content_type='text/csv; charset=utf-8')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    # BOM para que Excel reconozca UTF-8
-    response.write('\ufeff')
-    
+class _EchoBuffer:
+    """Pseudo-buffer para csv.writer: devuelve la línea en lugar de guardarla"""
+
+    def write(self, value):
+        return value
+
+
+def _valor_csv(valor):
+    """Formatea fechas de forma uniforme en los CSV"""
+    if isinstance(valor, datetime):
+        return valor.strftime('%Y-%m-%d %H:%M:%S')
+    return valor
+
+
+def _generar_csv(data, headers):
+    """Genera el CSV por lotes de EXPORT_CONFIG['chunk_size'] filas"""
     # Usar punto y coma como delimitador para mejor compatibilidad con Excel
-    writer = csv.writer(response, delimiter=';', quoting=csv.QUOTE_MINIMAL)
-    
-    # Escribir encabezados
+    writer = csv.writer(_EchoBuffer(), delimiter=CSVConfig.DELIMITER, quoting=csv.QUOTE_MINIMAL)
+
+    # BOM para que Excel reconozca UTF-8 + encabezados
     header_labels = [h[1] for h in headers]
-    writer.writerow(header_labels)
-    
+    yield CSVConfig.BOM + writer.writerow(header_labels)
+
     # Escribir datos
     header_keys = [h[0] for h in headers]
-    for row_data in data:
-        if isinstance(row_data, dict):
-            row = [row_data.get(key, '') for key in header_keys]
-        else:
-            row = row_data
-        writer.writerow(row)
-    
+    lote = []
+    try:
+        for row_data in data:
+            if isinstance(row_data, dict):
+                row = [_valor_csv(row_data.get(key, '')) for key in header_keys]
+            else:
+                row = row_data
+            lote.append(writer.writerow(row))
+            if len(lote) >= EXPORT_CONFIG['chunk_size']:
+                yield ''.join(lote)
+                lote = []
+    except Exception as e:
+        # El estado 200 ya se envió: se marca el archivo como incompleto y se
+        # propaga el error para que el servidor corte la transferencia
+        logger.error(f"Error generando CSV, exportación incompleta: {e}")
+        lote.append(writer.writerow([CSVConfig.MARCA_ERROR.format(error=e)]))
+        yield ''.join(lote)
+        raise
+    if lote:
+        yield ''.join(lote)
+
+
+def create_csv_response(data, headers, filename):
+    """
+    Crea una respuesta HTTP con un archivo CSV formateado correctamente.
+
+    La respuesta se transmite por partes (StreamingHttpResponse): data puede
+    ser cualquier iterable, p. ej. iterar_consulta(), y nunca se mantiene el
+    CSV completo en memoria.
+    """
+    response = StreamingHttpResponse(_generar_csv(data, headers), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
 
 from .utils import (
     ejecutar_procedimiento_almacenado,
     ejecutar_consulta_personalizada,
-    ejecutar_sp_dashboard_metrics,
+    debe_omitir_cache,
+    invalidar_cache_procedimiento,
+    obtener_estadisticas_cache,
+    ConsultaPaginada,
+    filtros_jobs_backup,
+    consulta_jobs_backup,
+    iterar_consulta,
+    iterar_procedimiento_almacenado,
     obtener_servidores_disponibles,
     obtener_bases_datos,
     formatear_resultado_backup,
     calcular_estadisticas_cumplimiento
 )
-from .config import STORED_PROCEDURES, QUERIES, DEFAULT_FILTERS, PAGINATION, THRESHOLDS
+from .config import (
+    STORED_PROCEDURES, QUERIES, DEFAULT_FILTERS, PAGINATION, THRESHOLDS, PROCEDURE_CACHE, EXPORT_CONFIG
+)
+from .eventos_dashboard import flujo_eventos
+from .recolectores import refrescar_si_vencido
+from .resumen_discos import series_crecimiento
+from .snapshot_dashboard import metricas_api, obtener_snapshot, sin_cambios_desde
+from .exportaciones import (
+    CONTENT_TYPES,
+    OPENPYXL_AVAILABLE,
+    escribir_excel,
+    generar_exportacion,
+    parametros_exportacion
+)
+from .models import TrabajoExportacion
+from .trabajos_exportacion import (
+    LimiteExportacionesError,
+    ruta_archivo_exportacion,
+    solicitar_exportacion
+)
 from .data_converters import (
     convert_cumplimiento_result,
-    convert_jobs_result,
     normalize_results,
-    format_cumplimiento_results
+    add_cumplimiento_format
 )
 from .constants import (
     DateFormats,
     ExportHeaders,
     ExportFileNames,
-    SheetNames,
-    ReportTitles
+    CSVConfig
 )
 
 logger = logging.getLogger(__name__)
@@ -236,7 +203,8 @@ def reporte_cumplimiento_excel(request):
         try:
             resultados = ejecutar_procedimiento_almacenado(
                 'sp_Programaciondebcks',
-                [fecha_inicio, fecha_fin]
+                [fecha_inicio, fecha_fin],
+                use_cache=not debe_omitir_cache(request)
             )
 
             # Convertir a formato consistente si es necesario
@@ -284,10 +252,11 @@ def reporte_cumplimiento_excel(request):
 
 @login_required
 def dashboard_view(request):
-    """Dashboard principal usando sp_DashboardMetrics"""
+    """Dashboard principal usando el snapshot de sp_DashboardMetrics"""
     try:
-        # Ejecutar el SP que devuelve todos los datos del dashboard
-        datos_dashboard = ejecutar_sp_dashboard_metrics()
+        # Snapshot del SP refrescado en segundo plano (snapshot_dashboard.py)
+        snapshot = obtener_snapshot()
+        datos_dashboard = snapshot['datos'] if snapshot else {}
         
         # Extraer métricas principales
         metricas = datos_dashboard.get('metricas', {})
@@ -352,7 +321,8 @@ def dashboard_view(request):
                 'weekly_trend': json.dumps(weekly_trend) if weekly_trend else '[]',
                 'top_servers': json.dumps(top_servers) if top_servers else '[]',
             },
-            'last_updated': timezone.now(),
+            'last_updated': snapshot['verificado'] if snapshot else timezone.now(),
+            'snapshot_generado': snapshot['generado'].isoformat() if snapshot else '',
         }
 
         return render(request, 'reportes/dashboard.html', context)
@@ -413,7 +383,8 @@ def cumplimiento_backup_view(request):
         try:
             resultados = ejecutar_procedimiento_almacenado(
                 'sp_Programaciondebcks',
-                [fecha_inicio, fecha_fin]
+                [fecha_inicio, fecha_fin],
+                use_cache=not debe_omitir_cache(request)
             )
 
             # Normalizar resultados usando data_converters
@@ -468,7 +439,11 @@ def cumplimiento_backup_view(request):
 
 @login_required
 def jobs_backup_view(request):
-    """Reporte de jobs usando sp_resultadoJobsBck - coincide exactamente con los campos del SP"""
+    """
+    Reporte de jobs leído directamente de JOBSBACKUPGENERADOS, paginado en
+    SQL. Las columnas son las mismas que devolvía sp_resultadoJobsBck, y las
+    exportaciones usan la misma consulta (consulta_jobs_backup).
+    """
     try:
         # Filtros
         fecha_inicio = request.GET.get('fecha_inicio', (timezone.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
@@ -478,33 +453,27 @@ def jobs_backup_view(request):
 
         logger.info(f"Ejecutando jobs backup: {fecha_inicio} a {fecha_fin}")
 
-        # Usar procedimiento almacenado sp_resultadoJobsBck
-        try:
-            resultados = ejecutar_procedimiento_almacenado(
-                'sp_resultadoJobsBck',
-                [fecha_inicio, fecha_fin]
-            )
-
-            # Normalizar resultados usando data_converters
-            resultados = normalize_results(resultados, convert_jobs_result)
-
-        except Exception as proc_error:
-            logger.warning(f"Error con sp_resultadoJobsBck: {proc_error}")
-            # Consulta directa como alternativa desde config
-            resultados = ejecutar_consulta_personalizada(QUERIES['jobs_resultado_directo'], [fecha_inicio, fecha_fin])
+        # Filtros aplicados en SQL (compartidos por la página, las estadísticas y las exportaciones)
+        filtros_sql, filtros_params = filtros_jobs_backup(servidor, resultado_filtro)
 
-        # Aplicar filtros adicionales en Python si es necesario
-        if servidor:
-            resultados = [r for r in resultados if servidor.lower() in r.get('SERVIDOR', '').lower()]
-        if resultado_filtro:
-            resultados = [r for r in resultados if resultado_filtro.lower() in r.get('RESULTADO', '').lower()]
+        # Solo se trae de SQL Server la página visible (COUNT + OFFSET/FETCH)
+        resultados = ConsultaPaginada(
+            QUERIES['jobs_resultado_paginado'] + filtros_sql,
+            [fecha_inicio, fecha_fin] + filtros_params,
+            order_by='FECHA_Y_HORA_INICIO DESC'
+        )
 
-        # Estadísticas
-        total = len(resultados)
-        exitosos = len([r for r in resultados if 'exitoso' in r.get('RESULTADO', '').lower()])
-        fallidos = len([r for r in resultados if 'fallido' in r.get('RESULTADO', '').lower() or 'error' in r.get('RESULTADO', '').lower()])
+        # Estadísticas calculadas con un agregado en SQL
+        fila_stats = ejecutar_consulta_personalizada(
+            QUERIES['jobs_resultado_estadisticas'] + filtros_sql,
+            ['%exitoso%', '%fallido%', '%error%', fecha_inicio, fecha_fin] + filtros_params
+        )
+        fila_stats = fila_stats[0] if fila_stats else {}
+        total = fila_stats.get('total') or 0
+        exitosos = fila_stats.get('exitosos') or 0
+        fallidos = fila_stats.get('fallidos') or 0
         otros = total - exitosos - fallidos
-        
+
         stats = {
             'total': total,
             'exitosos': exitosos,
@@ -587,7 +556,7 @@ def archivos_backup_view(request):
                 END as tipo_descripcion,
                 LEN(physical_device_name) as longitud_ruta
             FROM BACKUPSGENERADOS
-            WHERE CONVERT(date, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2)) >= DATEADD(day, -%s, GETDATE())
+            WHERE FECHA_HORA >= DATEADD(day, -%s, CONVERT(date, GETDATE()))
                 AND physical_device_name IS NOT NULL
         """
         
@@ -600,13 +569,15 @@ def archivos_backup_view(request):
             query += " AND TYPE = %s"
             params.append(tipo_backup)
             
-        query += """
-            ORDER BY 
-                CONVERT(date, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2)) DESC,
-                CONVERT(time, HORA) DESC
-        """
-        
-        resultados = ejecutar_consulta_personalizada(query, params)
+        # Solo se trae de SQL Server la página visible (COUNT + OFFSET/FETCH)
+        resultados = ConsultaPaginada(
+            query,
+            params,
+            order_by="""
+                FECHA_HORA DESC,
+                BCK_ID DESC
+            """
+        )
 
         # Paginación
         paginator = Paginator(resultados, PAGINATION['items_per_page'])
@@ -653,18 +624,11 @@ def estados_db_view(request):
         servidor = request.GET.get('servidor', '')
         estado = request.GET.get('estado', '')
 
-        logger.info("Ejecutando estados de bases de datos con sp_MonitorDatabaseStatus")
+        # El recolector solo se ejecuta si DatabaseStatusLog está vencido (recolectores.py)
+        refrescar_si_vencido('sp_MonitorDatabaseStatus')
 
-        # Usar procedimiento almacenado sp_MonitorDatabaseStatus y consultar DatabaseStatusLog
+        # Consultar DatabaseStatusLog
         try:
-            # Primero ejecutar el SP para actualizar datos
-            try:
-                ejecutar_procedimiento_almacenado('sp_MonitorDatabaseStatus')
-                logger.info("SP sp_MonitorDatabaseStatus ejecutado exitosamente")
-            except Exception as sp_error:
-                # El SP puede no devolver resultados (solo hace INSERT), esto es normal
-                logger.info(f"SP ejecutado (sin resultados de SELECT): {sp_error}")
-            
             # Consultar datos desde config
             query = QUERIES['estados_db_log']
             params = []
@@ -767,14 +731,14 @@ def ultimos_backup_view(request):
                         TYPE,
                         FECHA,
                         HORA,
+                        FECHA_HORA,
                         ROW_NUMBER() OVER (
                             PARTITION BY SERVIDOR, DatabaseName 
                             ORDER BY 
-                                CONVERT(date, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2)) DESC,
-                                CONVERT(time, HORA) DESC
+                                FECHA_HORA DESC
                         ) as rn,
                         DATEDIFF(hour, 
-                            CONVERT(datetime, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2) + ' ' + HORA), 
+                            FECHA_HORA, 
                             GETDATE()
                         ) as horas_transcurridas
                     FROM BACKUPSGENERADOS
@@ -796,8 +760,7 @@ def ultimos_backup_view(request):
                 FROM UltimosBackupsPorBD
                 WHERE rn = 1
                 ORDER BY 
-                    CONVERT(date, SUBSTRING(FECHA,7,4) + '-' + SUBSTRING(FECHA,4,2) + '-' + SUBSTRING(FECHA,1,2)) DESC,
-                    CONVERT(time, HORA) DESC
+                    FECHA_HORA DESC
             """)
 
         context = {
@@ -840,22 +803,28 @@ def listar_bd_view(request):
 @login_required
 @require_http_methods(["GET"])
 def api_dashboard_metrics(request):
-    """API para métricas del dashboard en tiempo real usando sp_DashboardMetrics"""
+    """
+    API para métricas del dashboard usando el snapshot de sp_DashboardMetrics.
+
+    Con ?desde=<generado de la respuesta anterior> responde solo
+    {'success': True, 'sin_cambios': True, 'generado'} si los datos no
+    cambiaron desde entonces.
+    """
     try:
-        # Usar el SP para obtener métricas
-        datos_dashboard = ejecutar_sp_dashboard_metrics()
-        metricas = datos_dashboard.get('metricas', {})
-        
+        snapshot = obtener_snapshot()
+        generado = snapshot['generado'].isoformat() if snapshot else None
+
+        try:
+            desde = parse_datetime(request.GET.get('desde', ''))
+        except ValueError:
+            desde = None
+        if sin_cambios_desde(snapshot, desde):
+            return JsonResponse({'success': True, 'sin_cambios': True, 'generado': generado})
+
         return JsonResponse({
             'success': True,
-            'data': {
-                'total_servidores': metricas.get('total_servidores', 0),
-                'total_bases_datos': metricas.get('total_bases_datos', 0),
-                'backups_hoy': metricas.get('backups_hoy', 0),
-                'backups_semana': metricas.get('backups_semana', 0),
-                'total_backups_historico': metricas.get('total_backups_historico', 0),
-                'total_jobs_historico': metricas.get('total_jobs_historico', 0),
-            },
+            'data': metricas_api(snapshot),
+            'generado': generado,
             'timestamp': timezone.now().isoformat()
         })
 
@@ -867,6 +836,66 @@ def api_dashboard_metrics(request):
         }, status=500)
 
 
+async def api_eventos_dashboard(request):
+    """
+    Canal SSE del dashboard: deltas de métricas y jobs fallidos nuevos
+    (eventos_dashboard.py).
+
+    Vista asíncrona: login_required y require_http_methods no aceptan
+    vistas async en Django 4.2, así que se validan aquí. Bajo WSGI responde
+    204, que indica al EventSource no reconectar; la plantilla sigue
+    consultando api_dashboard_metrics.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    if not await sync_to_async(lambda: request.user.is_authenticated)():
+        return HttpResponse(status=403)
+
+    response = StreamingHttpResponse(flujo_eventos(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Sin buffer en proxies inversos (nginx)
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+@require_http_methods(["GET", "POST"])
+def api_cache_procedimientos(request):
+    """
+    API de administración del cache de procedimientos almacenados.
+
+    GET devuelve los contadores de hits/misses; POST invalida el cache
+    (parámetro opcional 'procedimiento' para invalidar solo uno).
+    """
+    if not request.user.is_staff:
+        return JsonResponse({'success': False, 'error': 'No autorizado'}, status=403)
+
+    try:
+        if request.method == 'POST':
+            proc_name = request.POST.get('procedimiento') or None
+            if proc_name and proc_name not in PROCEDURE_CACHE:
+                return JsonResponse({
+                    'success': False,
+                    'error': f'Procedimiento sin cache: {proc_name}'
+                }, status=400)
+            invalidar_cache_procedimiento(proc_name)
+
+        return JsonResponse({
+            'success': True,
+            'data': obtener_estadisticas_cache(),
+            'timestamp': timezone.now().isoformat()
+        })
+
+    except Exception as e:
+        logger.error(f"Error en API cache: {e}")
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
+
 @login_required
 def disk_growth_view(request):
     """Reporte de crecimiento de discos usando DiskGrowthLog y sp_MonitorDiskGrowth"""
@@ -879,50 +908,41 @@ def disk_growth_view(request):
         
         logger.info(f"Ejecutando reporte de disk growth: {fecha_inicio} a {fecha_fin}")
         
-        # Primero, ejecutar el SP para actualizar los datos más recientes
-        try:
-            ejecutar_procedimiento_almacenado('usp_MonitorDiskGrowth')
-            logger.info("SP usp_MonitorDiskGrowth ejecutado exitosamente")
-        except Exception as sp_error:
-            logger.warning(f"Error ejecutando usp_MonitorDiskGrowth: {sp_error}")
-            # Continuar con el reporte aunque falle el SP
+        # El recolector solo se ejecuta si DiskGrowthLog está vencido (recolectores.py)
+        refrescar_si_vencido('usp_MonitorDiskGrowth')
         
         # Consultar datos históricos desde config
         params = [fecha_inicio, fecha_fin]
-        query = QUERIES['disk_growth_detallado']
+        filtros_sql = ''
         
-        # Aplicar filtros adicionales
+        # Aplicar filtros adicionales (compartidos por la página y las estadísticas)
         if servidor:
-            query += " AND ServerIP LIKE %s"
+            filtros_sql += " AND ServerIP LIKE %s"
             params.append(f'%{servidor}%')
         if base_datos:
-            query += " AND DatabaseName LIKE %s"
+            filtros_sql += " AND DatabaseName LIKE %s"
             params.append(f'%{base_datos}%')
             
-        query += " ORDER BY LogDate DESC, ServerIP, DatabaseName, FileName"
-        
-        resultados = ejecutar_consulta_personalizada(query, params)
+        # Solo se trae de SQL Server la página visible (COUNT + OFFSET/FETCH)
+        resultados = ConsultaPaginada(
+            QUERIES['disk_growth_detallado'] + filtros_sql,
+            params,
+            order_by="LogDate DESC, ServerIP, DatabaseName, FileName, LogID DESC"
+        )
         
-        # Calcular estadísticas
-        if resultados:
-            total_registros = len(resultados)
-            espacio_total_usado = sum(float(r.get('FileSizeMB', 0)) for r in resultados)
-            espacio_total_libre = sum(float(r.get('DiskFreeMB', 0)) for r in resultados)
-            servidores_unicos = len(set(r.get('ServerIP', '') for r in resultados))
-            bases_unicas = len(set(r.get('DatabaseName', '') for r in resultados))
-            
-            # Identificar discos con poco espacio
-            discos_criticos = len([r for r in resultados if r.get('status_class') == 'danger'])
-            discos_advertencia = len([r for r in resultados if r.get('status_class') == 'warning'])
-            
+        # Calcular estadísticas con un agregado en SQL (mismos filtros)
+        fila_stats = ejecutar_consulta_personalizada(QUERIES['disk_growth_estadisticas'] + filtros_sql, params)
+        fila_stats = fila_stats[0] if fila_stats else {}
+
+        if fila_stats.get('total_registros'):
             estadisticas = {
-                'total_registros': total_registros,
-                'espacio_usado_gb': round(espacio_total_usado / 1024, 2),
-                'espacio_libre_gb': round(espacio_total_libre / 1024, 2),
-                'servidores': servidores_unicos,
-                'bases_datos': bases_unicas,
-                'discos_criticos': discos_criticos,
-                'discos_advertencia': discos_advertencia
+                'total_registros': fila_stats['total_registros'],
+                'espacio_usado_gb': round(float(fila_stats.get('espacio_usado_mb') or 0) / 1024, 2),
+                'espacio_libre_gb': round(float(fila_stats.get('espacio_libre_mb') or 0) / 1024, 2),
+                'servidores': fila_stats.get('servidores') or 0,
+                'bases_datos': fila_stats.get('bases_datos') or 0,
+                'discos_criticos': fila_stats.get('discos_criticos') or 0,
+                'discos_advertencia': fila_stats.get('discos_advertencia') or 0
             }
         else:
             estadisticas = {
@@ -952,18 +972,13 @@ def disk_growth_view(request):
         except Exception:
             bases_datos = []
 
-        # Obtener tendencia de crecimiento (últimos 7 días)
+        # Series del gráfico: muestras o resumen diario/semanal según el
+        # rango, reducidas con LTTB (resumen_discos.py)
         try:
-            tendencia = ejecutar_consulta_personalizada(QUERIES['disk_growth_tendencia'])
-            # Aplicar filtros de servidor y base de datos si están presentes
-            if servidor or base_datos:
-                tendencia = [
-                    t for t in tendencia
-                    if (not servidor or servidor.lower() in t.get('ServerIP', '').lower())
-                    and (not base_datos or base_datos.lower() in t.get('DatabaseName', '').lower())
-                ]
-        except Exception:
-            tendencia = []
+            series_grafico = series_crecimiento(fecha_inicio, fecha_fin, servidor, base_datos)
+        except Exception as e:
+            logger.warning(f"No se pudieron obtener las series de crecimiento: {e}")
+            series_grafico = {'resolucion': '', 'resolucion_nombre': '', 'series': []}
         
         context = {
             'resultados': page_obj,
@@ -974,7 +989,7 @@ def disk_growth_view(request):
             'base_datos': base_datos,
             'servidores': servidores,
             'bases_datos': bases_datos,
-            'tendencia': tendencia[:50] if tendencia else []  # Limitar a 50 registros para el gráfico
+            'series_grafico': series_grafico
         }
         
         return render(request, 'reportes/disk_growth.html', context)
@@ -999,7 +1014,7 @@ def disk_growth_view(request):
             'base_datos': '',
             'servidores': [],
             'bases_datos': [],
-            'tendencia': []
+            'series_grafico': {'resolucion': '', 'resolucion_nombre': '', 'series': []}
         }
         return render(request, 'reportes/disk_growth.html', context)
 
@@ -1008,68 +1023,29 @@ def disk_growth_view(request):
 # EXPORTACIÓN A PDF
 # =============================================================================
 
+def _respuesta_exportacion(request, tipo, formato):
+    """
+    Genera la exportación en la misma petición (ver exportaciones.py). Se
+    mantiene para enlaces directos; los botones PDF/Excel de los reportes
+    usan api_exportaciones (trabajo en segundo plano).
+    """
+    parametros = parametros_exportacion(tipo, request.GET)
+    response = HttpResponse(content_type=CONTENT_TYPES[formato])
+    filename = generar_exportacion(
+        tipo, formato, parametros, response,
+        use_cache=not debe_omitir_cache(request)
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    
+    logger.info(f"{'PDF' if formato == 'pdf' else 'Excel'} generado: {filename}")
+    return response
+
+
 @login_required
 def export_cumplimiento_pdf(request):
     """Exportar reporte de cumplimiento a PDF"""
-    from .pdf_generator import generate_cumplimiento_pdf
-    
     try:
-        # Obtener parámetros
-        fecha_inicio_param = request.GET.get('fecha')
-        fecha_fin_param = request.GET.get('fecha1')
-        
-        # Configurar fechas
-        if fecha_inicio_param:
-            fecha_inicio = datetime.strptime(fecha_inicio_param, '%Y-%m-%d').strftime('%Y-%m-%d')
-        else:
-            fecha_inicio = datetime.now().replace(day=1).strftime('%Y-%m-%d')
-            
-        if fecha_fin_param:
-            fecha_fin = datetime.strptime(fecha_fin_param, '%Y-%m-%d').strftime('%Y-%m-%d')
-        else:
-            fecha_fin = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-        
-        # Obtener datos
-        try:
-            resultados = ejecutar_procedimiento_almacenado(
-                'sp_Programaciondebcks',
-                [fecha_inicio, fecha_fin]
-            )
-
-            # Normalizar resultados
-            resultados = normalize_results(resultados, convert_cumplimiento_result)
-        except Exception as e:
-            logger.error(f"Error obteniendo datos para PDF: {e}")
-            resultados = []
-        
-        # Calcular estadísticas
-        total_registros = len(resultados)
-        total_ejecutadas = sum(int(r.get('TOTAL', 0)) for r in resultados)
-        total_programadas = sum(int(r.get('TOTALPROGRAM', 0)) for r in resultados)
-        
-        estadisticas = {
-            'total_registros': total_registros,
-            'total_ejecutadas': total_ejecutadas,
-            'total_programadas': total_programadas,
-            'promedio_cumplimiento': (total_ejecutadas / total_programadas * 100) if total_programadas > 0 else 0
-        }
-        
-        # Generar PDF
-        pdf_buffer = generate_cumplimiento_pdf(
-            resultados, 
-            estadisticas,
-            fecha_inicio.replace('/', '-'),
-            fecha_fin.replace('/', '-')
-        )
-        
-        # Respuesta HTTP
-        response = HttpResponse(pdf_buffer.read(), content_type='application/pdf')
-        filename = f"cumplimiento_backup_{fecha_inicio.replace('/', '-')}_a_{fecha_fin.replace('/', '-')}.pdf"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        logger.info(f"PDF generado: {filename}")
-        return response
-        
+        return _respuesta_exportacion(request, 'cumplimiento', 'pdf')
     except Exception as e:
         logger.error(f"Error generando PDF de cumplimiento: {e}")
         messages.error(request, f'Error al generar el PDF: {str(e)}')
@@ -1079,57 +1055,8 @@ def export_cumplimiento_pdf(request):
 @login_required
 def export_jobs_pdf(request):
     """Exportar reporte de jobs a PDF"""
-    from .pdf_generator import generate_jobs_pdf
-    
     try:
-        # Obtener parámetros
-        fecha_inicio = request.GET.get('fecha_inicio', (timezone.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
-        fecha_fin = request.GET.get('fecha_fin', timezone.now().strftime('%Y-%m-%d'))
-        servidor = request.GET.get('servidor', '')
-        resultado_filtro = request.GET.get('resultado', '')
-        
-        # Obtener datos
-        try:
-            resultados = ejecutar_procedimiento_almacenado(
-                'sp_resultadoJobsBck',
-                [fecha_inicio, fecha_fin]
-            )
-
-            # Normalizar resultados
-            resultados = normalize_results(resultados, convert_jobs_result)
-        except Exception as e:
-            logger.error(f"Error obteniendo datos para PDF: {e}")
-            resultados = []
-        
-        # Aplicar filtros
-        if servidor:
-            resultados = [r for r in resultados if servidor.lower() in r.get('SERVIDOR', '').lower()]
-        if resultado_filtro:
-            resultados = [r for r in resultados if resultado_filtro.lower() in r.get('RESULTADO', '').lower()]
-        
-        # Calcular estadísticas
-        total = len(resultados)
-        exitosos = len([r for r in resultados if 'exitoso' in r.get('RESULTADO', '').lower()])
-        fallidos = len([r for r in resultados if 'fallido' in r.get('RESULTADO', '').lower() or 'error' in r.get('RESULTADO', '').lower()])
-        
-        stats = {
-            'total': total,
-            'exitosos': exitosos,
-            'fallidos': fallidos,
-            'porcentaje_exito': (exitosos / total * 100) if total > 0 else 0
-        }
-        
-        # Generar PDF
-        pdf_buffer = generate_jobs_pdf(resultados, stats, fecha_inicio, fecha_fin)
-        
-        # Respuesta HTTP
-        response = HttpResponse(pdf_buffer.read(), content_type='application/pdf')
-        filename = f"jobs_backup_{fecha_inicio}_a_{fecha_fin}.pdf"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        logger.info(f"PDF generado: {filename}")
-        return response
-        
+        return _respuesta_exportacion(request, 'jobs', 'pdf')
     except Exception as e:
         logger.error(f"Error generando PDF de jobs: {e}")
         messages.error(request, f'Error al generar el PDF: {str(e)}')
@@ -1139,73 +1066,8 @@ def export_jobs_pdf(request):
 @login_required
 def export_estados_pdf(request):
     """Exportar reporte de estados de BD a PDF"""
-    from .pdf_generator import generate_estados_pdf
-    
     try:
-        # Obtener parámetros
-        servidor = request.GET.get('servidor', '')
-        estado = request.GET.get('estado', '')
-        
-        # Obtener datos
-        try:
-            # Ejecutar SP para actualizar datos
-            try:
-                ejecutar_procedimiento_almacenado('sp_MonitorDatabaseStatus')
-            except Exception:
-                pass
-            
-            # Consultar datos
-            query = """
-                SELECT 
-                    ServerName as SERVIDOR,
-                    DatabaseName as DATABASE_NAME,
-                    LastLogDate as FECHA_DE_CREACION,
-                    StateDesc as ESTADO,
-                    [State] as TIPO_ESTADO,
-                    ServerIP as IPSERVER
-                FROM dbo.DatabaseStatusLog
-                WHERE 1=1
-            """
-            params = []
-            
-            if servidor:
-                query += " AND ServerName LIKE %s"
-                params.append(f'%{servidor}%')
-            if estado:
-                query += " AND StateDesc LIKE %s"
-                params.append(f'%{estado}%')
-                
-            query += " ORDER BY LastLogDate DESC, ServerName, DatabaseName"
-            
-            resultados = ejecutar_consulta_personalizada(query, params)
-            
-        except Exception as e:
-            logger.error(f"Error obteniendo datos para PDF: {e}")
-            resultados = []
-        
-        # Calcular estadísticas
-        total = len(resultados)
-        online = len([r for r in resultados if r.get('ESTADO', '').upper() == 'ONLINE'])
-        servidores_unicos = len(set(r.get('SERVIDOR', '') for r in resultados if r.get('SERVIDOR')))
-        
-        stats = {
-            'total': total,
-            'online': online,
-            'otros': total - online,
-            'servidores': servidores_unicos
-        }
-        
-        # Generar PDF
-        pdf_buffer = generate_estados_pdf(resultados, stats)
-        
-        # Respuesta HTTP
-        response = HttpResponse(pdf_buffer.read(), content_type='application/pdf')
-        filename = f"estados_bd_{datetime.now().strftime('%Y-%m-%d')}.pdf"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        logger.info(f"PDF generado: {filename}")
-        return response
-        
+        return _respuesta_exportacion(request, 'estados', 'pdf')
     except Exception as e:
         logger.error(f"Error generando PDF de estados: {e}")
         messages.error(request, f'Error al generar el PDF: {str(e)}')
@@ -1215,89 +1077,8 @@ def export_estados_pdf(request):
 @login_required
 def export_disk_growth_pdf(request):
     """Exportar reporte de crecimiento de discos a PDF"""
-    from .pdf_generator import generate_disk_growth_pdf
-    
     try:
-        # Obtener parámetros
-        fecha_inicio = request.GET.get('fecha_inicio', (timezone.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
-        fecha_fin = request.GET.get('fecha_fin', timezone.now().strftime('%Y-%m-%d'))
-        servidor = request.GET.get('servidor', '')
-        base_datos = request.GET.get('base_datos', '')
-        
-        # Obtener datos
-        try:
-            query = """
-                SELECT 
-                    LogID,
-                    ServerIP,
-                    DatabaseName,
-                    FileName,
-                    FilePath,
-                    FileSizeMB,
-                    DiskFreeMB,
-                    LogDate,
-                    CAST((DiskFreeMB * 100.0 / (FileSizeMB + DiskFreeMB)) AS DECIMAL(5,2)) as PorcentajeLibre,
-                    CASE 
-                        WHEN DiskFreeMB < 10240 THEN 'danger'
-                        WHEN DiskFreeMB < 51200 THEN 'warning'
-                        ELSE 'success'
-                    END as status_class
-                FROM DiskGrowthLog
-                WHERE CONVERT(date, LogDate) BETWEEN %s AND %s
-            """
-            
-            params = [fecha_inicio, fecha_fin]
-            
-            if servidor:
-                query += " AND ServerIP LIKE %s"
-                params.append(f'%{servidor}%')
-            if base_datos:
-                query += " AND DatabaseName LIKE %s"
-                params.append(f'%{base_datos}%')
-                
-            query += " ORDER BY LogDate DESC, ServerIP, DatabaseName, FileName"
-            
-            resultados = ejecutar_consulta_personalizada(query, params)
-            
-        except Exception as e:
-            logger.error(f"Error obteniendo datos para PDF: {e}")
-            resultados = []
-        
-        # Calcular estadísticas
-        if resultados:
-            total_registros = len(resultados)
-            espacio_total_usado = sum(float(r.get('FileSizeMB', 0)) for r in resultados)
-            espacio_total_libre = sum(float(r.get('DiskFreeMB', 0)) for r in resultados)
-            discos_criticos = len([r for r in resultados if r.get('status_class') == 'danger'])
-            discos_advertencia = len([r for r in resultados if r.get('status_class') == 'warning'])
-            
-            estadisticas = {
-                'total_registros': total_registros,
-                'espacio_usado_gb': round(espacio_total_usado / 1024, 2),
-                'espacio_libre_gb': round(espacio_total_libre / 1024, 2),
-                'discos_criticos': discos_criticos,
-                'discos_advertencia': discos_advertencia
-            }
-        else:
-            estadisticas = {
-                'total_registros': 0,
-                'espacio_usado_gb': 0,
-                'espacio_libre_gb': 0,
-                'discos_criticos': 0,
-                'discos_advertencia': 0
-            }
-        
-        # Generar PDF
-        pdf_buffer = generate_disk_growth_pdf(resultados, estadisticas, fecha_inicio, fecha_fin)
-        
-        # Respuesta HTTP
-        response = HttpResponse(pdf_buffer.read(), content_type='application/pdf')
-        filename = f"disk_growth_{fecha_inicio}_a_{fecha_fin}.pdf"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        logger.info(f"PDF generado: {filename}")
-        return response
-        
+        return _respuesta_exportacion(request, 'disk_growth', 'pdf')
     except Exception as e:
         logger.error(f"Error generando PDF de disk growth: {e}")
         messages.error(request, f'Error al generar el PDF: {str(e)}')
@@ -1312,42 +1093,7 @@ def export_disk_growth_pdf(request):
 def export_cumplimiento_excel(request):
     """Exportar reporte de cumplimiento a Excel con formato profesional"""
     try:
-        # Obtener parámetros
-        fecha_inicio_param = request.GET.get('fecha')
-        fecha_fin_param = request.GET.get('fecha1')
-        
-        # Configurar fechas
-        if fecha_inicio_param:
-            fecha_inicio = datetime.strptime(fecha_inicio_param, '%Y-%m-%d').strftime('%Y-%m-%d')
-        else:
-            fecha_inicio = datetime.now().replace(day=1).strftime('%Y-%m-%d')
-            
-        if fecha_fin_param:
-            fecha_fin = datetime.strptime(fecha_fin_param, '%Y-%m-%d').strftime('%Y-%m-%d')
-        else:
-            fecha_fin = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-        
-        # Obtener datos
-        try:
-            resultados = ejecutar_procedimiento_almacenado(
-                'sp_Programaciondebcks',
-                [fecha_inicio, fecha_fin]
-            )
-
-            # Normalizar y formatear resultados
-            resultados = normalize_results(resultados, convert_cumplimiento_result)
-            resultados = format_cumplimiento_results(resultados)
-        except Exception as e:
-            logger.error(f"Error obteniendo datos para Excel: {e}")
-            resultados = []
-        
-        headers = ExportHeaders.CUMPLIMIENTO
-        filename = ExportFileNames.timestamped('cumplimiento_backup', 'xlsx')
-        title = f"{ReportTitles.CUMPLIMIENTO} ({fecha_inicio} - {fecha_fin})"
-
-        logger.info(f"Excel generado: {filename}")
-        return create_styled_excel(resultados, headers, filename, title=title, sheet_name=SheetNames.CUMPLIMIENTO)
-        
+        return _respuesta_exportacion(request, 'cumplimiento', 'excel')
     except Exception as e:
         logger.error(f"Error generando Excel de cumplimiento: {e}")
         messages.error(request, f'Error al generar el Excel: {str(e)}')
@@ -1358,38 +1104,7 @@ def export_cumplimiento_excel(request):
 def export_jobs_excel(request):
     """Exportar reporte de jobs a Excel con formato profesional"""
     try:
-        # Obtener parámetros
-        fecha_inicio = request.GET.get('fecha_inicio', (timezone.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
-        fecha_fin = request.GET.get('fecha_fin', timezone.now().strftime('%Y-%m-%d'))
-        servidor = request.GET.get('servidor', '')
-        resultado_filtro = request.GET.get('resultado', '')
-        
-        # Obtener datos
-        try:
-            resultados = ejecutar_procedimiento_almacenado(
-                'sp_resultadoJobsBck',
-                [fecha_inicio, fecha_fin]
-            )
-
-            # Normalizar resultados
-            resultados = normalize_results(resultados, convert_jobs_result)
-        except Exception as e:
-            logger.error(f"Error obteniendo datos para Excel: {e}")
-            resultados = []
-        
-        # Aplicar filtros
-        if servidor:
-            resultados = [r for r in resultados if servidor.lower() in r.get('SERVIDOR', '').lower()]
-        if resultado_filtro:
-            resultados = [r for r in resultados if resultado_filtro.lower() in r.get('RESULTADO', '').lower()]
-        
-        headers = ExportHeaders.JOBS
-        filename = ExportFileNames.timestamped('jobs_backup', 'xlsx')
-        title = f"{ReportTitles.JOBS} ({fecha_inicio} - {fecha_fin})"
-
-        logger.info(f"Excel generado: {filename}")
-        return create_styled_excel(resultados, headers, filename, title=title, sheet_name=SheetNames.JOBS)
-        
+        return _respuesta_exportacion(request, 'jobs', 'excel')
     except Exception as e:
         logger.error(f"Error generando Excel de jobs: {e}")
         messages.error(request, f'Error al generar el Excel: {str(e)}')
@@ -1400,60 +1115,7 @@ def export_jobs_excel(request):
 def export_estados_excel(request):
     """Exportar reporte de estados de BD a Excel con formato profesional"""
     try:
-        # Obtener parámetros
-        servidor = request.GET.get('servidor', '')
-        estado = request.GET.get('estado', '')
-        
-        # Obtener datos
-        try:
-            # Ejecutar SP para actualizar datos
-            try:
-                ejecutar_procedimiento_almacenado('sp_MonitorDatabaseStatus')
-            except Exception:
-                pass
-            
-            # Consultar datos
-            query = """
-                SELECT 
-                    ServerName as SERVIDOR,
-                    DatabaseName as DATABASE_NAME,
-                    LastLogDate as FECHA_DE_CREACION,
-                    StateDesc as ESTADO,
-                    [State] as TIPO_ESTADO,
-                    ServerIP as IPSERVER
-                FROM dbo.DatabaseStatusLog
-                WHERE 1=1
-            """
-            params = []
-            
-            if servidor:
-                query += " AND ServerName LIKE %s"
-                params.append(f'%{servidor}%')
-            if estado:
-                query += " AND StateDesc LIKE %s"
-                params.append(f'%{estado}%')
-                
-            query += " ORDER BY LastLogDate DESC, ServerName, DatabaseName"
-            
-            resultados = ejecutar_consulta_personalizada(query, params)
-            
-        except Exception as e:
-            logger.error(f"Error obteniendo datos para Excel: {e}")
-            resultados = []
-        
-        # Formatear fechas
-        for r in resultados:
-            if 'FECHA_DE_CREACION' in r and r['FECHA_DE_CREACION']:
-                if hasattr(r['FECHA_DE_CREACION'], 'strftime'):
-                    r['FECHA_DE_CREACION'] = r['FECHA_DE_CREACION'].strftime('%Y-%m-%d %H:%M:%S')
-        
-        headers = ExportHeaders.ESTADOS_DB
-        filename = ExportFileNames.timestamped('estados_bd', 'xlsx')
-        title = ReportTitles.ESTADOS_DB
-
-        logger.info(f"Excel generado: {filename}")
-        return create_styled_excel(resultados, headers, filename, title=title, sheet_name=SheetNames.ESTADOS_DB)
-        
+        return _respuesta_exportacion(request, 'estados', 'excel')
     except Exception as e:
         logger.error(f"Error generando Excel de estados: {e}")
         messages.error(request, f'Error al generar el Excel: {str(e)}')
@@ -1464,76 +1126,107 @@ def export_estados_excel(request):
 def export_disk_growth_excel(request):
     """Exportar reporte de crecimiento de discos a Excel con formato profesional"""
     try:
-        # Obtener parámetros
-        fecha_inicio = request.GET.get('fecha_inicio', (timezone.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
-        fecha_fin = request.GET.get('fecha_fin', timezone.now().strftime('%Y-%m-%d'))
-        servidor = request.GET.get('servidor', '')
-        base_datos = request.GET.get('base_datos', '')
-        
-        # Obtener datos
-        try:
-            query = """
-                SELECT 
-                    LogID,
-                    ServerIP,
-                    DatabaseName,
-                    FileName,
-                    FilePath,
-                    FileSizeMB,
-                    DiskFreeMB,
-                    LogDate,
-                    CAST((DiskFreeMB * 100.0 / (FileSizeMB + DiskFreeMB)) AS DECIMAL(5,2)) as PorcentajeLibre,
-                    CASE 
-                        WHEN DiskFreeMB < 10240 THEN 'CRÍTICO'
-                        WHEN DiskFreeMB < 51200 THEN 'ADVERTENCIA'
-                        ELSE 'OK'
-                    END as Estado
-                FROM DiskGrowthLog
-                WHERE CONVERT(date, LogDate) BETWEEN %s AND %s
-            """
-            
-            params = [fecha_inicio, fecha_fin]
-            
-            if servidor:
-                query += " AND ServerIP LIKE %s"
-                params.append(f'%{servidor}%')
-            if base_datos:
-                query += " AND DatabaseName LIKE %s"
-                params.append(f'%{base_datos}%')
-                
-            query += " ORDER BY LogDate DESC, ServerIP, DatabaseName, FileName"
-            
-            resultados = ejecutar_consulta_personalizada(query, params)
-            
-        except Exception as e:
-            logger.error(f"Error obteniendo datos para Excel: {e}")
-            resultados = []
-        
-        # Formatear datos
-        for r in resultados:
-            if 'LogDate' in r and r['LogDate']:
-                if hasattr(r['LogDate'], 'strftime'):
-                    r['LogDate'] = r['LogDate'].strftime('%Y-%m-%d %H:%M:%S')
-            if 'FileSizeMB' in r and r['FileSizeMB'] is not None:
-                r['FileSizeMB'] = f"{float(r['FileSizeMB']):,.2f}"
-            if 'DiskFreeMB' in r and r['DiskFreeMB'] is not None:
-                r['DiskFreeMB'] = f"{float(r['DiskFreeMB']):,.2f}"
-            if 'PorcentajeLibre' in r and r['PorcentajeLibre'] is not None:
-                r['PorcentajeLibre'] = f"{float(r['PorcentajeLibre']):.2f}%"
-        
-        headers = ExportHeaders.DISK_GROWTH
-        filename = ExportFileNames.timestamped('crecimiento_discos', 'xlsx')
-        title = f"{ReportTitles.DISK_GROWTH} ({fecha_inicio} - {fecha_fin})"
-
-        logger.info(f"Excel generado: {filename}")
-        return create_styled_excel(resultados, headers, filename, title=title, sheet_name=SheetNames.DISK_GROWTH)
-        
+        return _respuesta_exportacion(request, 'disk_growth', 'excel')
     except Exception as e:
         logger.error(f"Error generando Excel de disk growth: {e}")
         messages.error(request, f'Error al generar el Excel: {str(e)}')
         return redirect('reportes:disk_growth')
 
 
+# =============================================================================
+# EXPORTACIONES EN SEGUNDO PLANO (PDF/EXCEL)
+# =============================================================================
+
+def _trabajo_json(trabajo):
+    """Representación JSON de un trabajo de exportación"""
+    data = {
+        'id': str(trabajo.pk),
+        'tipo': trabajo.tipo,
+        'formato': trabajo.formato,
+        'estado': trabajo.estado,
+        'nombre_archivo': trabajo.nombre_archivo,
+        'tamano_bytes': trabajo.tamano_bytes,
+        'error': trabajo.error,
+        'fecha_creacion': trabajo.fecha_creacion.isoformat() if trabajo.fecha_creacion else None,
+        'fecha_fin': trabajo.fecha_fin.isoformat() if trabajo.fecha_fin else None,
+        'url_estado': reverse('reportes:api_estado_exportacion', args=[trabajo.pk]),
+        'url_descarga': None,
+    }
+    if trabajo.estado == TrabajoExportacion.ESTADO_COMPLETADO:
+        data['url_descarga'] = reverse('reportes:descargar_exportacion', args=[trabajo.pk])
+    return data
+
+
+@login_required
+@require_http_methods(["GET", "POST"])
+def api_exportaciones(request):
+    """
+    GET lista los trabajos de exportación recientes del usuario.
+    POST solicita una exportación: 'tipo' (cumplimiento, jobs, estados,
+    disk_growth), 'formato' (pdf, excel) y los mismos filtros que la
+    exportación directa. Responde 202 con el id del trabajo para consultar
+    su estado; una solicitud idéntica en curso devuelve el trabajo existente.
+    """
+    if request.method == 'GET':
+        trabajos = TrabajoExportacion.objects.filter(usuario=request.user)[:20]
+        return JsonResponse({
+            'success': True,
+            'data': [_trabajo_json(t) for t in trabajos]
+        })
+
+    try:
+        tipo = request.POST.get('tipo', '')
+        formato = request.POST.get('formato', '')
+        parametros = parametros_exportacion(tipo, request.POST)
+        trabajo, creado = solicitar_exportacion(request.user, tipo, formato, parametros)
+
+        return JsonResponse({
+            'success': True,
+            'deduplicado': not creado,
+            'data': _trabajo_json(trabajo)
+        }, status=202)
+
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except LimiteExportacionesError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=429)
+    except Exception as e:
+        logger.error(f"Error solicitando exportación: {e}")
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+@login_required
+@require_http_methods(["GET"])
+def api_estado_exportacion(request, trabajo_id):
+    """Estado de un trabajo de exportación del usuario (para polling)"""
+    trabajo = get_object_or_404(TrabajoExportacion, pk=trabajo_id, usuario=request.user)
+    return JsonResponse({'success': True, 'data': _trabajo_json(trabajo)})
+
+
+@login_required
+@require_http_methods(["GET"])
+def descargar_exportacion(request, trabajo_id):
+    """Descarga el archivo de un trabajo de exportación completado"""
+    trabajo = get_object_or_404(TrabajoExportacion, pk=trabajo_id, usuario=request.user)
+
+    if trabajo.estado != TrabajoExportacion.ESTADO_COMPLETADO:
+        return JsonResponse({
+            'success': False,
+            'error': f'La exportación está en estado {trabajo.get_estado_display()}'
+        }, status=409)
+
+    ruta = ruta_archivo_exportacion(trabajo)
+    if not os.path.exists(ruta):
+        raise Http404('El archivo de la exportación ya no está disponible')
+
+    return FileResponse(
+        open(ruta, 'rb'),
+        as_attachment=True,
+        filename=trabajo.nombre_archivo,
+        content_type=CONTENT_TYPES[trabajo.formato]
+    )
+
+
 # =============================================================================
 # EXPORTACIÓN A CSV
 # =============================================================================
@@ -1555,17 +1248,13 @@ def export_cumplimiento_csv(request):
         else:
             fecha_fin = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
         
-        try:
-            resultados = ejecutar_procedimiento_almacenado(
-                'sp_Programaciondebcks',
-                [fecha_inicio, fecha_fin]
-            )
-
-            # Normalizar y formatear resultados
-            resultados = normalize_results(resultados, convert_cumplimiento_result)
-            resultados = format_cumplimiento_results(resultados)
-        except Exception as e:
-            resultados = []
+        # Filas por lotes (desde cache si existe); se formatean al escribirse
+        filas = iterar_procedimiento_almacenado(
+            'sp_Programaciondebcks',
+            [fecha_inicio, fecha_fin],
+            use_cache=not debe_omitir_cache(request)
+        )
+        resultados = (add_cumplimiento_format(r) for r in filas)
         
         headers = ExportHeaders.CUMPLIMIENTO
         filename = ExportFileNames.timestamped('cumplimiento_backup', 'csv')
@@ -1584,16 +1273,11 @@ def export_jobs_csv(request):
         fecha_inicio = request.GET.get('fecha_inicio', (timezone.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
         fecha_fin = request.GET.get('fecha_fin', timezone.now().strftime('%Y-%m-%d'))
         
-        try:
-            resultados = ejecutar_procedimiento_almacenado(
-                'sp_resultadoJobsBck',
-                [fecha_inicio, fecha_fin]
-            )
-
-            # Normalizar resultados
-            resultados = normalize_results(resultados, convert_jobs_result)
-        except Exception as e:
-            resultados = []
+        # Misma consulta y filtros que la página, leída por lotes
+        query, params = consulta_jobs_backup(
+            fecha_inicio, fecha_fin, request.GET.get('servidor', ''), request.GET.get('resultado', '')
+        )
+        resultados = iterar_consulta(query, params)
         
         headers = ExportHeaders.JOBS
         filename = ExportFileNames.timestamped('jobs_backup', 'csv')
@@ -1612,36 +1296,29 @@ def export_estados_csv(request):
         servidor = request.GET.get('servidor', '')
         estado = request.GET.get('estado', '')
         
-        try:
-            query = """
-                SELECT 
-                    ServerName as SERVIDOR,
-                    DatabaseName as DATABASE_NAME,
-                    LastLogDate as FECHA_DE_CREACION,
-                    StateDesc as ESTADO,
-                    ServerIP as IPSERVER
-                FROM dbo.DatabaseStatusLog
-                WHERE 1=1
-            """
-            params = []
-            
-            if servidor:
-                query += " AND ServerName LIKE %s"
-                params.append(f'%{servidor}%')
-            if estado:
-                query += " AND StateDesc LIKE %s"
-                params.append(f'%{estado}%')
-                
-            query += " ORDER BY LastLogDate DESC"
+        query = """
+            SELECT 
+                ServerName as SERVIDOR,
+                DatabaseName as DATABASE_NAME,
+                LastLogDate as FECHA_DE_CREACION,
+                StateDesc as ESTADO,
+                ServerIP as IPSERVER
+            FROM dbo.DatabaseStatusLog
+            WHERE 1=1
+        """
+        params = []
+        
+        if servidor:
+            query += " AND ServerName LIKE %s"
+            params.append(f'%{servidor}%')
+        if estado:
+            query += " AND StateDesc LIKE %s"
+            params.append(f'%{estado}%')
             
-            resultados = ejecutar_consulta_personalizada(query, params)
-        except Exception as e:
-            resultados = []
+        query += " ORDER BY LastLogDate DESC"
         
-        for r in resultados:
-            if 'FECHA_DE_CREACION' in r and r['FECHA_DE_CREACION']:
-                if hasattr(r['FECHA_DE_CREACION'], 'strftime'):
-                    r['FECHA_DE_CREACION'] = r['FECHA_DE_CREACION'].strftime('%Y-%m-%d %H:%M:%S')
+        # Filas por lotes desde el cursor (las fechas se formatean al escribirse)
+        resultados = iterar_consulta(query, params)
         
         # Usar solo los headers necesarios para CSV (sin TIPO_ESTADO para simplificar)
         headers = [h for h in ExportHeaders.ESTADOS_DB if h[0] != 'TIPO_ESTADO']
@@ -1663,39 +1340,32 @@ def export_disk_growth_csv(request):
         servidor = request.GET.get('servidor', '')
         base_datos = request.GET.get('base_datos', '')
         
-        try:
-            query = """
-                SELECT 
-                    ServerIP,
-                    DatabaseName,
-                    FileName,
-                    FileSizeMB,
-                    DiskFreeMB,
-                    LogDate,
-                    FilePath
-                FROM DiskGrowthLog
-                WHERE CONVERT(date, LogDate) BETWEEN %s AND %s
-            """
-            
-            params = [fecha_inicio, fecha_fin]
-            
-            if servidor:
-                query += " AND ServerIP LIKE %s"
-                params.append(f'%{servidor}%')
-            if base_datos:
-                query += " AND DatabaseName LIKE %s"
-                params.append(f'%{base_datos}%')
-                
-            query += " ORDER BY LogDate DESC"
+        query = """
+            SELECT 
+                ServerIP,
+                DatabaseName,
+                FileName,
+                FileSizeMB,
+                DiskFreeMB,
+                LogDate,
+                FilePath
+            FROM DiskGrowthLog
+            WHERE CONVERT(date, LogDate) BETWEEN %s AND %s
+        """
+        
+        params = [fecha_inicio, fecha_fin]
+        
+        if servidor:
+            query += " AND ServerIP LIKE %s"
+            params.append(f'%{servidor}%')
+        if base_datos:
+            query += " AND DatabaseName LIKE %s"
+            params.append(f'%{base_datos}%')
             
-            resultados = ejecutar_consulta_personalizada(query, params)
-        except Exception as e:
-            resultados = []
+        query += " ORDER BY LogDate DESC"
         
-        for r in resultados:
-            if 'LogDate' in r and r['LogDate']:
-                if hasattr(r['LogDate'], 'strftime'):
-                    r['LogDate'] = r['LogDate'].strftime('%Y-%m-%d %H:%M:%S')
+        # Filas por lotes desde el cursor (las fechas se formatean al escribirse)
+        resultados = iterar_consulta(query, params)
         
         # Usar headers simplificados para CSV (sin PorcentajeLibre y Estado)
         headers = [h for h in ExportHeaders.DISK_GROWTH if h[0] not in ['PorcentajeLibre', 'Estado']]
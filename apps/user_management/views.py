@@ -18,6 +18,7 @@ from .forms import (
     RoleForm, UserFilterForm
 )
 from .utils import log_user_action, has_permission, get_client_ip
+from apps.reportes.recolectores import refrescar_si_vencido
 
 logger = logging.getLogger(__name__)
 
@@ -270,14 +271,11 @@ def database_status_report(request):
         server_filter = request.GET.get('server', '')
         state_filter = request.GET.get('state', '')
         
+        # Actualizar DatabaseStatusLog solo si está vencido
+        refrescar_si_vencido('usp_MonitorDatabaseStatus')
+
         # Consulta base
         with connection.cursor() as cursor:
-            # Ejecutar el SP para actualizar datos
-            try:
-                cursor.execute("EXEC usp_MonitorDatabaseStatus")
-            except Exception as sp_error:
-                logger.warning(f"Error ejecutando SP usp_MonitorDatabaseStatus: {sp_error}")
-            
             # Consultar los datos
             query = """
                 SELECT LogID, ServerName, ServerIP, DatabaseName, 
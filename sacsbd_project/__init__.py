@@ -0,0 +1,7 @@
+# Cargar Celery con Django para que @shared_task use la app del proyecto
+try:
+    from .celery import app as celery_app
+    __all__ = ('celery_app',)
+except ImportError:
+    # Sin Celery instalado las exportaciones solo funcionan en modo eager
+    pass
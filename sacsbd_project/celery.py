@@ -0,0 +1,18 @@
+# sacsbd_project/celery.py
+"""
+Aplicación Celery de SACSBD (exportaciones en segundo plano).
+
+Worker (en Windows usar el pool solo o threads):
+    celery -A sacsbd_project worker -l info --pool=solo
+Limpieza programada:
+    celery -A sacsbd_project beat -l info
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sacsbd_project.settings.development')
+
+app = Celery('sacsbd_project')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -181,6 +181,10 @@ STORAGES = {
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Archivos generados por las exportaciones en segundo plano (no se sirven
+# como media: se descargan con la vista que valida el usuario)
+EXPORTACIONES_ROOT = BASE_DIR / "exportaciones"
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -266,6 +270,51 @@ os.makedirs(BASE_DIR / 'logs', exist_ok=True)
 if DEBUG:
     INTERNAL_IPS = ['127.0.0.1', 'localhost']
 
+# Celery - exportaciones PDF/Excel y reclasificación de horas en segundo plano
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'limpiar-exportaciones': {
+        'task': 'reportes.limpiar_exportaciones',
+        'schedule': 3600,  # cada hora
+    },
+    # Snapshot del dashboard (DASHBOARD_SNAPSHOT_CONFIG['intervalo']). Requiere un
+    # cache compartido con los procesos web; con LocMemCache cada proceso
+    # refresca el suyo al vencer 'max_antiguedad'.
+    'refrescar-dashboard': {
+        'task': 'reportes.refrescar_dashboard',
+        'schedule': 300,  # cada 5 minutos
+    },
+    'recolectar-msdb': {
+        'task': 'reportes.recolectar_msdb',
+        'schedule': 900,  # cada 15 minutos
+    },
+    # Resúmenes de DiskGrowthLog del gráfico de crecimiento de discos (solo
+    # aquí o con el comando; las vistas no los actualizan)
+    'actualizar-resumenes-discos': {
+        'task': 'reportes.actualizar_resumenes_discos',
+        'schedule': 900,  # cada 15 minutos
+    },
+}
+
+# Servidores cuyo historial de msdb se recolecta en BACKUPSGENERADOS y
+# JOBSBACKUPGENERADOS (apps/reportes/recoleccion_msdb.py). Cada entrada:
+#   {'nombre': 'SRV01', 'ip': '10.0.0.11', 'alias': 'srv01'}  # alias de DATABASES
+#   {'nombre': 'SRV02', 'ip': '10.0.0.12', 'vinculado': 'SRV02'}  # servidor vinculado
+# Sin 'alias' ni 'vinculado' se lee el msdb de la instancia de 'default'.
+SERVIDORES_MONITOREADOS = []
+
+# True: las exportaciones se generan en el mismo proceso al solicitarlas
+# (sin broker ni worker; desarrollo y tests)
+EXPORTACIONES_EAGER = os.getenv('EXPORTACIONES_EAGER', 'False') == 'True'
+
+# True: la reclasificación de horas tras cambiar una vigencia normativa se
+# ejecuta en el mismo proceso al confirmar la transacción (sin worker)
+CLASIFICACION_EAGER = os.getenv('CLASIFICACION_EAGER', 'False') == 'True'
+
 # Configuraciones adicionales para user_management
 SESSION_TIMEOUT = 1800  # 30 minutos
 SYSTEM_NAME = 'SACSBD'
@@ -40,6 +40,10 @@ STORAGES = {
     },
 }
 
+# Exportaciones y reclasificación en segundo plano sin Redis/worker en desarrollo
+EXPORTACIONES_EAGER = os.getenv('EXPORTACIONES_EAGER', 'True') == 'True'
+CLASIFICACION_EAGER = os.getenv('CLASIFICACION_EAGER', 'True') == 'True'
+
 # Debug toolbar para desarrollo (opcional)
 # INSTALLED_APPS += ['debug_toolbar']
 # MIDDLEWARE += ['debug_toolbar.middleware.DebugToolbarMiddleware']
@@ -19,7 +19,7 @@ urlpatterns = [
 
     # Apps principales
     path('auth/', include('authentication.urls', namespace='authentication')),
-    path('reportes/', include('reportes.urls', namespace='reportes')),
+    path('reportes/', include('apps.reportes.urls', namespace='reportes')),
     path('users/', include('apps.user_management.urls', namespace='user_management')),
     path('recargos/', include('apps.horas_extras.urls', namespace='horas_extras')),
 